@@ -0,0 +1,112 @@
+"""
+Compares the throughput of the asyncio streams based `Server` with the
+`asyncio.Protocol` based `ProtocolServer`.
+
+Each server runs in its own process and answers every request with a small JSON
+body. The client opens `--concurrency` connections and sends `--requests`
+requests in total, either opening a new connection per request or reusing
+keep-alive connections.
+
+    PYTHONPATH=. python benchmarks/server_throughput.py --requests 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from typing import Any, List, Tuple
+
+from birchrest.http import ProtocolServer, Request, Response, Server
+
+SERVERS = {"streams": Server, "protocol": ProtocolServer}
+
+
+def _serve(name: str, queue: Any) -> None:
+    os.environ["birchrest_log_level"] = "test"
+
+    async def handler(_request: Request) -> Response:
+        return Response().send({"message": "Service is healthy!"})
+
+    async def main() -> None:
+        server = SERVERS[name](handler, host="127.0.0.1", port=0, backlog=1024)
+        task = asyncio.ensure_future(server.start())
+
+        while not server.ready:
+            await asyncio.sleep(0.01)
+
+        queue.put(server._server.sockets[0].getsockname()[1])  # type: ignore
+        await task
+
+    asyncio.run(main())
+
+
+async def _worker(port: int, count: int, keep_alive: bool) -> None:
+    request = b"GET /health HTTP/1.1\r\nHost: localhost\r\n"
+    request += b"\r\n" if keep_alive else b"Connection: close\r\n\r\n"
+    reader = writer = None
+
+    for _ in range(count):
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        assert reader is not None
+        writer.write(request)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+
+        if not keep_alive:
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def _load(port: int, requests: int, concurrency: int, keep_alive: bool) -> float:
+    per_worker = requests // concurrency
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_worker(port, per_worker, keep_alive) for _ in range(concurrency))
+    )
+    return per_worker * concurrency / (time.perf_counter() - started)
+
+
+def run(name: str, requests: int, concurrency: int, keep_alive: bool) -> float:
+    """Starts the named server in a subprocess and returns the measured requests per second."""
+    queue: Any = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(name, queue))
+    process.start()
+
+    try:
+        port = queue.get(timeout=10)
+        asyncio.run(_load(port, concurrency * 10, concurrency, keep_alive))
+        return asyncio.run(_load(port, requests, concurrency, keep_alive))
+    finally:
+        os.kill(process.pid, signal.SIGTERM)
+        process.join(10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    scenarios: List[Tuple[str, str, bool]] = [
+        ("streams, new connection per request", "streams", False),
+        ("protocol, new connection per request", "protocol", False),
+        ("protocol, keep-alive", "protocol", True),
+    ]
+
+    baseline = None
+    for label, name, keep_alive in scenarios:
+        rps = run(name, args.requests, args.concurrency, keep_alive)
+        baseline = baseline or rps
+        print(f"{label:<40} {rps:>10.0f} req/s  {rps / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ This module serves as the main entry point for the BirchRest framework.
 Modules imported include:
 - `app`: Contains the core `BirchRest` class to handle application setup.
 - `decorators`: Provides decorators like `get`, `post`, `controller`, and middleware helpers.
+- `di`: Provides the dependency injection `Container`.
 - `routes`: Defines controllers for managing routes.
 - `http`: Handles HTTP requests, responses, and status codes.
 - `types`: Defines core types such as middleware functions and route handlers.
@@ -11,11 +12,62 @@ Modules imported include:
 - `middlewares`: Includes various middleware like `RateLimiter`, `Logger`, and `Cors`.
 - `unittest`: Includes the TestAdapter for unittesting.
 
+The exported components and the subpackages are imported on first access, so
+importing a single subpackage, such as in the CLI or a worker process, does not
+import the whole framework.
 """
 
-from .app import BirchRest
-from .routes import Controller
-from .middlewares import Middleware
+import sys
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .app import BirchRest
+    from .routes import Controller
+    from .middlewares import Middleware
+
+_EXPORTS = {
+    "BirchRest": "app",
+    "Controller": "routes",
+    "Middleware": "middlewares",
+}
+
+_SUBPACKAGES = {
+    "app",
+    "benchmarks",
+    "cli",
+    "decorators",
+    "di",
+    "exceptions",
+    "http",
+    "metrics",
+    "middlewares",
+    "openapi",
+    "profiling",
+    "routes",
+    "tracing",
+    "types",
+    "unittest",
+    "utils",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        # Imported as `from .app import BirchRest` would be, rather than with
+        # importlib, so the import is reported by `python -X importtime`.
+        value = getattr(__import__(_EXPORTS[name], globals(), None, [name], 1), name)
+    elif name in _SUBPACKAGES:
+        __import__(f"{__name__}.{name}")
+        value = sys.modules[f"{__name__}.{name}"]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBPACKAGES)
 
 
 __all__ = ["BirchRest", "Controller", "Middleware"]
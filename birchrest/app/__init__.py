@@ -1,3 +1,22 @@
+from typing import TYPE_CHECKING, Any
+
 from .birchrest_app import BirchRest
 
-__all__ = ["BirchRest"]
+if TYPE_CHECKING:
+    from .process_pool import ProcessPool
+    from .asgi import AsgiAdapter
+    from .reloader import Reloader
+
+_LAZY = {"ProcessPool": "process_pool", "AsgiAdapter": "asgi", "Reloader": "reloader"}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(__import__(_LAZY[name], globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ["BirchRest", "ProcessPool", "AsgiAdapter", "Reloader"]
@@ -0,0 +1,201 @@
+"""
+ASGI 3 adapter for running a BirchRest application behind an ASGI server such as
+uvicorn or hypercorn. Requests are translated to `Request` objects and passed to the
+same `handle_request` the built in server uses, so routing, middleware, auth and
+error handling behave identically.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from json import JSONDecodeError
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, MutableMapping
+
+from birchrest.http import Request, Response
+from birchrest.utils import Logger
+
+if TYPE_CHECKING:
+    from .birchrest_app import BirchRest
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class AsgiAdapter:
+    """
+    An ASGI 3 application wrapping a BirchRest application.
+
+    The route table is built on the lifespan startup event, which also runs the
+    startup hooks registered with `on_startup`. Servers that do not send lifespan
+    events get the route table built on the first request instead. The background
+    tasks of a response run once its body has been sent, before the call returns.
+
+    WebSocket routes are only served by the built in servers. A WebSocket connection
+    arriving through ASGI is closed before it is accepted, which the ASGI server
+    answers with 403.
+
+    Attributes:
+        app (BirchRest): The wrapped application.
+    """
+
+    def __init__(self, app: BirchRest) -> None:
+        self.app = app
+        self._built = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._reject_websocket(receive, send)
+
+    def _build(self) -> None:
+        if not self._built:
+            self.app._build_api()
+            self._built = True
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+
+            if message["type"] == "lifespan.startup":
+                try:
+                    self._build()
+                    await self.app.startup()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+
+            elif message["type"] == "lifespan.shutdown":
+                try:
+                    await self.app.shutdown()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    await send({"type": "lifespan.shutdown.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _reject_websocket(receive: Receive, send: Send) -> None:
+        message = await receive()
+
+        if message["type"] == "websocket.connect":
+            Logger.warning("WebSocket connections are not supported through ASGI")
+            await send({"type": "websocket.close", "code": 1000})
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._build()
+
+        body = await self._read_body(receive)
+        headers = {
+            key.decode("latin-1").lower(): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+
+        path = scope.get("root_path", "") + scope["path"]
+        query_string = scope.get("query_string", b"")
+        if query_string:
+            path += "?" + query_string.decode("latin-1")
+
+        client = scope.get("client") or ("", None)
+
+        try:
+            request = Request(
+                scope["method"],
+                path,
+                f"HTTP/{scope.get('http_version', '1.1')}",
+                headers,
+                body.decode("utf-8"),
+                client[0],
+                client[1],
+            )
+        except JSONDecodeError:
+            Logger.warning("Failed to parse request as JSON")
+            await self._send(
+                send,
+                Response().status(400).send(
+                    {"error": "Failed to parse request, likely invalid JSON format"}
+                ),
+            )
+            return
+        except (ValueError, UnicodeDecodeError) as e:
+            Logger.warning(f"Failed to parse request: {e}")
+            await self._send(
+                send, Response().status(400).send({"error": "Malformed request"})
+            )
+            return
+
+        response = await self.app.handle_request(request)
+
+        try:
+            if response.stream is not None:
+                await self._send_stream(receive, send, response)
+            else:
+                await self._send(send, response)
+
+            await self.app.run_background(response)
+        finally:
+            self.app.background.drop(response)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks: List[bytes] = []
+
+        while True:
+            message = await receive()
+
+            if message["type"] == "http.disconnect":
+                break
+
+            chunks.append(message.get("body", b""))
+
+            if not message.get("more_body", False):
+                break
+
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _send(send: Send, response: Response) -> None:
+        body = response.json.encode("utf-8") if response._is_sent else b""
+        headers: Dict[str, str] = dict(response._headers)
+        headers["Content-Length"] = str(len(body))
+
+        await send(AsgiAdapter._start_message(response, headers))
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_stream(receive: Receive, send: Send, response: Response) -> None:
+        assert response.stream is not None
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        async def write(data: bytes) -> None:
+            await send({"type": "http.response.body", "body": data, "more_body": True})
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await send(AsgiAdapter._start_message(response, dict(response._headers)))
+            await response.stream.run(write, disconnected)
+            if not disconnected.is_set():
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+
+    @staticmethod
+    def _start_message(response: Response, headers: Dict[str, str]) -> Message:
+        return {
+            "type": "http.response.start",
+            "status": response._status_code,
+            "headers": [
+                (key.lower().encode("latin-1"), value.encode("latin-1"))
+                for key, value in headers.items()
+            ],
+        }
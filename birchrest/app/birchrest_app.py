@@ -10,7 +10,12 @@ Modules imported include:
 - `http`: Manages the server and request/response objects.
 - `routes`: Provides the base Controller and Route for registering API endpoints.
 - `utils`: Utility functions like `get_artwork` for server startup.
+- `metrics`: Records request metrics and serves them when enabled.
 - `version`: Holds the current version of the BirchRest framework.
+
+Optional features, such as metrics, profiling, the process pool, the OpenAPI
+generator and the ASGI adapter, are imported when they are enabled or used, to keep
+importing the framework fast.
 """
 
 import traceback
@@ -18,27 +23,51 @@ import os
 import importlib.util
 import sys
 import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
 
-from typing import Dict, List, Optional, Type, Any
-from colorama import init
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Any
 
 from birchrest.exceptions.api_error import (
     ApiError,
     MethodNotAllowed,
     BadRequest,
+    Conflict,
     NotFound,
 )
 from birchrest.http.server import Server
-from birchrest.utils import Logger
+from birchrest.http.background import BackgroundTasks
+from birchrest.http import event_loop
+from birchrest.utils import Logger, to_async
 from birchrest.routes import Route, Controller
+from birchrest.routes.router import RouteTable
+from birchrest.utils.executor import MiddlewareExecutor
 from birchrest.utils.artwork import get_artwork
 from birchrest.version import __version__
-from birchrest.openapi import routes_to_openapi
+from .discovery import discover_birch_files
 from ..http import Request, Response
+from ..http.timing import Timings, timed
 from ..exceptions import InvalidControllerRegistration
-from ..types import MiddlewareFunction, AuthHandlerFunction, ErrorHandler
+from ..types import (
+    MiddlewareFunction,
+    AuthHandlerFunction,
+    ErrorHandler,
+    LifecycleHook,
+    TimingHook,
+)
+
+if TYPE_CHECKING:
+    from birchrest.metrics import MetricsRegistry, HttpMetrics
+    from birchrest.tracing import Tracer
+    from birchrest.profiling import Profiler, Watchdog
+    from birchrest.di import Container
+    from .process_pool import ProcessPool
+    from .asgi import AsgiAdapter
+    from .reloader import Reloader
+    from .scheduler import Scheduler
 
 
+F = TypeVar("F", bound=Callable[..., Any])
+
 class BirchRest:
     """
     The core application class for the BirchRest framework, responsible for
@@ -50,21 +79,142 @@ class BirchRest:
         global_middlewares (List[MiddlewareFunction]): Global middleware applied to all routes.
         auth_handler (Optional[AuthHandlerFunction]): Authentication handler for protected routes.
         error_handler (Optional[ErrorHandler]): Error handler function for handling exceptions.
+        startup_hooks (List[LifecycleHook]): Functions run before the application starts serving.
+        shutdown_hooks (List[LifecycleHook]): Functions run after the application stopped serving.
+        server (Optional[Server]): The HTTP server serving the application, once started.
+        executor (Optional[Executor]): Executor that synchronous handlers, auth handlers,
+            middlewares and error handlers run in. Created on first use if not set.
+        process_pool (Optional[ProcessPool]): Pool that `@cpu_bound` route handlers run in.
+            Created when the API is built if any route needs it and it is not set.
+        metrics (Optional[MetricsRegistry]): Registry of the request metrics served at
+            `metrics_path`, None when metrics are disabled.
+        timing_hooks (List[TimingHook]): Functions receiving the stage timings of each request.
+        tracer (Optional[Tracer]): Tracer recording spans of sampled requests.
+        profiler (Optional[Profiler]): Runs profiling sessions, None when profiling is disabled.
+        watchdog (Optional[Watchdog]): Reports slow requests and a blocked event loop.
+        router (Optional[RouteTable]): The routes compiled for lookup. Building the
+            API resets it, so it is compiled on the first request, and reloading
+            controllers replaces it.
+        reloader (Optional[Reloader]): Reloads changed controllers while serving with
+            `reload=True`.
+        birch_files (List[str]): The paths of the imported __birch__.py files.
+        container (Optional[Container]): Injects the dependencies of route handlers
+            and controllers.
+        background (BackgroundTasks): Runs the tasks scheduled with `res.background`
+            once their response has been sent.
+        scheduler (Optional[Scheduler]): Runs the jobs registered with `every`, created
+            when the first job is registered.
     """
 
-    def __init__(self, log_level: str = "debug", base_path: str = "") -> None:
+    def __init__(
+        self,
+        log_level: str = "debug",
+        base_path: str = "",
+        max_workers: Optional[int] = None,
+        middleware_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        process_pool: Optional["ProcessPool"] = None,
+        metrics: bool = False,
+        metrics_path: str = "/metrics",
+        server_timing: bool = False,
+        tracer: Optional["Tracer"] = None,
+        profiling: bool = False,
+        profiling_path: str = "/debug/profile",
+        profiling_auth: Optional[AuthHandlerFunction] = None,
+        watchdog: Optional["Watchdog"] = None,
+        watchdog_path: str = "/debug/slow",
+        birch_file: Optional[str] = None,
+        container: Optional["Container"] = None,
+    ) -> None:
         """
         Initializes the BirchRest application with empty lists of controllers,
         global middleware, and optional handlers for authentication and error handling.
+
+        Args:
+            log_level (str): The log level of the application. Defaults to "debug".
+            base_path (str): A path prefixed to every route. Defaults to "".
+            max_workers (Optional[int]): Size of the thread pool that synchronous handlers
+                run in. Defaults to the ThreadPoolExecutor default.
+            middleware_workers (Optional[int]): Size of the separate thread pool that
+                synchronous middlewares run in. Bounds the number of requests inside
+                chains of synchronous middlewares, as each holds one thread per such
+                middleware. Defaults to the ThreadPoolExecutor default.
+            process_workers (Optional[int]): Number of worker processes for `@cpu_bound`
+                routes. Defaults to the CPU count.
+            process_pool (Optional[ProcessPool]): Pool that `@cpu_bound` routes run in,
+                for setting its queue size and timeout. Replaces `process_workers`.
+                Defaults to a pool created when the first `@cpu_bound` route is
+                prepared.
+            metrics (bool): Whether to record request metrics and serve them. Defaults to False.
+            metrics_path (str): The path the metrics are served at. Not prefixed with
+                `base_path`. Defaults to "/metrics".
+            server_timing (bool): Whether to send the stage timings of each request in a
+                `Server-Timing` header. Defaults to False.
+            tracer (Optional[Tracer]): Tracer recording spans of sampled requests and
+                continuing incoming `traceparent` headers. Defaults to None.
+            profiling (bool): Whether to serve the profiling route and accept profiling
+                requests from `birch profile --pid`. Defaults to False.
+            profiling_path (str): The path of the profiling route. Not prefixed with
+                `base_path`. Defaults to "/debug/profile".
+            profiling_auth (Optional[AuthHandlerFunction]): Auth handler of the profiling
+                and watchdog routes, for example one that only accepts administrators.
+                The routes are always protected and default to the application's auth
+                handler.
+            watchdog (Optional[Watchdog]): Watchdog reporting slow requests and a blocked
+                event loop. Its reports are served at `watchdog_path`. Defaults to None.
+            watchdog_path (str): The path the watchdog reports are served at. Not
+                prefixed with `base_path`. Defaults to "/debug/slow".
+            birch_file (Optional[str]): The __birch__.py file to import, or the directory
+                containing it, relative to the working directory. Skips searching for
+                it. Defaults to the `birchrest_birch_file` environment variable or the
+                `birch_file` setting in `[tool.birchrest]` of pyproject.toml.
+            container (Optional[Container]): Container injecting the dependencies of
+                route handlers and controllers. Its singleton and worker dependencies
+                are created on startup and torn down on shutdown. Defaults to None.
         """
         self.openapi: Dict[str, Any] = {}
         self.base_path = base_path
         self.controllers: List[Controller] = []
         self.global_middlewares: List[MiddlewareFunction] = []
         self.routes: List[Route] = []
+        self.router: Optional[RouteTable] = None
+        self._built = False
         self.auth_handler: Optional[AuthHandlerFunction] = None
         self.error_handler: Optional[ErrorHandler] = None
-        self._discover_controllers()
+        self.startup_hooks: List[LifecycleHook] = []
+        self.shutdown_hooks: List[LifecycleHook] = []
+        self._started = False
+        self.server: Optional[Server] = None
+        self.max_workers = max_workers
+        self.executor: Optional[Executor] = None
+        self.middleware_executor = MiddlewareExecutor(middleware_workers)
+        self.process_workers = process_workers
+        self.process_pool: Optional["ProcessPool"] = process_pool
+        self._error_handler: Optional[ErrorHandler] = None
+        self.metrics_path = metrics_path
+        self.metrics: Optional["MetricsRegistry"] = None
+        self._http_metrics: Optional["HttpMetrics"] = None
+        self.server_timing = server_timing
+        self.timing_hooks: List[TimingHook] = []
+        self._timing = server_timing or metrics
+        self.tracer = tracer
+        self.profiling_path = profiling_path
+        self.profiling_auth = profiling_auth
+        self.profiler: Optional["Profiler"] = None
+        if profiling:
+            from birchrest.profiling import Profiler
+
+            self.profiler = Profiler()
+        self.watchdog = watchdog
+        self.watchdog_path = watchdog_path
+        self.reloader: Optional["Reloader"] = None
+        self.birch_files: List[str] = []
+        self.container = container
+        self.background = BackgroundTasks(self._get_executor)
+        self.scheduler: Optional["Scheduler"] = None
+        if metrics:
+            self._enable_metrics()
+        self._discover_controllers(birch_file)
         if os.getenv("birchrest_log_level", "").lower() != "test":
             os.environ["birchrest_log_level"] = log_level
 
@@ -114,82 +264,387 @@ class BirchRest:
         """
 
         self.error_handler = handler
+        self._error_handler = None
+
+    def on_startup(self, handler: LifecycleHook) -> None:
+        """
+        Registers a function that is run before the application starts serving requests.
+        Hooks run in the order they were registered.
+
+        Args:
+            handler (LifecycleHook): A function without arguments, sync or async.
+        """
+
+        self.startup_hooks.append(handler)
+
+    def on_shutdown(self, handler: LifecycleHook) -> None:
+        """
+        Registers a function that is run after the application stopped serving requests.
+        Hooks run in the reverse order of registration.
+
+        Args:
+            handler (LifecycleHook): A function without arguments, sync or async.
+        """
+
+        self.shutdown_hooks.append(handler)
+
+    def every(
+        self,
+        seconds: float,
+        jitter: float = 0.0,
+        concurrency: int = 1,
+        name: Optional[str] = None,
+    ) -> Callable[[F], F]:
+        """
+        Decorator registering a function that is run every `seconds` while the
+        application is serving, on its event loop, or in the executor if it is
+        synchronous. Runs that fail are logged. On shutdown, runs in progress are
+        given the drain timeout to finish and then cancelled.
+
+        Args:
+            seconds (float): Seconds between the starts of two runs.
+            jitter (float): Up to this many seconds added at random to each interval.
+                Defaults to 0.
+            concurrency (int): The number of runs that may overlap. A run due while
+                as many are running is skipped. Defaults to 1.
+            name (Optional[str]): The name of the job in logs. Defaults to the
+                function's name.
+        """
+
+        from .scheduler import Job, Scheduler
+
+        if self.scheduler is None:
+            self.scheduler = Scheduler(self._get_executor)
+
+        def decorator(func: F) -> F:
+            assert self.scheduler is not None
+            self.scheduler.add(Job(func, seconds, jitter, concurrency, name))
+            return func
+
+        return decorator
+
+    def on_timing(self, hook: TimingHook) -> None:
+        """
+        Registers a function that receives the stage timings of every request once it
+        has been handled, for exporting them. Registering a hook enables timing.
+        The hook is called on the event loop and must not block.
+
+        Args:
+            hook (TimingHook): A function taking the request, the response and the timings.
+        """
+
+        self.timing_hooks.append(hook)
+        self._timing = True
+
+    async def startup(self) -> None:
+        """
+        Creates the dependencies of the container and runs the startup hooks. Called by
+        `serve` before the server starts listening and by the ASGI adapter on the
+        lifespan startup event.
+        """
+
+        if self.container is not None:
+            await self.container.startup()
+
+        if self.process_pool is not None:
+            await to_async(self.process_pool.start, self._get_executor)()
+
+        for hook in self.startup_hooks:
+            await to_async(hook, self._get_executor)()
+
+        if self.watchdog is not None:
+            self.watchdog.start()
 
-    def serve(self, host: str = "127.0.0.1", port: int = 13337) -> None:
+        if self.scheduler is not None:
+            self.scheduler.start()
+
+        self._started = True
+
+    async def shutdown(self) -> None:
+        """
+        Stops the scheduled jobs and waits for them and the background tasks, runs
+        the shutdown hooks, then tears down the dependencies of the container. A
+        failing hook is logged and does not prevent the remaining hooks from running.
+        """
+
+        self._started = False
+        timeout = self.server.drain_timeout if self.server is not None else 30.0
+
+        if self.scheduler is not None:
+            await self.scheduler.stop(timeout)
+
+        await self.background.drain(timeout)
+
+        if self.watchdog is not None:
+            self.watchdog.stop()
+
+        for hook in reversed(self.shutdown_hooks):
+            try:
+                await to_async(hook, self._get_executor)()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                Logger.error(
+                    "Shutdown hook failed",
+                    {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+                )
+
+        if self.container is not None:
+            await self.container.shutdown()
+
+        if self.tracer is not None:
+            # Flushing the exporter waits on its thread, off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.tracer.shutdown)
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether the application is serving and should receive new traffic. Turns False
+        as soon as a shutdown has been requested, so a health route can report it and
+        let the load balancer drain the instance before it stops accepting connections.
+        """
+        if not self._started:
+            return False
+
+        return self.server is None or self.server.ready
+
+    def asgi(self) -> "AsgiAdapter":
+        """
+        Returns an ASGI 3 application for running the API behind an ASGI server.
+        The route table is built on the lifespan startup event, or on the first
+        request if the server does not send lifespan events.
+
+        Returns:
+            AsgiAdapter: The ASGI callable.
+        """
+
+        from .asgi import AsgiAdapter
+
+        return AsgiAdapter(self)
+
+    def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 13337,
+        drain_timeout: float = 30.0,
+        shutdown_delay: float = 0.0,
+        loop: str = "auto",
+        backlog: int = 100,
+        tcp_nodelay: bool = True,
+        keepalive: bool = False,
+        server: str = "streams",
+        reload: bool = False,
+        keep_alive_timeout: float = 5.0,
+    ) -> None:
         """
         Starts the HTTP server to serve the API on the specified host and port.
 
+        The server shuts down gracefully on SIGTERM or SIGINT, letting in-flight
+        requests finish for up to `drain_timeout` seconds.
+
         Args:
             host (str): The hostname or IP address to bind the server to. Defaults to "127.0.0.1".
             port (int): The port number to listen on. Defaults to 13337.
+            drain_timeout (float): Seconds to let in-flight requests finish on shutdown. Defaults to 30.
+            shutdown_delay (float): Seconds to keep accepting connections after turning unready. Defaults to 0.
+            loop (str): The event loop to use, "auto", "asyncio" or "uvloop". "auto" uses uvloop
+                when it is installed. Defaults to "auto".
+            backlog (int): The maximum number of queued connections. Defaults to 100.
+            tcp_nodelay (bool): Set TCP_NODELAY on accepted connections. Defaults to True.
+            keepalive (bool): Set SO_KEEPALIVE on accepted connections. Defaults to False.
+            server (str): The server implementation, "streams" for the asyncio streams based
+                `Server` or "protocol" for the `ProtocolServer`. Defaults to "streams".
+            reload (bool): Reload the controllers when their source files change, for
+                development. Defaults to False.
+            keep_alive_timeout (float): Seconds a kept-alive connection of the protocol
+                server may wait for its next request before it is closed. Defaults to 5.
         """
 
+        from birchrest.http.protocol_server import ProtocolServer
+
+        servers = {"streams": Server, "protocol": ProtocolServer}
+        if server not in servers:
+            raise ValueError(
+                f"Unknown server '{server}', expected one of {', '.join(servers)}"
+            )
+
+        event_loop.get_loop_factory(loop)
         self._build_api()
-        server = Server(self.handle_request, host=host, port=port)
+        if self.process_pool is not None:
+            self.process_pool.start()
+        if reload:
+            from .reloader import Reloader
+
+            self.reloader = Reloader(self)
+        self.server = servers[server](
+            self.handle_request,
+            host=host,
+            port=port,
+            backlog=backlog,
+            drain_timeout=drain_timeout,
+            shutdown_delay=shutdown_delay,
+            tcp_nodelay=tcp_nodelay,
+            keepalive=keepalive,
+            keep_alive_timeout=keep_alive_timeout,
+            timing=self._timing,
+            background=self.background,
+        )
 
         print(get_artwork(host, port, __version__))
 
         try:
-            asyncio.run(server.start())
+            event_loop.run(self._run_server(self.server), loop=loop)
         except KeyboardInterrupt:
             Logger.info("\nServer shutdown initiated by user. Exiting...")
         finally:
-            asyncio.run(server.shutdown())
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+            self.middleware_executor.shutdown()
+            if self.process_pool is not None:
+                self.process_pool.shutdown()
             Logger.info("Server stopped.")
 
+    async def _run_server(self, server: Server) -> None:
+        """
+        Runs the startup hooks, serves until the server has drained and then runs
+        the shutdown hooks, all on the same event loop.
+        """
+
+        await self.startup()
+        if self.profiler is not None:
+            self.profiler.install_signal_handler()
+        if self.reloader is not None:
+            self.reloader.start()
+        try:
+            await server.start()
+        finally:
+            if self.reloader is not None:
+                await self.reloader.stop()
+            if self.profiler is not None:
+                self.profiler.remove_signal_handler()
+            await self.shutdown()
+
     async def handle_request(self, request: Request) -> Response:
         """
         Handles incoming HTTP requests by matching them to routes, processing middleware,
         and handling exceptions asynchronously.
         """
+        if self.watchdog is None:
+            return await self._observe(request)
+
+        with self.watchdog.watch(request):
+            return await self._observe(request)
+
+    async def _observe(self, request: Request) -> Response:
+        """Handles a request, recording its trace and stage timings when enabled."""
+        tracer = self.tracer
+        trace = tracer.start(request) if tracer is not None else None
+
+        if trace is None and not self._timing:
+            return await self._dispatch(request)
+
+        timings = request.timings
+        if timings is None:
+            timings = request.timings = Timings()
+        timings.trace = trace
+
+        response = await self._dispatch(request)
+
+        if tracer is not None and trace is not None:
+            tracer.finish(trace, request, response)
+        if self._timing:
+            self._report_timings(request, response, timings)
+
+        return response
+
+    async def _dispatch(self, request: Request) -> Response:
         response = Response(request.correlation_id)
+        response.timings = request.timings
+        request.app = self
 
         try:
             return await self._handle_request(request, response)
         except ApiError as e:
-            if self.error_handler:
-                if asyncio.iscoroutinefunction(self.error_handler):
-                    await self.error_handler(request, response, e)
-                else:
-                    self.error_handler(request, response, e)
-                return response
-
-            return e.convert_to_response(response)
+            self._drop_background(response)
+            with timed(request.timings, "error"):
+                error_handler = self._get_error_handler()
+                if error_handler:
+                    await error_handler(request, response, e)
+                    return response
+
+                return e.convert_to_response(response)
         except Exception as e:
-            response._is_sent = False
-            if self.error_handler:
-                await self.error_handler(request, response, e)
-                return response
+            self._drop_background(response)
+            with timed(request.timings, "error"):
+                response._is_sent = False
+                error_handler = self._get_error_handler()
+                if error_handler:
+                    await error_handler(request, response, e)
+                    return response
 
-            self._warn_about_unhandled_exception(e)
+                self._warn_about_unhandled_exception(e)
 
-            return response.status(500).send(
-                {"error": {"status": 500, "code": "Internal Server Error"}}
-            )
+                return response.status(500).send(
+                    {"error": {"status": 500, "code": "Internal Server Error"}}
+                )
 
-    async def _handle_request(self, request: Request, response: Response) -> Response:
-        matched_route: Optional[Route] = None
-        path_params: Optional[Dict[str, str]] = {}
+    async def run_background(self, response: Response) -> None:
+        """
+        Runs the background tasks of a sent response and waits for them. Used where
+        no server runs them, such as the ASGI and test adapters.
+        """
+
+        task = self.background.run(response)
+        if task is not None:
+            await task
+
+    def _drop_background(self, response: Response) -> None:
+        """Drops the background tasks of a request whose handler raised."""
+        self.background.drop(response)
+
+    def _report_timings(
+        self, request: Request, response: Response, timings: Timings
+    ) -> None:
+        """
+        Passes the stage timings of a handled request to the `Server-Timing` header,
+        the metrics and the timing hooks.
+        """
 
-        route_exists = False
+        if self.server_timing:
+            response.set_header("Server-Timing", timings.server_timing())
 
-        for route in self.routes:
-            params = route.match(request.clean_path)
+        if self._http_metrics is not None:
+            self._http_metrics.observe(request, response, timings.total() / 1e9)
+            self._http_metrics.observe_stages(timings)
 
-            if params is not None:
-                route_exists = True
+        for hook in self.timing_hooks:
+            try:
+                hook(request, response, timings)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                Logger.error(
+                    "Timing hook failed",
+                    {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+                )
 
-                if route.is_method_allowed(request.method):
-                    matched_route = route
-                    path_params = params if params is not None else {}
-                    break
+    async def _handle_request(self, request: Request, response: Response) -> Response:
+        with timed(request.timings, "routing"):
+            router = self.router
+            if router is None:
+                router = self.router = RouteTable(self.routes)
+
+            matched_route, path_params, route_exists = router.match(
+                request.method, request.clean_path
+            )
 
         if matched_route:
             if matched_route.requires_params and not path_params:
                 raise BadRequest("400 Bad Request - Missing Parameters")
 
-            request.params = path_params if path_params is not None else {}
-            await matched_route(request, response)
+            request.params = path_params
+            request.route = matched_route.path
+            if self.profiler is None:
+                await matched_route(request, response)
+            else:
+                with self.profiler.tracking(matched_route.path):
+                    await matched_route(request, response)
         else:
             if route_exists:
                 raise MethodNotAllowed
@@ -201,7 +656,78 @@ class BirchRest:
     def _build_api(self) -> None:
         """
         Constructs the API by registering all routes from the controllers and applying
-        global middleware and authentication handlers.
+        global middleware and authentication handlers. The API is built once, so the
+        server, the ASGI adapter and the OpenAPI generation share the same routes, and
+        the route table is compiled from them on the first request.
+        """
+
+        if self._built:
+            return
+        self._built = True
+
+        self.routes.extend(self._prepare_routes(*self._collect_routes()))
+        self.router = None
+        self._error_handler = None
+        self._get_error_handler()
+
+    def _rebuild_api(self) -> None:
+        """
+        Builds the routes again from new instances of the controllers, after their
+        modules were reloaded, and swaps them in at once. Requests that were already
+        routed finish on the previous routes.
+        """
+
+        registered = [type(c) for c in self.controllers if type(c) is not Controller]
+        self.controllers = []
+        for cls in registered:
+            current = getattr(sys.modules.get(cls.__module__), cls.__name__, cls)
+            self.controllers.append(current() if isinstance(current, type) else cls())
+
+        routes = self._prepare_routes(*self._collect_routes())
+        self.routes, self.router = routes, RouteTable(routes)
+
+    def _prepare_routes(
+        self, routes: List[Route], debug_routes: List[Route]
+    ) -> List[Route]:
+        """
+        Registers the auth handlers of the routes and prepares them to run their
+        handlers in the executor or the process pool, creating the pool if needed,
+        and resolves the dependencies of their handlers. The pool is started by
+        `serve` or `startup`, as starting it blocks.
+        """
+
+        if self.container is not None:
+            self.container.validate()
+
+        if self.process_pool is None and any(
+            isinstance(route, Route) and route.cpu_bound for route in routes
+        ):
+            from .process_pool import ProcessPool
+
+            self.process_pool = ProcessPool(max_workers=self.process_workers)
+
+        for route in routes:
+            route.register_auth_handler(
+                self.profiling_auth
+                if route in debug_routes and self.profiling_auth is not None
+                else self.auth_handler
+            )
+            route.prepare(
+                self._get_executor,
+                self.process_pool,
+                self.container,
+                self.middleware_executor,
+            )
+
+        return routes
+
+    def _collect_routes(self) -> Tuple[List[Route], List[Route]]:
+        """
+        Instantiates the controllers and resolves the paths and middlewares of their
+        routes and of the metrics and debug routes, in the order they are matched.
+
+        Returns:
+            Tuple[List[Route], List[Route]]: All routes, and the debug routes among them.
         """
 
         self.controllers.append(Controller())
@@ -210,14 +736,127 @@ class BirchRest:
             controller.resolve_paths(
                 prefix=self.base_path, middlewares=self.global_middlewares
             )
+            controller.use_container(self.container)
 
-        for controller in self.controllers:
-            for route in controller.collect_routes():
-                route.register_auth_handler(self.auth_handler)
-                self.routes.append(route)
+        routes = [
+            route
+            for controller in self.controllers
+            for route in controller.collect_routes()
+        ]
+
+        if self._http_metrics is not None:
+            metrics_route = Route(
+                self._serve_metrics, "GET", self.metrics_path, [], False, None, None, None
+            )
+            metrics_route.resolve("", [])
+            routes.insert(0, metrics_route)
+
+        debug_routes: List[Route] = []
+        if self.profiler is not None:
+            debug_routes.append(
+                Route(
+                    self._serve_profile, "GET", self.profiling_path, [], True, None, None, None
+                )
+            )
+        if self.watchdog is not None:
+            debug_routes.append(
+                Route(
+                    self._serve_watchdog, "GET", self.watchdog_path, [], True, None, None, None
+                )
+            )
+        for debug_route in debug_routes:
+            debug_route.resolve("", [])
+            routes.insert(0, debug_route)
+
+        return routes, debug_routes
+
+    def _enable_metrics(self) -> None:
+        """
+        Creates the metrics registry with the request metrics and the gauges that
+        are read from the server and the worker pools when the metrics are served.
+        """
+
+        from birchrest.metrics import MetricsRegistry, HttpMetrics
+
+        self.metrics = MetricsRegistry()
+        self._http_metrics = HttpMetrics(self.metrics)
+
+        self._http_metrics.connections.set_function(
+            lambda: self.server.connections if self.server else 0
+        )
+        self._http_metrics.in_flight.set_function(
+            lambda: self.server.in_flight if self.server else 0
+        )
+        self._http_metrics.queue_depth.labels("threads").set_function(
+            self._executor_queue_depth
+        )
+        self._http_metrics.queue_depth.labels("processes").set_function(
+            lambda: self.process_pool.pending if self.process_pool else 0
+        )
+
+    async def _serve_metrics(self, req: Request, res: Response) -> None:
+        assert self.metrics is not None
+        res.text(
+            self.metrics.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    async def _serve_profile(self, req: Request, res: Response) -> None:
+        """
+        Profiles the application for the number of seconds in the `duration` query
+        and responds with collapsed stacks. The `route` query limits the samples to
+        requests to a route template and `interval` sets the seconds between samples.
+        """
+        assert self.profiler is not None
+
+        try:
+            duration = float(getattr(req.queries, "duration", 30))
+            interval = getattr(req.queries, "interval", None)
+            collapsed = await self.profiler.profile(
+                duration,
+                getattr(req.queries, "route", None),
+                float(interval) if interval is not None else None,
+            )
+        except RuntimeError as e:
+            raise Conflict(str(e)) from e
+        except ValueError as e:
+            raise BadRequest(str(e)) from e
+
+        res.text(collapsed)
+
+    async def _serve_watchdog(self, req: Request, res: Response) -> None:
+        assert self.watchdog is not None
+        res.send(self.watchdog.snapshot())
+
+    def _executor_queue_depth(self) -> int:
+        queue = getattr(self.executor, "_work_queue", None)
+        return queue.qsize() if queue is not None else 0
+
+    def _get_executor(self) -> Executor:
+        """
+        Returns the executor used for synchronous callables, creating a thread pool
+        the first time it is needed.
+        """
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="birchrest"
+            )
+
+        return self.executor
+
+    def _get_error_handler(self) -> Optional[ErrorHandler]:
+        """
+        Returns the registered error handler, wrapped so that a synchronous handler
+        runs in the executor. The wrapped handler is computed once and reused.
+        """
+
+        if self._error_handler is None and self.error_handler is not None:
+            self._error_handler = to_async(self.error_handler, self._get_executor)
+
+        return self._error_handler
 
     def _warn_about_unhandled_exception(self, e: Exception) -> None:
-        init(autoreset=True)
         Logger.error(
             "Unhandled Exception! Status code 500 was sent to the user",
             {
@@ -227,29 +866,16 @@ class BirchRest:
             },
         )
 
-    def _discover_controllers(self) -> None:
+    def _discover_controllers(self, birch_file: Optional[str] = None) -> None:
         """
-        Searches for the __birch__.py file starting from the current working directory and imports it,
-        including all controllers and other imports from that file.
+        Finds the __birch__.py files of the project and imports them, including all
+        controllers and other imports from them. See `discover_birch_files` for how
+        the files are found.
         """
 
-        current_dir = os.getcwd()
-
-        birch_files = []
-        for root, dirs, files in os.walk(current_dir):
-
-            dirs[:] = [d for d in dirs if not d.startswith("__")]
-
-            if "__birch__.py" in files:
-                birch_files.append(os.path.join(root, "__birch__.py"))
-
-        if not birch_files:
-            raise FileNotFoundError(
-                "No __birch__.py file found in the current directory or subdirectories."
-            )
-
-        for birch_file in birch_files:
-            self._import_birch_file(birch_file)
+        self.birch_files = discover_birch_files(os.getcwd(), birch_file)
+        for path in self.birch_files:
+            self._import_birch_file(path)
 
     def _import_birch_file(self, birch_file: str) -> None:
         """
@@ -285,6 +911,8 @@ class BirchRest:
         Returns:
             Dict[str, Any]: A dictionary representing the complete OpenAPI specification.
         """
+        from birchrest.openapi import routes_to_openapi
+
         self._build_api()
 
         paths, models = routes_to_openapi(self.routes)
@@ -0,0 +1,256 @@
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..utils import Logger
+
+BIRCH_FILE = "__birch__.py"
+BIRCH_FILE_ENV = "birchrest_birch_file"
+
+DEFAULT_IGNORE = ("__*", ".*", "node_modules", "venv", "env", "site-packages")
+DEFAULT_MAX_DEPTH = 5
+
+
+def read_config(root: str) -> Dict[str, Any]:
+    """
+    Reads the `[tool.birchrest]` table of the project's pyproject.toml. Returns an
+    empty configuration when there is no such file, or no TOML parser before
+    Python 3.11 without `tomli` installed.
+    """
+    path = os.path.join(root, "pyproject.toml")
+    if not os.path.isfile(path):
+        return {}
+
+    try:
+        import tomllib as toml  # type: ignore[import-not-found,unused-ignore]
+    except ImportError:
+        try:
+            import tomli as toml  # type: ignore[import-not-found,no-redef,unused-ignore]
+        except ImportError:
+            Logger.debug("No TOML parser available, ignoring pyproject.toml")
+            return {}
+
+    try:
+        with open(path, "rb") as file:
+            config = toml.load(file).get("tool", {}).get("birchrest", {})
+    except (OSError, ValueError) as e:
+        Logger.warning(f"Failed to read {path}", {"Exception Message": str(e)})
+        return {}
+
+    return config if isinstance(config, dict) else {}
+
+
+def find_birch_files(
+    root: str,
+    ignore: Sequence[str] = DEFAULT_IGNORE,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> List[str]:
+    """
+    Walks `root` looking for __birch__.py files. Directories matching an `ignore`
+    pattern, virtual environments and directories deeper than `max_depth` are not
+    entered, and symbolic links are not followed.
+
+    :param root: The directory to search from
+    :param ignore: Glob patterns of directory names to skip
+    :param max_depth: The number of directory levels below `root` to search
+    :return: The paths of the files found
+    """
+    return _walk(root, ignore, max_depth)[0]
+
+
+def _walk(
+    root: str, ignore: Sequence[str], max_depth: int
+) -> Tuple[List[str], Dict[str, int]]:
+    """Returns the birch files found and the modification times of the walked directories."""
+    birch_files = []
+    walked = {}
+    base_depth = root.rstrip(os.sep).count(os.sep)
+    ignored = re.compile("|".join(fnmatch.translate(pattern) for pattern in ignore) or "$^")
+
+    for path, dirs, files in os.walk(root):
+        try:
+            walked[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass
+
+        if BIRCH_FILE in files:
+            birch_files.append(os.path.join(path, BIRCH_FILE))
+
+        if "pyvenv.cfg" in files or path.count(os.sep) - base_depth >= max_depth:
+            dirs[:] = []
+            continue
+
+        dirs[:] = [d for d in dirs if not ignored.match(d)]
+
+    return birch_files, walked
+
+
+def cache_dir() -> str:
+    """
+    The per-user directory scans are cached in: `$XDG_CACHE_HOME/birchrest`, or
+    `~/.cache/birchrest`.
+    """
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "birchrest")
+
+
+def manifest_path(root: str) -> str:
+    """The file the result of a scan of `root` is cached in."""
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir(), f"discovery-{digest}.json")
+
+
+def _is_private(status: os.stat_result) -> bool:
+    """Whether a cache file or directory is owned by the user and writable only by them."""
+    if hasattr(os, "getuid") and status.st_uid != os.getuid():
+        return False
+    return not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _manifest_key(ignore: Sequence[str], max_depth: int) -> Dict[str, Any]:
+    return {"ignore": list(ignore), "max_depth": max_depth}
+
+
+def read_manifest(
+    root: str, ignore: Sequence[str] = DEFAULT_IGNORE, max_depth: int = DEFAULT_MAX_DEPTH
+) -> Optional[List[str]]:
+    """
+    Returns the files found by a previous scan of `root` with the same options, or
+    None when there is no cached scan or it is stale: one of its files no longer
+    exists, or one of the walked directories changed, as it does when a birch file
+    or directory is added.
+
+    The cache is only trusted if it and its directory are owned by the user and not
+    writable by anyone else, as its files are imported.
+    """
+    path = manifest_path(root)
+    try:
+        if not _is_private(os.stat(os.path.dirname(path))):
+            Logger.warning(f"Ignoring the discovery cache, {cache_dir()} is not private")
+            return None
+
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        with os.fdopen(fd, encoding="utf-8") as file:
+            if not _is_private(os.fstat(file.fileno())):
+                Logger.warning(f"Ignoring the discovery cache {path}, it is not private")
+                return None
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("root") != os.path.abspath(root)
+        or manifest.get("key") != _manifest_key(ignore, max_depth)
+    ):
+        return None
+
+    files, walked = manifest.get("files"), manifest.get("dirs")
+    if (
+        not isinstance(files, list)
+        or not files
+        or not all(isinstance(f, str) and os.path.isfile(f) for f in files)
+        or not isinstance(walked, dict)
+    ):
+        return None
+
+    for directory, mtime in walked.items():
+        try:
+            if os.stat(directory).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+
+    return files
+
+
+def write_manifest(
+    root: str,
+    files: List[str],
+    walked: Dict[str, int],
+    ignore: Sequence[str] = DEFAULT_IGNORE,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> None:
+    path = manifest_path(root)
+    manifest = {
+        "root": os.path.abspath(root),
+        "key": _manifest_key(ignore, max_depth),
+        "files": files,
+        "dirs": walked,
+    }
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(manifest, file)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError as e:
+        Logger.debug(f"Could not cache the discovered files: {e}")
+
+
+def _resolve(path: str, root: str) -> str:
+    path = os.path.join(root, os.path.expanduser(path))
+    if os.path.isdir(path):
+        path = os.path.join(path, BIRCH_FILE)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"The configured birch file {path} does not exist.")
+    return path
+
+
+def discover_birch_files(
+    root: Optional[str] = None, birch_file: Optional[str] = None
+) -> List[str]:
+    """
+    Finds the __birch__.py files of a project, in order of precedence:
+
+    1. `birch_file`, a path to the file or the directory containing it
+    2. the `birchrest_birch_file` environment variable
+    3. `birch_file` in the `[tool.birchrest]` table of pyproject.toml
+    4. the files found by the last scan of `root`, if none of the walked
+       directories has changed since
+    5. a scan of `root`, skipping the directories matching `ignore` and those deeper
+       than `max_depth` from `[tool.birchrest]`. The result is cached unless `cache`
+       is false.
+
+    :param root: The project directory, defaults to the working directory
+    :param birch_file: An explicitly configured birch file
+    :return: The paths of the birch files
+    :raises FileNotFoundError: If a configured file does not exist or none is found
+    """
+    root = root or os.getcwd()
+    config = read_config(root)
+
+    explicit = birch_file or os.getenv(BIRCH_FILE_ENV) or config.get("birch_file")
+    if explicit:
+        return [_resolve(str(explicit), root)]
+
+    ignore = list(DEFAULT_IGNORE) + [str(p) for p in config.get("ignore", [])]
+    max_depth = int(config.get("max_depth", DEFAULT_MAX_DEPTH))
+
+    cache = bool(config.get("cache", True))
+    if cache:
+        cached = read_manifest(root, ignore, max_depth)
+        if cached is not None:
+            Logger.debug(f"Using the cached birch files in {manifest_path(root)}")
+            return cached
+
+    birch_files, walked = _walk(root, ignore, max_depth)
+
+    if not birch_files:
+        raise FileNotFoundError(
+            "No __birch__.py file found in the current directory or subdirectories."
+        )
+
+    if cache:
+        write_manifest(root, birch_files, walked, ignore, max_depth)
+
+    return birch_files
@@ -0,0 +1,296 @@
+"""
+This module provides the `ProcessPool` used to execute CPU-bound route handlers
+in separate worker processes. Routes opt in with the `@cpu_bound` decorator.
+
+Only the parts of the request a handler needs are sent to the worker: the method,
+path, headers, validated body, queries and params, and the authenticated user.
+Handlers run on a controller instance created without calling `__init__`, and the
+status, headers and body they produce are copied back onto the real response.
+"""
+
+import asyncio
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, is_dataclass
+from importlib import import_module
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..exceptions import ApiError, GatewayTimeout, ServiceUnavailable
+from ..http import Request, Response
+from ..utils import Logger, dict_to_dataclass
+
+_REQUEST_FIELDS = (
+    "method",
+    "path",
+    "version",
+    "headers",
+    "client_address",
+    "client_port",
+    "correlation_id",
+    "clean_path",
+    "host",
+    "referrer",
+    "user_agent",
+    "received",
+    "user",
+    "body",
+    "queries",
+    "params",
+)
+
+
+class _DynamicDataclass:
+    """
+    Stands in for a dataclass generated at runtime by `dict_to_dataclass`, which can
+    not be pickled, and is converted back into an equivalent dataclass in the worker.
+    """
+
+    __slots__ = ("name", "data")
+
+    def __init__(self, name: str, data: Dict[str, Any]) -> None:
+        self.name = name
+        self.data = data
+
+
+class _RemoteError:
+    """An exception raised in a worker that could not be sent back as-is."""
+
+    __slots__ = ("status_code", "message")
+
+    def __init__(self, status_code: Optional[int], message: str) -> None:
+        self.status_code = status_code
+        self.message = message
+
+
+def _is_importable(cls: type) -> bool:
+    target: Any = sys.modules.get(cls.__module__)
+    for part in cls.__qualname__.split("."):
+        target = getattr(target, part, None)
+    return target is cls
+
+
+def _to_portable(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        if _is_importable(type(value)):
+            return value
+        return _DynamicDataclass(type(value).__name__, asdict(value))
+    if isinstance(value, list):
+        return [_to_portable(item) for item in value]
+    return value
+
+
+def _from_portable(value: Any) -> Any:
+    if isinstance(value, _DynamicDataclass):
+        return dict_to_dataclass(value.name, value.data)
+    if isinstance(value, list):
+        return [_from_portable(item) for item in value]
+    return value
+
+
+def _resolve(path: str) -> Any:
+    module_name, _, qualname = path.partition(":")
+    target: Any = import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def _handler_reference(func: Callable[..., Any]) -> Tuple[str, Optional[str]]:
+    """
+    Returns an importable reference to a route handler. Bound controller methods
+    are referenced by their class and attribute name, so the controller itself
+    never has to be pickled.
+    """
+    owner = getattr(func, "__self__", None)
+    name = getattr(func, "__name__", "")
+
+    if owner is not None:
+        cls = type(owner)
+        return f"{cls.__module__}:{cls.__qualname__}", name
+
+    return f"{func.__module__}:{func.__qualname__}", None
+
+
+def _warm_worker() -> int:
+    return 0
+
+
+def _execute_handler(
+    target: str, attribute: Optional[str], state: Dict[str, Any]
+) -> Tuple[Any, ...]:
+    """Runs a route handler inside a worker process."""
+    try:
+        resolved = _resolve(target)
+        if attribute is not None:
+            resolved = getattr(resolved.__new__(resolved), attribute)
+
+        req = Request.__new__(Request)
+        for name, value in state.items():
+            setattr(req, name, _from_portable(value))
+
+        res = Response(req.correlation_id)
+        result = resolved(req, res)
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+
+        return (
+            res._status_code,
+            res._headers,
+            res._is_sent,
+            res.body if res._is_sent else None,
+        )
+    except ApiError as e:
+        return (_RemoteError(e.status_code, e.user_message),)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        try:
+            pickle.loads(pickle.dumps(e))
+            return (e,)
+        except Exception:  # pylint: disable=broad-exception-caught
+            return (_RemoteError(None, f"{type(e).__name__}: {e}"),)
+
+
+class ProcessPool:
+    """
+    A managed pool of worker processes for CPU-bound route handlers.
+
+    The pool is started and warmed before the server starts listening, or on the
+    ASGI lifespan startup event, so the first requests do not pay for process
+    creation. Starting it blocks, so on a running event loop it is started in a
+    thread. The number of requests that can be running or
+    waiting at the same time is bounded; requests beyond that fail fast with a 503
+    instead of growing an unbounded queue. Requests that take longer than their
+    timeout are answered with a 504.
+
+    Attributes:
+        max_workers (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        max_queue (Optional[int]): Requests allowed to wait for a free worker.
+            Defaults to the number of workers.
+        timeout (Optional[float]): Default timeout in seconds for a handler.
+        pending (int): Requests currently running or queued in the pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def capacity(self) -> int:
+        """The maximum number of requests that can be running or queued at once."""
+        workers = self._workers()
+        queue = self.max_queue if self.max_queue is not None else workers
+        return workers + queue
+
+    def _finished(self, _: "Future[Any]") -> None:
+        # Called from the thread of the executor that completed the future
+        with self._lock:
+            self.pending -= 1
+
+    def _workers(self) -> int:
+        return self.max_workers or os.cpu_count() or 1
+
+    def start(self) -> None:
+        """
+        Starts the worker processes and waits until each of them has completed a
+        warm-up task. Blocks, so it must not be called on a running event loop.
+        """
+        with self._start_lock:
+            if self._executor is not None:
+                return
+
+            workers = self._workers()
+            executor = ProcessPoolExecutor(max_workers=workers)
+            wait([executor.submit(_warm_worker) for _ in range(workers)])
+            self._executor = executor
+            Logger.debug(f"Started process pool with {workers} workers")
+
+    def shutdown(self) -> None:
+        """Stops the worker processes without waiting for running handlers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def wrap(
+        self, func: Callable[..., Any], timeout: Optional[float] = None
+    ) -> Callable[[Request, Response], Any]:
+        """
+        Returns a route handler that executes `func` in the pool.
+
+        :param func: The route handler, usually a bound controller method.
+        :param timeout: Seconds before the request is answered with a 504.
+            Defaults to the pool timeout.
+        """
+        target, attribute = _handler_reference(func)
+
+        async def run_in_process(req: Request, res: Response) -> None:
+            await self.run(target, attribute, req, res, timeout)
+
+        return run_in_process
+
+    async def run(
+        self,
+        target: str,
+        attribute: Optional[str],
+        req: Request,
+        res: Response,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Executes a handler reference in the pool and copies the produced status,
+        headers and body onto `res`.
+
+        :raises ServiceUnavailable: If the pool is saturated.
+        :raises GatewayTimeout: If the handler did not finish in time.
+        """
+        if self._executor is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.start)
+
+        if self.pending >= self.capacity:
+            raise ServiceUnavailable("Too many CPU-bound requests are queued")
+
+        state = {
+            name: _to_portable(getattr(req, name, None)) for name in _REQUEST_FIELDS
+        }
+        limit = timeout if timeout is not None else self.timeout
+
+        assert self._executor is not None
+        future = self._executor.submit(_execute_handler, target, attribute, state)
+        with self._lock:
+            self.pending += 1
+        # A handler that timed out keeps its worker busy until it returns, as a running
+        # process can not be cancelled, so it counts as pending until then
+        future.add_done_callback(self._finished)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), limit)
+        except asyncio.TimeoutError as e:
+            future.cancel()
+            raise GatewayTimeout("The request took too long to process") from e
+
+        if len(result) == 1:
+            error = result[0]
+            if isinstance(error, _RemoteError):
+                if error.status_code is not None:
+                    raise ApiError(error.message, error.status_code)
+                raise RuntimeError(error.message)
+            raise error
+
+        status_code, headers, is_sent, body = result
+        res.status(status_code)
+        for name, value in headers.items():
+            res.set_header(name, value)
+
+        if is_sent:
+            res.send(body)
@@ -0,0 +1,373 @@
+"""
+This module provides the `Reloader` used by `birch serve --reload`, which re-imports
+the changed source files of a project while the server keeps running.
+
+Changes are detected with inotify on Linux and by polling the modification times
+of the watched files elsewhere. When a file changes, its module is reloaded along
+with the project modules that import from it, the controllers defined in them are
+replaced, and the app swaps in routes built from the new controllers. The listening
+socket stays open, and requests that were already routed finish on the old routes.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import ctypes
+import ctypes.util
+import importlib
+import os
+import struct
+import sys
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..routes import Controller
+from ..utils import Logger
+
+if TYPE_CHECKING:
+    from .birchrest_app import BirchRest
+
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Detects changed files by comparing their modification time and size to the ones
+    seen last, checking only the watched files every `interval` seconds.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def watch(self, paths: Iterable[str]) -> None:
+        """Sets the files to watch, keeping the last seen state of known files."""
+        self._stats = {
+            path: self._stats[path] if path in self._stats else self._stat(path)
+            for path in paths
+        }
+
+    def changed(self) -> Set[str]:
+        """Returns the watched files that changed since the last check."""
+        changed: Set[str] = set()
+        for path, previous in self._stats.items():
+            current = self._stat(path)
+            if current != previous:
+                self._stats[path] = current
+                changed.add(path)
+        return changed
+
+    async def wait(self) -> Set[str]:
+        while True:
+            await asyncio.sleep(self.interval)
+            changed = self.changed()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detects changed files with Linux inotify, watching the directories that contain
+    them so files replaced by editors saving through a rename are noticed too.
+
+    :raises OSError: If inotify is not available.
+    """
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._paths: Set[str] = set()
+        self._directories: Dict[int, str] = {}
+        self._readable = asyncio.Event()
+        self._reader = False
+
+    def watch(self, paths: Iterable[str]) -> None:
+        self._paths = set(paths)
+        watched = set(self._directories.values())
+
+        for directory in {os.path.dirname(path) for path in self._paths} - watched:
+            descriptor = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), _IN_MASK
+            )
+            if descriptor >= 0:
+                self._directories[descriptor] = directory
+
+    def changed(self) -> Set[str]:
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                descriptor, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+
+                directory = self._directories.get(descriptor)
+                if directory is not None:
+                    path = os.path.join(directory, os.fsdecode(name))
+                    if path in self._paths:
+                        changed.add(path)
+
+    async def wait(self) -> Set[str]:
+        if not self._reader:
+            asyncio.get_running_loop().add_reader(self._fd, self._readable.set)
+            self._reader = True
+
+        while True:
+            await self._readable.wait()
+            self._readable.clear()
+            changed = self.changed()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        if self._reader:
+            try:
+                asyncio.get_running_loop().remove_reader(self._fd)
+            except RuntimeError:
+                pass
+            self._reader = False
+        os.close(self._fd)
+
+
+_IMPORTS: Dict[Tuple[str, int], Set[str]] = {}
+
+
+def _imported_modules(module: ModuleType) -> Set[str]:
+    """
+    Returns the names of the modules imported by a module's source, including the
+    submodules a `from package import name` may refer to. Cached by modification time.
+    """
+    path = getattr(module, "__file__", None)
+    try:
+        key = (str(path), os.stat(str(path)).st_mtime_ns)
+    except OSError:
+        return set()
+
+    if key in _IMPORTS:
+        return _IMPORTS[key]
+
+    try:
+        with open(str(path), "rb") as file:
+            tree = ast.parse(file.read(), str(path))
+    except (OSError, SyntaxError, ValueError):
+        return set()
+
+    package = module.__name__
+    if not str(path).endswith("__init__.py"):
+        package = package.rpartition(".")[0]
+
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".")
+                parent = ".".join(parts[: len(parts) - node.level + 1])
+                base = f"{parent}.{base}".strip(".")
+            names.add(base)
+            names.update(f"{base}.{alias.name}".strip(".") for alias in node.names)
+
+    _IMPORTS[key] = names
+    return names
+
+
+def _controller_classes() -> List[type]:
+    classes: List[type] = []
+    pending = list(Controller.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+class Reloader:
+    """
+    Watches the modules a project imported from its own directory and the birch
+    files, and reloads the app's controllers when one of them changes.
+
+    Attributes:
+        app (BirchRest): The application whose routes are rebuilt.
+        root (str): The project directory. Modules outside it are not watched.
+        debounce (float): Seconds to wait for more changes after the first one, as
+            editors and formatters often write several files at once.
+        watcher (Union[PollingWatcher, InotifyWatcher]): Detects the changed files.
+    """
+
+    def __init__(
+        self,
+        app: BirchRest,
+        root: Optional[str] = None,
+        interval: float = 0.5,
+        debounce: float = 0.1,
+        inotify: bool = True,
+    ) -> None:
+        """
+        :param app: The application to reload.
+        :param root: The project directory, defaults to the working directory.
+        :param interval: Seconds between checks when polling for changes.
+        :param debounce: Seconds to wait for more changes after the first one.
+        :param inotify: Use inotify when available instead of polling.
+        """
+        self.app = app
+        self.root = os.path.abspath(root or os.getcwd())
+        self.debounce = debounce
+        self.watcher: Union[PollingWatcher, InotifyWatcher] = PollingWatcher(interval)
+        self._task: Optional[asyncio.Task[None]] = None
+
+        if inotify and sys.platform.startswith("linux"):
+            try:
+                self.watcher = InotifyWatcher()
+            except OSError as e:
+                Logger.debug(f"Polling for changes, inotify is unavailable: {e}")
+
+    def modules(self) -> Dict[str, str]:
+        """Returns the project modules to watch, by the path of their source file."""
+        framework = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules = {}
+
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if not path or name == "__main__" or not path.endswith(".py"):
+                continue
+
+            path = os.path.abspath(path)
+            if (
+                path.startswith(self.root + os.sep)
+                and not path.startswith(framework + os.sep)
+                and "site-packages" not in path.split(os.sep)
+            ):
+                modules[path] = name
+
+        for path in self.app.birch_files:
+            modules[os.path.abspath(path)] = ""
+
+        return modules
+
+    def start(self) -> None:
+        """Starts watching for changes on the running event loop."""
+        if self._task is None:
+            self.watcher.watch(self.modules())
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            Logger.info(f"Watching {self.root} for changes")
+
+    async def stop(self) -> None:
+        """Stops watching for changes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.watcher.close()
+
+    async def _run(self) -> None:
+        while True:
+            changed = await self.watcher.wait()
+            await asyncio.sleep(self.debounce)
+            changed |= self.watcher.changed()
+            self.reload(changed)
+            self.watcher.watch(self.modules())
+
+    def reload(self, paths: Iterable[str]) -> List[str]:
+        """
+        Reloads the modules of the changed files and the project modules depending on
+        them, and rebuilds the app's routes. When reloading fails, for example on a
+        syntax error, the error is logged and the app keeps serving the old routes.
+
+        :param paths: The changed source files
+        :return: The names of the reloaded modules
+        """
+        modules = self.modules()
+        changed = {modules[path] for path in paths if modules.get(path)}
+        birch_files = [p for p in self.app.birch_files if os.path.abspath(p) in paths]
+        if not changed and not birch_files:
+            return []
+
+        order = self._dependents(changed, set(modules.values()))
+        names = set(order)
+
+        previous: Dict[str, List[type]] = {}
+        for cls in _controller_classes():
+            if cls.__module__ in names:
+                previous.setdefault(cls.__module__, []).append(cls)
+
+        try:
+            for name in order:
+                module = sys.modules.get(name)
+                if module is not None:
+                    importlib.reload(module)
+
+                # Only classes whose module reloaded have a replacement to discover
+                for cls in previous.get(name, ()):
+                    setattr(cls, "_replaced", True)
+
+            if order or birch_files:
+                for path in self.app.birch_files:
+                    self.app._import_birch_file(path)
+
+            self.app._rebuild_api()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            Logger.error(
+                "Reloading failed, serving the previous routes",
+                {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+            )
+            return []
+
+        Logger.info(f"Reloaded {', '.join(order) or 'the birch files'}")
+        return order
+
+    @staticmethod
+    def _dependents(changed: Set[str], project: Set[str]) -> List[str]:
+        """
+        Returns the changed modules followed by the project modules that import
+        them or anything from them, directly or through each other, in the order
+        they are reloaded.
+        """
+        order = sorted(changed)
+        seen = set(changed)
+
+        while True:
+            found = sorted(
+                name
+                for name in project - seen
+                if name in sys.modules and _imported_modules(sys.modules[name]) & seen
+            )
+            if not found:
+                return order
+            order.extend(found)
+            seen.update(found)
@@ -0,0 +1,189 @@
+"""
+This module provides the `Scheduler` running the periodic jobs registered with
+`app.every` on the server's event loop while the app is serving.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from ..utils import Logger, to_async
+from ..utils.executor import ExecutorFactory
+
+
+class Job:
+    """
+    A function run every `interval` seconds.
+
+    Attributes:
+        func (Callable): The job function, sync or async, without arguments.
+        name (str): The name of the job in logs.
+        interval (float): Seconds between the starts of two runs.
+        jitter (float): Up to this many seconds are added at random to each interval,
+            so jobs of several processes or instances do not all run at once.
+        concurrency (int): The number of runs of the job that may overlap. A run that
+            is due while as many are still running is skipped.
+        runs (int): The number of completed runs.
+        failures (int): The number of runs that raised.
+        skipped (int): The number of runs skipped because earlier ones were still running.
+        last_duration (Optional[float]): Seconds the last completed run took.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[], Any],
+        interval: float,
+        jitter: float = 0.0,
+        concurrency: int = 1,
+        name: Optional[str] = None,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("The interval of a job must be positive")
+        if concurrency < 1:
+            raise ValueError("The concurrency of a job must be at least 1")
+
+        self.func = func
+        self.name = name or getattr(func, "__qualname__", repr(func))
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_duration: Optional[float] = None
+        self._running = 0
+
+    def delay(self) -> float:
+        """Returns the seconds until the next run is due, including the jitter."""
+        return self.interval + random.uniform(0, self.jitter)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the interval, the runs in progress and the run counts of the job."""
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "running": self._running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_duration": self.last_duration,
+        }
+
+
+class Scheduler:
+    """
+    Runs the registered jobs from the moment the app has started until it shuts down.
+
+    Each job is started every `interval` seconds plus jitter, counted from the start
+    of the previous run, so a slow run does not delay the schedule. Runs execute as
+    separate tasks, at most `concurrency` at a time per job and `limit` at a time in
+    total. On shutdown the schedule stops, and runs still in progress are given a
+    grace period to finish before they are cancelled.
+
+    Attributes:
+        jobs (List[Job]): The registered jobs.
+        limit (Optional[int]): The number of runs of all jobs that may execute at once.
+            Runs due while the limit is reached wait for a slot.
+        executor (ExecutorFactory): Returns the executor synchronous jobs run in.
+    """
+
+    def __init__(
+        self, executor: Optional[ExecutorFactory] = None, limit: Optional[int] = None
+    ) -> None:
+        self.jobs: List[Job] = []
+        self.limit = limit
+        self.executor: ExecutorFactory = executor or (lambda: None)
+        self._loops: List["asyncio.Task[None]"] = []
+        self._runs: Set["asyncio.Task[None]"] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._started = False
+
+    def add(self, job: Job) -> Job:
+        """Registers a job, starting it right away if the scheduler is running."""
+        self.jobs.append(job)
+        if self._started:
+            loop = asyncio.get_running_loop()
+            self._loops.append(loop.create_task(self._schedule(job)))
+        return job
+
+    def start(self) -> None:
+        """Starts the schedule of every job on the running event loop."""
+        if self._started:
+            return
+
+        self._started = True
+        loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.limit) if self.limit else None
+        self._loops = [loop.create_task(self._schedule(job)) for job in self.jobs]
+
+    async def stop(self, timeout: float) -> None:
+        """
+        Stops scheduling runs, waits up to `timeout` seconds for the runs in progress
+        and cancels the ones that have not finished.
+
+        :param timeout: Seconds runs in progress are given to finish.
+        """
+        self._started = False
+        loops, self._loops = self._loops, []
+        for task in loops:
+            task.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+
+        if not self._runs:
+            return
+
+        _, pending = await asyncio.wait(set(self._runs), timeout=max(timeout, 0))
+        if pending:
+            Logger.warning(f"Cancelling {len(pending)} scheduled job(s) still running")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _schedule(self, job: Job) -> None:
+        loop = asyncio.get_running_loop()
+        run = to_async(job.func, self.executor)
+        due = loop.time() + job.delay()
+
+        while True:
+            await asyncio.sleep(max(due - loop.time(), 0))
+            due += job.delay()
+
+            # Runs were missed while the loop was blocked, do not catch up on them
+            if due < loop.time():
+                due = loop.time() + job.delay()
+
+            if job._running >= job.concurrency:
+                job.skipped += 1
+                Logger.debug(f"Skipping job {job.name}, previous runs are still running")
+                continue
+
+            job._running += 1
+            task = loop.create_task(self._run(job, run))
+            self._runs.add(task)
+            task.add_done_callback(self._runs.discard)
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            if self._slots is not None:
+                async with self._slots:
+                    await self._execute(job, run)
+            else:
+                await self._execute(job, run)
+        finally:
+            job._running -= 1
+
+    @staticmethod
+    async def _execute(job: Job, run: Callable[[], Awaitable[Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            await run()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            job.failures += 1
+            Logger.error(
+                f"Job {job.name} failed",
+                {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+            )
+        else:
+            job.runs += 1
+        job.last_duration = time.perf_counter() - started
@@ -0,0 +1,63 @@
+"""
+This module provides the micro-benchmarks of the BirchRest framework hot paths.
+
+Components:
+- **BENCHMARKS**: The registered benchmarks of request parsing, routing, validation,
+  dataclass conversion, middleware chains and response serialization.
+- **measure**, **run**: Measure benchmarks with calibrated loops and repeats.
+- **compare**: Compares results to a stored baseline to flag regressions.
+- **to_json**, **load_baseline**: Write and read results as JSON.
+- **LoadGenerator**: Sends a weighted scenario of requests to a running server.
+- **LatencyHistogram**: A log-linear latency histogram reporting percentiles.
+
+The suite is run with `birch bench`, and load tests with `birch load`.
+
+Exported components:
+- `Benchmark`
+- `Result`
+- `Comparison`
+- `BENCHMARKS`
+- `select`
+- `measure`
+- `run`
+- `compare`
+- `to_json`
+- `load_baseline`
+- `LoadGenerator`
+- `LoadResult`
+- `Scenario`
+- `ScenarioRequest`
+- `LatencyHistogram`
+"""
+
+from .harness import (
+    Benchmark,
+    Result,
+    Comparison,
+    measure,
+    run,
+    compare,
+    to_json,
+    load_baseline,
+)
+from .suite import BENCHMARKS, select
+from .histogram import LatencyHistogram
+from .load import LoadGenerator, LoadResult, Scenario, ScenarioRequest
+
+__all__ = [
+    "Benchmark",
+    "Result",
+    "Comparison",
+    "BENCHMARKS",
+    "select",
+    "measure",
+    "run",
+    "compare",
+    "to_json",
+    "load_baseline",
+    "LoadGenerator",
+    "LoadResult",
+    "Scenario",
+    "ScenarioRequest",
+    "LatencyHistogram",
+]
@@ -0,0 +1,217 @@
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import sys
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Union
+
+from ..version import __version__
+
+BenchmarkFunction = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class Benchmark(NamedTuple):
+    """
+    A named operation measured by the harness. The setup function runs once and
+    returns the operation, so building its inputs is not measured.
+    """
+
+    name: str
+    setup: Callable[[], BenchmarkFunction]
+    group: str
+
+
+class Result(NamedTuple):
+    """
+    The statistics of a benchmark, in nanoseconds per operation.
+
+    Attributes:
+        name (str): The name of the benchmark.
+        group (str): The hot path the benchmark belongs to.
+        median_ns (float): The median of the repeats, used for comparisons.
+        mean_ns (float): The mean of the repeats.
+        stdev_ns (float): The standard deviation of the repeats.
+        min_ns (float): The fastest repeat.
+        iqr_ns (float): The interquartile range of the repeats.
+        loops (int): The operations run per repeat.
+        repeats (int): The number of repeats.
+    """
+
+    name: str
+    group: str
+    median_ns: float
+    mean_ns: float
+    stdev_ns: float
+    min_ns: float
+    iqr_ns: float
+    loops: int
+    repeats: int
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1e9 / self.median_ns if self.median_ns else float("inf")
+
+
+class Comparison(NamedTuple):
+    """A result compared to the same benchmark in a baseline."""
+
+    name: str
+    baseline_ns: float
+    current_ns: float
+    change: float
+    regression: bool
+
+
+def _time_loops(operation: BenchmarkFunction, loops: int, is_async: bool) -> int:
+    if is_async:
+
+        async def run() -> int:
+            started = perf_counter_ns()
+            for _ in range(loops):
+                await operation()
+            return perf_counter_ns() - started
+
+        return asyncio.run(run()) if loops else 0
+
+    started = perf_counter_ns()
+    for _ in range(loops):
+        operation()
+    return perf_counter_ns() - started
+
+
+def _calibrate(operation: BenchmarkFunction, min_time_ns: int, is_async: bool) -> int:
+    """Doubles the loop count until one repeat takes at least `min_time_ns`."""
+    loops = 1
+    while True:
+        if _time_loops(operation, loops, is_async) >= min_time_ns or loops >= 1 << 24:
+            return loops
+        loops *= 2
+
+
+def measure(
+    benchmark: Benchmark, min_time: float = 0.05, repeat: int = 7, warmup: int = 1
+) -> Result:
+    """
+    Measures a benchmark. The number of operations per repeat is calibrated so each
+    repeat runs for at least `min_time` seconds, which keeps timer resolution and
+    loop overhead out of the results, and the garbage collector is disabled while
+    timing, as `timeit` does. Each statistic is per operation.
+
+    :param benchmark: The benchmark to measure
+    :param min_time: The minimum seconds per repeat
+    :param repeat: The number of repeats the statistics are computed from
+    :param warmup: The number of repeats run and discarded first
+    :return: The statistics of the benchmark
+    """
+    operation = benchmark.setup()
+    is_async = asyncio.iscoroutinefunction(operation)
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = _calibrate(operation, int(min_time * 1e9), is_async)
+        for _ in range(warmup):
+            _time_loops(operation, loops, is_async)
+        samples = [_time_loops(operation, loops, is_async) / loops for _ in range(repeat)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if len(samples) > 1:
+        quartiles = statistics.quantiles(samples, n=4)
+        iqr = quartiles[2] - quartiles[0]
+        stdev = statistics.stdev(samples)
+    else:
+        iqr = stdev = 0.0
+
+    return Result(
+        benchmark.name,
+        benchmark.group,
+        statistics.median(samples),
+        statistics.mean(samples),
+        stdev,
+        min(samples),
+        iqr,
+        loops,
+        repeat,
+    )
+
+
+def run(
+    benchmarks: List[Benchmark],
+    min_time: float = 0.05,
+    repeat: int = 7,
+    report: Optional[Callable[[Result], None]] = None,
+) -> List[Result]:
+    """
+    Measures benchmarks one after another.
+
+    :param benchmarks: The benchmarks to measure
+    :param min_time: The minimum seconds per repeat
+    :param repeat: The number of repeats per benchmark
+    :param report: Called with each result as soon as it is measured
+    :return: The results in the order of the benchmarks
+    """
+    results = []
+    for benchmark in benchmarks:
+        result = measure(benchmark, min_time, repeat)
+        if report is not None:
+            report(result)
+        results.append(result)
+    return results
+
+
+def to_json(results: List[Result]) -> Dict[str, Any]:
+    """Converts results to a JSON document describing the environment they ran in."""
+    return {
+        "birchrest": __version__,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": [
+            {**result._asdict(), "ops_per_second": result.ops_per_second}
+            for result in results
+        ],
+    }
+
+
+def compare(
+    results: List[Result], baseline: Dict[str, Any], tolerance: float = 0.1
+) -> List[Comparison]:
+    """
+    Compares results to a baseline written by `to_json`. A benchmark regressed when
+    its median is more than `tolerance` slower than in the baseline. Benchmarks that
+    are missing from the baseline are skipped.
+
+    :param results: The current results
+    :param baseline: A document written by `to_json`
+    :param tolerance: The accepted slowdown as a fraction, 0.1 for 10%
+    :return: A comparison per benchmark found in the baseline
+    """
+    baseline_medians = {
+        entry["name"]: float(entry["median_ns"]) for entry in baseline.get("results", [])
+    }
+
+    comparisons = []
+    for result in results:
+        baseline_ns = baseline_medians.get(result.name)
+        if not baseline_ns:
+            continue
+
+        change = result.median_ns / baseline_ns - 1
+        comparisons.append(
+            Comparison(
+                result.name, baseline_ns, result.median_ns, change, change > tolerance
+            )
+        )
+
+    return comparisons
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """Reads a baseline written by `to_json`."""
+    with open(path, encoding="utf-8") as file:
+        baseline: Dict[str, Any] = json.load(file)
+    return baseline
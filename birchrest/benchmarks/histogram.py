@@ -0,0 +1,118 @@
+from typing import Any, Dict, Iterable, Optional
+
+PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """
+    A latency histogram with log-linear buckets, in the style of HdrHistogram.
+
+    Values are recorded in microseconds. Below 2**`precision_bits` every value has
+    its own bucket, and above it each power of two is split into
+    2**(`precision_bits` - 1) buckets, so every bucket is within 1/2**(`precision_bits`
+    - 1) of the values it holds, about 1.6% with the default, whatever the
+    magnitude. Recording is a dictionary update and the memory used only grows
+    with the number of distinct buckets hit.
+
+    Attributes:
+        count (int): The number of recorded values.
+        min (float): The smallest recorded value in seconds.
+        max (float): The largest recorded value in seconds.
+    """
+
+    def __init__(self, precision_bits: int = 7) -> None:
+        """
+        :param precision_bits: The bits of precision kept per value
+        """
+        self.precision_bits = precision_bits
+        self.count = 0
+        self.min = 0.0
+        self.max = 0.0
+        self._sum = 0
+        self._half = 1 << (precision_bits - 1)
+        self._buckets: Dict[int, int] = {}
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.precision_bits
+        if shift <= 0:
+            return value
+        return shift * self._half + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        """The highest value in microseconds held by a bucket."""
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        return ((index - shift * self._half + 1) << shift) - 1
+
+    def record(self, latency: float, count: int = 1) -> None:
+        """
+        Records a latency.
+
+        :param latency: The latency in seconds
+        :param count: The number of times to record it
+        """
+        value = max(int(latency * 1e6), 0)
+        index = self._index(value)
+        self._buckets[index] = self._buckets.get(index, 0) + count
+        self._sum += value * count
+
+        if self.count == 0 or latency < self.min:
+            self.min = latency
+        if latency > self.max:
+            self.max = latency
+        self.count += count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Adds the values of a histogram with the same precision to this one."""
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("Cannot merge histograms with different precisions")
+        if not other.count:
+            return
+
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._sum += other._sum
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+
+    @property
+    def mean(self) -> float:
+        """The mean latency in seconds."""
+        return self._sum / self.count / 1e6 if self.count else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns the latency in seconds at or below which `percentile` percent of the
+        values fall, as the highest value of its bucket capped at `max`.
+        """
+        if not self.count:
+            return 0.0
+
+        target = max(1, -(-self.count * percentile // 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= target:
+                return min(self._highest(index) / 1e6, self.max)
+        return self.max
+
+    def summary(self, percentiles: Optional[Iterable[float]] = None) -> Dict[str, Any]:
+        """Returns the count and the latencies in milliseconds, keyed like `p99`."""
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "min_ms": round(self.min * 1000, 3),
+            "mean_ms": round(self.mean * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+        for percentile in percentiles or PERCENTILES:
+            summary[f"{percentile_key(percentile)}_ms"] = round(
+                self.percentile(percentile) * 1000, 3
+            )
+        return summary
+
+
+def percentile_key(percentile: float) -> str:
+    """Formats a percentile as `p50` or `p99.9`."""
+    return f"p{percentile:g}"
@@ -0,0 +1,543 @@
+"""
+A load generator for running BirchRest servers, replacing external tools such as
+ApacheBench so load tests can mix routes and gate on latency percentiles.
+"""
+
+import asyncio
+import json
+import random
+import urllib.parse
+from collections import Counter
+from time import perf_counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .histogram import LatencyHistogram, percentile_key
+
+
+_IDEMPOTENT = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"})
+
+
+class LoadError(Exception):
+    """Raised when a response cannot be read or the connection fails."""
+
+
+class ScenarioRequest(NamedTuple):
+    """
+    A request of a scenario, chosen in proportion to its weight.
+
+    Attributes:
+        name (str): The name results are grouped by.
+        method (str): The HTTP method.
+        path (str): The path including the query string.
+        headers (Tuple[Tuple[str, str], ...]): Extra request headers.
+        body (Optional[bytes]): The request body.
+        weight (float): The relative frequency of the request.
+        statuses (Tuple[int, ...]): The expected status codes. Any 2xx or 3xx status
+            is expected when empty.
+    """
+
+    name: str
+    method: str
+    path: str
+    headers: Tuple[Tuple[str, str], ...]
+    body: Optional[bytes]
+    weight: float
+    statuses: Tuple[int, ...]
+
+    def expects(self, status: int) -> bool:
+        if self.statuses:
+            return status in self.statuses
+        return 200 <= status < 400
+
+    @property
+    def idempotent(self) -> bool:
+        """Whether the request can be sent again when its connection fails."""
+        return self.method in _IDEMPOTENT
+
+
+class Scenario:
+    """
+    A weighted mix of requests. A scenario file is JSON of the form:
+
+        {
+            "requests": [
+                {"name": "health", "path": "/health", "weight": 5},
+                {
+                    "name": "create user",
+                    "method": "POST",
+                    "path": "/user",
+                    "body": {"name": "Jane", "age": 30},
+                    "status": 201,
+                    "weight": 1
+                }
+            ]
+        }
+
+    `method` defaults to GET, `weight` to 1 and `name` to the method and path. A body
+    that is not a string is sent as JSON. `status` is an expected status code or a
+    list of them, and defaults to any 2xx or 3xx status.
+    """
+
+    def __init__(self, requests: List[ScenarioRequest]) -> None:
+        if not requests:
+            raise ValueError("A scenario needs at least one request")
+        if any(request.weight <= 0 for request in requests):
+            raise ValueError("Request weights must be positive")
+
+        self.requests = requests
+        self._cum_weights: List[float] = []
+        total = 0.0
+        for request in requests:
+            total += request.weight
+            self._cum_weights.append(total)
+
+    def choose(self, rng: random.Random) -> ScenarioRequest:
+        if len(self.requests) == 1:
+            return self.requests[0]
+        return rng.choices(self.requests, cum_weights=self._cum_weights)[0]
+
+    @classmethod
+    def single(cls, method: str, path: str) -> "Scenario":
+        return cls([ScenarioRequest(f"{method} {path}", method, path, (), None, 1, ())])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        requests = []
+        for entry in data.get("requests", []):
+            method = str(entry.get("method", "GET")).upper()
+            path = str(entry["path"])
+            if not path.startswith("/"):
+                path = "/" + path
+
+            headers = {str(k): str(v) for k, v in entry.get("headers", {}).items()}
+            body = entry.get("body")
+            encoded: Optional[bytes] = None
+            if isinstance(body, str):
+                encoded = body.encode("utf-8")
+            elif body is not None:
+                encoded = json.dumps(body).encode("utf-8")
+                headers.setdefault("Content-Type", "application/json")
+
+            status = entry.get("status", ())
+            statuses = (status,) if isinstance(status, int) else tuple(status)
+
+            requests.append(
+                ScenarioRequest(
+                    str(entry.get("name", f"{method} {path}")),
+                    method,
+                    path,
+                    tuple(headers.items()),
+                    encoded,
+                    float(entry.get("weight", 1)),
+                    statuses,
+                )
+            )
+        return cls(requests)
+
+    @classmethod
+    def load(cls, path: str) -> "Scenario":
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+
+def _encode(request: ScenarioRequest, host: str, keep_alive: bool) -> bytes:
+    lines = [
+        f"{request.method} {request.path} HTTP/1.1",
+        f"Host: {host}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in request.headers)
+    if request.body is not None:
+        lines.append(f"Content-Length: {len(request.body)}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head + (request.body or b"")
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "used")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.used = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+    async def exchange(self, data: bytes) -> Tuple[int, bool]:
+        """Sends a request and reads the response, returning its status and whether
+        the connection can be reused."""
+        self.used = True
+        self.writer.write(data)
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        reusable = headers.get("connection", "").lower() != "close"
+        if "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            await self._read_chunked()
+        else:
+            await self.reader.read()
+            reusable = False
+
+        return status, reusable
+
+    async def _read_chunked(self) -> None:
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0].strip(), 16)
+            await self.reader.readexactly(size + 2)
+            if size == 0:
+                return
+
+
+class _Pool:
+    """At most `size` connections to the target, reused while the server keeps them
+    open."""
+
+    def __init__(self, host: str, port: int, size: int, keep_alive: bool) -> None:
+        self.host = host
+        self.port = port
+        self.keep_alive = keep_alive
+        self.opened = 0
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    async def exchange(self, data: bytes, retry: bool = True) -> Tuple[int, float]:
+        """Sends a request on an idle or new connection, returning the response status
+        and the time the request was sent, after waiting for a connection. A request
+        on a reused connection that fails is sent again on a new one only if `retry`
+        is set, as the server may already have acted on it."""
+        async with self._slots:
+            sent = perf_counter()
+            connection = self._idle.pop() if self._idle else await self._connect()
+            reused = connection.used
+            try:
+                try:
+                    status, reusable = await connection.exchange(data)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    # The server may close an idle keep-alive connection at any
+                    # time, in which case the request is retried once on a new one.
+                    connection.close()
+                    if not reused or not retry:
+                        raise
+                    connection = await self._connect()
+                    status, reusable = await connection.exchange(data)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+                connection.close()
+                raise LoadError("Incomplete response") from e
+            except (OSError, ValueError, IndexError) as e:
+                connection.close()
+                raise LoadError(str(e) or type(e).__name__) from e
+            except BaseException:
+                connection.close()
+                raise
+
+            if reusable and self.keep_alive:
+                self._idle.append(connection)
+            else:
+                connection.close()
+            return status, sent
+
+    def close(self) -> None:
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+
+
+class LoadResult:
+    """
+    The outcome of a load test.
+
+    Attributes:
+        duration (float): The seconds measured, excluding the warmup.
+        requests (int): The requests completed within the measured window.
+        errors (int): The requests that failed or got an unexpected status.
+        statuses (Counter): The number of responses per status code, with `error`
+            counting failed requests.
+        latency (LatencyHistogram): The latency from the time each request was due
+            to be sent, which includes the time it waited for a connection, so a
+            stalled server is not hidden by the generator slowing down with it.
+        service (LatencyHistogram): The latency from the time each request was sent.
+        by_request (Dict[str, LatencyHistogram]): The latency per scenario request.
+        connections (int): The connections opened.
+    """
+
+    def __init__(self) -> None:
+        self.duration = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.statuses: "Counter[str]" = Counter()
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.by_request: Dict[str, LatencyHistogram] = {}
+        self.connections = 0
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "duration_s": round(self.duration, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 6),
+            "throughput_rps": round(self.throughput, 2),
+            "connections": self.connections,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency": self.latency.summary(),
+            "service": self.service.summary(),
+            "requests_by_name": {
+                name: histogram.summary()
+                for name, histogram in self.by_request.items()
+            },
+        }
+
+    def check(
+        self,
+        max_latency: Optional[Dict[float, float]] = None,
+        min_throughput: Optional[float] = None,
+        max_error_rate: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Checks the result against thresholds for CI.
+
+        :param max_latency: The highest accepted latency in milliseconds per
+            percentile, such as `{99: 250}`
+        :param min_throughput: The lowest accepted requests per second
+        :param max_error_rate: The highest accepted fraction of failed requests
+        :return: A description of each threshold that was not met
+        """
+        failures = []
+        for percentile, limit in sorted((max_latency or {}).items()):
+            value = self.latency.percentile(percentile) * 1000
+            if value > limit:
+                failures.append(
+                    f"{percentile_key(percentile)} latency {value:.2f} ms exceeds {limit:g} ms"
+                )
+        if min_throughput is not None and self.throughput < min_throughput:
+            failures.append(
+                f"Throughput {self.throughput:.1f} req/s is below {min_throughput:g} req/s"
+            )
+        if max_error_rate is not None and self.error_rate > max_error_rate:
+            failures.append(
+                f"Error rate {self.error_rate:.2%} exceeds {max_error_rate:.2%}"
+            )
+        if not self.requests:
+            failures.append("No requests completed")
+        return failures
+
+
+class LoadGenerator:
+    """
+    Sends a scenario of requests to a server for a duration or a number of
+    requests, over a pool of keep-alive connections.
+
+    In the closed loop mode, `concurrency` workers each send a request as soon as
+    their previous one completes, or at `rate` requests per second in total when a
+    rate is given. In the open loop mode, requests are due at `rate` requests per
+    second whether or not earlier ones have completed, as real clients behave, and
+    at most `concurrency` are in flight.
+
+    Whenever requests follow a schedule, latency is measured from the time each was
+    due rather than the time it was sent. This corrects for coordinated omission: a
+    generator that waits for a stalled server sends fewer requests during the
+    stall, which would otherwise hide it from the percentiles.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        scenario: Optional[Scenario] = None,
+        concurrency: int = 50,
+        rate: Optional[float] = None,
+        mode: str = "closed",
+        duration: Optional[float] = 10.0,
+        requests: Optional[int] = None,
+        warmup: float = 0.0,
+        timeout: float = 10.0,
+        keep_alive: bool = True,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        :param url: The server URL, such as `http://127.0.0.1:13337`. Its path is
+            requested with GET when no scenario is given.
+        :param scenario: The requests to send
+        :param concurrency: The connections, and in the closed loop the workers
+        :param rate: The target requests per second
+        :param mode: `closed` or `open`, which requires a rate
+        :param duration: Seconds to send requests for, after the warmup
+        :param requests: The number of requests to send, after the warmup
+        :param warmup: Seconds of requests that are sent but not recorded
+        :param timeout: Seconds before a request fails
+        :param keep_alive: Whether connections are reused between requests
+        :param seed: Seeds the choice of scenario requests
+        """
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme != "http" or not parsed.hostname:
+            raise ValueError("Only http:// URLs are supported")
+        if mode not in ("closed", "open"):
+            raise ValueError(f"Unknown mode {mode}")
+        if mode == "open" and not rate:
+            raise ValueError("The open loop mode requires a rate")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if duration is None and requests is None:
+            raise ValueError("A duration or a number of requests is required")
+
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+
+        self.scenario = scenario or Scenario.single("GET", path)
+        self.concurrency = concurrency
+        self.rate = rate
+        self.mode = mode
+        self.duration = duration
+        self.requests = requests
+        self.warmup = warmup
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._rng = random.Random(seed)
+        self._result = LoadResult()
+        self._pool: Optional[_Pool] = None
+        self._started = self._measured_from = self._last_completed = 0.0
+        self._deadline: Optional[float] = None
+        self._issued = self._measured = 0
+
+        authority = parsed.netloc.rsplit("@", 1)[-1]
+        self._encoded = {
+            request: _encode(request, authority, keep_alive)
+            for request in self.scenario.requests
+        }
+
+    def run(self) -> LoadResult:
+        """Runs the load test on a new event loop."""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> LoadResult:
+        """Runs the load test on the running event loop."""
+        result = LoadResult()
+        pool = _Pool(self.host, self.port, self.concurrency, self.keep_alive)
+
+        self._result = result
+        self._pool = pool
+        self._started = perf_counter()
+        self._measured_from = self._started + self.warmup
+        self._deadline = (
+            self._measured_from + self.duration if self.duration is not None else None
+        )
+        self._issued = 0
+        self._measured = 0
+        self._last_completed = self._measured_from
+
+        try:
+            if self.mode == "open":
+                await self._open_loop()
+            else:
+                await asyncio.gather(
+                    *(self._worker(n) for n in range(self.concurrency))
+                )
+        finally:
+            pool.close()
+
+        result.duration = max(self._last_completed - self._measured_from, 0.0)
+        result.connections = pool.opened
+        return result
+
+    def _next_due(self) -> Optional[float]:
+        """Returns when the next request is due, or None once the test is over."""
+        if self.rate:
+            due = self._started + self._issued / self.rate
+        else:
+            due = perf_counter()
+
+        if self._deadline is not None and due >= self._deadline:
+            return None
+        if due >= self._measured_from:
+            if self.requests is not None and self._measured >= self.requests:
+                return None
+            self._measured += 1
+
+        self._issued += 1
+        return due
+
+    async def _worker(self, _n: int) -> None:
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            delay = due - perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._send(due)
+
+    async def _open_loop(self) -> None:
+        pending = set()
+        while True:
+            due = self._next_due()
+            if due is None:
+                break
+            delay = due - perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            task = asyncio.ensure_future(self._send(due))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def _send(self, due: float) -> None:
+        assert self._pool is not None
+        request = self.scenario.choose(self._rng)
+
+        status: Union[int, str]
+        try:
+            status, sent = await asyncio.wait_for(
+                self._pool.exchange(self._encoded[request], request.idempotent),
+                self.timeout,
+            )
+        except (LoadError, OSError, asyncio.TimeoutError):
+            status, sent = "error", due
+
+        completed = perf_counter()
+        if due < self._measured_from:
+            return
+
+        result = self._result
+        result.requests += 1
+        result.statuses[str(status)] += 1
+        if status == "error" or not request.expects(int(status)):
+            result.errors += 1
+
+        latency = completed - due
+        result.latency.record(latency)
+        result.service.record(completed - sent)
+        histogram = result.by_request.get(request.name)
+        if histogram is None:
+            histogram = result.by_request[request.name] = LatencyHistogram()
+        histogram.record(latency)
+        self._last_completed = max(self._last_completed, completed)
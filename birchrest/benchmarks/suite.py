@@ -0,0 +1,252 @@
+"""
+The micro-benchmarks of the framework hot paths. Each benchmark measures one path
+in isolation, with its inputs built by the setup function.
+"""
+
+import fnmatch
+import json
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..http import Request, Response
+from ..routes import Route, parse_data_class
+from ..routes.router import RouteTable, match_route
+from ..utils import dict_to_dataclass
+from .harness import Benchmark, BenchmarkFunction
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, group: str) -> Callable[[Callable[[], BenchmarkFunction]], Any]:
+    """Registers a setup function returning the operation to measure."""
+
+    def register(setup: Callable[[], BenchmarkFunction]) -> Callable[[], BenchmarkFunction]:
+        BENCHMARKS.append(Benchmark(name, setup, group))
+        return setup
+
+    return register
+
+
+def select(pattern: Optional[str] = None) -> List[Benchmark]:
+    """
+    Returns the benchmarks whose name or group matches a glob pattern, or all of
+    them when no pattern is given.
+    """
+    if not pattern:
+        return list(BENCHMARKS)
+    return [
+        b
+        for b in BENCHMARKS
+        if fnmatch.fnmatch(b.name, pattern) or fnmatch.fnmatch(b.group, pattern)
+    ]
+
+
+HEADERS = (
+    "Host: localhost:13337\r\n"
+    "User-Agent: Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/131.0\r\n"
+    "Accept: application/json\r\n"
+    "Accept-Encoding: gzip, deflate, br\r\n"
+    "Connection: keep-alive\r\n"
+)
+
+
+@benchmark("request.parse.get", "request")
+def _parse_get() -> BenchmarkFunction:
+    raw = f"GET /api/users/42?fields=name&page=2 HTTP/1.1\r\n{HEADERS}\r\n"
+    return lambda: Request.parse(raw, "127.0.0.1", 5000)
+
+
+@benchmark("request.parse.post", "request")
+def _parse_post() -> BenchmarkFunction:
+    body = json.dumps({"name": "Ada", "email": "ada@example.com", "tags": ["a", "b"]})
+    raw = (
+        f"POST /api/users HTTP/1.1\r\n{HEADERS}Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n{body}"
+    )
+    return lambda: Request.parse(raw, "127.0.0.1", 5000)
+
+
+async def _noop_handler(req: Request, res: Response) -> None:
+    res.send({"ok": True})
+
+
+def _routes(count: int) -> List[Route]:
+    routes = []
+    for n in range(count):
+        route = Route(
+            _noop_handler, "GET", f"resource{n}/:id", [], False, None, None, None
+        )
+        route.resolve("/api", [])
+        routes.append(route)
+    return routes
+
+
+def _router_benchmark(count: int) -> None:
+    @benchmark(f"router.match.{count}", "router")
+    def _setup() -> BenchmarkFunction:
+        routes = _routes(count)
+        middle = f"/api/resource{count // 2}/42"
+        return lambda: match_route(routes, "GET", middle)
+
+    @benchmark(f"router.table.{count}", "router")
+    def _setup_table() -> BenchmarkFunction:
+        table = RouteTable(_routes(count))
+        middle = f"/api/resource{count // 2}/42"
+        return lambda: table.match("GET", middle)
+
+
+for _count in (10, 100, 1000):
+    _router_benchmark(_count)
+
+
+@benchmark("router.miss.1000", "router")
+def _router_miss() -> BenchmarkFunction:
+    routes = _routes(1000)
+    return lambda: match_route(routes, "GET", "/api/missing/42")
+
+
+@benchmark("router.table.miss.1000", "router")
+def _router_table_miss() -> BenchmarkFunction:
+    table = RouteTable(_routes(1000))
+    return lambda: table.match("GET", "/api/missing/42/items")
+
+
+@dataclass
+class Address:
+    street: str = field(metadata={"min_length": 1, "max_length": 100})
+    city: str
+    zip_code: str = field(metadata={"regex": r"^\d{5}$"})
+
+
+@dataclass
+class SmallModel:
+    name: str = field(metadata={"min_length": 1, "max_length": 50})
+    age: int = field(metadata={"min_value": 0, "max_value": 150})
+
+
+@dataclass
+class LargeModel:
+    name: str = field(metadata={"min_length": 1, "max_length": 50})
+    email: str = field(metadata={"regex": r"^[^@]+@[^@]+\.[a-z]+$"})
+    age: int = field(metadata={"min_value": 0, "max_value": 150})
+    score: float
+    active: bool
+    tags: List[str]
+    bio: Optional[str] = field(default=None, metadata={"is_optional": True})
+    country: str = "SE"
+    city: str = "Stockholm"
+    phone: str = field(default="", metadata={"max_length": 20})
+    role: str = "user"
+    level: int = 1
+
+
+@dataclass
+class NestedModel:
+    name: str
+    address: Address
+    previous: List[Address]
+
+
+@benchmark("validation.small", "validation")
+def _validate_small() -> BenchmarkFunction:
+    data = {"name": "Ada", "age": 36}
+    return lambda: parse_data_class(SmallModel, data)
+
+
+@benchmark("validation.large", "validation")
+def _validate_large() -> BenchmarkFunction:
+    data = {
+        "name": "Ada",
+        "email": "ada@example.com",
+        "age": 36,
+        "score": 9.5,
+        "active": True,
+        "tags": ["math", "engines", "poetry"],
+        "bio": "Wrote the first program.",
+        "phone": "+46 70 000 00 00",
+    }
+    return lambda: parse_data_class(LargeModel, data)
+
+
+@benchmark("validation.nested", "validation")
+def _validate_nested() -> BenchmarkFunction:
+    address = {"street": "Main Street 1", "city": "Uppsala", "zip_code": "75310"}
+    data = {"name": "Ada", "address": address, "previous": [address] * 5}
+    return lambda: parse_data_class(NestedModel, data)
+
+
+@benchmark("dataclass.flat", "dataclass")
+def _dataclass_flat() -> BenchmarkFunction:
+    data = {"id": "42", "page": "2", "fields": "name"}
+    return lambda: dict_to_dataclass("queries", data)
+
+
+@benchmark("dataclass.nested", "dataclass")
+def _dataclass_nested() -> BenchmarkFunction:
+    data = {
+        "user": {"name": "Ada", "address": {"city": "Uppsala", "zip": "75310"}},
+        "items": [{"id": n, "qty": n * 2} for n in range(10)],
+    }
+    return lambda: dict_to_dataclass("body", data)
+
+
+def _no_executor() -> Executor:
+    raise RuntimeError("The benchmarked callables are asynchronous")
+
+
+async def _passthrough(req: Request, res: Response, _next: Callable[[], Any]) -> None:
+    await _next()
+
+
+def _middleware_benchmark(depth: int) -> None:
+    @benchmark(f"middleware.chain.{depth}", "middleware")
+    def _setup() -> BenchmarkFunction:
+        route = Route(
+            _noop_handler,
+            "GET",
+            "users/:id",
+            [_passthrough] * depth,
+            False,
+            None,
+            None,
+            None,
+        )
+        route.resolve("/api", [])
+        route.prepare(_no_executor)
+        request = Request("GET", "/api/users/42", "HTTP/1.1", {}, None, "127.0.0.1")
+
+        async def call() -> None:
+            request.params = {"id": "42"}
+            request.body = None
+            request.queries = {}
+            await route(request, Response())
+
+        return call
+
+
+for _depth in (0, 5, 20):
+    _middleware_benchmark(_depth)
+
+
+@benchmark("response.send.small", "response")
+def _send_small() -> BenchmarkFunction:
+    payload = {"id": 42, "name": "Ada"}
+    return lambda: Response().send(payload)
+
+
+@benchmark("response.send.large", "response")
+def _send_large() -> BenchmarkFunction:
+    payload: Dict[str, Any] = {
+        "items": [
+            {"id": n, "name": f"item {n}", "price": n * 1.5, "tags": ["a", "b"]}
+            for n in range(200)
+        ]
+    }
+    return lambda: Response().send(payload)
+
+
+@benchmark("response.end", "response")
+def _end() -> BenchmarkFunction:
+    payload = {"id": 42, "name": "Ada"}
+    return lambda: Response().send(payload).end()
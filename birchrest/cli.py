@@ -5,11 +5,14 @@ import shutil
 import subprocess
 import platform
 import json
+import signal
+import tempfile
+import time
+import urllib.parse
 
 from colorama import Fore, Style, init
-from typing import Any
+from typing import Any, Dict, List, Optional
 
-from .app import BirchRest
 
 init(autoreset=True)
 
@@ -166,13 +169,112 @@ def init_project(_args: Any) -> None:
         )
 
 
-def serve_project(port: int, host: str, log_level: str, base_path: str = "") -> None:
+def serve_project(
+    port: int,
+    host: str,
+    log_level: str,
+    base_path: str = "",
+    loop: str = "auto",
+    backlog: int = 100,
+    server: str = "streams",
+    birch_file: Optional[str] = None,
+    reload: bool = False,
+) -> None:
     """
     CLI version of starting the server
     """
+    from .app import BirchRest
+
     sys.path.insert(0, os.getcwd())
-    app = BirchRest(log_level=log_level, base_path=base_path)
-    app.serve(host=host, port=port)
+    app = BirchRest(log_level=log_level, base_path=base_path, birch_file=birch_file)
+    app.serve(
+        host=host, port=port, loop=loop, backlog=backlog, server=server, reload=reload
+    )
+
+
+def _time_lookup(lookup: Any, min_time: float = 0.05) -> float:
+    """Returns the nanoseconds a route lookup takes, averaged over `min_time` seconds."""
+    loops = 0
+    start = time.perf_counter_ns()
+    while True:
+        for _ in range(100):
+            lookup()
+        loops += 100
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            return elapsed / loops
+
+
+def list_routes(args: Any) -> None:
+    """
+    Prints the compiled route table of the project in the order routes are matched
+    and how each route is looked up, and the route that sample requests given with
+    `--match` resolve to, with the lookup time compared to trying every route.
+    """
+    from .app import BirchRest
+    from .routes.router import RouteTable, match_route
+
+    sys.path.insert(0, os.getcwd())
+    app = BirchRest(
+        log_level="warning", base_path=args.base_path, birch_file=args.birch_file
+    )
+    routes, _ = app._collect_routes()
+    table = RouteTable(routes)
+    entries = table.describe()
+    stats = table.stats()
+
+    matches: List[Dict[str, Any]] = []
+    for sample in args.match or []:
+        method, _, path = sample.strip().partition(" ")
+        method, path = method.upper(), path.strip() or "/"
+        clean_path = path.partition("?")[0]
+        route, params, exists = table.match(method, clean_path)
+        matches.append(
+            {
+                "request": f"{method} {path}",
+                "route": f"{route.method} {route.path or '/'}" if route else None,
+                "params": params,
+                "status": 200 if route else 405 if exists else 404,
+                "table_ns": _time_lookup(lambda: table.match(method, clean_path)),
+                "linear_ns": _time_lookup(
+                    lambda: match_route(routes, method, clean_path)
+                ),
+            }
+        )
+
+    if args.json:
+        print(
+            json.dumps({"routes": entries, "stats": stats, "matches": matches}, indent=4)
+        )
+        return
+
+    print(f"{'#':>4}  {'METHOD':<8}{'PATH':<40}{'LOOKUP':<12}HANDLER")
+    for index, entry in enumerate(entries, 1):
+        lookup = {"static": "tree", "dynamic": "tree", "pattern": "regex"}[
+            entry["kind"]
+        ]
+        lock = " (protected)" if entry["protected"] else ""
+        print(
+            f"{index:>4}  {entry['method']:<8}{entry['path']:<40}{lookup:<12}"
+            f"{entry['handler']}{lock}"
+        )
+
+    print(
+        f"\n{stats['routes']} routes: {stats['static']} static and "
+        f"{stats['dynamic']} with parameters in a tree of {stats['nodes']} segments, "
+        f"{stats['pattern']} matched by regex in turn"
+    )
+
+    for match in matches:
+        target = match["route"] or {404: "Not Found", 405: "Method Not Allowed"}.get(
+            match["status"]
+        )
+        found = f" {match['params']}" if match["params"] else ""
+        print(
+            f"\n{match['request']} -> {target}{found}\n"
+            f"  {_format_ns(match['table_ns'])} per lookup "
+            f"({_format_ns(match['linear_ns'])} trying every route in turn)"
+        )
 
 
 def run_tests(_args: Any) -> None:
@@ -228,6 +330,8 @@ def generate_openapi(args: Any) -> None:
         args: The command-line arguments, including the output filename.
     """
     sys.path.insert(0, os.getcwd())
+    from .app import BirchRest
+
     app = BirchRest()
     openapi_spec = app._generate_open_api()
 
@@ -245,6 +349,278 @@ def generate_openapi(args: Any) -> None:
             print(f"{Fore.RED}Error writing OpenAPI documentation: {e}{Style.RESET_ALL}")
 
 
+def profile_process(args: Any) -> None:
+    """
+    Profiles a running BirchRest application, either through its profiling route with
+    --url or by signalling the process with --pid, and prints or saves the collapsed
+    stacks.
+    """
+    if (args.pid is None) == (args.url is None):
+        print(f"{Fore.RED}Pass exactly one of --pid and --url.{Style.RESET_ALL}")
+        return
+
+    options = {"duration": args.duration, "route": args.route, "interval": args.interval}
+
+    try:
+        if args.pid is not None:
+            collapsed = _profile_pid(args.pid, options)
+        else:
+            collapsed = _profile_url(args.url, options, args.header)
+    except Exception as e:
+        print(f"{Fore.RED}Profiling failed: {e}{Style.RESET_ALL}")
+        return
+
+    if not collapsed and should_print():
+        print(
+            f"{Fore.YELLOW}No samples were recorded, the application was idle.{Style.RESET_ALL}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(collapsed)
+        if should_print():
+            print(f"{Fore.GREEN}Collapsed stacks saved to {args.output}.{Style.RESET_ALL}")
+    else:
+        print(collapsed, end="")
+
+
+def _profile_pid(pid: int, options: Any) -> str:
+    """Asks the process to profile itself and waits for the result file."""
+    from .profiling.profiler import control_dir, control_path
+
+    fd, output = tempfile.mkstemp(prefix="result-", suffix=".txt", dir=control_dir())
+    os.close(fd)
+    os.remove(output)
+
+    # The directory is private, a file left there is from an earlier request that failed
+    control = control_path(pid)
+    if os.path.lexists(control):
+        os.remove(control)
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW
+    with open(os.open(control, flags, 0o600), "w") as f:
+        json.dump({**options, "output": output}, f)
+
+    os.kill(pid, signal.SIGUSR2)
+    if should_print():
+        print(f"Profiling process {pid} for {options['duration']} seconds...")
+
+    deadline = time.monotonic() + options["duration"] + 30
+    while not os.path.exists(output):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            raise RuntimeError(
+                f"process {pid} exited, was it serving with profiling enabled?"
+            )
+        if time.monotonic() > deadline:
+            if os.path.exists(control):
+                os.remove(control)
+            raise TimeoutError(
+                f"process {pid} did not respond, is it serving with profiling enabled?"
+            )
+        time.sleep(0.2)
+
+    with open(output, encoding="utf-8") as f:
+        collapsed = f.read()
+    os.remove(output)
+
+    return collapsed
+
+
+def _profile_url(url: str, options: Any, headers: Any) -> str:
+    """Calls the profiling route of the application."""
+    query = urllib.parse.urlencode(
+        {key: value for key, value in options.items() if value is not None}
+    )
+    import urllib.request
+
+    request = urllib.request.Request(f"{url}?{query}")
+    for header in headers or []:
+        name, value = header.split(":", 1)
+        request.add_header(name.strip(), value.strip())
+
+    with urllib.request.urlopen(request, timeout=options["duration"] + 30) as response:
+        return str(response.read().decode("utf-8"))
+
+
+def _format_ns(value: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.0f} ns"
+
+
+def run_benchmarks(args: Any) -> None:
+    """
+    Runs the micro-benchmarks of the framework hot paths, optionally saving the
+    results and comparing them to a baseline. Exits with status 1 if a benchmark
+    regressed.
+    """
+    from .benchmarks import compare, load_baseline, run, select, to_json
+
+    benchmarks = select(args.filter)
+    if not benchmarks:
+        print(f"{Fore.RED}No benchmarks match {args.filter}.{Style.RESET_ALL}")
+        return
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+
+    print(f"{'benchmark':<28} {'median':>12} {'iqr':>12} {'ops/s':>12}")
+
+    def report(result: Any) -> None:
+        print(
+            f"{result.name:<28} {_format_ns(result.median_ns):>12} "
+            f"{_format_ns(result.iqr_ns):>12} {result.ops_per_second:>12,.0f}"
+        )
+
+    results = run(benchmarks, args.min_time, args.repeat, report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(to_json(results), f, indent=4)
+        print(f"{Fore.GREEN}Results saved to {args.output}.{Style.RESET_ALL}")
+
+    if baseline is None:
+        return
+
+    comparisons = compare(results, baseline, args.tolerance)
+    print(f"\nCompared to {args.baseline} (tolerance {args.tolerance:.0%}):")
+    for comparison in comparisons:
+        color = Fore.RED if comparison.regression else Fore.GREEN
+        print(
+            f"{comparison.name:<28} {_format_ns(comparison.baseline_ns):>12} -> "
+            f"{_format_ns(comparison.current_ns):>12} "
+            f"{color}{comparison.change:+.1%}{Style.RESET_ALL}"
+        )
+
+    regressions = [c for c in comparisons if c.regression]
+    if regressions:
+        print(f"{Fore.RED}{len(regressions)} benchmark(s) regressed.{Style.RESET_ALL}")
+        sys.exit(1)
+
+
+def _parse_latency_limit(value: str) -> Any:
+    """Parses a latency threshold such as `p99=250` into a percentile and milliseconds."""
+    try:
+        percentile, limit = value.lower().lstrip("p").split("=", 1)
+        return float(percentile), float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Expected a threshold such as p99=250, got {value}"
+        ) from None
+
+
+def run_load_test(args: Any) -> None:
+    """
+    Sends load to a running server and prints the throughput and latency
+    percentiles. Exits with status 1 if a threshold is not met.
+    """
+    from .benchmarks.load import LoadGenerator, Scenario
+
+    try:
+        generator = LoadGenerator(
+            args.url,
+            Scenario.load(args.scenario) if args.scenario else None,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            mode=args.mode,
+            duration=args.duration or (None if args.requests else 10.0),
+            requests=args.requests,
+            warmup=args.warmup,
+            timeout=args.timeout,
+            keep_alive=not args.no_keep_alive,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"{Fore.RED}Invalid load test: {e}{Style.RESET_ALL}")
+        sys.exit(2)
+
+    result = generator.run()
+    summary = result.to_json()
+
+    print(
+        f"{result.requests} requests in {result.duration:.2f}s over "
+        f"{result.connections} connection(s), {result.throughput:,.1f} req/s"
+    )
+    print(f"Statuses: {summary['statuses']}")
+    print(f"\n{'request':<28} {'count':>8} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}")
+    rows = [("all", summary["latency"])] + list(summary["requests_by_name"].items())
+    for name, latency in rows:
+        print(
+            f"{name[:28]:<28} {latency['count']:>8} {latency['p50_ms']:>8.2f}ms "
+            f"{latency['p90_ms']:>8.2f}ms {latency['p99_ms']:>8.2f}ms "
+            f"{latency['max_ms']:>8.2f}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+        print(f"{Fore.GREEN}Results saved to {args.output}.{Style.RESET_ALL}")
+
+    failures = result.check(
+        dict(args.max_latency or []), args.min_rps, args.max_error_rate
+    )
+    for failure in failures:
+        print(f"{Fore.RED}{failure}{Style.RESET_ALL}")
+    if failures:
+        sys.exit(1)
+
+
+def profile_startup(args: Any) -> None:
+    """
+    Reports the time spent importing each module when running a statement in a new
+    interpreter, by package and by module. Exits with status 1 if the total exceeds
+    the budget.
+    """
+    from .profiling.imports import by_package, profile_imports, total_us
+
+    try:
+        imports = profile_imports(args.statement, args.repeat)
+    except RuntimeError as e:
+        print(f"{Fore.RED}Failed to run {args.statement!r}: {e}{Style.RESET_ALL}")
+        sys.exit(2)
+
+    total = total_us(imports) / 1000
+    own = total_us(imports, "birchrest") / 1000
+    print(
+        f"{args.statement}: {total:.1f} ms importing {len(imports)} modules, "
+        f"{own:.1f} ms in birchrest (median of {args.repeat} runs)"
+    )
+
+    print(f"\n{'package':<40} {'self':>10}")
+    for package, self_us in list(by_package(imports).items())[: args.top]:
+        print(f"{package:<40} {self_us / 1000:>8.1f}ms")
+
+    print(f"\n{'module':<40} {'self':>10} {'cumulative':>12}")
+    slowest = sorted(imports, key=lambda module: module.self_us, reverse=True)
+    for module in slowest[: args.top]:
+        print(
+            f"{module.name:<40} {module.self_us / 1000:>8.1f}ms "
+            f"{module.cumulative_us / 1000:>10.1f}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "statement": args.statement,
+                    "total_ms": total,
+                    "birchrest_ms": own,
+                    "imports": [module._asdict() for module in imports],
+                },
+                f,
+                indent=4,
+            )
+        print(f"{Fore.GREEN}Results saved to {args.output}.{Style.RESET_ALL}")
+
+    if args.budget is not None and total > args.budget:
+        print(
+            f"{Fore.RED}Import time {total:.1f} ms exceeds the budget of "
+            f"{args.budget:g} ms.{Style.RESET_ALL}"
+        )
+        sys.exit(1)
+
+
 def main() -> None:
     """
     Entry point for the CLI.
@@ -298,9 +674,52 @@ def main() -> None:
         help="Prefix the api with a global basepath (default: None)",
     )
 
+    serve_parser.add_argument(
+        "--loop",
+        type=str,
+        default="auto",
+        choices=["auto", "asyncio", "uvloop"],
+        help="Event loop to use, auto picks uvloop when installed (default: auto)",
+    )
+
+    serve_parser.add_argument(
+        "--backlog",
+        type=int,
+        default=100,
+        help="Maximum number of queued connections (default: 100)",
+    )
+
+    serve_parser.add_argument(
+        "--server",
+        type=str,
+        default="streams",
+        choices=["streams", "protocol"],
+        help="Server implementation to use (default: streams)",
+    )
+
+    serve_parser.add_argument(
+        "--birch-file",
+        type=str,
+        help="The __birch__.py file or its directory, skips searching for it",
+    )
+
+    serve_parser.add_argument(
+        "--reload",
+        action="store_true",
+        help="Reload the controllers when their source files change, for development",
+    )
+
     serve_parser.set_defaults(
         func=lambda args: serve_project(
-            args.port, args.host, args.log_level, args.base_bath
+            args.port,
+            args.host,
+            args.log_level,
+            args.base_bath,
+            args.loop,
+            args.backlog,
+            args.server,
+            args.birch_file,
+            args.reload,
         )
     )
 
@@ -314,6 +733,230 @@ def main() -> None:
 
     lint_parser = subparsers.add_parser("lint", help="Run pylint for lint checking")
     lint_parser.set_defaults(func=run_lint)
+
+    profile_parser = subparsers.add_parser(
+        "profile", help="Profile a running BirchREST application"
+    )
+    profile_parser.add_argument(
+        "--pid",
+        type=int,
+        help="Process ID of an application serving with profiling enabled",
+    )
+    profile_parser.add_argument(
+        "--url",
+        type=str,
+        help="URL of the profiling route, e.g. http://127.0.0.1:13337/debug/profile",
+    )
+    profile_parser.add_argument(
+        "--duration",
+        type=float,
+        default=30,
+        help="Seconds to profile for (default: 30)",
+    )
+    profile_parser.add_argument(
+        "--route",
+        type=str,
+        help="Only sample requests to this route template, e.g. /users/:id",
+    )
+    profile_parser.add_argument(
+        "--interval",
+        type=float,
+        help="Seconds between samples (default: 0.005)",
+    )
+    profile_parser.add_argument(
+        "--header",
+        type=str,
+        action="append",
+        help="Header sent with --url, e.g. 'Authorization: Bearer token'",
+    )
+    profile_parser.add_argument(
+        "--output",
+        type=str,
+        help="File to save the collapsed stacks to (default: print them)",
+    )
+    profile_parser.set_defaults(func=profile_process)
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="Run the micro-benchmarks of the framework hot paths"
+    )
+    bench_parser.add_argument(
+        "--filter",
+        type=str,
+        help="Only run benchmarks whose name or group matches this glob, e.g. 'router*'",
+    )
+    bench_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="Minimum seconds per repeat (default: 0.05)",
+    )
+    bench_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=7,
+        help="Repeats per benchmark (default: 7)",
+    )
+    bench_parser.add_argument(
+        "--output",
+        type=str,
+        help="File to save the results to as JSON",
+    )
+    bench_parser.add_argument(
+        "--baseline",
+        type=str,
+        help="Results of a previous run to compare against",
+    )
+    bench_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Accepted slowdown compared to the baseline (default: 0.1 for 10%%)",
+    )
+    bench_parser.set_defaults(func=run_benchmarks)
+
+    load_parser = subparsers.add_parser(
+        "load", help="Send load to a running server and report latency percentiles"
+    )
+    load_parser.add_argument(
+        "url",
+        type=str,
+        help="The server URL, e.g. http://127.0.0.1:13337/health",
+    )
+    load_parser.add_argument(
+        "--scenario",
+        type=str,
+        help="JSON file of weighted requests to send instead of GET on the URL",
+    )
+    load_parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=50,
+        help="Connections, and workers in the closed loop mode (default: 50)",
+    )
+    load_parser.add_argument(
+        "--rate",
+        type=float,
+        help="Target requests per second, required by the open loop mode",
+    )
+    load_parser.add_argument(
+        "--mode",
+        choices=["closed", "open"],
+        default="closed",
+        help="closed: send when a request completes, open: send at --rate (default: closed)",
+    )
+    load_parser.add_argument(
+        "--duration",
+        "-d",
+        type=float,
+        help="Seconds to send requests for (default: 10 unless --requests is given)",
+    )
+    load_parser.add_argument(
+        "--requests",
+        "-n",
+        type=int,
+        help="Number of requests to send",
+    )
+    load_parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0.0,
+        help="Seconds of requests to send before recording (default: 0)",
+    )
+    load_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Seconds before a request fails (default: 10)",
+    )
+    load_parser.add_argument(
+        "--no-keep-alive",
+        action="store_true",
+        help="Open a new connection for every request",
+    )
+    load_parser.add_argument(
+        "--output",
+        type=str,
+        help="File to save the results to as JSON",
+    )
+    load_parser.add_argument(
+        "--max-latency",
+        type=_parse_latency_limit,
+        action="append",
+        metavar="pXX=MS",
+        help="Fail if a latency percentile exceeds a limit in ms, e.g. p99=250 (repeatable)",
+    )
+    load_parser.add_argument(
+        "--min-rps",
+        type=float,
+        help="Fail if the throughput is below this many requests per second",
+    )
+    load_parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.0,
+        help="Fail if more than this fraction of requests fail (default: 0)",
+    )
+    load_parser.set_defaults(func=run_load_test)
+
+    routes_parser = subparsers.add_parser(
+        "routes", help="Print the compiled route table of the project"
+    )
+    routes_parser.add_argument(
+        "--base-path",
+        type=str,
+        default="",
+        help="Prefix the api with a global basepath (default: None)",
+    )
+    routes_parser.add_argument(
+        "--birch-file",
+        type=str,
+        help="The __birch__.py file or its directory, skips searching for it",
+    )
+    routes_parser.add_argument(
+        "--match",
+        type=str,
+        action="append",
+        metavar="'METHOD PATH'",
+        help="Show the route a request resolves to and the lookup time, e.g. 'GET /user/1'",
+    )
+    routes_parser.add_argument(
+        "--json", action="store_true", help="Print the table and statistics as JSON"
+    )
+    routes_parser.set_defaults(func=list_routes)
+
+    startup_parser = subparsers.add_parser(
+        "startup-profile", help="Report the time spent importing each module"
+    )
+    startup_parser.add_argument(
+        "--statement",
+        type=str,
+        default="from birchrest import BirchRest",
+        help="Statement to profile (default: 'from birchrest import BirchRest')",
+    )
+    startup_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs to take the median of (default: 5)",
+    )
+    startup_parser.add_argument(
+        "--top",
+        type=int,
+        default=15,
+        help="Number of packages and modules to list (default: 15)",
+    )
+    startup_parser.add_argument(
+        "--output",
+        type=str,
+        help="File to save the import times to as JSON",
+    )
+    startup_parser.add_argument(
+        "--budget",
+        type=float,
+        help="Fail if the total import time exceeds this many milliseconds",
+    )
+    startup_parser.set_defaults(func=profile_startup)
     args = parser.parse_args()
 
     if args.command:
@@ -13,6 +13,7 @@ Decorators:
   - `@delete`: Defines a route that handles HTTP DELETE requests.
   - `@options`: Defines a route that handles HTTP OPTIONS requests.
   - `@head`: Defines a route that handles HTTP HEAD requests.
+  - `@websocket`: Defines a route that accepts WebSocket connections.
 
 - **Controller decorator**:
   - `@controller`: Marks a class as a controller, where routes can be organized for better structure and reusability.
@@ -23,6 +24,12 @@ Decorators:
 - **Protected route decorator**:
   - `@protected`: Protects routes or controllers by enforcing authentication and authorization mechanisms.
 
+- **Execution decorators**:
+  - `@cpu_bound`: Executes a CPU-heavy route handler in a worker process instead of on the event loop.
+  - `@coalesce`: Merges identical concurrent requests so the handler runs once and the response is shared.
+  - `@circuit_breaker`: Fails fast with 503 while a route keeps failing, probing it again after a timeout.
+  - `@bulkhead`: Limits the number of concurrent executions of a route and fails fast with 503 beyond it.
+
 - **Request body and query parameter decorators**:
   - `@body`: Validates and injects the body of the request into the handler.
   - `@queries`: Validates and injects query parameters from the URL into the handler.
@@ -66,6 +73,11 @@ from .options import options
 from .head import head
 from .produces import produces
 from .tag import tag
+from .cpu_bound import cpu_bound
+from .websocket import websocket
+from .coalesce import coalesce
+from .circuit_breaker import circuit_breaker
+from .bulkhead import bulkhead
 
 __all__ = [
     "get",
@@ -82,5 +94,10 @@ __all__ = [
     "queries",
     "params",
     "produces",
-    "tag"
+    "tag",
+    "cpu_bound",
+    "websocket",
+    "coalesce",
+    "circuit_breaker",
+    "bulkhead",
 ]
@@ -0,0 +1,18 @@
+from typing import Any, Callable, Optional, TypeVar
+from ..middlewares.bulkhead import Bulkhead
+from .middleware import middleware
+
+T = TypeVar("T", bound=Callable[..., Any])
+
+
+def bulkhead(
+    max_concurrent: int = 10, max_waiting: int = 0, timeout: Optional[float] = None
+) -> Callable[[T], T]:
+    """
+    Decorator to limit the number of concurrent executions of a route (method).
+    Applied to an API class, the limit is shared by all of its routes.
+    """
+
+    return middleware(
+        Bulkhead(max_concurrent=max_concurrent, max_waiting=max_waiting, timeout=timeout)
+    )
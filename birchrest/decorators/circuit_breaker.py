@@ -0,0 +1,25 @@
+from typing import Any, Callable, TypeVar
+from ..middlewares.circuit_breaker import CircuitBreaker
+from .middleware import middleware
+
+T = TypeVar("T", bound=Callable[..., Any])
+
+
+def circuit_breaker(
+    failure_threshold: float = 0.5,
+    window_size: int = 20,
+    min_calls: int = 10,
+    reset_timeout: float = 30.0,
+    half_open_calls: int = 1,
+) -> Callable[[T], T]:
+    """Decorator to protect a route (method) or an API class with a circuit breaker."""
+
+    return middleware(
+        CircuitBreaker(
+            failure_threshold=failure_threshold,
+            window_size=window_size,
+            min_calls=min_calls,
+            reset_timeout=reset_timeout,
+            half_open_calls=half_open_calls,
+        )
+    )
@@ -0,0 +1,15 @@
+from typing import Any, Callable, List, TypeVar
+from ..middlewares.singleflight import Singleflight
+from .middleware import middleware
+
+T = TypeVar("T", bound=Callable[..., Any])
+
+
+def coalesce(headers: List[str] = []) -> Callable[[T], T]:
+    """
+    Decorator to merge identical concurrent requests to a route (method) or an API
+    class into a single handler call. To read the hit and merge counters, register
+    a `Singleflight` instance with `@middleware` instead.
+    """
+
+    return middleware(Singleflight(headers=headers))
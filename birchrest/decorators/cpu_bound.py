@@ -0,0 +1,18 @@
+from typing import Callable, Any, Optional, cast
+from functools import wraps
+from ..types import FuncType
+
+
+def cpu_bound(timeout: Optional[float] = None) -> Callable[[FuncType], FuncType]:
+    """Decorator to execute a route handler in the application's process pool."""
+
+    def decorator(func: FuncType) -> FuncType:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return func(*args, **kwargs)
+
+        setattr(wrapper, "_cpu_bound", {"timeout": timeout})
+
+        return cast(FuncType, wrapper)
+
+    return decorator
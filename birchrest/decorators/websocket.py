@@ -0,0 +1,33 @@
+from typing import Callable, Any, Optional, cast
+from functools import wraps
+from ..types import FuncType
+
+
+def websocket(
+    sub_route: str = "",
+    max_message_size: int = 2**20,
+    ping_interval: Optional[float] = 20.0,
+    max_queue: int = 16,
+) -> Callable[[FuncType], FuncType]:
+    """Decorator to define a WebSocket route inside an API class."""
+
+    def decorator(func: FuncType) -> FuncType:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return func(*args, **kwargs)
+
+        setattr(wrapper, "_http_method", "GET")
+        setattr(wrapper, "_sub_route", sub_route)
+        setattr(
+            wrapper,
+            "_websocket",
+            {
+                "max_message_size": max_message_size,
+                "ping_interval": ping_interval,
+                "max_queue": max_queue,
+            },
+        )
+
+        return cast(FuncType, wrapper)
+
+    return decorator
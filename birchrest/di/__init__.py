@@ -0,0 +1,24 @@
+"""
+This module provides dependency injection for the BirchRest framework.
+
+Components:
+- **Container**: Registers the factories of dependencies and creates them per scope.
+- **Inject**: Marks a handler parameter or controller attribute to inject by key.
+- **ResourcePool**: Lends pooled resources, such as database connections, with health checks.
+
+A container is passed with `BirchRest(container=Container())`. Its singleton and
+worker dependencies are created when the server starts and torn down when it stops,
+and the dependencies of each route handler are resolved when the app is built. A
+`ResourcePool` provided with the worker scope is warmed before the server is ready.
+
+Exported components:
+- `Container`
+- `Inject`
+- `ResourcePool`
+- `SINGLETON`, `WORKER`, `REQUEST`: The scopes of a dependency.
+"""
+
+from .container import Container, Inject, SINGLETON, WORKER, REQUEST
+from .pool import ResourcePool
+
+__all__ = ["Container", "Inject", "ResourcePool", "SINGLETON", "WORKER", "REQUEST"]
@@ -0,0 +1,460 @@
+import asyncio
+import inspect
+import os
+import typing
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from ..exceptions import DependencyError
+from ..http import Request
+from ..utils import Logger
+
+SINGLETON = "singleton"
+WORKER = "worker"
+REQUEST = "request"
+
+# From the longest to the shortest lived. A dependency must live at least as long
+# as what depends on it.
+_SCOPES = (SINGLETON, WORKER, REQUEST)
+
+_MISSING: Any = object()
+_REQUEST: Any = object()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+Plan = Tuple[Tuple[str, Any], ...]
+
+
+class Inject:
+    """
+    Marks a dependency to inject by its key, as the default value of a route handler
+    parameter or a factory parameter, or as a controller attribute. Parameters
+    annotated with a registered type are injected without it.
+
+    ```python
+    class UserController(Controller):
+        settings = Inject(Settings)
+
+        @get(":id")
+        async def get_user(self, req, res, users: UserRepository, db=Inject("db")):
+            ...
+    ```
+
+    A controller attribute can only inject singleton and worker dependencies, and
+    is available once the app has been built.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __get__(self, instance: Any, owner: Any = None) -> Any:
+        if instance is None:
+            return self
+
+        container = getattr(instance, "_container", None)
+        if container is None:
+            raise DependencyError(self.key, "the controller was not built by an app")
+        return container.get(self.key)
+
+
+class _Provider:
+    __slots__ = ("key", "factory", "scope", "plan", "value", "pending")
+
+    def __init__(
+        self, key: Any, factory: Optional[Callable[..., Any]], scope: str
+    ) -> None:
+        self.key = key
+        self.factory = factory
+        self.scope = scope
+        self.plan: Optional[Plan] = None
+        self.value: Any = _MISSING
+        self.pending: Optional["asyncio.Future[Any]"] = None
+
+
+class RequestScope:
+    """The request scoped dependencies created for one request, and their teardowns."""
+
+    __slots__ = ("values", "teardowns")
+
+    def __init__(self) -> None:
+        self.values: Dict[Any, Any] = {}
+        self.teardowns: List[Tuple[Any, Any]] = []
+
+
+_CONTAINERS: "weakref.WeakSet[Container]" = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    for container in list(_CONTAINERS):
+        container._forget(WORKER)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _key_of(factory: Callable[..., Any]) -> Any:
+    """The key a factory provides: its return annotation, or the class itself."""
+    if isinstance(factory, type):
+        return factory
+
+    try:
+        annotation = typing.get_type_hints(factory).get("return")
+    except Exception:  # pylint: disable=broad-exception-caught
+        annotation = None
+
+    if annotation is None:
+        raise DependencyError(
+            getattr(factory, "__qualname__", factory),
+            "the factory has no return annotation, pass the key explicitly",
+        )
+
+    if inspect.isgeneratorfunction(factory) or inspect.isasyncgenfunction(factory):
+        args = typing.get_args(annotation)  # type: ignore[attr-defined,unused-ignore]
+        if args:
+            return args[0]
+    return annotation
+
+
+class Container:
+    """
+    Creates the dependencies of route handlers and controllers and injects them
+    where they are declared, reusing each one for as long as its scope.
+
+    Scopes:
+    - `singleton`: Created once, on startup or first use, and shared by every
+      request. Processes forked afterwards inherit it.
+    - `worker`: Created once per process on startup or first use, and created again
+      in forked processes, for resources such as connection pools that can not be
+      shared between processes.
+    - `request`: Created for each request that needs it, shared by the dependencies
+      of that request, and torn down once its handler has completed.
+
+    A factory is a class, a function, or a coroutine function returning the
+    dependency, or a generator or async generator function yielding it, which runs
+    the code after the `yield` to tear the dependency down on shutdown or at the end
+    of the request. Its parameters are injected the same way as those of a route
+    handler, and a request scoped factory can take the `Request`.
+
+    Which provider supplies each handler parameter is resolved once when the app
+    is built, so injecting a created dependency costs a dictionary lookup.
+    """
+
+    def __init__(self) -> None:
+        self._providers: Dict[Any, _Provider] = {}
+        self._teardowns: List[Tuple[_Provider, Any]] = []
+        _CONTAINERS.add(self)
+
+    def register(
+        self,
+        key: Any,
+        factory: Optional[Callable[..., Any]] = None,
+        scope: str = SINGLETON,
+    ) -> None:
+        """
+        Registers the factory of a dependency.
+
+        :param key: The type or name the dependency is injected by
+        :param factory: Creates the dependency, defaults to the key when it is a class
+        :param scope: `singleton`, `worker` or `request`
+        :raises ValueError: If the scope is unknown
+        """
+        if scope not in _SCOPES:
+            raise ValueError(f"Unknown scope '{scope}', expected one of {_SCOPES}")
+
+        if factory is None:
+            if not callable(key):
+                raise DependencyError(key, "no factory was given")
+            factory = key
+
+        self._providers[key] = _Provider(key, factory, scope)
+
+    def provide(self, key: Any = None, scope: str = SINGLETON) -> Callable[[F], F]:
+        """
+        Decorator registering a factory. The key defaults to its return annotation,
+        or the type it yields for generator factories.
+        """
+
+        def decorator(factory: F) -> F:
+            self.register(_key_of(factory) if key is None else key, factory, scope)
+            return factory
+
+        return decorator
+
+    def instance(self, key: Any, value: Any) -> None:
+        """Registers an already created singleton."""
+        provider = self._providers[key] = _Provider(key, None, SINGLETON)
+        provider.plan = ()
+        provider.value = value
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._providers
+
+    def plan(
+        self,
+        func: Callable[..., Any],
+        skip: int = 2,
+        scope: str = REQUEST,
+        key: Any = None,
+    ) -> Plan:
+        """
+        Resolves the providers of a callable's parameters after the first `skip`
+        positional ones, such as the request and response of a route handler.
+
+        A parameter is injected when its default is `Inject(key)`, or when it is
+        annotated with a registered key or `Request`. Other parameters with a
+        default are left to it.
+
+        :param func: The route handler or factory
+        :param skip: The number of leading positional parameters passed by the caller
+        :param scope: The scope of the callable, which its dependencies must outlive
+        :param key: The key of the factory, reported in errors
+        :return: The parameter names with their providers
+        :raises DependencyError: If a parameter has no provider or a shorter scope
+        """
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            return ()
+
+        try:
+            # The parameters of a class are those of its constructor
+            hints = typing.get_type_hints(
+                getattr(func, "__init__") if isinstance(func, type) else func
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            hints = {}
+
+        plan = []
+        parameters = list(signature.parameters.values())
+        skipped = 0
+
+        for parameter in parameters:
+            if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+                continue
+            if skipped < skip and parameter.kind in (
+                parameter.POSITIONAL_ONLY,
+                parameter.POSITIONAL_OR_KEYWORD,
+            ):
+                skipped += 1
+                continue
+
+            if isinstance(parameter.default, Inject):
+                dependency = parameter.default.key
+            else:
+                dependency = hints.get(parameter.name, _MISSING)
+
+            if dependency is Request:
+                provider = _REQUEST
+                dependency_scope = REQUEST
+            elif dependency in self._providers:
+                provider = self._providers[dependency]
+                dependency_scope = provider.scope
+            elif parameter.default is not parameter.empty:
+                continue
+            else:
+                raise DependencyError(
+                    dependency if dependency is not _MISSING else parameter.name,
+                    f"no provider is registered for parameter '{parameter.name}' of "
+                    f"{getattr(func, '__qualname__', func)}",
+                )
+
+            if _SCOPES.index(dependency_scope) > _SCOPES.index(scope):
+                raise DependencyError(
+                    key if key is not None else dependency,
+                    f"a {scope} dependency can not depend on the {dependency_scope} "
+                    f"scoped '{getattr(dependency, '__qualname__', dependency)}'",
+                )
+
+            plan.append((parameter.name, provider))
+
+        return tuple(plan)
+
+    def validate(self) -> None:
+        """
+        Resolves the parameters of every factory, failing on a missing provider, a
+        dependency with a shorter scope, or a factory depending on itself.
+
+        :raises DependencyError: If a dependency can not be created
+        """
+        for provider in self._providers.values():
+            self._factory_plan(provider)
+
+        def visit(provider: _Provider, path: Sequence[Any]) -> None:
+            if provider.key in path:
+                raise DependencyError(provider.key, "the factory depends on itself")
+            for _, dependency in self._factory_plan(provider):
+                if dependency is not _REQUEST:
+                    visit(dependency, [*path, provider.key])
+
+        for provider in self._providers.values():
+            visit(provider, [])
+
+    def _factory_plan(self, provider: _Provider) -> Plan:
+        if provider.plan is None and provider.factory is not None:
+            provider.plan = self.plan(
+                provider.factory, skip=0, scope=provider.scope, key=provider.key
+            )
+        return provider.plan or ()
+
+    async def startup(self) -> None:
+        """Creates the singleton and worker dependencies in the order registered."""
+        self.validate()
+        for provider in list(self._providers.values()):
+            if provider.scope != REQUEST:
+                await self._create(provider, None, None)
+
+    async def shutdown(self) -> None:
+        """
+        Tears down the singleton and worker dependencies in the reverse order they
+        were created. A failing teardown is logged and does not stop the others.
+        """
+        teardowns, self._teardowns = self._teardowns, []
+        await self._teardown(reversed(teardowns))
+        self._forget(SINGLETON, WORKER)
+
+    def _forget(self, *scopes: str) -> None:
+        for provider in self._providers.values():
+            if provider.scope in scopes and provider.factory is not None:
+                provider.value = _MISSING
+                provider.pending = None
+        self._teardowns = [t for t in self._teardowns if t[0].scope not in scopes]
+
+    def get(self, key: Any) -> Any:
+        """
+        Returns a singleton or worker dependency, creating it if it has not been and
+        its factory and those of its dependencies are synchronous.
+
+        :raises DependencyError: If the dependency is request scoped, not registered,
+            or has to be created asynchronously before startup
+        """
+        provider = self._providers.get(key)
+        if provider is None:
+            raise DependencyError(key, "no provider is registered")
+        if provider.scope == REQUEST:
+            raise DependencyError(key, "request scoped dependencies can not be fetched")
+        if provider.value is _MISSING:
+            self._create_sync(provider)
+        return provider.value
+
+    def _create_sync(self, provider: _Provider) -> None:
+        factory = provider.factory
+        assert factory is not None
+        if inspect.iscoroutinefunction(factory) or inspect.isasyncgenfunction(factory):
+            raise DependencyError(
+                provider.key, "it has an async factory and is created on startup"
+            )
+
+        kwargs = {name: self.get(dep.key) for name, dep in self._factory_plan(provider)}
+        value = factory(**kwargs)
+        if inspect.isgenerator(value):
+            generator, value = value, next(value)
+            self._teardowns.append((provider, generator))
+        provider.value = value
+
+    async def resolve(
+        self, plan: Plan, request: Request, scope: RequestScope
+    ) -> Dict[str, Any]:
+        """
+        Returns the dependencies of a route handler by parameter name. Request scoped
+        dependencies are added to `scope` as they are created, which must be passed
+        to `release` once the handler has completed, including when resolving failed.
+        """
+        kwargs = {}
+        for name, provider in plan:
+            if provider is _REQUEST:
+                kwargs[name] = request
+            elif provider.value is not _MISSING:
+                kwargs[name] = provider.value
+            else:
+                kwargs[name] = await self._create(provider, request, scope)
+        return kwargs
+
+    async def release(self, scope: Optional[RequestScope]) -> None:
+        """Tears down the request scoped dependencies of a request."""
+        if scope is not None and scope.teardowns:
+            await self._teardown(reversed(scope.teardowns))
+
+    async def _create(
+        self,
+        provider: _Provider,
+        request: Optional[Request],
+        scope: Optional[RequestScope],
+    ) -> Any:
+        if provider.scope == REQUEST:
+            if scope is None:
+                raise DependencyError(provider.key, "it is request scoped")
+            if provider.key in scope.values:
+                return scope.values[provider.key]
+        elif provider.value is not _MISSING:
+            return provider.value
+        elif provider.pending is not None:
+            return await asyncio.shield(provider.pending)
+
+        future: Optional["asyncio.Future[Any]"] = None
+        if provider.scope != REQUEST:
+            future = provider.pending = asyncio.get_running_loop().create_future()
+
+        try:
+            kwargs = {}
+            for name, dependency in self._factory_plan(provider):
+                if dependency is _REQUEST:
+                    kwargs[name] = request
+                else:
+                    kwargs[name] = await self._create(dependency, request, scope)
+
+            assert provider.factory is not None
+            value = provider.factory(**kwargs)
+            teardown: Any = None
+            if inspect.isasyncgen(value):
+                teardown, value = value, await value.__anext__()
+            elif inspect.isgenerator(value):
+                teardown, value = value, next(value)
+            elif inspect.isawaitable(value):
+                value = await value
+        except BaseException as e:
+            if future is not None:
+                provider.pending = None
+                future.set_exception(e)
+                future.exception()
+            raise
+
+        if scope is not None and provider.scope == REQUEST:
+            scope.values[provider.key] = value
+            if teardown is not None:
+                scope.teardowns.append((provider, teardown))
+        else:
+            provider.value = value
+            provider.pending = None
+            if teardown is not None:
+                self._teardowns.append((provider, teardown))
+            if future is not None:
+                future.set_result(value)
+
+        return value
+
+    @staticmethod
+    async def _teardown(teardowns: Any) -> None:
+        for provider, generator in teardowns:
+            name = str(getattr(provider.key, "__qualname__", provider.key))
+            try:
+                if inspect.isasyncgen(generator):
+                    await generator.__anext__()
+                else:
+                    next(generator)
+            except (StopIteration, StopAsyncIteration):
+                continue
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                Logger.error(
+                    "Dependency teardown failed",
+                    {
+                        "Dependency": name,
+                        "Exception Type": type(e).__name__,
+                        "Exception Message": str(e),
+                    },
+                )
+                continue
+
+            Logger.warning(f"The factory of {name} yielded more than once")
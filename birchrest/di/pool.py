@@ -0,0 +1,450 @@
+import asyncio
+import collections
+import inspect
+import time
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from contextlib import asynccontextmanager
+
+from ..exceptions import PoolTimeout
+from ..utils import Logger
+
+if TYPE_CHECKING:
+    from ..metrics import MetricsRegistry, Histogram
+
+T = TypeVar("T")
+
+MaybeAwaitable = Union[Awaitable[Any], Any]
+
+
+async def _call(func: Callable[..., MaybeAwaitable], *args: Any) -> Any:
+    result = func(*args)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class ResourcePool(Generic[T]):
+    """
+    Keeps between `min_size` and `max_size` resources, such as database connections,
+    and lends them to one caller at a time.
+
+    Idle resources are reused most recently released first, so the ones that are
+    not needed stay idle and are closed after `max_idle` seconds, down to `min_size`.
+    When every resource is in use, callers wait in the order they arrived and get
+    the next released resource, or `PoolTimeout` after `acquire_timeout` seconds. A
+    background task checks the idle resources every `health_check_interval` seconds
+    with `check`, replacing the ones that fail, and keeps `min_size` resources open.
+
+    ```python
+    pool = ResourcePool(connect, close=lambda conn: conn.close(), min_size=2)
+    app.on_startup(pool.start)
+    app.on_shutdown(pool.close)
+
+    async with pool.acquire() as conn:
+        ...
+    ```
+
+    Attributes:
+        name (str): The name of the pool in logs and metrics.
+        min_size (int): The number of resources kept open, created on `start`.
+        max_size (int): The maximum number of resources open at once.
+        acquire_timeout (float): Seconds to wait for a resource.
+        max_idle (float): Seconds an idle resource above `min_size` is kept.
+        health_check_interval (float): Seconds between checks of the idle resources.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[], MaybeAwaitable],
+        close: Optional[Callable[[T], MaybeAwaitable]] = None,
+        check: Optional[Callable[[T], MaybeAwaitable]] = None,
+        min_size: int = 0,
+        max_size: int = 10,
+        acquire_timeout: float = 10.0,
+        max_idle: float = 300.0,
+        health_check_interval: float = 30.0,
+        name: str = "pool",
+    ) -> None:
+        """
+        :param create: Creates a resource, sync or async.
+        :param close: Closes a resource, sync or async.
+        :param check: Returns whether an idle resource is still usable, sync or async.
+            Raising counts as unusable.
+        :param min_size: The number of resources kept open.
+        :param max_size: The maximum number of resources open at once.
+        :param acquire_timeout: Seconds to wait for a resource.
+        :param max_idle: Seconds an idle resource above `min_size` is kept.
+        :param health_check_interval: Seconds between checks of the idle resources.
+        :param name: The name of the pool in logs and metrics.
+        :raises ValueError: If the sizes are invalid.
+        """
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError("Expected 0 <= min_size <= max_size and max_size >= 1")
+
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self._create = create
+        self._close = close
+        self._check = check
+        self._idle: List[Tuple[T, float]] = []
+        self._waiters: Deque["asyncio.Future[T]"] = collections.deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._wait_histogram: Optional["Histogram"] = None
+        self._counters: Dict[str, float] = {
+            "acquired": 0,
+            "waited": 0,
+            "timeouts": 0,
+            "created": 0,
+            "closed": 0,
+            "failed_checks": 0,
+            "wait_seconds": 0.0,
+        }
+
+    @property
+    def size(self) -> int:
+        """The number of open resources, including those being created."""
+        return self._size
+
+    async def start(self) -> None:
+        """
+        Opens `min_size` resources and starts the health checks. Registered as a
+        startup hook, the app reports ready only once the pool is warm.
+        """
+        self._closed = False
+        await self._fill()
+
+        if self._task is None and self.health_check_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._maintain())
+
+    async def close(self) -> None:
+        """
+        Stops the health checks and closes the idle resources. Resources still in use
+        are closed when released, and waiting callers fail with `PoolTimeout`.
+        """
+        self._closed = True
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolTimeout(self.name, 0))
+
+        idle, self._idle = self._idle, []
+        for resource, _ in idle:
+            await self._discard(resource)
+
+    async def __aenter__(self) -> "ResourcePool[T]":
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[T]:
+        """
+        Lends a resource for the duration of the `async with` block. A resource whose
+        block was cancelled is closed rather than reused, as it may have been left in
+        the middle of an operation.
+
+        :raises PoolTimeout: If no resource became available in time.
+        """
+        resource = await self.get()
+        try:
+            yield resource
+        except (asyncio.CancelledError, KeyboardInterrupt, SystemExit):
+            await self.release(resource, discard=True)
+            raise
+        except BaseException:
+            await self.release(resource)
+            raise
+        await self.release(resource)
+
+    async def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Takes a resource, which must be given back with `release`.
+
+        :param timeout: Seconds to wait, defaults to `acquire_timeout`.
+        :raises PoolTimeout: If no resource became available in time.
+        :raises RuntimeError: If the pool is closed.
+        """
+        if self._closed:
+            raise RuntimeError(f"The {self.name} pool is closed")
+
+        self._counters["acquired"] += 1
+
+        if self._idle and not self._waiters:
+            resource, _ = self._idle.pop()
+            self._in_use += 1
+            self._observe_wait(0.0)
+            return resource
+
+        if self._size < self.max_size and not self._waiters:
+            self._size += 1
+            try:
+                resource = await self._new()
+            except BaseException:
+                self._size -= 1
+                raise
+            self._in_use += 1
+            self._observe_wait(0.0)
+            return resource
+
+        return await self._wait(self.acquire_timeout if timeout is None else timeout)
+
+    async def _wait(self, timeout: float) -> T:
+        loop = asyncio.get_running_loop()
+        waiter: "asyncio.Future[T]" = loop.create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        expiry = loop.call_later(timeout, self._expire, waiter, timeout)
+        self._counters["waited"] += 1
+
+        try:
+            resource = await waiter
+        except asyncio.CancelledError:
+            # Handed a resource just as the caller was cancelled
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._in_use += 1
+                await self.release(waiter.result())
+            raise
+        finally:
+            expiry.cancel()
+            if not waiter.done() or waiter.cancelled():
+                self._remove_waiter(waiter)
+
+        self._in_use += 1
+        self._observe_wait(time.perf_counter() - started)
+        return resource
+
+    def _expire(self, waiter: "asyncio.Future[T]", timeout: float) -> None:
+        if not waiter.done():
+            self._remove_waiter(waiter)
+            self._counters["timeouts"] += 1
+            waiter.set_exception(PoolTimeout(self.name, timeout))
+
+    def _remove_waiter(self, waiter: "asyncio.Future[T]") -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    async def release(self, resource: T, discard: bool = False) -> None:
+        """
+        Gives back a resource taken with `get`, handing it to the longest waiting
+        caller if there is one.
+
+        :param resource: The resource to give back.
+        :param discard: Close the resource instead of reusing it.
+        """
+        self._in_use -= 1
+
+        if discard or self._closed:
+            await self._discard(resource)
+            if not self._closed:
+                await self._replace()
+            return
+
+        self._put(resource)
+
+    def _put(self, resource: T) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(resource)
+                return
+
+        self._idle.append((resource, time.monotonic()))
+
+    async def _new(self) -> T:
+        resource: T = await _call(self._create)
+        self._counters["created"] += 1
+        return resource
+
+    async def _discard(self, resource: T) -> None:
+        self._size -= 1
+        self._counters["closed"] += 1
+
+        if self._close is None:
+            return
+        try:
+            await _call(self._close, resource)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            Logger.warning(f"Closing a resource of the {self.name} pool failed: {e}")
+
+    async def _replace(self) -> None:
+        """Opens a resource for the waiting callers or to keep `min_size` open."""
+        while not self._closed and self._size < self.max_size and (
+            self._size < self.min_size
+            or any(not waiter.done() for waiter in self._waiters)
+        ):
+            self._size += 1
+            try:
+                resource = await self._new()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self._size -= 1
+                Logger.warning(f"Opening a resource of the {self.name} pool failed: {e}")
+                return
+            self._put(resource)
+
+    async def _fill(self) -> None:
+        missing = self.min_size - self._size
+        if missing <= 0:
+            return
+
+        self._size += missing
+        results = await asyncio.gather(
+            *(self._new() for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                self._size -= 1
+                Logger.warning(
+                    f"Opening a resource of the {self.name} pool failed: {result}"
+                )
+            else:
+                self._put(result)
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                Logger.warning(f"Health check of the {self.name} pool failed: {e}")
+
+    async def check(self) -> None:
+        """
+        Closes the resources idle for longer than `max_idle` above `min_size`, checks
+        the remaining idle resources and replaces the ones that fail. Run periodically
+        by the pool once started.
+        """
+        now = time.monotonic()
+        unchecked, self._idle = collections.deque(self._idle), []
+
+        try:
+            # Most recently released last, so the longest idle resources are closed first
+            while unchecked:
+                resource, released = unchecked[0]
+                if now - released > self.max_idle and self._size > self.min_size:
+                    unchecked.popleft()
+                    await self._discard(resource)
+                    continue
+
+                if self._check is not None and not await self._is_healthy(resource):
+                    unchecked.popleft()
+                    self._counters["failed_checks"] += 1
+                    await self._discard(resource)
+                    continue
+
+                unchecked.popleft()
+                self._put(resource)
+        finally:
+            # Cancelled part way, for example by `close`, so the resources not checked
+            # yet are given back instead of being lost while still counted in the size
+            while unchecked:
+                resource, released = unchecked.pop()
+                if self._waiters and not self._closed:
+                    self._put(resource)
+                else:
+                    self._idle.insert(0, (resource, released))
+
+        await self._replace()
+
+    async def _is_healthy(self, resource: T) -> bool:
+        assert self._check is not None
+        self._in_use += 1
+        try:
+            return bool(await _call(self._check, resource))
+        except Exception:  # pylint: disable=broad-exception-caught
+            return False
+        finally:
+            self._in_use -= 1
+
+    def _observe_wait(self, seconds: float) -> None:
+        self._counters["wait_seconds"] += seconds
+        if self._wait_histogram is not None:
+            self._wait_histogram.labels(self.name).observe(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the current size, idle, in use and waiting counts, the utilization
+        as the share of `max_size` in use, and the totals since the pool was created.
+        """
+        return {
+            "name": self.name,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "waiting": sum(1 for waiter in self._waiters if not waiter.done()),
+            "max_size": self.max_size,
+            "utilization": self._in_use / self.max_size,
+            **self._counters,
+        }
+
+    def register_metrics(self, registry: "MetricsRegistry") -> None:
+        """
+        Exposes the pool in a metrics registry, such as `app.metrics`, labelled with
+        its name: the open, idle, in use and waiting counts, the timeouts, and a
+        histogram of the time callers waited for a resource.
+        """
+        gauges = {
+            "birchrest_pool_size": ("Open resources", lambda: self._size),
+            "birchrest_pool_idle": ("Idle resources", lambda: len(self._idle)),
+            "birchrest_pool_in_use": ("Resources in use", lambda: self._in_use),
+            "birchrest_pool_waiting": (
+                "Callers waiting for a resource",
+                lambda: self.stats()["waiting"],
+            ),
+            "birchrest_pool_timeouts": (
+                "Acquires that timed out",
+                lambda: self._counters["timeouts"],
+            ),
+        }
+
+        for name, (description, function) in gauges.items():
+            gauge = registry.get(name) or registry.gauge(name, description, ["pool"])
+            gauge.labels(self.name).set_function(function)
+
+        histogram = registry.get("birchrest_pool_wait_seconds") or registry.histogram(
+            "birchrest_pool_wait_seconds",
+            "Seconds callers waited for a resource",
+            ["pool"],
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0),
+        )
+        self._wait_histogram = histogram  # type: ignore[assignment]
@@ -4,6 +4,8 @@ This module defines custom exceptions used throughout the BirchRest framework.
 Exceptions:
 - **InvalidControllerRegistration**: Raised when a controller that does not inherit from the `Controller` base class is registered.
 - **MissingAuthHandlerError**: Raised when an authentication handler is required but has not been provided.
+- **DependencyError**: Raised when a dependency of a route handler or controller can not be injected.
+- **PoolTimeout**: Raised when a resource pool has no resource available within its acquire timeout.
 - **ApiError**: Represents errors related to API requests, such as 404 Not Found or 500 Internal Server Error, with customizable status codes and messages.
 
 These exceptions are used to manage error handling and enforce proper application behavior.
@@ -11,17 +13,22 @@ These exceptions are used to manage error handling and enforce proper applicatio
 Exported exceptions:
 - `InvalidControllerRegistration`
 - `MissingAuthHandlerError`
+- `DependencyError`
+- `PoolTimeout`
 - `ApiError`
 """
 
 from .invalid_controller_registration import InvalidControllerRegistration
 from .missing_auth_handler_error import MissingAuthHandlerError
 from .invalid_validation_model import InvalidValidationModel
+from .dependency_error import DependencyError
+from .pool_timeout import PoolTimeout
 from .api_error import (
     ApiError,
     NotFound,
     BadRequest,
     ServiceUnavailable,
+    GatewayTimeout,
     InternalServerError,
     MethodNotAllowed,
     Forbidden,
@@ -43,10 +50,13 @@ __all__ = [
     "InvalidControllerRegistration",
     "MissingAuthHandlerError",
     "InvalidValidationModel",
+    "DependencyError",
+    "PoolTimeout",
     "ApiError",
     "NotFound",
     "BadRequest",
     "ServiceUnavailable",
+    "GatewayTimeout",
     "InternalServerError",
     "MethodNotAllowed",
     "Forbidden",
@@ -123,6 +123,15 @@ class ServiceUnavailable(ApiError):
         super().__init__(user_message, 503)
 
 
+class GatewayTimeout(ApiError):
+    """
+    Represents a 504 Gateway Timeout error.
+    """
+
+    def __init__(self, user_message: str = ""):
+        super().__init__(user_message, 504)
+
+
 class MethodNotAllowed(ApiError):
     """
     Represents a 405 Method Not Allowed error.
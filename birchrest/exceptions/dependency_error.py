@@ -0,0 +1,14 @@
+from typing import Any
+
+
+class DependencyError(Exception):
+    """
+    Exception raised when a dependency can not be injected: it was never registered
+    with the container, depends on a dependency with a shorter scope, or its factory
+    depends on itself.
+    """
+
+    def __init__(self, key: Any, reason: str):
+        self.key = key
+        identifier = getattr(key, "__qualname__", key)
+        super().__init__(f"Can not inject '{identifier}': {reason}")
@@ -0,0 +1,14 @@
+from .api_error import ServiceUnavailable
+
+
+class PoolTimeout(ServiceUnavailable):
+    """
+    Exception raised when no resource of a `ResourcePool` became available within its
+    acquire timeout. When not handled, it is sent as a 503 Service Unavailable, so a
+    saturated pool sheds load instead of queueing requests indefinitely.
+    """
+
+    def __init__(self, pool: str, timeout: float):
+        self.pool = pool
+        self.timeout = timeout
+        super().__init__("The service is busy, try again later")
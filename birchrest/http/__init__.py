@@ -6,17 +6,45 @@ Components:
 - **Response**: Represents an outgoing HTTP response, used to send data back to the client.
 - **HttpStatus**: A collection of HTTP status codes for setting response statuses.
 - **Server**: A simple HTTP server that handles incoming requests, processes them, and sends back responses.
+- **ProtocolServer**: An alternative server built on `asyncio.Protocol` with an incremental parser and keep-alive connections.
+- **Broadcaster**: An in-process hub fanning Server-Sent Events out to subscribed connections.
+- **ServerSentEvent**: A single event sent with `Response.sse`.
+- **WebSocket**: A WebSocket connection passed to `@websocket` route handlers.
+- **ConnectionClosed**: Raised when using a WebSocket that has been closed.
+- **Timings**: Durations of the stages of handling a request.
+- **event_loop**: Selects the event loop implementation (asyncio or uvloop) used to run the server.
 
 Exported components:
 - `Request`
 - `Response`
 - `HttpStatus`
 - `Server`
+- `ProtocolServer`
+- `Broadcaster`
+- `ServerSentEvent`
+- `WebSocket`
+- `ConnectionClosed`
+- `Timings`
 """
 
 from .request import Request
 from .response import Response
 from .status import HttpStatus
 from .server import Server
+from .protocol_server import ProtocolServer
+from .sse import Broadcaster, ServerSentEvent
+from .websocket import WebSocket, ConnectionClosed
+from .timing import Timings
 
-__all__ = ["Request", "Response", "HttpStatus", "Server"]
+__all__ = [
+    "Request",
+    "Response",
+    "HttpStatus",
+    "Server",
+    "ProtocolServer",
+    "Broadcaster",
+    "ServerSentEvent",
+    "WebSocket",
+    "ConnectionClosed",
+    "Timings",
+]
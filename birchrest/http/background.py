@@ -0,0 +1,136 @@
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..utils import Logger, to_async
+from ..utils.executor import ExecutorFactory
+
+if TYPE_CHECKING:
+    from .response import Response
+
+BackgroundTask = Tuple[Any, Tuple[Any, ...], Dict[str, Any]]
+
+
+class Cleanup:
+    """
+    A background entry releasing what the tasks added before it use, such as the
+    request scoped dependencies of the handler. It runs after those tasks, and also
+    when they are dropped or cancelled.
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Awaitable[Any]]) -> None:
+        self.func = func
+
+    async def run(self) -> None:
+        try:
+            await self.func()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            Logger.error(
+                "Background cleanup failed",
+                {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+            )
+
+
+def discard(tasks: List[BackgroundTask]) -> None:
+    """
+    Closes the coroutines of tasks that will not run, so they are not reported, and
+    starts their cleanups.
+    """
+    for task, _, _ in tasks:
+        if inspect.iscoroutine(task):
+            task.close()
+        elif isinstance(task, Cleanup):
+            asyncio.ensure_future(task.run())
+
+
+class BackgroundTasks:
+    """
+    Runs the tasks a handler scheduled with `res.background` once its response has
+    been sent, on the server's event loop, and keeps track of them so a shutdown can
+    let them finish.
+
+    The tasks of one response run one after the other in the order they were added.
+    A failing task is logged and does not prevent the following ones from running.
+
+    Attributes:
+        executor (ExecutorFactory): Returns the executor synchronous tasks run in.
+    """
+
+    def __init__(self, executor: Optional[ExecutorFactory] = None) -> None:
+        """
+        :param executor: Returns the executor synchronous tasks run in, defaults to
+            the event loop's default executor.
+        """
+        self.executor: ExecutorFactory = executor or (lambda: None)
+        self._running: Set["asyncio.Task[None]"] = set()
+
+    def __len__(self) -> int:
+        """The number of responses whose background tasks are still running."""
+        return len(self._running)
+
+    def run(self, response: "Response") -> Optional["asyncio.Task[None]"]:
+        """
+        Starts the background tasks of a response that has been sent.
+
+        :param response: The sent response
+        :return: The task running them, or None if the response has none
+        """
+        tasks = response.background_tasks
+        if not tasks:
+            return None
+
+        response.background_tasks = None
+        task = asyncio.get_running_loop().create_task(self._run(tasks))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return task
+
+    def drop(self, response: "Response") -> None:
+        """Drops the background tasks of a response that will not be sent."""
+        if response.background_tasks:
+            discard(response.background_tasks)
+            response.background_tasks = None
+
+    async def _run(self, tasks: List[BackgroundTask]) -> None:
+        for index, (task, args, kwargs) in enumerate(tasks):
+            try:
+                if isinstance(task, Cleanup):
+                    await task.run()
+                elif inspect.isawaitable(task):
+                    await task
+                else:
+                    await to_async(task, self.executor)(*args, **kwargs)
+            except asyncio.CancelledError:
+                discard(tasks[index + 1 :])
+                raise
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                Logger.error(
+                    "Background task failed",
+                    {
+                        "Task": getattr(task, "__qualname__", repr(task)),
+                        "Exception Type": type(e).__name__,
+                        "Exception Message": str(e),
+                    },
+                )
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Waits for the running background tasks to finish and cancels the ones still
+        running after `timeout` seconds.
+
+        :param timeout: Seconds to wait for the tasks.
+        """
+        if not self._running:
+            return
+
+        Logger.info(f"Waiting for {len(self._running)} background task(s) to finish")
+        _, pending = await asyncio.wait(set(self._running), timeout=max(timeout, 0))
+
+        if pending:
+            Logger.warning(f"Cancelling {len(pending)} background task(s)")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
@@ -0,0 +1,84 @@
+"""
+This module selects the event loop implementation used to run the server.
+
+- **auto**: Uses uvloop when it is installed, otherwise the default asyncio loop.
+- **asyncio**: Always uses the default asyncio loop.
+- **uvloop**: Requires uvloop and fails if it is not installed.
+"""
+
+import asyncio
+import sys
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+LOOPS = ("auto", "asyncio", "uvloop")
+
+
+def get_loop_factory(loop: str = "auto") -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """
+    Returns a factory creating the requested event loop, or None for the default
+    asyncio loop.
+
+    :param loop: One of "auto", "asyncio" or "uvloop".
+    :raises ValueError: If the loop name is unknown.
+    :raises RuntimeError: If "uvloop" was requested but is not installed.
+    """
+    if loop not in LOOPS:
+        raise ValueError(f"Unknown event loop '{loop}', expected one of {', '.join(LOOPS)}")
+
+    if loop == "asyncio":
+        return None
+
+    try:
+        import uvloop  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        if loop == "uvloop":
+            raise RuntimeError(
+                "uvloop was requested but is not installed, install it with 'pip install uvloop'"
+            ) from e
+        return None
+
+    factory: Callable[[], asyncio.AbstractEventLoop] = uvloop.new_event_loop
+    return factory
+
+
+def run(main: Coroutine[Any, Any, T], loop: str = "auto") -> T:
+    """
+    Runs a coroutine to completion on a new event loop of the requested kind.
+
+    :param main: The coroutine to run.
+    :param loop: One of "auto", "asyncio" or "uvloop".
+    :return: The result of the coroutine.
+    """
+    factory = get_loop_factory(loop)
+
+    if factory is None:
+        return asyncio.run(main)
+
+    if sys.version_info >= (3, 12):
+        return asyncio.run(main, loop_factory=factory)
+
+    previous = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(_FactoryPolicy(factory))
+    try:
+        return asyncio.run(main)
+    finally:
+        asyncio.set_event_loop_policy(previous)
+
+
+def loop_name() -> str:
+    """Returns the module name of the running event loop, e.g. 'asyncio' or 'uvloop'."""
+    running: Any = asyncio.get_running_loop()
+    return str(type(running).__module__).split(".", maxsplit=1)[0]
+
+
+class _FactoryPolicy(asyncio.DefaultEventLoopPolicy):
+    """An event loop policy creating loops from a factory, for Python < 3.12."""
+
+    def __init__(self, factory: Callable[[], asyncio.AbstractEventLoop]) -> None:
+        super().__init__()
+        self._factory = factory
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        return self._factory()
@@ -0,0 +1,138 @@
+from typing import Dict, NamedTuple, Optional
+
+
+class HttpParserError(Exception):
+    """Raised when the incoming bytes are not a valid HTTP/1.1 request."""
+
+
+class ParsedRequest(NamedTuple):
+    """The parts of an HTTP request needed to construct a `Request`."""
+
+    method: str
+    path: str
+    version: str
+    headers: Dict[str, str]
+    body: str
+    keep_alive: bool
+
+
+class HttpParser:
+    """
+    An incremental HTTP/1.1 request parser.
+
+    Bytes are fed to the parser as they arrive from the transport and complete
+    requests are taken out with `next_request`. The request head is parsed once it
+    has fully arrived, after which the parser waits for `Content-Length` bytes of
+    body. Pipelined requests remain in the buffer until they are taken out.
+
+    Attributes:
+        max_header_size (int): The maximum size in bytes of the request line and headers.
+    """
+
+    def __init__(self, max_header_size: int = 65536) -> None:
+        self.max_header_size = max_header_size
+        self._buffer = bytearray()
+        self._head: Optional[ParsedRequest] = None
+        self._body_length = 0
+
+    @property
+    def buffered(self) -> int:
+        """The number of received bytes that have not been parsed into a request yet."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> None:
+        """
+        Appends data received from the client to the parse buffer.
+
+        :param data: The received bytes.
+        """
+        self._buffer += data
+
+    def take_buffer(self) -> bytes:
+        """
+        Removes and returns the bytes buffered after the last request, used when the
+        connection switches to another protocol.
+        """
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+    def next_request(self) -> Optional[ParsedRequest]:
+        """
+        Returns the next complete request, or None if more data is needed.
+
+        :raises HttpParserError: If the buffered data is not a valid request.
+        """
+        if self._head is None and not self._parse_head():
+            return None
+
+        if len(self._buffer) < self._body_length:
+            return None
+
+        assert self._head is not None
+        head, raw = self._head, bytes(self._buffer[: self._body_length])
+        del self._buffer[: self._body_length]
+        self._head = None
+        self._body_length = 0
+
+        try:
+            body = raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise HttpParserError("Request body is not valid UTF-8") from e
+
+        request = head._replace(body=body)
+
+        return request
+
+    def _parse_head(self) -> bool:
+        while self._buffer.startswith(b"\r\n"):
+            del self._buffer[:2]
+
+        end = self._buffer.find(b"\r\n\r\n")
+
+        if end < 0:
+            if len(self._buffer) > self.max_header_size:
+                raise HttpParserError("Request headers are too large")
+            return False
+
+        lines = self._buffer[:end].decode("latin-1").split("\r\n")
+        del self._buffer[: end + 4]
+
+        request_line = lines[0].split()
+        if len(request_line) != 3 or not request_line[2].startswith("HTTP/"):
+            raise HttpParserError("Malformed request line")
+
+        method, path, version = request_line
+
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if not separator:
+                raise HttpParserError("Malformed header line")
+            headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise HttpParserError("Chunked request bodies are not supported")
+
+        try:
+            self._body_length = int(headers.get("content-length", "0"))
+        except ValueError as e:
+            raise HttpParserError("Invalid Content-Length header") from e
+
+        if self._body_length < 0:
+            raise HttpParserError("Invalid Content-Length header")
+
+        self._head = ParsedRequest(
+            method, path, version, headers, "", _keep_alive(version, headers)
+        )
+
+        return True
+
+
+def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+
+    return connection != "close"
@@ -0,0 +1,280 @@
+from json import JSONDecodeError
+from typing import Any, Optional, Tuple
+import asyncio
+from time import perf_counter_ns
+
+from .parser import HttpParser, HttpParserError, ParsedRequest
+from .request import Request
+from .response import Response
+from .server import Server
+from .timing import Timings
+from ..utils import Logger
+
+
+class HttpProtocol(asyncio.Protocol):
+    """
+    Handles a single client connection for the `ProtocolServer`.
+
+    Data from `data_received` is fed straight into an incremental parser and each
+    complete request is passed to the request handler. Connections are kept alive
+    between requests unless the client asks to close them or the server is draining.
+    Responses are written with `transport.writelines`, and the handler waits for the
+    transport to drain when the client reads slower than it is written to. After a
+    WebSocket handshake, received data is passed to the WebSocket instead.
+    """
+
+    def __init__(self, server: "ProtocolServer") -> None:
+        self.server = server
+        self.parser = HttpParser()
+        self.transport: Optional[asyncio.Transport] = None
+        self.peer: Tuple[str, Optional[int]] = ("", None)
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+        self._reading_paused = False
+        self._websocket_reader: Optional[asyncio.StreamReader] = None
+        self._idle_timer: Optional[asyncio.TimerHandle] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+
+        peername = transport.get_extra_info("peername")
+        if isinstance(peername, tuple):
+            self.peer = (peername[0], peername[1])
+
+        self.server._configure_socket(transport)
+        self.server._connections[self] = False
+        self._start_idle_timer()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._cancel_idle_timer()
+        self.server._release(self)
+        self._can_write.set()
+
+        if self._websocket_reader is not None:
+            self._websocket_reader.feed_eof()
+
+    def pause_writing(self) -> None:
+        self._can_write.clear()
+
+    def resume_writing(self) -> None:
+        self._can_write.set()
+
+    def close(self) -> None:
+        """Closes the connection."""
+        if self.transport is not None:
+            self.transport.close()
+
+    def data_received(self, data: bytes) -> None:
+        if self._websocket_reader is not None:
+            self._websocket_reader.feed_data(data)
+            return
+
+        self._cancel_idle_timer()
+        self.parser.feed(data)
+
+        if self._task is None:
+            self._process_next()
+        elif self.parser.buffered > self.parser.max_header_size and self.transport:
+            self.transport.pause_reading()
+            self._reading_paused = True
+
+    def _process_next(self) -> None:
+        try:
+            parsed = self.parser.next_request()
+        except HttpParserError as e:
+            Logger.warning(f"Failed to parse request: {e}")
+            self._send_error(400, {"error": "Malformed request"})
+            return
+
+        if parsed is None:
+            return
+
+        request = self._build_request(parsed)
+        if request is None:
+            return
+
+        self.server._mark_busy(self)
+        self._task = asyncio.get_running_loop().create_task(
+            self._respond(request, parsed.keep_alive)
+        )
+        self.server._tasks[self] = self._task
+
+    def _build_request(self, parsed: ParsedRequest) -> Optional[Request]:
+        try:
+            started = perf_counter_ns() if self.server.timing else 0
+            request = Request(
+                parsed.method,
+                parsed.path,
+                parsed.version,
+                parsed.headers,
+                parsed.body,
+                self.peer[0],
+                self.peer[1],
+            )
+            if self.server.timing:
+                request.timings = Timings(started)
+                request.timings.stages["parse"] = perf_counter_ns() - started
+            return request
+        except JSONDecodeError:
+            Logger.warning("Failed to parse request as JSON")
+            self._send_error(
+                400, {"error": "Failed to parse request, likely invalid JSON format"}
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            self._send_error(400, {"error": "Malformed request"})
+
+        return None
+
+    async def _respond(self, request: Request, keep_alive: bool) -> None:
+        res: Optional[Response] = None
+        try:
+            res = await self.server.request_handler(request)
+            keep_alive = (
+                keep_alive
+                and res._is_sent
+                and res.stream is None
+                and res.websocket is None
+                and self.server.ready
+            )
+
+            if res.websocket is not None:
+                await self._run_websocket(res)
+            elif res.stream is not None:
+                await self._write_stream(res)
+            elif res._is_sent:
+                await self._write(res, keep_alive)
+
+            self.server.background.run(res)
+        except asyncio.CancelledError:
+            keep_alive = False
+            raise
+        except Exception:  # pylint: disable=broad-exception-caught
+            keep_alive = False
+            error = Response().status(500).send({"error": "Internal server error"})
+            await self._write(error, keep_alive)
+        finally:
+            if res is not None:
+                self.server.background.drop(res)
+            self._task = None
+            self.server._tasks.pop(self, None)
+            self.server._mark_idle(self)
+
+            if not keep_alive:
+                self.close()
+
+        if not keep_alive:
+            return
+
+        if self._reading_paused and self.transport is not None:
+            self._reading_paused = False
+            self.transport.resume_reading()
+
+        self._process_next()
+        if self._task is None and not self.parser.buffered:
+            self._start_idle_timer()
+
+    def _start_idle_timer(self) -> None:
+        """Closes the connection if no request arrives within the keep-alive timeout."""
+        timeout = self.server.keep_alive_timeout
+        if timeout > 0 and self._idle_timer is None:
+            self._idle_timer = asyncio.get_running_loop().call_later(
+                timeout, self._close_idle
+            )
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _close_idle(self) -> None:
+        self._idle_timer = None
+        if self._task is None:
+            Logger.debug(f"Closing connection from {self.peer[0]} idle for too long")
+            self.close()
+
+    async def _write(self, res: Response, keep_alive: bool) -> None:
+        if self.transport is None or self.transport.is_closing():
+            return
+
+        if not keep_alive:
+            res.set_header("Connection", "close")
+
+        self.transport.writelines(
+            (res.head().encode("latin-1"), res.json.encode("utf-8"))
+        )
+        await self._can_write.wait()
+
+    async def _write_bytes(self, data: bytes) -> None:
+        if self.transport is None or self.transport.is_closing():
+            raise ConnectionResetError("Connection lost")
+
+        self.transport.write(data)
+        await self._can_write.wait()
+
+    async def _write_stream(self, res: Response) -> None:
+        assert res.stream is not None
+
+        res.set_header("Connection", "close")
+        try:
+            await self._write_bytes(res.head().encode("latin-1"))
+        except ConnectionError:
+            return
+
+        await res.stream.run(self._write_bytes, self.server._stopping)
+
+    async def _run_websocket(self, res: Response) -> None:
+        assert res.websocket is not None
+
+        try:
+            await self._write_bytes(res.head().encode("latin-1"))
+        except ConnectionError:
+            return
+
+        assert self.transport is not None
+        reader = asyncio.StreamReader()
+        reader.set_transport(self.transport)
+        reader.feed_data(self.parser.take_buffer())
+        self._websocket_reader = reader
+
+        if self._reading_paused:
+            self._reading_paused = False
+            self.transport.resume_reading()
+
+        async def read() -> bytes:
+            return await reader.read(65536)
+
+        await res.websocket.run(read, self._write_bytes, self.server._stopping)
+
+    def _send_error(self, status: int, body: Any) -> None:
+        if self.transport is None or self.transport.is_closing():
+            return
+
+        res = Response().status(status).send(body).set_header("Connection", "close")
+        self.transport.writelines(
+            (res.head().encode("latin-1"), res.json.encode("utf-8"))
+        )
+        self.close()
+
+
+class ProtocolServer(Server):
+    """
+    An HTTP server built directly on `asyncio.Protocol` instead of asyncio streams.
+
+    Each connection is handled by an `HttpProtocol` that parses requests
+    incrementally as data arrives and writes responses straight to the transport,
+    avoiding the buffering layers and per-read coroutines of the streams API.
+    Connections are kept alive between requests and pipelined requests are
+    answered in order. Configuration, readiness and graceful draining behave
+    exactly as for `Server`.
+    """
+
+    async def _create_server(self) -> asyncio.AbstractServer:
+        """
+        Creates the listening server with an `HttpProtocol` per connection.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.create_server(
+            lambda: HttpProtocol(self), self.host, self.port, backlog=self.backlog
+        )
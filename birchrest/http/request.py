@@ -1,9 +1,14 @@
-from typing import Dict, Optional, List, Any
+from typing import TYPE_CHECKING, Dict, Optional, List, Any
 from urllib.parse import urlparse, parse_qs
 import json
 import uuid
 from dataclasses import asdict, is_dataclass
 from datetime import datetime
+from .timing import Timings
+from .trace_context import TraceContext, parse_traceparent
+
+if TYPE_CHECKING:
+    from ..tracing import Trace
 
 
 class Request:
@@ -14,7 +19,8 @@ class Request:
     This class is responsible for parsing raw HTTP request data and extracting
     useful information such as headers, query parameters, path parameters, and
     the request body. It also generates a unique correlation ID for tracking
-    the request across systems.
+    the request across systems, which is the trace ID of an incoming W3C
+    `traceparent` header when one is present.
 
     Attributes:
         method (str): The HTTP method (e.g., GET, POST).
@@ -29,6 +35,12 @@ class Request:
         queries (Dict[str, str]): Query parameters parsed from the URL.
         clean_path (str): The URL path without query parameters.
         received (datetime): Timestamp of when the request was created.
+        app (Optional[Any]): The application handling the request, set by the app.
+        route (Optional[str]): The path template of the matched route, set by the app.
+        timings (Optional[Timings]): Stage durations, recorded when timing is enabled.
+        trace_context (Optional[TraceContext]): The trace context of the caller, parsed
+            from the `traceparent` header.
+        trace (Optional[Trace]): The spans of the request, when it is sampled by the tracer.
     """
 
     def __init__(
@@ -63,10 +75,20 @@ class Request:
         self.client_address: str = client_address
         self.client_port: Optional[int] = client_port
         self.params: Any = {}
-        self.correlation_id: str = str(uuid.uuid4())
+        traceparent = headers.get("traceparent")
+        self.trace_context: Optional[TraceContext] = (
+            parse_traceparent(traceparent) if traceparent else None
+        )
+        self.correlation_id: str = (
+            self.trace_context.trace_id if self.trace_context else str(uuid.uuid4())
+        )
         self.user: Optional[Any] = None
         self.received = datetime.now()
         self.queries: Any = {}
+        self.app: Optional[Any] = None
+        self.route: Optional[str] = None
+        self.timings: Optional[Timings] = None
+        self.trace: Optional["Trace"] = None
 
         parsed_url = urlparse(self.path)
         parsed_queries: Dict[str, List[str]] = parse_qs(parsed_url.query)
@@ -126,6 +148,19 @@ class Request:
         """
         return self.headers.get(header_name.lower())
 
+    def traceparent(self) -> Optional[str]:
+        """
+        Returns the `traceparent` header value to send with calls to other services,
+        so their spans join the trace of this request.
+
+        :return: The header value, or None if the request is not part of a trace
+        """
+        if self.trace is not None:
+            return self.trace.traceparent()
+        if self.trace_context is not None:
+            return self.trace_context.traceparent()
+        return None
+
     def __repr__(self) -> str:
         def serialize_body(body: Any) -> str:
             if is_dataclass(body) and not isinstance(body, type):
@@ -1,6 +1,11 @@
+import inspect
 import json
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterable, Awaitable, Callable, List, Optional
+from .background import BackgroundTask
 from .status import HttpStatus
+from .sse import EventStream
+from .websocket import WebSocket, WebSocketUpgrade, accept_key
+from .timing import Timings, timed
 
 
 class Response:
@@ -15,6 +20,10 @@ class Response:
         _body (str): The response body.
         _is_sent (bool): A flag to indicate if the response has already been sent.
         correlation_id (str): A unique correlation ID for tracking the request-response cycle.
+        stream (Optional[EventStream]): The event stream body set by `sse`, written after the head.
+        websocket (Optional[WebSocketUpgrade]): The accepted WebSocket handshake, run after the head.
+        timings (Optional[Timings]): The stage durations of the request, serialization is added to them.
+        background_tasks (Optional[List[BackgroundTask]]): The tasks to run once the response has been sent.
     """
 
     def __init__(self, correlation_id: str = "") -> None:
@@ -28,6 +37,10 @@ class Response:
         self.correlation_id = correlation_id
         self.body: Any
         self.json: str
+        self.stream: Optional[EventStream] = None
+        self.websocket: Optional[WebSocketUpgrade] = None
+        self.timings: Optional[Timings] = None
+        self.background_tasks: Optional[List[BackgroundTask]] = None
 
     def status(self, code: int) -> "Response":
         """
@@ -69,26 +82,148 @@ class Response:
             )
 
         self.body = data
-        self.json = json.dumps(data)
-        self._body = json.dumps(data)
+        with timed(self.timings, "serialize"):
+            self.json = json.dumps(data)
+        self._body = self.json
         self.set_header("Content-Type", "application/json")
         self._headers["Content-Length"] = str(len(self._body))
         self._is_sent = True
         return self
 
-    def end(self) -> str:
+    def text(
+        self, data: str, content_type: str = "text/plain; charset=utf-8"
+    ) -> "Response":
         """
-        Finalize the response and return it as a raw HTTP response string.
+        Set the response body to a string that is sent as is, for endpoints that
+        serve other formats than JSON.
 
-        :return: The complete HTTP response as a string
+        :param data: The response body
+        :param content_type: The Content-Type header of the response
+        :return: self to allow for chaining
+        """
+
+        if self._is_sent:
+            raise RuntimeError(
+                "You tried to send the response twice, make sure you only send the response once."
+            )
+
+        self.body = data
+        self.json = data
+        self._body = data
+        self.set_header("Content-Type", content_type)
+        self._headers["Content-Length"] = str(len(data.encode("utf-8")))
+        self._is_sent = True
+        return self
+
+    def sse(self, source: AsyncIterable[Any], heartbeat: float = 15.0) -> "Response":
+        """
+        Send the response as a stream of Server-Sent Events. The connection is kept
+        open and every item from `source` is sent as an event until the source is
+        exhausted or the client disconnects. A comment is sent as heartbeat when no
+        event was sent for `heartbeat` seconds.
+
+        :param source: An async iterable of events, strings or JSON-encodable data
+        :param heartbeat: Seconds of inactivity after which a heartbeat is sent
+        :return: self to allow for chaining
+        """
+
+        if self._is_sent:
+            raise RuntimeError(
+                "You tried to send the response twice, make sure you only send the response once."
+            )
+
+        self.body = None
+        self.json = ""
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+        self.set_header("X-Accel-Buffering", "no")
+        self._headers.pop("Content-Length", None)
+        self.stream = EventStream(source, heartbeat)
+        self._is_sent = True
+        return self
+
+    def accept_websocket(
+        self,
+        key: str,
+        handler: Callable[[WebSocket], Awaitable[Any]],
+        **options: Any,
+    ) -> "Response":
+        """
+        Accept a WebSocket handshake. The server sends the 101 response and then
+        runs `handler` on the connection. Called by `@websocket` routes once the
+        middlewares and authentication have passed.
+
+        :param key: The `Sec-WebSocket-Key` header sent by the client
+        :param handler: The function to run on the connection
+        :param options: Options for the connection, see `WebSocketUpgrade`
+        :return: self to allow for chaining
+        """
+
+        if self._is_sent:
+            raise RuntimeError(
+                "You tried to send the response twice, make sure you only send the response once."
+            )
+
+        self.body = None
+        self.json = ""
+        self._status_code = 101
+        self._headers.pop("Content-Type", None)
+        self._headers.pop("Content-Length", None)
+        self.set_header("Upgrade", "websocket")
+        self.set_header("Connection", "Upgrade")
+        self.set_header("Sec-WebSocket-Accept", accept_key(key))
+        self.websocket = WebSocketUpgrade(handler, **options)
+        self._is_sent = True
+        return self
+
+    def background(self, task: Any, *args: Any, **kwargs: Any) -> "Response":
+        """
+        Schedule work to run after the response has been sent, such as sending an
+        email, without delaying the response. Tasks run in the order they were added,
+        synchronous functions in the executor. They are dropped if the handler raises.
+
+        :param task: A coroutine, or a function to call with the given arguments
+        :param args: Positional arguments for the function
+        :param kwargs: Keyword arguments for the function
+        :return: self to allow for chaining
+        :raises TypeError: If the task is neither a coroutine nor a function
+        """
+
+        if inspect.isawaitable(task):
+            if args or kwargs:
+                raise TypeError("Arguments can only be passed with a function")
+        elif not callable(task):
+            raise TypeError(
+                f"Expected a coroutine or a function, got {type(task).__name__}"
+            )
+
+        if self.background_tasks is None:
+            self.background_tasks = []
+        self.background_tasks.append((task, args, kwargs))
+        return self
+
+    def head(self) -> str:
+        """
+        Return the status line and headers of the response, terminated by the
+        blank line that separates them from the body.
+
+        :return: The response head as a string
         """
 
         status_message = HttpStatus.description(self._status_code)
         response_line = f"HTTP/1.1 {self._status_code} {status_message}\r\n"
         headers = "".join(f"{key}: {value}\r\n" for key, value in self._headers.items())
-        response = response_line + headers + "\r\n" + self.json
 
-        return response
+        return response_line + headers + "\r\n"
+
+    def end(self) -> str:
+        """
+        Finalize the response and return it as a raw HTTP response string.
+
+        :return: The complete HTTP response as a string
+        """
+
+        return self.head() + self.json
 
     def __repr__(self) -> str:
         return f"<Response {self._status_code} with {len(self._body)} bytes>"
@@ -1,12 +1,20 @@
 from json import JSONDecodeError
+import re
 import socket
-from typing import Callable, Optional, Awaitable
+import signal
+from typing import Any, Callable, Dict, Optional, Awaitable
 import asyncio
 
+from time import perf_counter_ns
 from .request import Request
 from .response import Response
+from .event_loop import loop_name
+from .timing import Timings
+from .background import BackgroundTasks
 from ..utils import Logger
 
+_CONTENT_LENGTH = re.compile(rb"^content-length:[ \t]*(\d+)[ \t]*\r?$", re.I | re.M)
+
 
 class Server:
     """
@@ -15,14 +23,27 @@ class Server:
 
     The server accepts incoming TCP connections, reads and parses HTTP requests,
     passes them to a request handler, and sends back the corresponding HTTP response.
+    When a SIGTERM or SIGINT is received the server drains: it reports itself as
+    not ready, stops accepting new connections, closes idle connections and lets
+    in-flight requests finish until the drain deadline has passed.
 
     Attributes:
         host (str): The server's hostname or IP address. Defaults to '127.0.0.1'.
         port (int): The port the server listens on. Defaults to 5000.
-        backlog (int): The maximum number of queued connections. Defaults to 5.
+        backlog (int): The maximum number of queued connections. Defaults to 100.
+        tcp_nodelay (bool): Disables Nagle's algorithm on accepted connections. Defaults to True.
+        keepalive (bool): Enables TCP keepalive probes on accepted connections. Defaults to False.
         server_socket (Optional[socket.socket]): The server's main socket.
         request_handler (Callable[[Request], Response]): A function that processes
             the incoming HTTP request and returns a response.
+        drain_timeout (float): Seconds in-flight requests are given to finish during shutdown.
+        shutdown_delay (float): Seconds to keep accepting connections after the server
+            stopped reporting ready, giving load balancers time to take it out of rotation.
+        ready (bool): Whether the server is accepting traffic and should receive new requests.
+        background (BackgroundTasks): Runs the background tasks of sent responses. They
+            are given the rest of the drain deadline to finish on shutdown.
+        keep_alive_timeout (float): Seconds an idle connection may wait for its next
+            request before it is closed, for servers keeping connections alive.
     """
 
     def __init__(
@@ -30,7 +51,14 @@ class Server:
         request_handler: Callable[[Request], Awaitable[Response]],
         host: str = "127.0.0.1",
         port: int = 5000,
-        backlog: int = 5,
+        backlog: int = 100,
+        drain_timeout: float = 30.0,
+        shutdown_delay: float = 0.0,
+        tcp_nodelay: bool = True,
+        keepalive: bool = False,
+        timing: bool = False,
+        background: Optional[BackgroundTasks] = None,
+        keep_alive_timeout: float = 5.0,
     ) -> None:
         """
         Initializes the server with a request handler, host, port, and backlog size.
@@ -38,28 +66,119 @@ class Server:
         :param request_handler: A callable that processes HTTP requests and returns responses.
         :param host: The hostname or IP address to bind the server to. Defaults to '127.0.0.1'.
         :param port: The port to bind the server to. Defaults to 5000.
-        :param backlog: The maximum number of queued connections. Defaults to 5.
+        :param backlog: The maximum number of queued connections. Defaults to 100.
+        :param drain_timeout: Seconds to wait for in-flight requests on shutdown. Defaults to 30.
+        :param shutdown_delay: Seconds to wait between turning unready and closing the
+            listening socket. Defaults to 0.
+        :param tcp_nodelay: Whether to set TCP_NODELAY on accepted connections. Defaults to True.
+        :param keepalive: Whether to set SO_KEEPALIVE on accepted connections. Defaults to False.
+        :param timing: Whether to record stage timings, starting with request parsing.
+            Defaults to False.
+        :param background: Runs the background tasks of sent responses. Defaults to a
+            runner using the event loop's default executor.
+        :param keep_alive_timeout: Seconds an idle connection may wait for its next
+            request before it is closed. 0 disables the timeout. Defaults to 5.
         """
 
         self.host: str = host
         self.port: int = port
         self.backlog: int = backlog
+        self.drain_timeout: float = drain_timeout
+        self.shutdown_delay: float = shutdown_delay
+        self.tcp_nodelay: bool = tcp_nodelay
+        self.keepalive: bool = keepalive
+        self.timing: bool = timing
         self.server_socket: Optional[socket.socket] = None
         self.request_handler = request_handler
+        self.ready: bool = False
+        self.background = background or BackgroundTasks()
+        self.keep_alive_timeout: float = keep_alive_timeout
         self._server: Optional[asyncio.AbstractServer] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._connections: Dict[Any, bool] = {}
+        self._tasks: Dict[Any, "asyncio.Task[Any]"] = {}
+        self._drained: Optional[asyncio.Event] = None
+        self._is_shut_down = False
+
+    @property
+    def in_flight(self) -> int:
+        """The number of connections that are currently processing a request."""
+        return sum(1 for busy in self._connections.values() if busy)
+
+    @property
+    def connections(self) -> int:
+        """The number of open client connections."""
+        return len(self._connections)
 
     async def start(self) -> None:
         """
         Starts the server and begins listening for incoming connections asynchronously.
+        Returns once the server has been asked to stop and has finished draining.
         """
-        self._server = await asyncio.start_server(
-            self._handle_client, self.host, self.port
-        )
-        Logger.info(f"Running on: {self.host}:{self.port}")
+        self._stopping = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._is_shut_down = False
+
+        self._server = await self._create_server()
+        self._install_signal_handlers()
+        self.ready = True
+
+        Logger.info(f"Running on: {self.host}:{self.port} ({loop_name()} event loop)")
         Logger.info("Press Ctrl+C to stop the server.")
 
-        async with self._server:
-            await self._server.serve_forever()
+        serve_task = asyncio.ensure_future(self._server.serve_forever())
+        stop_task = asyncio.ensure_future(self._stopping.wait())
+
+        try:
+            await asyncio.wait(
+                {serve_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            stop_task.cancel()
+            await self.shutdown()
+            serve_task.cancel()
+            await asyncio.gather(serve_task, stop_task, return_exceptions=True)
+
+    async def _create_server(self) -> asyncio.AbstractServer:
+        """
+        Creates the listening server. Connections are handled by `_handle_client`
+        using asyncio streams.
+        """
+        return await asyncio.start_server(
+            self._handle_client, self.host, self.port, backlog=self.backlog
+        )
+
+    def stop(self) -> None:
+        """
+        Requests a graceful shutdown. The server stops reporting ready immediately and
+        `start` returns once in-flight requests have drained.
+        """
+        self.ready = False
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def _install_signal_handlers(self) -> None:
+        """
+        Installs SIGTERM and SIGINT handlers on the running loop. Platforms and threads
+        that do not support loop signal handlers fall back to KeyboardInterrupt.
+        """
+        loop = asyncio.get_running_loop()
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError, ValueError):
+                return
+
+    def _remove_signal_handlers(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                return
 
     async def _handle_client(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
@@ -68,64 +187,245 @@ class Server:
         Handles communication with a client, reading the request data, processing
         the request, and sending back the response asynchronously.
         """
+        task = asyncio.current_task()
+        self._configure_socket(writer)
+        self._connections[writer] = False
+        if task is not None:
+            self._tasks[writer] = task
+
+        res: Optional[Response] = None
         try:
-            request_data = ""
-            while True:
-                data = await reader.read(1024)
-                if not data:
-                    break
-                request_data += data.decode("utf-8")
-                if len(data) < 1024:
-                    break
+            try:
+                request_data = await self._read_request(reader)
+            except ValueError:
+                await self._send(
+                    writer, Response().status(400).send({"error": "Malformed request"})
+                )
+                return
+
+            if not request_data:
+                return
+
+            self._mark_busy(writer)
 
             client_address, client_port = writer.get_extra_info("peername")
 
             try:
-                request = Request.parse(request_data, client_address, client_port)
+                started = perf_counter_ns() if self.timing else 0
+                request = Request.parse(
+                    request_data.decode("utf-8"), client_address, client_port
+                )
+                if self.timing:
+                    request.timings = Timings(started)
+                    request.timings.stages["parse"] = perf_counter_ns() - started
             except JSONDecodeError:
                 Logger.warning("Failed to parse request as JSON")
-                response = (
+                await self._send(
+                    writer,
                     Response()
                     .status(400)
                     .send(
                         {"error": "Failed to parse request, likely invalid JSON format"}
-                    )
-                    .end()
+                    ),
                 )
-                writer.write(response.encode("utf-8"))
-                await writer.drain()
                 return
             except Exception as e:
-                response = (
-                    Response().status(400).send({"error": "Malformed request"}).end()
+                await self._send(
+                    writer, Response().status(400).send({"error": "Malformed request"})
                 )
-                writer.write(response.encode("utf-8"))
-                await writer.drain()
                 return
 
-            res: Response = await self.request_handler(request)
+            res = await self.request_handler(request)
 
-            if res._is_sent:
-                writer.write(res.end().encode("utf-8"))
-                await writer.drain()
+            if res.websocket is not None:
+                await self._run_websocket(reader, writer, res)
+            elif res.stream is not None:
+                await self._write_stream(writer, res)
+            elif res._is_sent:
+                await self._send(writer, res)
+
+            self.background.run(res)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            response = (
-                Response().status(500).send({"error": "Internal server error"}).end()
+            await self._send(
+                writer, Response().status(500).send({"error": "Internal server error"})
             )
-            writer.write(response.encode("utf-8"))
-            await writer.drain()
         finally:
+            if res is not None:
+                self.background.drop(res)
+            self._release(writer)
             writer.close()
-            await writer.wait_closed()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> bytes:
+        """
+        Reads the head of a request up to the blank line and a body of the length
+        announced by `Content-Length`. Bytes sent after the request, such as the first
+        frames of a WebSocket client that does not wait for the handshake response,
+        are left in the reader.
+
+        :raises ValueError: If the head exceeds the limit of the reader.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            raise ValueError("The request head is too large") from e
+
+        match = _CONTENT_LENGTH.search(head)
+        if match is None:
+            return head
+
+        try:
+            return head + await reader.readexactly(int(match.group(1)))
+        except asyncio.IncompleteReadError as e:
+            return head + e.partial
 
-    async def shutdown(self) -> None:
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, res: Response) -> None:
         """
-        Gracefully shuts down the server by closing the server socket and stopping the server loop.
+        Writes a complete response. The server closes every connection after one
+        response, so it is marked with `Connection: close` for clients that would
+        otherwise try to reuse the connection.
         """
-        if self._server is not None:
-            print("Shutting down the server...")
-            self._server.close()
-            await self._server.wait_closed()
-            print("Server successfully shut down.")
-        else:
+        res.set_header("Connection", "close")
+        writer.write(res.end().encode("utf-8"))
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, res: Response) -> None:
+        """
+        Writes a streamed response, ending it when the server begins shutting down.
+        """
+        assert res.stream is not None
+
+        async def write(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        res.set_header("Connection", "close")
+        try:
+            await write(res.head().encode("latin-1"))
+        except (ConnectionError, OSError):
+            return
+
+        await res.stream.run(write, self._stopping)
+
+    async def _run_websocket(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, res: Response
+    ) -> None:
+        """
+        Completes a WebSocket handshake and runs the route handler on the connection,
+        closing it with 1001 when the server begins shutting down.
+        """
+        assert res.websocket is not None
+
+        async def read() -> bytes:
+            return await reader.read(65536)
+
+        async def write(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        try:
+            await write(res.head().encode("latin-1"))
+        except (ConnectionError, OSError):
+            return
+
+        await res.websocket.run(read, write, self._stopping)
+
+    def _configure_socket(self, connection: Any) -> None:
+        """
+        Applies the configured socket options to an accepted connection.
+        """
+        sock = connection.get_extra_info("socket")
+        if sock is None:
+            return
+
+        try:
+            if self.tcp_nodelay:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.keepalive:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (OSError, AttributeError):
+            pass
+
+    def _mark_busy(self, connection: Any) -> None:
+        self._connections[connection] = True
+        if self._drained is not None:
+            self._drained.clear()
+
+    def _mark_idle(self, connection: Any) -> None:
+        if connection in self._connections:
+            self._connections[connection] = False
+        if self._drained is not None and self.in_flight == 0:
+            self._drained.set()
+
+    def _release(self, connection: Any) -> None:
+        self._connections.pop(connection, None)
+        self._tasks.pop(connection, None)
+        if self._drained is not None and self.in_flight == 0:
+            self._drained.set()
+
+    def _close_idle_connections(self) -> None:
+        """
+        Closes every open connection that is not processing a request.
+        """
+        for connection, busy in list(self._connections.items()):
+            if not busy:
+                connection.close()
+
+    async def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Gracefully shuts down the server. The server stops reporting ready, stops
+        accepting new connections, closes idle connections and waits for in-flight
+        requests and then background tasks to finish. Those still running after the
+        drain deadline are cancelled.
+
+        :param timeout: Seconds to wait for in-flight requests. Defaults to `drain_timeout`.
+        """
+        if self._server is None:
             print("Server is not running.")
+            return
+
+        if self._is_shut_down:
+            return
+
+        self._is_shut_down = True
+        self.ready = False
+        deadline = self.drain_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+
+        print("Shutting down the server...")
+        self._remove_signal_handlers()
+
+        if self.shutdown_delay > 0:
+            await asyncio.sleep(self.shutdown_delay)
+
+        self._server.close()
+        self._close_idle_connections()
+
+        if self.in_flight:
+            Logger.info(f"Waiting for {self.in_flight} in-flight request(s) to finish")
+
+        started = loop.time()
+        if self._drained is not None:
+            try:
+                await asyncio.wait_for(self._drained.wait(), deadline)
+            except asyncio.TimeoutError:
+                Logger.warning(
+                    f"Drain deadline of {deadline}s passed, cancelling {self.in_flight} request(s)"
+                )
+
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+        await self.background.drain(deadline - (loop.time() - started))
+
+        await self._server.wait_closed()
+        print("Server successfully shut down.")
@@ -0,0 +1,282 @@
+import asyncio
+import json
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Optional,
+    Set,
+)
+
+from ..utils import Logger
+
+HEARTBEAT = b": ping\n\n"
+
+
+class ServerSentEvent:
+    """
+    A single event in a `text/event-stream` response.
+
+    Attributes:
+        data (Any): The event payload. Strings are sent as is, anything else is JSON encoded.
+        event (Optional[str]): The event name, dispatched to listeners of that name on the client.
+        id (Optional[str]): The event id, sent back by the client as `Last-Event-ID` on reconnect.
+        retry (Optional[int]): The reconnection delay in milliseconds the client should use.
+    """
+
+    def __init__(
+        self,
+        data: Any,
+        event: Optional[str] = None,
+        id: Optional[str] = None,  # pylint: disable=redefined-builtin
+        retry: Optional[int] = None,
+    ) -> None:
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def encode(self) -> bytes:
+        """
+        Encodes the event with the `text/event-stream` framing.
+
+        :return: The encoded event, terminated by a blank line
+        """
+
+        data = self.data if isinstance(self.data, str) else json.dumps(self.data)
+        lines = []
+
+        if self.event is not None:
+            lines.append(f"event: {self.event}")
+        if self.id is not None:
+            lines.append(f"id: {self.id}")
+        if self.retry is not None:
+            lines.append(f"retry: {self.retry}")
+
+        lines.extend(f"data: {line}" for line in data.split("\n"))
+
+        return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def encode_event(item: Any) -> bytes:
+    """
+    Encodes an item yielded by an event source. Bytes are assumed to be encoded
+    already, events are encoded with their fields and anything else is sent as data.
+    """
+
+    if isinstance(item, bytes):
+        return item
+    if isinstance(item, ServerSentEvent):
+        return item.encode()
+
+    return ServerSentEvent(item).encode()
+
+
+class EventStream:
+    """
+    The body of a Server-Sent Events response. Created by `Response.sse` and written
+    by the server after the response head.
+
+    Attributes:
+        source (AsyncIterable[Any]): The events to send.
+        heartbeat (float): Seconds without events after which a comment is sent, keeping
+            proxies from closing the connection and detecting clients that went away.
+    """
+
+    def __init__(self, source: AsyncIterable[Any], heartbeat: float = 15.0) -> None:
+        self.source = source
+        self.heartbeat = heartbeat
+
+    async def run(
+        self,
+        write: Callable[[bytes], Awaitable[None]],
+        stopping: Optional[asyncio.Event] = None,
+    ) -> None:
+        """
+        Writes events until the source is exhausted, `stopping` is set or a write
+        fails because the client disconnected. The source is closed afterwards.
+
+        :param write: Writes bytes to the client and waits until they can be buffered
+        :param stopping: An event that ends the stream when set
+        """
+
+        iterator = self.source.__aiter__()
+        stop = asyncio.ensure_future(stopping.wait()) if stopping else None
+        pending: Optional["asyncio.Future[Any]"] = None
+
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+
+                waiters: Set["asyncio.Future[Any]"] = {pending}
+                if stop is not None:
+                    waiters.add(stop)
+
+                done, _ = await asyncio.wait(
+                    waiters, timeout=self.heartbeat, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if stop is not None and stop in done:
+                    break
+
+                if pending not in done:
+                    await write(HEARTBEAT)
+                    continue
+
+                item, pending = pending, None
+
+                try:
+                    value = item.result()
+                except StopAsyncIteration:
+                    break
+
+                await write(encode_event(value))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if stop is not None:
+                stop.cancel()
+            await self._close(iterator, pending)
+
+    @staticmethod
+    async def _close(iterator: Any, pending: Optional["asyncio.Future[Any]"]) -> None:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait({pending})
+
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is None:
+            return
+
+        try:
+            await aclose()
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+
+
+class Subscription:
+    """
+    A subscriber of a `Broadcaster`, iterated to receive the published events.
+    Pass it to `Response.sse` to forward the events to a client.
+
+    Attributes:
+        evicted (bool): Whether the subscription was dropped for falling behind.
+    """
+
+    def __init__(self, broadcaster: "Broadcaster", max_queue: int) -> None:
+        self._broadcaster = broadcaster
+        self._queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(max_queue)
+        self._closed = False
+        self.evicted = False
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+
+        payload = await self._queue.get()
+        if payload is None:
+            raise StopAsyncIteration
+
+        return payload
+
+    def _deliver(self, payload: bytes) -> bool:
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            self.evicted = True
+            Logger.debug("Evicted a slow Server-Sent Events subscriber")
+            self.close()
+            return False
+
+    def close(self) -> None:
+        """
+        Ends the subscription. Events still queued are discarded when the subscriber
+        was evicted and delivered otherwise.
+        """
+
+        if self._closed:
+            return
+
+        self._closed = True
+        self._broadcaster._subscribers.discard(self)
+
+        if self.evicted:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    async def aclose(self) -> None:
+        """Ends the subscription, called when the response stream finishes."""
+        self.close()
+
+
+class Broadcaster:
+    """
+    An in-process hub that fans published events out to every subscriber.
+
+    Each event is encoded once and put on the bounded queue of every subscriber
+    without waiting. A subscriber whose queue is full is evicted: its stream ends
+    and the client is expected to reconnect, so one slow consumer never delays
+    publishing or grows memory without bound. Use from the event loop thread.
+
+    Attributes:
+        max_queue (int): The default number of queued events per subscriber.
+    """
+
+    def __init__(self, max_queue: int = 100) -> None:
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def subscribers(self) -> int:
+        """The number of active subscribers."""
+        return len(self._subscribers)
+
+    def subscribe(self, max_queue: Optional[int] = None) -> Subscription:
+        """
+        Adds a subscriber.
+
+        :param max_queue: The queue size for this subscriber, defaults to `max_queue`
+        :return: The subscription to iterate or pass to `Response.sse`
+        """
+
+        subscription = Subscription(self, max_queue or self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def publish(
+        self,
+        data: Any,
+        event: Optional[str] = None,
+        id: Optional[str] = None,  # pylint: disable=redefined-builtin
+    ) -> int:
+        """
+        Publishes an event to all subscribers.
+
+        :param data: The event payload
+        :param event: The event name
+        :param id: The event id
+        :return: The number of subscribers the event was delivered to
+        """
+
+        payload = encode_event(ServerSentEvent(data, event=event, id=id))
+
+        return sum(
+            subscription._deliver(payload)
+            for subscription in list(self._subscribers)
+        )
+
+    def close(self) -> None:
+        """Ends all subscriptions."""
+        for subscription in list(self._subscribers):
+            subscription.close()
@@ -0,0 +1,97 @@
+from contextlib import nullcontext
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from ..tracing import Trace
+
+_UNTIMED: ContextManager[Any] = nullcontext()
+
+
+class Timings:
+    """
+    Durations of the stages of handling a request, in nanoseconds.
+
+    The framework records the stages `parse`, `routing`, `auth`, `validation`,
+    `dataclass`, `middlewares`, `handler`, `serialize` and `error`. Stages nest:
+    while a stage runs inside another, for example the handler inside the
+    middlewares, the time is only counted for the inner stage. The durations of
+    all stages therefore add up to at most the total time of the request.
+
+    When the request is sampled by the tracer, each stage is also recorded as a span.
+
+    Attributes:
+        started (int): The `perf_counter_ns` timestamp the request started at.
+        stages (Dict[str, int]): The time spent in each stage, in nanoseconds.
+        trace (Optional[Trace]): The trace recording the stages as spans.
+    """
+
+    __slots__ = ("started", "stages", "trace", "_stack", "_mark")
+
+    def __init__(self, started: Optional[int] = None) -> None:
+        self.started = perf_counter_ns() if started is None else started
+        self.stages: Dict[str, int] = {}
+        self.trace: Optional["Trace"] = None
+        self._stack: List[str] = []
+        self._mark = self.started
+
+    def enter(self, stage: str) -> None:
+        """Starts a stage, pausing the stage it runs in."""
+        now = perf_counter_ns()
+        if self._stack:
+            self._add(self._stack[-1], now - self._mark)
+        self._stack.append(stage)
+        self._mark = now
+        if self.trace is not None:
+            self.trace.start_span(stage, now)
+
+    def exit(self) -> None:
+        """Ends the current stage and resumes the stage it ran in."""
+        now = perf_counter_ns()
+        self._add(self._stack.pop(), now - self._mark)
+        self._mark = now
+        if self.trace is not None:
+            self.trace.end_span(now)
+
+    def stage(self, stage: str) -> "_Stage":
+        """Returns a context manager timing a stage."""
+        return _Stage(self, stage)
+
+    def total(self) -> int:
+        """Nanoseconds since the request started."""
+        return perf_counter_ns() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Formats the stages as a `Server-Timing` header value, in milliseconds.
+        """
+        metrics = [
+            f"{name};dur={duration / 1e6:.3f}" for name, duration in self.stages.items()
+        ]
+        metrics.append(f"total;dur={self.total() / 1e6:.3f}")
+        return ", ".join(metrics)
+
+    def _add(self, stage: str, duration: int) -> None:
+        self.stages[stage] = self.stages.get(stage, 0) + duration
+
+
+class _Stage:
+    __slots__ = ("timings", "name")
+
+    def __init__(self, timings: Timings, name: str) -> None:
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.timings.enter(self.name)
+
+    def __exit__(self, *exc: Any) -> None:
+        self.timings.exit()
+
+
+def timed(timings: Optional[Timings], stage: str) -> ContextManager[Any]:
+    """
+    Returns a context manager timing `stage` when timings are recorded for the
+    request, and a shared no-op context manager otherwise.
+    """
+    return timings.stage(stage) if timings is not None else _UNTIMED
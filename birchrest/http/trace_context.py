@@ -0,0 +1,68 @@
+import random
+from typing import NamedTuple, Optional
+
+_HEX = frozenset("0123456789abcdef")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+def new_trace_id() -> str:
+    """Returns a random 16 byte trace ID as 32 lowercase hex characters."""
+    return f"{random.getrandbits(128):032x}"
+
+
+def new_span_id() -> str:
+    """Returns a random 8 byte span ID as 16 lowercase hex characters."""
+    return f"{random.getrandbits(64):016x}"
+
+
+class TraceContext(NamedTuple):
+    """
+    The position of a request in a distributed trace, as carried by the W3C
+    `traceparent` header.
+
+    Attributes:
+        trace_id (str): The ID of the whole trace, 32 hex characters.
+        parent_id (str): The ID of the span of the caller, 16 hex characters.
+        sampled (bool): Whether the caller records the trace.
+    """
+
+    trace_id: str
+    parent_id: str
+    sampled: bool
+
+    def traceparent(self) -> str:
+        """Formats the context as a `traceparent` header value."""
+        return f"00-{self.trace_id}-{self.parent_id}-{'01' if self.sampled else '00'}"
+
+
+def _is_hex(value: str, length: int) -> bool:
+    return len(value) == length and _HEX.issuperset(value)
+
+
+def parse_traceparent(header: str) -> Optional[TraceContext]:
+    """
+    Parses a W3C `traceparent` header. Headers that are malformed, use the invalid
+    version `ff` or contain all zero IDs are ignored, as the specification requires.
+
+    :param header: The header value, for example
+        `00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01`
+    :return: The trace context, or None if the header is invalid
+    """
+    parts = header.strip().split("-")
+    if len(parts) < 4:
+        return None
+
+    version, trace_id, parent_id, flags = parts[:4]
+    if not _is_hex(version, 2) or version == "ff":
+        return None
+    if version == "00" and len(parts) != 4:
+        return None
+    if not _is_hex(trace_id, 32) or trace_id == _INVALID_TRACE_ID:
+        return None
+    if not _is_hex(parent_id, 16) or parent_id == _INVALID_SPAN_ID:
+        return None
+    if not _is_hex(flags, 2):
+        return None
+
+    return TraceContext(trace_id, parent_id, bool(int(flags, 16) & 0x01))
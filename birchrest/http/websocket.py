@@ -0,0 +1,509 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional, Union
+
+from ..utils import Logger
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+CONTINUATION = 0x0
+TEXT = 0x1
+BINARY = 0x2
+CLOSE = 0x8
+PING = 0x9
+PONG = 0xA
+
+CLOSE_TIMEOUT = 5.0
+
+Message = Union[str, bytes]
+
+
+class ConnectionClosed(Exception):
+    """
+    Raised when receiving from or sending to a WebSocket that has been closed.
+
+    Attributes:
+        code (int): The close code of the connection.
+    """
+
+    def __init__(self, code: int) -> None:
+        super().__init__(f"WebSocket connection closed with code {code}")
+        self.code = code
+
+
+class WebSocketError(Exception):
+    """Raised when a peer violates the WebSocket protocol."""
+
+    def __init__(self, code: int, reason: str) -> None:
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+class Frame(NamedTuple):
+    """A single WebSocket frame with its payload unmasked."""
+
+    fin: bool
+    opcode: int
+    payload: bytes
+
+
+def _valid_close_code(code: int) -> bool:
+    """Whether a peer may send a close code: a defined one, or one for applications."""
+    return 1000 <= code <= 1003 or 1007 <= code <= 1014 or 3000 <= code <= 4999
+
+
+def accept_key(key: str) -> str:
+    """
+    Computes the `Sec-WebSocket-Accept` header value for a handshake key.
+
+    :param key: The `Sec-WebSocket-Key` header sent by the client
+    :return: The accept value to send back
+    """
+
+    digest = hashlib.sha1((key + GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def apply_mask(data: Union[bytes, bytearray], mask: bytes) -> bytes:
+    """
+    Masks or unmasks a payload. The payload is XORed as one big integer with the
+    repeated mask instead of byte by byte.
+    """
+
+    length = len(data)
+    if not length:
+        return b""
+
+    repeated = (mask * (length // 4 + 1))[:length]
+    masked = int.from_bytes(data, "little") ^ int.from_bytes(repeated, "little")
+
+    return masked.to_bytes(length, "little")
+
+
+def encode_frame(opcode: int, payload: bytes = b"", fin: bool = True) -> bytes:
+    """
+    Encodes a frame as sent by a server, which is never masked.
+
+    :param opcode: The frame opcode
+    :param payload: The frame payload
+    :param fin: Whether this is the final frame of a message
+    :return: The encoded frame
+    """
+
+    first = (0x80 if fin else 0) | opcode
+    length = len(payload)
+
+    if length < 126:
+        header = struct.pack("!BB", first, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", first, 126, length)
+    else:
+        header = struct.pack("!BBQ", first, 127, length)
+
+    return header + payload
+
+
+class FrameParser:
+    """
+    An incremental parser for frames sent by a client.
+
+    Attributes:
+        max_size (int): The maximum payload size of a single frame.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        """Appends received bytes to the buffer."""
+        self._buffer += data
+
+    def next_frame(self) -> Optional[Frame]:
+        """
+        Takes the next complete frame out of the buffer.
+
+        :return: The frame, or None if it has not fully arrived yet
+        :raises WebSocketError: If the frame violates the protocol or is too large
+        """
+
+        buffer = self._buffer
+        if len(buffer) < 2:
+            return None
+
+        first, second = buffer[0], buffer[1]
+
+        if first & 0x70:
+            raise WebSocketError(1002, "Reserved bits must not be set")
+        if not second & 0x80:
+            raise WebSocketError(1002, "Client frames must be masked")
+
+        length = second & 0x7F
+        offset = 2
+
+        if length == 126:
+            if len(buffer) < 4:
+                return None
+            length = int.from_bytes(buffer[2:4], "big")
+            offset = 4
+        elif length == 127:
+            if len(buffer) < 10:
+                return None
+            length = int.from_bytes(buffer[2:10], "big")
+            offset = 10
+
+        if length > self.max_size:
+            raise WebSocketError(1009, "Frame too large")
+
+        end = offset + 4 + length
+        if len(buffer) < end:
+            return None
+
+        mask = bytes(buffer[offset : offset + 4])
+        payload = apply_mask(buffer[offset + 4 : end], mask)
+        del buffer[:end]
+
+        return Frame(bool(first & 0x80), first & 0x0F, payload)
+
+
+class WebSocket:
+    """
+    A WebSocket connection passed to `@websocket` route handlers.
+
+    Received frames are reassembled into messages and queued in a bounded queue.
+    When the handler falls behind and the queue is full, reading from the socket
+    stops until the handler catches up, so a fast client is slowed down by TCP
+    instead of filling memory. Sends wait until the data has been handed to the
+    transport. Pings are answered automatically, and a ping is sent every
+    `ping_interval` seconds to detect peers that went away.
+
+    Attributes:
+        max_message_size (int): The maximum size in bytes of a received message.
+        ping_interval (Optional[float]): Seconds between keepalive pings, None to disable them.
+        close_code (Optional[int]): The close code once the connection is closed.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[], Awaitable[bytes]],
+        write: Callable[[bytes], Awaitable[None]],
+        max_message_size: int = 2**20,
+        ping_interval: Optional[float] = 20.0,
+        max_queue: int = 16,
+    ) -> None:
+        self._read = read
+        self._write = write
+        self.max_message_size = max_message_size
+        self.ping_interval = ping_interval
+        self.close_code: Optional[int] = None
+        self._parser = FrameParser(max_message_size)
+        self._messages: "asyncio.Queue[Optional[Message]]" = asyncio.Queue(max_queue)
+        self._write_lock = asyncio.Lock()
+        self._close_sent = False
+        self._closed = asyncio.Event()
+        self._pong = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection has been closed."""
+        return self._closed.is_set()
+
+    def __aiter__(self) -> "WebSocket":
+        return self
+
+    async def __anext__(self) -> Message:
+        try:
+            return await self.receive()
+        except ConnectionClosed:
+            raise StopAsyncIteration from None
+
+    async def receive(self) -> Message:
+        """
+        Waits for the next message.
+
+        :return: The message, a string for text and bytes for binary messages
+        :raises ConnectionClosed: If the connection was closed
+        """
+
+        if self._closed.is_set() and self._messages.empty():
+            raise ConnectionClosed(self.close_code or 1006)
+
+        message = await self._messages.get()
+        if message is None:
+            raise ConnectionClosed(self.close_code or 1006)
+
+        return message
+
+    async def receive_json(self) -> Any:
+        """Waits for the next message and decodes it as JSON."""
+        return json.loads(await self.receive())
+
+    async def send(self, data: Any) -> None:
+        """
+        Sends a message. Strings are sent as text, bytes as binary and anything
+        else JSON encoded as text.
+
+        :param data: The message to send
+        :raises ConnectionClosed: If the connection is closing
+        """
+
+        if self._close_sent:
+            raise ConnectionClosed(self.close_code or 1000)
+
+        if isinstance(data, (bytes, bytearray)):
+            await self._send_frame(BINARY, bytes(data))
+        elif isinstance(data, str):
+            await self._send_frame(TEXT, data.encode("utf-8"))
+        else:
+            await self._send_frame(TEXT, json.dumps(data).encode("utf-8"))
+
+    async def ping(self, data: bytes = b"") -> None:
+        """Sends a ping frame."""
+        await self._send_frame(PING, data)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Starts the closing handshake and waits for the client to complete it.
+
+        :param code: The close code
+        :param reason: A short reason sent to the client
+        """
+
+        if not self._close_sent:
+            self._close_sent = True
+            payload = struct.pack("!H", code) + reason.encode("utf-8")[:123]
+            try:
+                await self._send_frame(CLOSE, payload)
+            except (ConnectionError, OSError):
+                self._finish(1006)
+
+        try:
+            await asyncio.wait_for(self._closed.wait(), CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._finish(code)
+
+    async def run(
+        self,
+        handler: Callable[["WebSocket"], Awaitable[Any]],
+        stopping: Optional[asyncio.Event] = None,
+    ) -> None:
+        """
+        Runs a handler on this connection together with the reader, the keepalive
+        pings and, when given, a task closing the connection once `stopping` is set.
+        The connection is closed when the handler returns.
+        """
+
+        tasks = [asyncio.ensure_future(self._read_loop())]
+        if self.ping_interval:
+            tasks.append(asyncio.ensure_future(self._ping_loop(self.ping_interval)))
+        if stopping is not None:
+            tasks.append(asyncio.ensure_future(self._close_when(stopping)))
+
+        try:
+            await handler(self)
+            await self.close()
+        except ConnectionClosed:
+            pass
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            Logger.error(
+                "WebSocket handler failed",
+                {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+            )
+            await self.close(1011, "Internal error")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        async with self._write_lock:
+            await self._write(encode_frame(opcode, payload))
+
+    def _finish(self, code: int) -> None:
+        if self.close_code is None:
+            self.close_code = code
+        self._closed.set()
+
+        try:
+            self._messages.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    async def _close_when(self, stopping: asyncio.Event) -> None:
+        await stopping.wait()
+        await self.close(1001, "Server shutting down")
+
+    async def _ping_loop(self, interval: float) -> None:
+        while not self._closed.is_set():
+            await asyncio.sleep(interval)
+            self._pong.clear()
+
+            try:
+                await self.ping()
+                await asyncio.wait_for(self._pong.wait(), interval)
+            except (ConnectionError, OSError):
+                self._finish(1006)
+                return
+            except asyncio.TimeoutError:
+                Logger.debug("WebSocket keepalive ping timed out")
+                await self.close(1011, "Ping timeout")
+                return
+
+    async def _read_loop(self) -> None:
+        code = 1006
+        fragments: List[bytes] = []
+        fragment_opcode: Optional[int] = None
+        size = 0
+
+        try:
+            while True:
+                frame = self._parser.next_frame()
+
+                if frame is None:
+                    data = await self._read()
+                    if not data:
+                        break
+                    self._parser.feed(data)
+                    continue
+
+                if frame.opcode >= CLOSE:
+                    close_code = await self._handle_control(frame)
+                    if close_code:
+                        code = close_code
+                        break
+                    continue
+
+                if frame.opcode == CONTINUATION:
+                    if fragment_opcode is None:
+                        raise WebSocketError(1002, "Unexpected continuation frame")
+                elif frame.opcode in (TEXT, BINARY):
+                    if fragment_opcode is not None:
+                        raise WebSocketError(1002, "Expected a continuation frame")
+                    fragment_opcode = frame.opcode
+                else:
+                    raise WebSocketError(1002, "Unknown opcode")
+
+                size += len(frame.payload)
+                if size > self.max_message_size:
+                    raise WebSocketError(1009, "Message too large")
+
+                fragments.append(frame.payload)
+                if not frame.fin:
+                    continue
+
+                payload = fragments[0] if len(fragments) == 1 else b"".join(fragments)
+                message: Message = payload
+
+                if fragment_opcode == TEXT:
+                    try:
+                        message = payload.decode("utf-8")
+                    except UnicodeDecodeError as e:
+                        raise WebSocketError(1007, "Invalid UTF-8 in text message") from e
+
+                fragments, fragment_opcode, size = [], None, 0
+                await self._messages.put(message)
+
+        except WebSocketError as e:
+            Logger.debug(f"Closing WebSocket: {e.reason}")
+            code = e.code
+            if not self._close_sent:
+                self._close_sent = True
+                try:
+                    await self._send_frame(
+                        CLOSE, struct.pack("!H", e.code) + e.reason.encode("utf-8")
+                    )
+                except (ConnectionError, OSError):
+                    pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._finish(code)
+
+    async def _handle_control(self, frame: Frame) -> int:
+        """
+        Handles a control frame and returns the close code if it closed the connection.
+        """
+
+        if not frame.fin or len(frame.payload) > 125:
+            raise WebSocketError(1002, "Invalid control frame")
+
+        if frame.opcode == PING:
+            if not self._close_sent:
+                await self._send_frame(PONG, frame.payload)
+            return 0
+
+        if frame.opcode == PONG:
+            self._pong.set()
+            return 0
+
+        if frame.opcode != CLOSE:
+            raise WebSocketError(1002, "Unknown opcode")
+
+        code = 1005
+        if len(frame.payload) == 1:
+            raise WebSocketError(1002, "Invalid close frame")
+        if len(frame.payload) >= 2:
+            code = struct.unpack("!H", frame.payload[:2])[0]
+            if not _valid_close_code(code):
+                raise WebSocketError(1002, "Invalid close code")
+            try:
+                frame.payload[2:].decode("utf-8")
+            except UnicodeDecodeError as e:
+                raise WebSocketError(1007, "Invalid UTF-8 in close reason") from e
+
+        if not self._close_sent:
+            self._close_sent = True
+            await self._send_frame(CLOSE, frame.payload[:2])
+
+        return code
+
+
+class WebSocketUpgrade:
+    """
+    A handshake accepted by a `@websocket` route. Set on the response by
+    `Response.accept_websocket` and run by the server after the 101 response.
+
+    Attributes:
+        handler (Callable[[WebSocket], Awaitable[Any]]): Runs the route handler on the connection.
+        max_message_size (int): The maximum size in bytes of a received message.
+        ping_interval (Optional[float]): Seconds between keepalive pings.
+        max_queue (int): The number of received messages buffered before reading pauses.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[WebSocket], Awaitable[Any]],
+        max_message_size: int = 2**20,
+        ping_interval: Optional[float] = 20.0,
+        max_queue: int = 16,
+    ) -> None:
+        self.handler = handler
+        self.max_message_size = max_message_size
+        self.ping_interval = ping_interval
+        self.max_queue = max_queue
+
+    async def run(
+        self,
+        read: Callable[[], Awaitable[bytes]],
+        write: Callable[[bytes], Awaitable[None]],
+        stopping: Optional[asyncio.Event] = None,
+    ) -> None:
+        """
+        Runs the handler on a connection.
+
+        :param read: Reads the next bytes from the client, empty bytes at EOF
+        :param write: Writes bytes to the client and waits until they can be buffered
+        :param stopping: An event that closes the connection when set
+        """
+
+        websocket = WebSocket(
+            read,
+            write,
+            max_message_size=self.max_message_size,
+            ping_interval=self.ping_interval,
+            max_queue=self.max_queue,
+        )
+        await websocket.run(self.handler, stopping)
@@ -0,0 +1,23 @@
+"""
+This module provides the metrics of the BirchRest framework.
+
+Components:
+- **MetricsRegistry**: A collection of metrics rendered in the Prometheus text exposition format.
+- **Counter**, **Gauge**, **Histogram**: The metric types, optionally with labels.
+- **HttpMetrics**: The request metrics recorded by the application when metrics are enabled.
+
+Metrics are enabled with `BirchRest(metrics=True)`, which records request metrics and
+serves the registry at `/metrics`. Custom metrics can be added to `app.metrics`.
+
+Exported components:
+- `MetricsRegistry`
+- `Counter`
+- `Gauge`
+- `Histogram`
+- `HttpMetrics`
+"""
+
+from .registry import MetricsRegistry, Counter, Gauge, Histogram
+from .http_metrics import HttpMetrics
+
+__all__ = ["MetricsRegistry", "Counter", "Gauge", "Histogram", "HttpMetrics"]
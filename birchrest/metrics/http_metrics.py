@@ -0,0 +1,138 @@
+from typing import Dict, Tuple
+
+from ..http import Request, Response
+from ..http.timing import Timings
+from .registry import CounterChild, HistogramChild, MetricsRegistry
+
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH")
+)
+
+STAGE_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+def _content_length(request: Request) -> int:
+    """The announced body size of a request, 0 when the header is missing or invalid."""
+    try:
+        return max(int(request.get_header("content-length") or 0), 0)
+    except ValueError:
+        return 0
+
+
+class HttpMetrics:
+    """
+    The request metrics recorded by the application when metrics are enabled.
+
+    Requests are labelled with the path template of the matched route rather than
+    the requested path, so the number of series stays bounded. Requests that did
+    not match a route are labelled "unmatched", and methods outside the standard
+    HTTP methods are labelled "other".
+
+    Attributes:
+        requests (Counter): Requests by route, method and status class.
+        duration (Histogram): Request latency in seconds by route and method.
+        request_size (Histogram): Request body sizes in bytes by route.
+        response_size (Histogram): Response body sizes in bytes by route.
+        connections (Gauge): Open client connections.
+        in_flight (Gauge): Requests currently being handled.
+        queue_depth (Gauge): Calls waiting for a worker, by pool.
+        stages (Histogram): Time spent in each stage of handling a request, in seconds.
+    """
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.requests = registry.counter(
+            "birchrest_requests_total",
+            "Requests handled, by route template, method and status class.",
+            ("route", "method", "status"),
+        )
+        self.duration = registry.histogram(
+            "birchrest_request_duration_seconds",
+            "Time spent handling a request.",
+            ("route", "method"),
+        )
+        self.request_size = registry.histogram(
+            "birchrest_request_size_bytes",
+            "Size of request bodies.",
+            ("route",),
+            buckets=SIZE_BUCKETS,
+        )
+        self.response_size = registry.histogram(
+            "birchrest_response_size_bytes",
+            "Size of response bodies.",
+            ("route",),
+            buckets=SIZE_BUCKETS,
+        )
+        self.connections = registry.gauge(
+            "birchrest_active_connections", "Open client connections."
+        )
+        self.in_flight = registry.gauge(
+            "birchrest_requests_in_flight", "Requests currently being handled."
+        )
+        self.queue_depth = registry.gauge(
+            "birchrest_queue_depth", "Calls waiting for a worker.", ("pool",)
+        )
+        self.stages = registry.histogram(
+            "birchrest_request_stage_duration_seconds",
+            "Time spent in each stage of handling a request.",
+            ("stage",),
+            buckets=STAGE_BUCKETS,
+        )
+        self._series: Dict[
+            Tuple[str, str, int],
+            Tuple[CounterChild, HistogramChild, HistogramChild, HistogramChild],
+        ] = {}
+
+    def observe(self, request: Request, response: Response, duration: float) -> None:
+        """
+        Records a handled request.
+
+        :param request: The handled request
+        :param response: The response sent for it
+        :param duration: Seconds spent handling the request
+        """
+
+        route = request.route or "unmatched"
+        method = request.method if request.method in METHODS else "other"
+        key = (route, method, response._status_code // 100)
+
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = (
+                self.requests.labels(route, method, f"{key[2]}xx"),
+                self.duration.labels(route, method),
+                self.request_size.labels(route),
+                self.response_size.labels(route),
+            )
+
+        requests, latency, request_size, response_size = series
+        requests.inc()
+        latency.observe(duration)
+        request_size.observe(_content_length(request))
+        response_size.observe(
+            len(response.json) if response._is_sent and response.stream is None else 0
+        )
+
+    def observe_stages(self, timings: Timings) -> None:
+        """
+        Records the stage durations of a handled request.
+
+        :param timings: The stage timings of the request
+        """
+
+        for stage, duration in timings.stages.items():
+            self.stages.labels(stage).observe(duration / 1e9)
@@ -0,0 +1,332 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[str, ...]
+Child = TypeVar("Child")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric(ABC, Generic[Child]):
+    """
+    Base class for metrics. A metric without label names records values itself,
+    a metric with label names records them on a child per combination of label values.
+
+    Metrics are not locked and must only be updated from the event loop thread.
+
+    Attributes:
+        name (str): The metric name.
+        description (str): The help text of the metric.
+        label_names (Tuple[str, ...]): The names of the labels.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._children: Dict[LabelValues, Child] = {}
+
+    def labels(self, *values: str) -> Child:
+        """
+        Returns the child recording values for the given label values.
+
+        :param values: One value per label name, in order
+        :return: The child metric
+        """
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"{self.name} expects labels {self.label_names}, got {values}"
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Child:
+        """Creates the child recording the values of one combination of label values."""
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Returns the sample lines of the metric and its children."""
+
+    def render(self) -> str:
+        """Renders the metric in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines) + "\n"
+
+
+class CounterChild:
+    """A counter for one combination of label values."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        """Increments the counter."""
+        self.value += amount
+
+
+class Counter(Metric[CounterChild]):
+    """A value that only increases, such as the number of requests served."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, description, labels)
+        self._value = CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increments a counter without labels."""
+        self._value.value += amount
+
+    @property
+    def value(self) -> float:
+        """The value of a counter without labels."""
+        return self._value.value
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def _samples(self) -> List[str]:
+        if not self.label_names:
+            return [f"{self.name} {_format_value(self._value.value)}"]
+
+        return [
+            f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.value)}"
+            for values, child in self._children.items()
+        ]
+
+
+class GaugeChild:
+    """A gauge for one combination of label values."""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self) -> None:
+        self.value: float = 0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        """Sets the gauge."""
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        """Increments the gauge."""
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrements the gauge."""
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Reads the value from `function` when the metrics are rendered."""
+        self.function = function
+
+    def get(self) -> float:
+        """Returns the current value."""
+        return self.function() if self.function is not None else self.value
+
+
+class Gauge(Metric[GaugeChild]):
+    """A value that goes up and down, such as the number of open connections."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, description, labels)
+        self._value = GaugeChild()
+
+    def set(self, value: float) -> None:
+        """Sets a gauge without labels."""
+        self._value.set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        """Increments a gauge without labels."""
+        self._value.inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrements a gauge without labels."""
+        self._value.dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Reads the value of a gauge without labels from `function` when rendered."""
+        self._value.set_function(function)
+
+    @property
+    def value(self) -> float:
+        """The value of a gauge without labels."""
+        return self._value.get()
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def _samples(self) -> List[str]:
+        if not self.label_names:
+            return [f"{self.name} {_format_value(self._value.get())}"]
+
+        return [
+            f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.get())}"
+            for values, child in self._children.items()
+        ]
+
+
+class HistogramChild:
+    """
+    A histogram for one combination of label values. Bucket counts are kept in a
+    list allocated once, and an observation is a binary search and an increment.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum: float = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Records an observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric[HistogramChild]):
+    """
+    Counts observations, such as request durations, in buckets with fixed upper bounds.
+
+    Attributes:
+        buckets (Tuple[float, ...]): The sorted upper bounds of the buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._value = HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Records an observation on a histogram without labels."""
+        self._value.observe(value)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def _samples(self) -> List[str]:
+        if not self.label_names:
+            return self._child_samples((), self._value)
+
+        samples: List[str] = []
+        for values, child in self._children.items():
+            samples.extend(self._child_samples(values, child))
+        return samples
+
+    def _child_samples(self, values: LabelValues, child: HistogramChild) -> List[str]:
+        names = self.label_names + ("le",)
+        samples = []
+        cumulative = 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(names, values + (_format_value(bound),))
+            samples.append(f"{self.name}_bucket{labels} {cumulative}")
+
+        labels = _format_labels(self.label_names, values)
+        samples.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        samples.append(f"{self.name}_count{labels} {child.count}")
+        return samples
+
+
+MetricType = TypeVar("MetricType", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    """
+    A collection of metrics rendered together in the Prometheus text exposition format.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric[Any]] = {}
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        """Creates and registers a counter."""
+        return self._register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        """Creates and registers a gauge."""
+        return self._register(Gauge(name, description, labels))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Creates and registers a histogram."""
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def get(self, name: str) -> Optional[Metric[Any]]:
+        """Returns a registered metric by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Renders all registered metrics."""
+        return "".join(metric.render() for metric in self._metrics.values())
+
+    def _register(self, metric: MetricType) -> MetricType:
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric named {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
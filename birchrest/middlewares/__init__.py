@@ -10,6 +10,9 @@ Built-in middlewares:
 - **RateLimiter**: Limits the number of requests from a single client over a period of time.
 - **Logger**: Logs incoming requests and outgoing responses, providing useful insights for debugging and monitoring.
 - **Cors**: Handles Cross-Origin Resource Sharing (CORS) headers to manage access from different domains.
+- **Singleflight**: Merges identical concurrent requests so the handler runs once and the response is shared.
+- **CircuitBreaker**: Fails fast while a route keeps failing and probes it again after a timeout.
+- **Bulkhead**: Limits the number of concurrent executions of a route.
 
 Custom middlewares:
 - **Middleware**: This is the base class that users should inherit from to create their own middleware. 
@@ -38,6 +41,17 @@ class CustomMiddleware(Middleware):
 from .rate_limiter import RateLimiter
 from .logger import Logger
 from .cors import Cors
+from .singleflight import Singleflight
+from .circuit_breaker import CircuitBreaker
+from .bulkhead import Bulkhead
 from .middleware import Middleware
 
-__all__ = ["RateLimiter", "Logger", "Cors", "Middleware"]
+__all__ = [
+    "RateLimiter",
+    "Logger",
+    "Cors",
+    "Singleflight",
+    "CircuitBreaker",
+    "Bulkhead",
+    "Middleware",
+]
@@ -0,0 +1,81 @@
+import asyncio
+from typing import NoReturn, Optional
+from ..exceptions import ServiceUnavailable
+from ..http import Request
+from ..http import Response
+from ..types import NextFunction
+from .middleware import Middleware
+
+
+class Bulkhead(Middleware):
+    """
+    Middleware that limits the number of concurrent executions of a route.
+
+    At most `max_concurrent` requests run the handler at the same time and up to
+    `max_waiting` more wait for a slot, for at most `timeout` seconds. Everything
+    beyond that fails fast with `503 Service Unavailable`, so a route waiting on a
+    slow dependency cannot tie up capacity needed by unrelated routes.
+
+    Attributes:
+        max_concurrent (int): The number of requests that run concurrently.
+        max_waiting (int): The number of requests that wait for a slot.
+        timeout (Optional[float]): Seconds a request waits for a slot, None to wait indefinitely.
+        active (int): The number of requests currently running.
+        waiting (int): The number of requests currently waiting.
+        rejected (int): The number of requests rejected so far.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        max_waiting: int = 0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        :param max_concurrent: The number of requests that run concurrently
+        :param max_waiting: The number of requests that wait for a slot
+        :param timeout: Seconds a request waits for a slot
+        """
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self, req: Request, res: Response, _next: NextFunction) -> None:
+        """
+        Runs the request when a slot is free and rejects it when the route is saturated.
+        :param req: The HTTP request object
+        :param res: The HTTP response object
+        :param next: The next middleware or handler to call
+        """
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if self._semaphore.locked():
+            if self.waiting >= self.max_waiting:
+                self._reject()
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self._reject()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+        try:
+            await _next()
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def _reject(self) -> NoReturn:
+        self.rejected += 1
+        raise ServiceUnavailable("Too many concurrent requests")
@@ -0,0 +1,171 @@
+import time
+from typing import List, NoReturn, Optional
+from ..exceptions import ApiError, ServiceUnavailable
+from ..http import Request
+from ..http import Response
+from ..types import NextFunction
+from ..utils import Logger
+from .middleware import Middleware
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker(Middleware):
+    """
+    Middleware that stops calling a failing route until it has had time to recover.
+
+    The outcome of the last `window_size` requests is kept in a ring buffer together
+    with a running failure count, so recording an outcome and computing the failure
+    rate are constant time. When at least `min_calls` outcomes are recorded and the
+    failure rate reaches `failure_threshold`, the circuit opens and requests fail
+    fast with `503 Service Unavailable` instead of waiting on a degraded dependency.
+    After `reset_timeout` seconds the circuit is half-open: up to `half_open_calls`
+    probe requests are let through, and the circuit closes if they succeed and opens
+    again if one of them fails.
+
+    A request fails when the handler raises an exception, other than an `ApiError`
+    with a status below 500, or responds with a 5xx status.
+
+    Attributes:
+        failure_threshold (float): The failure rate, between 0 and 1, that opens the circuit.
+        window_size (int): The number of recent outcomes the failure rate is computed over.
+        min_calls (int): The number of outcomes required before the circuit can open.
+        reset_timeout (float): Seconds the circuit stays open before probing.
+        half_open_calls (int): The number of concurrent probe requests when half-open.
+        state (str): The current state, one of "closed", "open" or "half_open".
+    """
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+    ) -> None:
+        """
+        :param failure_threshold: The failure rate that opens the circuit
+        :param window_size: The number of recent outcomes to keep
+        :param min_calls: The number of outcomes required before the circuit can open
+        :param reset_timeout: Seconds before an open circuit lets probe requests through
+        :param half_open_calls: The number of concurrent probes when half-open
+        """
+        self.failure_threshold = failure_threshold
+        self.window_size = window_size
+        self.min_calls = min(min_calls, window_size)
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._outcomes: List[bool] = [False] * window_size
+        self._index = 0
+        self._recorded = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def failure_rate(self) -> float:
+        """The failure rate over the recorded outcomes."""
+        return self._failures / self._recorded if self._recorded else 0.0
+
+    async def __call__(self, req: Request, res: Response, _next: NextFunction) -> None:
+        """
+        Fails fast while the circuit is open, otherwise runs the request and records
+        its outcome.
+        :param req: The HTTP request object
+        :param res: The HTTP response object
+        :param next: The next middleware or handler to call
+        """
+
+        probe = self._before_call(res)
+
+        try:
+            await _next()
+        except ApiError as e:
+            self._after_call(probe, failed=e.status_code >= 500)
+            raise
+        except Exception:
+            self._after_call(probe, failed=True)
+            raise
+        except BaseException:
+            if probe:
+                self._probes -= 1
+            raise
+
+        self._after_call(probe, failed=res._status_code >= 500)
+
+    def _before_call(self, res: Response) -> bool:
+        """
+        Checks whether a request may pass and returns whether it is a probe.
+        """
+
+        if self.state == OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+
+            if remaining > 0:
+                self._reject(res, remaining)
+
+            self.state = HALF_OPEN
+            Logger.debug("Circuit half-open, probing")
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self._reject(res, self.reset_timeout)
+
+            self._probes += 1
+            return True
+
+        return False
+
+    def _after_call(self, probe: bool, failed: bool) -> None:
+        if probe:
+            self._probes -= 1
+
+            if failed:
+                self._open()
+            else:
+                self._close()
+            return
+
+        if self.state != CLOSED:
+            return
+
+        self._record(failed)
+
+        if (
+            self._recorded >= self.min_calls
+            and self.failure_rate >= self.failure_threshold
+        ):
+            self._open()
+
+    def _record(self, failed: bool) -> None:
+        if self._recorded == self.window_size:
+            self._failures -= self._outcomes[self._index]
+        else:
+            self._recorded += 1
+
+        self._outcomes[self._index] = failed
+        self._failures += failed
+        self._index = (self._index + 1) % self.window_size
+
+    def _open(self) -> None:
+        if self.state != OPEN:
+            Logger.warning(f"Circuit opened at failure rate {self.failure_rate:.0%}")
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        Logger.debug("Circuit closed")
+        self.state = CLOSED
+        self._outcomes = [False] * self.window_size
+        self._index = 0
+        self._recorded = 0
+        self._failures = 0
+
+    @staticmethod
+    def _reject(res: Response, retry_after: Optional[float]) -> NoReturn:
+        if retry_after is not None:
+            res.set_header("Retry-After", str(max(1, round(retry_after))))
+        raise ServiceUnavailable("Circuit is open")
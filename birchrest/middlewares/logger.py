@@ -5,11 +5,6 @@ from ..http import Request, Response
 from ..types import NextFunction
 from .middleware import Middleware
 
-init(autoreset=True)
-
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger("RequestLogger")
 
 
@@ -19,6 +14,17 @@ class Logger(Middleware):
     Logs useful information including request method, path, client address, correlation ID, response status, and time taken.
     """
 
+    def __init__(self) -> None:
+        """
+        Configures logging when the middleware is created rather than when the module
+        is imported, so importing the framework does not change the logging setup.
+        """
+        init(autoreset=True)
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        )
+
     async def __call__(self, req: Request, res: Response, next: NextFunction) -> None:
         """
         Middleware entry point.
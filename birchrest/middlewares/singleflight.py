@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from ..http import Request
+from ..http import Response
+from ..types import NextFunction
+from .middleware import Middleware
+
+
+class SharedResponse(NamedTuple):
+    """The parts of a response that are copied to merged requests."""
+
+    status: int
+    headers: Dict[str, str]
+    body: Any
+    json: str
+
+
+class Singleflight(Middleware):
+    """
+    Middleware that merges identical concurrent requests into a single handler call.
+
+    Requests are identical when they have the same method, path including the query
+    string, and values for the configured headers. While a request is in flight,
+    identical requests wait for it instead of running the handler, and receive a copy
+    of its status, headers and already serialized body. This protects the handler's
+    dependencies from a burst of identical requests, for example when a cache entry
+    expires. Exceptions raised by the handler are raised for every merged request.
+
+    Responses must not depend on anything but the key: include headers such as
+    `Authorization` when the response is specific to the user.
+
+    Attributes:
+        headers (List[str]): Request headers that are part of the key.
+        methods (List[str]): Methods that are merged, other requests pass through.
+        hits (int): The number of requests that ran the handler.
+        merges (int): The number of requests served with the response of another request.
+    """
+
+    def __init__(
+        self, headers: List[str] = [], methods: List[str] = ["GET", "HEAD"]
+    ) -> None:
+        """
+        :param headers: Request headers that are part of the key
+        :param methods: Methods whose requests are merged
+        """
+        self.headers = [header.lower() for header in headers]
+        self.methods = methods
+        self.hits = 0
+        self.merges = 0
+        self._in_flight: Dict[
+            Tuple[Any, ...], "asyncio.Future[Optional[SharedResponse]]"
+        ] = {}
+
+    async def __call__(self, req: Request, res: Response, _next: NextFunction) -> None:
+        """
+        Runs the handler for the first of a group of identical requests and shares
+        its response with the rest.
+        :param req: The HTTP request object
+        :param res: The HTTP response object
+        :param next: The next middleware or handler to call
+        """
+
+        if req.method not in self.methods:
+            await _next()
+            return
+
+        key = (req.method, req.path) + tuple(
+            req.get_header(header) for header in self.headers
+        )
+
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            try:
+                snapshot = await asyncio.shield(shared)
+            except Exception:
+                self.merges += 1
+                raise
+
+            if snapshot is not None:
+                self.merges += 1
+                self._apply(snapshot, res)
+                return
+
+        self.hits += 1
+        future: "asyncio.Future[Optional[SharedResponse]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+
+        try:
+            await _next()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+            if not future.done():
+                future.set_result(self._snapshot(res))
+
+    @staticmethod
+    def _snapshot(res: Response) -> Optional[SharedResponse]:
+        """
+        Captures a sent response. Streamed and unsent responses are not shared, and
+        the requests waiting for them run the handler themselves.
+        """
+
+        if not res._is_sent or res.stream is not None or res.websocket is not None:
+            return None
+
+        return SharedResponse(res._status_code, dict(res._headers), res.body, res.json)
+
+    @staticmethod
+    def _apply(snapshot: SharedResponse, res: Response) -> None:
+        res._status_code = snapshot.status
+        res._headers = dict(snapshot.headers)
+        res.body = snapshot.body
+        res.json = snapshot.json
+        res._body = snapshot.json
+        res._is_sent = True
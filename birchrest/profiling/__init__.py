@@ -0,0 +1,23 @@
+"""
+This module provides on-demand profiling for the BirchRest framework.
+
+Components:
+- **StackSampler**: A statistical profiler recording the stacks of a thread.
+- **Profiler**: Runs profiling sessions for an application, optionally limited to a route.
+- **Watchdog**: Reports slow requests and a blocked event loop with their stacks.
+
+Profiling is enabled with `BirchRest(profiling=True)`, which serves a protected route
+returning collapsed stacks, and lets `birch profile` profile a running process.
+`BirchRest(watchdog=Watchdog())` serves the slow request reports.
+
+Exported components:
+- `StackSampler`
+- `Profiler`
+- `Watchdog`
+"""
+
+from .sampler import StackSampler
+from .profiler import Profiler
+from .watchdog import Watchdog
+
+__all__ = ["StackSampler", "Profiler", "Watchdog"]
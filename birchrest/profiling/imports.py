@@ -0,0 +1,115 @@
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+
+class ImportTime(NamedTuple):
+    """
+    The time spent importing a module, as reported by `python -X importtime`.
+
+    Attributes:
+        name (str): The module name.
+        self_us (int): Microseconds spent in the module itself.
+        cumulative_us (int): Microseconds including the modules it imported.
+        depth (int): The nesting level, 0 for the modules imported by the statement.
+    """
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTime]:
+    """Parses the `-X importtime` lines written to stderr."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+            imports.append(
+                ImportTime(
+                    name.strip(),
+                    int(self_us),
+                    int(cumulative_us),
+                    (len(name) - len(name.lstrip()) - 1) // 2,
+                )
+            )
+        except ValueError:
+            continue  # The header line
+    return imports
+
+
+def profile_imports(
+    statement: str = "import birchrest",
+    repeat: int = 1,
+    python: Optional[str] = None,
+) -> List[ImportTime]:
+    """
+    Runs a statement in a new interpreter with `-X importtime` and returns the time
+    spent importing each module. With `repeat`, the statement is run several times
+    and the median times are returned, as the first run after a change also pays
+    for compiling the bytecode.
+
+    :param statement: The Python statement to run
+    :param repeat: The number of runs to take the median of
+    :param python: The interpreter, defaults to the current one
+    :return: The modules in the order the interpreter finished importing them
+    :raises RuntimeError: If the statement fails
+    """
+    runs: List[List[ImportTime]] = []
+    for _ in range(max(repeat, 1)):
+        process = subprocess.run(
+            [python or sys.executable, "-X", "importtime", "-c", statement],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else "failed")
+        runs.append(parse_importtime(process.stderr))
+
+    if len(runs) == 1:
+        return runs[0]
+
+    self_times: Dict[str, List[int]] = {}
+    cumulative_times: Dict[str, List[int]] = {}
+    for run in runs:
+        for module in run:
+            self_times.setdefault(module.name, []).append(module.self_us)
+            cumulative_times.setdefault(module.name, []).append(module.cumulative_us)
+
+    return [
+        module._replace(
+            self_us=int(statistics.median(self_times[module.name])),
+            cumulative_us=int(statistics.median(cumulative_times[module.name])),
+        )
+        for module in runs[-1]
+    ]
+
+
+def total_us(imports: List[ImportTime], prefix: Optional[str] = None) -> int:
+    """
+    Returns the total microseconds spent importing, or only in the modules whose
+    name starts with `prefix`, such as `birchrest`.
+    """
+    if prefix is None:
+        return sum(module.self_us for module in imports)
+    return sum(
+        module.self_us
+        for module in imports
+        if module.name == prefix or module.name.startswith(prefix + ".")
+    )
+
+
+def by_package(imports: List[ImportTime]) -> Dict[str, int]:
+    """Returns the microseconds spent per top-level package, slowest first."""
+    packages: Dict[str, int] = {}
+    for module in imports:
+        package = module.name.split(".", 1)[0]
+        packages[package] = packages.get(package, 0) + module.self_us
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
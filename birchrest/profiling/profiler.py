@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import signal
+import stat
+import tempfile
+from contextlib import nullcontext
+from typing import Any, ContextManager, Optional, Set
+
+from ..utils import Logger
+from .sampler import StackSampler
+
+MAX_DURATION = 300.0
+
+_UNTRACKED: ContextManager[Any] = nullcontext()
+
+
+def control_dir() -> str:
+    """
+    The directory `birch profile --pid` exchanges profiling requests and results
+    with a process through, private to the user running both.
+
+    :raises PermissionError: If the directory exists but is not private to the user.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"birchrest-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    status = os.lstat(path)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.getuid()
+        or status.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    ):
+        raise PermissionError(f"{path} is not a directory private to the current user")
+
+    return path
+
+
+def control_path(pid: int) -> str:
+    """
+    The file `birch profile --pid` writes the profiling options of a process to
+    before signalling it.
+    """
+    return os.path.join(control_dir(), f"profile-{pid}.json")
+
+
+class _Tracked:
+    __slots__ = ("profiler", "task")
+
+    def __init__(self, profiler: "Profiler") -> None:
+        self.profiler = profiler
+        self.task: Optional["asyncio.Task[Any]"] = None
+
+    def __enter__(self) -> None:
+        self.task = asyncio.current_task()
+        if self.task is not None:
+            self.profiler._tasks.add(self.task)
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.task is not None:
+            self.profiler._tasks.discard(self.task)
+
+
+class Profiler:
+    """
+    Runs on-demand profiling sessions for an application, one at a time.
+
+    A session samples the event loop thread with a `StackSampler` for a fixed
+    duration and returns collapsed stacks. It can be limited to requests matching a
+    route template, in which case only samples taken while such a request is running
+    on the event loop are kept. Work done for the request in the thread pool or the
+    process pool is not sampled.
+
+    Attributes:
+        interval (float): The default seconds between samples.
+        mode (str): The sampling mode passed to `StackSampler`.
+        route (Optional[str]): The route template the running session is limited to.
+        active (bool): Whether a session is running.
+    """
+
+    def __init__(self, interval: float = 0.005, mode: str = "auto") -> None:
+        """
+        :param interval: The default seconds between samples
+        :param mode: The sampling mode, `signal`, `thread` or `auto`
+        """
+        self.interval = interval
+        self.mode = mode
+        self.route: Optional[str] = None
+        self.active = False
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+
+    async def profile(
+        self,
+        duration: float,
+        route: Optional[str] = None,
+        interval: Optional[float] = None,
+    ) -> str:
+        """
+        Samples the event loop for `duration` seconds.
+
+        :param duration: Seconds to sample for, at most 300
+        :param route: A route template such as `/users/:id` to limit the samples to
+        :param interval: Seconds between samples, defaults to `interval`
+        :return: The samples as collapsed stacks
+        :raises RuntimeError: If a session is already running
+        :raises ValueError: If the duration or interval is out of range
+        """
+        if self.active:
+            raise RuntimeError("A profiling session is already running")
+        if not 0 < duration <= MAX_DURATION:
+            raise ValueError(f"duration must be between 0 and {MAX_DURATION} seconds")
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be positive")
+
+        loop = asyncio.get_running_loop()
+        sampler = StackSampler(
+            interval or self.interval,
+            self.mode,
+            (lambda: asyncio.current_task(loop) in self._tasks) if route else None,
+        )
+
+        self.active = True
+        self.route = route
+        sampler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            sampler.stop()
+            self.active = False
+            self.route = None
+            self._tasks.clear()
+
+        return sampler.collapsed()
+
+    def tracking(self, route: str) -> ContextManager[Any]:
+        """
+        Returns a context manager marking the current task as handling a request to
+        `route` while the running session is limited to that route, and a shared
+        no-op context manager otherwise.
+        """
+        if self.route is None or self.route != route:
+            return _UNTRACKED
+        return _Tracked(self)
+
+    def install_signal_handler(self) -> None:
+        """
+        Starts a session when the process receives `SIGUSR2`, with the options
+        written to `control_path` by `birch profile --pid`. Does nothing on platforms
+        without loop signal handlers.
+        """
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGUSR2, self._on_signal
+            )
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            pass
+
+    def remove_signal_handler(self) -> None:
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR2)
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            pass
+
+    def _on_signal(self) -> None:
+        try:
+            path = control_path(os.getpid())
+            fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+            with os.fdopen(fd, encoding="utf-8") as file:
+                if os.fstat(file.fileno()).st_uid != os.getuid():
+                    Logger.warning(f"Ignoring profiling request {path} owned by another user")
+                    return
+                options = json.load(file)
+            os.remove(path)
+        except (OSError, ValueError) as e:
+            Logger.error("Failed to read profiling request", {"Exception Message": str(e)})
+            return
+
+        asyncio.ensure_future(self._profile_to_file(options))
+
+    async def _profile_to_file(self, options: Any) -> None:
+        output = str(options["output"])
+
+        try:
+            collapsed = await self.profile(
+                float(options.get("duration", 30)),
+                options.get("route"),
+                options.get("interval"),
+            )
+        except (RuntimeError, ValueError) as e:
+            collapsed = f"# error: {e}\n"
+
+        with open(output + ".tmp", "w", encoding="utf-8") as file:
+            file.write(collapsed)
+        os.replace(output + ".tmp", output)
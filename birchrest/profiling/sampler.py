@@ -0,0 +1,118 @@
+import signal
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, List, Optional
+
+
+def frame_label(frame: FrameType) -> str:
+    """Formats a frame as a function name with its file and first line."""
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    A statistical profiler that periodically records the stack of one thread and
+    counts identical stacks, which is cheap enough to run in production.
+
+    In `signal` mode a `SIGPROF` interval timer interrupts the thread, so samples are
+    taken in proportion to CPU time and an idle event loop is not sampled. Signals
+    are only available on Unix and only for the main thread. In `thread` mode a
+    background thread samples the stack at a wall clock interval instead. `auto`
+    picks `signal` when it is available.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        mode (str): The sampling mode, `signal` or `thread`.
+        stacks (Counter[str]): The number of samples per stack, frames joined by `;`
+            from the outermost frame.
+        samples (int): The number of samples taken, including filtered ones.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        mode: str = "auto",
+        accept: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        :param interval: Seconds between samples
+        :param mode: `signal`, `thread` or `auto`
+        :param accept: Called for each sample, which is discarded when it returns False
+        """
+        if mode not in ("auto", "signal", "thread"):
+            raise ValueError(f"Unknown sampling mode: {mode}")
+
+        signals_available = hasattr(signal, "setitimer") and (
+            threading.current_thread() is threading.main_thread()
+        )
+        if mode == "signal" and not signals_available:
+            raise ValueError("Signal sampling requires Unix and the main thread")
+        if mode == "auto":
+            mode = "signal" if signals_available else "thread"
+
+        self.interval = interval
+        self.mode = mode
+        self.accept = accept
+        self.stacks: "Counter[str]" = Counter()
+        self.samples = 0
+        self._thread_id = threading.get_ident()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._previous_handler: Any = None
+
+    def start(self) -> None:
+        """Starts sampling the thread calling this method."""
+        self._thread_id = threading.get_ident()
+        self._stopped.clear()
+
+        if self.mode == "signal":
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._thread = threading.Thread(
+                target=self._run, name="birchrest-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling."""
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        else:
+            self._stopped.set()
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    def collapsed(self) -> str:
+        """
+        Formats the samples as collapsed stacks, one stack and its count per line,
+        which flamegraph.pl, speedscope and inferno read directly.
+        """
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def _record(self, frame: Optional[FrameType]) -> None:
+        self.samples += 1
+        if frame is None or (self.accept is not None and not self.accept()):
+            return
+
+        labels: List[str] = []
+        while frame is not None:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+
+        labels.reverse()
+        self.stacks[";".join(labels)] += 1
+
+    def _on_signal(self, _signum: int, frame: Optional[FrameType]) -> None:
+        self._record(frame)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._record(sys._current_frames().get(self._thread_id))
@@ -0,0 +1,259 @@
+import asyncio
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+from types import FrameType
+from typing import Any, Deque, Dict, List, Optional
+
+from ..http import Request
+from ..utils import Logger
+
+Report = Dict[str, Any]
+
+
+def format_frame(frame: FrameType) -> str:
+    """Formats a frame as a function name with its file and current line."""
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+
+def _thread_stack(frame: Optional[FrameType]) -> List[str]:
+    stack: List[str] = []
+    while frame is not None:
+        stack.append(format_frame(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _task_stack(task: "asyncio.Task[Any]") -> List[str]:
+    """
+    Follows the chain of awaited coroutines of a suspended task, outermost first,
+    down to the coroutine waiting on a future.
+    """
+    stack: List[str] = []
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            break
+        stack.append(format_frame(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+    return stack
+
+
+class _InFlight:
+    __slots__ = ("task", "started", "reported", "report")
+
+    def __init__(self, task: Optional["asyncio.Task[Any]"]) -> None:
+        self.task = task
+        self.started = perf_counter()
+        self.reported = False
+        self.report: Optional[Report] = None
+
+
+class _Watched:
+    __slots__ = ("watchdog", "request")
+
+    def __init__(self, watchdog: "Watchdog", request: Request) -> None:
+        self.watchdog = watchdog
+        self.request = request
+
+    def __enter__(self) -> None:
+        self.watchdog._in_flight[self.request] = _InFlight(asyncio.current_task())
+
+    def __exit__(self, *exc: Any) -> None:
+        entry = self.watchdog._in_flight.pop(self.request, None)
+        if entry is not None and entry.report is not None:
+            entry.report["duration_ms"] = round((perf_counter() - entry.started) * 1000, 3)
+
+
+class Watchdog:
+    """
+    Detects slow requests and a blocked event loop, and keeps a report of each
+    with the stack at the time it was detected.
+
+    A background thread checks the requests in flight every `interval` seconds.
+    When a request has been running for longer than `threshold`, the stack of the
+    task handling it is captured on the event loop, showing what it is waiting for.
+    The report is updated with the total duration once the request completes.
+
+    The same thread measures the event loop lag by scheduling a callback on the
+    loop and timing how long it takes to run. When the loop does not respond
+    within `lag_threshold`, a synchronous call is blocking it, and the stack of the
+    loop thread is captured from the watchdog thread together with the request
+    whose handler was running. The report is updated with the total blocked time
+    once the loop responds again.
+
+    Reports are kept in a ring buffer holding the latest `max_reports`.
+
+    Attributes:
+        threshold (float): Seconds after which a request is reported as slow.
+        lag_threshold (float): Seconds the loop may not respond before it is reported
+            as blocked.
+        interval (float): Seconds between checks.
+        reports (Deque[Report]): The latest reports, oldest first.
+        lag (float): The last measured event loop lag in seconds.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        lag_threshold: float = 0.1,
+        interval: float = 0.05,
+        max_reports: int = 100,
+    ) -> None:
+        """
+        :param threshold: Seconds after which a request is reported as slow
+        :param lag_threshold: Seconds the loop may not respond before it is reported
+        :param interval: Seconds between checks
+        :param max_reports: The number of reports to keep
+        """
+        self.threshold = threshold
+        self.lag_threshold = lag_threshold
+        self.interval = interval
+        self.reports: Deque[Report] = deque(maxlen=max_reports)
+        self.lag = 0.0
+        self._in_flight: Dict[Request, _InFlight] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._beat_sent: Optional[float] = None
+        self._blocked: Optional[Report] = None
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests being handled."""
+        return len(self._in_flight)
+
+    def watch(self, request: Request) -> _Watched:
+        """Returns a context manager tracking a request while it is handled."""
+        return _Watched(self, request)
+
+    def start(self) -> None:
+        """Starts watching the running event loop."""
+        if self._thread is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="birchrest-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the watchdog thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the reports and the current state, as served by the admin route."""
+        return {
+            "in_flight": self.in_flight,
+            "loop_lag_ms": round(self.lag * 1000, 3),
+            "reports": list(self.reports),
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                return
+
+            now = perf_counter()
+            self._check_lag(loop, now)
+
+            for request, entry in list(self._in_flight.items()):
+                if not entry.reported and now - entry.started > self.threshold:
+                    entry.reported = True
+                    loop.call_soon_threadsafe(self._report_slow, request, entry)
+
+    def _check_lag(self, loop: asyncio.AbstractEventLoop, now: float) -> None:
+        if self._beat_sent is None:
+            self._beat_sent = now
+            loop.call_soon_threadsafe(self._beat)
+            return
+
+        blocked_for = now - self._beat_sent
+        if blocked_for > self.lag_threshold and self._blocked is None:
+            report = self._report_blocked(loop, blocked_for)
+            if self._beat_sent is not None:
+                self._blocked = report
+
+    def _beat(self) -> None:
+        """Runs on the event loop once it gets to the scheduled callback."""
+        if self._beat_sent is None:
+            return
+
+        self.lag = perf_counter() - self._beat_sent
+        self._beat_sent = None
+
+        if self._blocked is not None:
+            self._blocked["duration_ms"] = round(self.lag * 1000, 3)
+            Logger.warning("Event loop was blocked", self._blocked)
+            self._blocked = None
+
+    def _report_blocked(
+        self, loop: asyncio.AbstractEventLoop, blocked_for: float
+    ) -> Report:
+        """Captures the stack of the blocked loop thread from the watchdog thread."""
+        frame = sys._current_frames().get(self._loop_thread)
+        task = asyncio.current_task(loop)
+        request = next(
+            (
+                request
+                for request, entry in list(self._in_flight.items())
+                if task is not None and entry.task is task
+            ),
+            None,
+        )
+
+        report = self._report("loop_blocked", blocked_for, request, _thread_stack(frame))
+        self.reports.append(report)
+        return report
+
+    def _report_slow(self, request: Request, entry: _InFlight) -> None:
+        """Captures the stack of a slow request's task on the event loop."""
+        if request not in self._in_flight:
+            return
+
+        stack = _task_stack(entry.task) if entry.task is not None else []
+        report = self._report(
+            "slow_request", perf_counter() - entry.started, request, stack
+        )
+        entry.report = report
+        self.reports.append(report)
+        Logger.warning("Slow request", report)
+
+    @staticmethod
+    def _report(
+        kind: str, duration: float, request: Optional[Request], stack: List[str]
+    ) -> Report:
+        return {
+            "kind": kind,
+            "time": datetime.now().isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "request": (
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "route": request.route,
+                    "correlation_id": request.correlation_id,
+                    "client_address": request.client_address,
+                }
+                if request is not None
+                else None
+            ),
+            "stack": stack,
+        }
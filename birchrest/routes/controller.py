@@ -1,9 +1,12 @@
 from __future__ import annotations
-from typing import Generator, List
+from typing import TYPE_CHECKING, Generator, List, Optional
 from .route import Route
 from ..types import MiddlewareFunction
 from ..utils import Logger
 
+if TYPE_CHECKING:
+    from ..di import Container
+
 
 class Controller:
     """
@@ -21,6 +24,7 @@ class Controller:
         _is_protected (str): Indicates if routes in this controller require protection (e.g., authentication).
         routes (List[Route]): The list of routes collected from the controller's methods.
         controllers (List[Controller]): The list of subcontrollers attached to this controller.
+        _container (Optional[Container]): The container injecting the `Inject` attributes.
     """
 
     def __init__(self) -> None:
@@ -40,13 +44,15 @@ class Controller:
         self._is_protected: str = getattr(self.__class__, "_is_protected", "")
         self.routes: List[Route] = []
         self.controllers: List[Controller] = []
+        self._container: Optional[Container] = None
 
         self._discover_subcontrollers()
 
-        for attr_name in dir(self):
-            method = getattr(self, attr_name)
-
-            if attr_name in self.__class__.__dict__ and hasattr(method, "_http_method"):
+        # Only the methods defined on the class itself are routes, so the attributes
+        # inherited from Controller and object are not looked up for every instance.
+        for attr_name, attr in sorted(vars(self.__class__).items()):
+            if hasattr(attr, "_http_method"):
+                method = getattr(self, attr_name)
                 middlewares = []
 
                 if hasattr(method, "_middlewares"):
@@ -72,6 +78,14 @@ class Controller:
                 if hasattr(method, "_produces"):
                     produces = getattr(method, "_produces")
 
+                cpu_bound = None
+                if hasattr(method, "_cpu_bound"):
+                    cpu_bound = getattr(method, "_cpu_bound")
+
+                websocket = None
+                if hasattr(method, "_websocket"):
+                    websocket = getattr(method, "_websocket")
+
                 openapi_tags: List[str] = []
 
                 if hasattr(self, "_openapi_tags"):
@@ -92,17 +106,23 @@ class Controller:
                         validate_params=validate_params,
                         produces=produces,
                         openapi_tags=openapi_tags,
+                        cpu_bound=cpu_bound,
+                        websocket=websocket,
                     )
                 )
 
     def _discover_subcontrollers(self) -> None:
         """
         Discovers all subclasses of the current `Controller` class and automatically
-        initializes them as subcontrollers.
+        initializes them as subcontrollers, skipping the classes that were replaced
+        by reloading the module defining them.
         """
         subclasses = self.__class__.__subclasses__()
 
         for subclass in subclasses:
+            if subclass.__dict__.get("_replaced", False):
+                continue  # Redefined by reloading its module, see Reloader
+
             Logger.debug(f"Discovered Controller {subclass.__name__}")
             self.controllers.append(subclass())
 
@@ -138,6 +158,19 @@ class Controller:
         for controller in self.controllers:
             controller.resolve_paths(new_prefix, middlewares + self._middlewares)
 
+    def use_container(self, container: Optional[Container]) -> None:
+        """
+        Sets the container injecting the `Inject` attributes of this controller and
+        its subcontrollers.
+
+        :param container: The application's dependency injection container.
+        """
+
+        self._container = container
+
+        for controller in self.controllers:
+            controller.use_container(container)
+
     def collect_routes(self) -> Generator[Route, None, None]:
         """
         Collect and yield all routes defined in this controller and its subcontrollers.
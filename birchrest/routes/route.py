@@ -1,14 +1,28 @@
+from __future__ import annotations
 from dataclasses import is_dataclass
 import re
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from birchrest.exceptions.invalid_validation_model import InvalidValidationModel
 from birchrest.routes.validator import parse_data_class
-from birchrest.utils import dict_to_dataclass
+from birchrest.utils import dict_to_dataclass, to_async, to_async_middleware
+from birchrest.utils.executor import ExecutorFactory, MiddlewareExecutor, is_async_callable
 from ..types import RouteHandler, MiddlewareFunction, AuthHandlerFunction
 from ..http import Request, Response
-from ..exceptions import MissingAuthHandlerError, Unauthorized, BadRequest
+from ..http.background import Cleanup
+from ..http.timing import Timings, timed
+from ..exceptions import (
+    DependencyError,
+    MissingAuthHandlerError,
+    Unauthorized,
+    BadRequest,
+    UpgradeRequired,
+)
 from ..utils import Logger
 
+if TYPE_CHECKING:
+    from ..app.process_pool import ProcessPool
+    from ..di import Container
+
 
 class Route:
     """
@@ -26,6 +40,8 @@ class Route:
         validate_queries (Optional[Any]): A dataclass or schema to validate the query parameters.
         validate_params (Optional[Any]): A dataclass or schema to validate the URL parameters.
         auth_handler (Optional[AuthHandlerFunction]): A function to handle authentication for protected routes.
+        cpu_bound (Optional[Dict[str, Any]]): Process pool options if the handler is CPU-bound.
+        websocket (Optional[Dict[str, Any]]): Connection options if the route accepts WebSockets.
     """
 
     def __init__(
@@ -39,7 +55,9 @@ class Route:
         validate_queries: Optional[Any],
         validate_params: Optional[Any],
         produces: Optional[Any] = None,
-        openapi_tags: List[str] = []
+        openapi_tags: List[str] = [],
+        cpu_bound: Optional[Dict[str, Any]] = None,
+        websocket: Optional[Dict[str, Any]] = None,
     ) -> None:
         """
         Initializes a new `Route` object with the provided handler, method, path, and configurations.
@@ -53,6 +71,8 @@ class Route:
         :param validate_queries: A dataclass or schema to validate the query parameters, if applicable.
         :param validate_params: A dataclass or schema to validate the URL parameters, if applicable.
         :param produces: A dataclass or schema to show what the route returns.
+        :param cpu_bound: Process pool options if the handler should run in a worker process.
+        :param websocket: Connection options if the route accepts WebSocket connections.
         """
 
         self.func = func
@@ -65,10 +85,75 @@ class Route:
         self.validate_params = validate_params
         self.produces = produces
         self.openapi_tags = openapi_tags
+        self.cpu_bound = cpu_bound
+        self.websocket = websocket
         self.auth_handler: Optional[AuthHandlerFunction] = None
         self.param_names: List[Any] = []
         self.requires_params = 0
         self.regex = re.compile(".*")
+        self._handler: Optional[RouteHandler] = None
+        self._auth: Optional[AuthHandlerFunction] = None
+        self._chain: Optional[List[MiddlewareFunction]] = None
+        self._container: Optional[Container] = None
+        self._plan: Tuple[Tuple[str, Any], ...] = ()
+        self._middleware_executor: Optional[MiddlewareExecutor] = None
+        self._sync_middlewares = 0
+
+    def prepare(
+        self,
+        executor: ExecutorFactory,
+        process_pool: Optional[ProcessPool] = None,
+        container: Optional[Container] = None,
+        middleware_executor: Optional[MiddlewareExecutor] = None,
+    ) -> None:
+        """
+        Detects synchronous handlers, auth handlers and middlewares once and wraps them
+        so that they run in the given executor instead of blocking the event loop.
+        CPU-bound handlers are wrapped to run in the process pool instead. WebSocket
+        handlers must be coroutines and are never wrapped. Synchronous middlewares run
+        in the middleware pool, which a request reserves a thread of per synchronous
+        middleware before entering the chain.
+
+        The dependencies the handler declares after the request and response are
+        resolved against the container here, so a request only looks them up.
+
+        :param executor: A callable returning the executor used for synchronous callables.
+        :param process_pool: The pool CPU-bound handlers are executed in.
+        :param container: The container injecting the handler's dependencies.
+        :param middleware_executor: The pool synchronous middlewares run in.
+        :raises ValueError: If the route has more synchronous middlewares than the
+            middleware pool has threads.
+        :raises DependencyError: If a dependency is not registered, or the handler is
+            CPU-bound or a WebSocket handler and declares dependencies.
+        """
+
+        self._container = container
+        self._plan = container.plan(self.func) if container is not None else ()
+        if self._plan and (self.websocket is not None or self.cpu_bound is not None):
+            raise DependencyError(
+                self._plan[0][0],
+                f"dependencies can not be injected into {self.path or '/'}, as "
+                "CPU-bound and WebSocket handlers do not run in the request",
+            )
+
+        if self.websocket is not None:
+            self._handler = self.func
+        elif self.cpu_bound is not None and process_pool is not None:
+            self._handler = process_pool.wrap(
+                self.func, timeout=self.cpu_bound.get("timeout")
+            )
+        else:
+            self._handler = to_async(self.func, executor)
+        pool = middleware_executor or MiddlewareExecutor()
+        self._sync_middlewares = sum(not is_async_callable(m) for m in self.middlewares)
+        if self._sync_middlewares > pool.max_workers:
+            raise ValueError(
+                f"{self.path or '/'} has {self._sync_middlewares} synchronous "
+                f"middlewares, more than the {pool.max_workers} middleware threads"
+            )
+        self._middleware_executor = pool if self._sync_middlewares else None
+        self._chain = [to_async_middleware(m, pool) for m in self.middlewares]
+        self._auth = to_async(self.auth_handler, executor) if self.auth_handler else None
 
     def resolve(self, prefix: str, middlewares: List[MiddlewareFunction]) -> None:
         """
@@ -107,12 +192,16 @@ class Route:
         :return: The result of the route handler function.
         """
 
+        timings = getattr(req, "timings", None)
+
         if self.is_protected:
-            if not self.auth_handler:
+            auth_handler = self._auth or self.auth_handler
+            if not auth_handler:
                 raise MissingAuthHandlerError()
 
             try:
-                auth_result = await self.auth_handler(req, res)
+                with timed(timings, "auth"):
+                    auth_result = await auth_handler(req, res)
 
                 if not auth_result:
                     Logger.debug(
@@ -139,7 +228,8 @@ class Route:
                 if isinstance(self.validate_body, type) and is_dataclass(
                     self.validate_body
                 ):
-                    parsed_data = parse_data_class(self.validate_body, body_data)
+                    with timed(timings, "validation"):
+                        parsed_data = parse_data_class(self.validate_body, body_data)
                     req.body = parsed_data
 
                 else:
@@ -151,14 +241,16 @@ class Route:
                 )
                 raise BadRequest(f"Body validation failed: {str(e)}") from e
         else:
-            req.body = dict_to_dataclass("body", req.body)
+            with timed(timings, "dataclass"):
+                req.body = dict_to_dataclass("body", req.body)
 
         if self.validate_queries:
             try:
                 if isinstance(self.validate_body, type) and is_dataclass(
                     self.validate_body
                 ):
-                    parsed_data = parse_data_class(self.validate_body, body_data)
+                    with timed(timings, "validation"):
+                        parsed_data = parse_data_class(self.validate_body, body_data)
                     req.queries = parsed_data
 
                 else:
@@ -170,14 +262,16 @@ class Route:
                 )
                 raise BadRequest(f"Query validation failed: {str(e)}")
         else:
-            req.queries = dict_to_dataclass("queries", req.queries)
+            with timed(timings, "dataclass"):
+                req.queries = dict_to_dataclass("queries", req.queries)
 
         if self.validate_params:
             try:
                 if isinstance(self.validate_params, type) and is_dataclass(
                     self.validate_params
                 ):
-                    parsed_data = parse_data_class(self.validate_params, req.params)
+                    with timed(timings, "validation"):
+                        parsed_data = parse_data_class(self.validate_params, req.params)
                     req.params = parsed_data
 
                 else:
@@ -189,17 +283,89 @@ class Route:
                 )
                 raise BadRequest(f"Param validation failed: {str(e)}")
         else:
-            req.params = dict_to_dataclass("params", req.params)
+            with timed(timings, "dataclass"):
+                req.params = dict_to_dataclass("params", req.params)
+
+        handler = self._handler or self.func
+        middlewares = self._chain if self._chain is not None else self.middlewares
 
         async def run_middlewares(index: int) -> None:
-            if index < len(self.middlewares):
-                middleware = self.middlewares[index]
-                await middleware(req, res, lambda: run_middlewares(index + 1))
+            if index < len(middlewares):
+                middleware = middlewares[index]
+                with timed(timings, "middlewares"):
+                    await middleware(req, res, lambda: run_middlewares(index + 1))
+            elif self.websocket is not None:
+                self._accept_websocket(req, res, handler)
+            elif self._plan and self._container is not None:
+                await self._inject(handler, req, res, timings)
             else:
-                await self.func(req, res)
+                with timed(timings, "handler"):
+                    await handler(req, res)
+
+        if self._middleware_executor is not None:
+            async with self._middleware_executor.reserve(self._sync_middlewares):
+                return await run_middlewares(0)
 
         return await run_middlewares(0)
 
+    async def _inject(
+        self,
+        handler: Callable[..., Awaitable[Any]],
+        req: Request,
+        res: Response,
+        timings: Optional[Timings],
+    ) -> None:
+        """
+        Calls the handler with its dependencies. Request scoped dependencies are
+        released once the handler has completed, or after the background tasks it
+        added to the response, which may still use them.
+        """
+        from ..di.container import RequestScope  # pylint: disable=import-outside-toplevel
+
+        assert self._container is not None
+        container = self._container
+        scope = RequestScope()
+        deferred = False
+
+        try:
+            kwargs = await container.resolve(self._plan, req, scope)
+            with timed(timings, "handler"):
+                await handler(req, res, **kwargs)
+
+            if scope.teardowns and res.background_tasks:
+                res.background_tasks.append(
+                    (Cleanup(lambda: container.release(scope)), (), {})
+                )
+                deferred = True
+        finally:
+            if not deferred:
+                await container.release(scope)
+
+    def _accept_websocket(
+        self, req: Request, res: Response, handler: Callable[..., Awaitable[Any]]
+    ) -> None:
+        """
+        Validates the WebSocket handshake and accepts it, so the server runs the
+        handler on the connection after sending the 101 response.
+
+        :raises UpgradeRequired: If the request is not a WebSocket handshake.
+        :raises BadRequest: If the client uses an unsupported protocol version.
+        """
+
+        key = req.get_header("sec-websocket-key")
+        upgrade = (req.get_header("upgrade") or "").lower()
+
+        if upgrade != "websocket" or not key:
+            res.set_header("Upgrade", "websocket")
+            raise UpgradeRequired("This endpoint only accepts WebSocket connections")
+
+        if req.get_header("sec-websocket-version") != "13":
+            res.set_header("Sec-WebSocket-Version", "13")
+            raise BadRequest("Unsupported WebSocket version")
+
+        assert self.websocket is not None
+        res.accept_websocket(key, lambda ws: handler(req, ws), **self.websocket)
+
     def match(self, request_path: str) -> Optional[Dict[str, str]]:
         """
         Checks if the given request path matches the route's path pattern.
@@ -232,6 +398,7 @@ class Route:
         :param auth_handler: A function that handles authentication for protected routes.
         """
         self.auth_handler = auth_handler
+        self._auth = None
 
     def make_protected(self) -> None:
         """
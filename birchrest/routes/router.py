@@ -0,0 +1,197 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .route import Route
+
+_REGEX_CHARACTERS = set(".^$*+?{}[]\\|()")
+_PARAM_SEGMENT = re.compile(r":\w+")
+
+RouteMatch = Tuple[Optional[Route], Dict[str, str], bool]
+
+
+def match_route(routes: Sequence[Route], method: str, path: str) -> RouteMatch:
+    """
+    Finds the first route matching a request path and method.
+
+    :param routes: The routes in the order they are matched
+    :param method: The HTTP method of the request
+    :param path: The request path without the query string
+    :return: The matched route or None, its path parameters, and whether any route
+        matched the path regardless of the method
+    """
+    route_exists = False
+
+    for route in routes:
+        params = route.match(path)
+
+        if params is not None:
+            route_exists = True
+
+            if route.is_method_allowed(method):
+                return route, params, True
+
+    return None, {}, route_exists
+
+
+class _Node:
+    """A path segment of the route tree."""
+
+    __slots__ = ("literals", "param", "routes", "any_route")
+
+    def __init__(self) -> None:
+        self.literals: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.routes: Dict[str, Tuple[int, Route]] = {}
+        self.any_route = False
+
+
+class RouteTable:
+    """
+    The resolved routes of an application compiled for lookup, matching requests
+    exactly like `match_route` without trying every route in turn.
+
+    The routes are split into their path segments and stored in a tree, where each
+    segment is either a literal or a `:param`, which matches any non-empty segment.
+    A lookup walks the tree along the request path, following both the literal and
+    the parameter branch of a node when both exist, and picks the route defined
+    first among those reached. Routes whose path contains regex characters, such as
+    `.`, can match across segments and are tried in turn after the walk.
+
+    Attributes:
+        routes (List[Route]): The routes in the order they are matched.
+    """
+
+    def __init__(self, routes: Sequence[Route]) -> None:
+        self.routes = list(routes)
+        self._root = _Node()
+        self._patterns: List[Tuple[int, Route]] = []
+        self._kinds: List[str] = []
+        self._nodes = 1
+
+        for index, route in enumerate(self.routes):
+            kind = self._kind(route)
+            self._kinds.append(kind)
+
+            if kind == "pattern":
+                self._patterns.append((index, route))
+            else:
+                self._insert(index, route)
+
+    @staticmethod
+    def _kind(route: Route) -> str:
+        for segment in route.path.split("/"):
+            if _PARAM_SEGMENT.fullmatch(segment):
+                continue
+            if any(character in _REGEX_CHARACTERS for character in segment):
+                return "pattern"
+            if ":" in segment:
+                return "pattern"
+        return "dynamic" if route.param_names else "static"
+
+    def _insert(self, index: int, route: Route) -> None:
+        node = self._root
+        for segment in route.path.split("/"):
+            if _PARAM_SEGMENT.fullmatch(segment):
+                if node.param is None:
+                    node.param = _Node()
+                    self._nodes += 1
+                node = node.param
+            else:
+                child = node.literals.get(segment)
+                if child is None:
+                    child = node.literals[segment] = _Node()
+                    self._nodes += 1
+                node = child
+
+        node.any_route = True
+        node.routes.setdefault(route.method, (index, route))
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def match(self, method: str, path: str) -> RouteMatch:
+        """
+        Finds the first route matching a request path and method.
+
+        :param method: The HTTP method of the request
+        :param path: The request path without the query string
+        :return: The matched route or None, its path parameters, and whether any route
+            matched the path regardless of the method
+        """
+        segments = path.split("/")
+        depth = len(segments)
+        found: Optional[Tuple[int, Route]] = None
+        route_exists = False
+        stack = [(self._root, 0)]
+
+        while stack:
+            node, position = stack.pop()
+
+            if position == depth:
+                if node.any_route:
+                    route_exists = True
+                    entry = node.routes.get(method)
+                    if entry is not None and (found is None or entry[0] < found[0]):
+                        found = entry
+                continue
+
+            segment = segments[position]
+            child = node.literals.get(segment)
+            if child is not None:
+                stack.append((child, position + 1))
+            if node.param is not None and segment:
+                stack.append((node.param, position + 1))
+
+        for index, route in self._patterns:
+            if found is not None and index > found[0]:
+                break
+
+            params = route.match(path)
+            if params is not None:
+                route_exists = True
+
+                if route.is_method_allowed(method):
+                    return route, params, True
+
+        if found is None:
+            return None, {}, route_exists
+
+        route = found[1]
+        params = route.match(path) if route.param_names else {}
+        return route, params or {}, True
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """
+        Describes each route in the order they are matched: its method, path,
+        handler, and whether it is found by walking the tree of literal segments,
+        of segments with parameters, or by trying its regex.
+        """
+        entries = []
+
+        for index, route in enumerate(self.routes):
+            handler = getattr(route.func, "__qualname__", repr(route.func))
+            entries.append(
+                {
+                    "method": route.method,
+                    "path": route.path or "/",
+                    "handler": handler,
+                    "kind": self._kinds[index],
+                    "params": list(route.param_names),
+                    "protected": bool(route.is_protected),
+                }
+            )
+
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarizes the routes per kind and the size of the route tree."""
+        return {
+            "routes": len(self.routes),
+            "static": self._kinds.count("static"),
+            "dynamic": self._kinds.count("dynamic"),
+            "pattern": self._kinds.count("pattern"),
+            "nodes": self._nodes,
+            "depth": max(
+                (route.path.count("/") + 1 for route in self.routes), default=0
+            ),
+        }
@@ -0,0 +1,38 @@
+"""
+This module provides distributed tracing for the BirchRest framework.
+
+Components:
+- **Tracer**: Samples requests and passes their spans to an exporter.
+- **Trace**, **Span**: The spans recorded for a sampled request.
+- **SpanExporter**: Base class for exporters.
+- **BatchExporter**: Exports spans in batches from a background thread.
+- **FileExporter**: Appends spans to a file as JSON lines.
+- **InMemoryExporter**: Keeps spans in a list, for tests.
+
+Tracing is enabled with `BirchRest(tracer=Tracer(exporter))`. Incoming W3C
+`traceparent` headers are continued, and the stages of handling a request are
+recorded as spans of sampled requests.
+
+Exported components:
+- `Tracer`
+- `Trace`
+- `Span`
+- `SpanExporter`
+- `BatchExporter`
+- `FileExporter`
+- `InMemoryExporter`
+"""
+
+from .span import Trace, Span
+from .exporters import SpanExporter, BatchExporter, FileExporter, InMemoryExporter
+from .tracer import Tracer
+
+__all__ = [
+    "Tracer",
+    "Trace",
+    "Span",
+    "SpanExporter",
+    "BatchExporter",
+    "FileExporter",
+    "InMemoryExporter",
+]
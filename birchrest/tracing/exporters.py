@@ -0,0 +1,170 @@
+import json
+import queue
+import threading
+from time import monotonic
+from typing import List, Optional
+
+from ..utils import Logger
+from .span import SpanRecord
+
+
+class SpanExporter:
+    """
+    Base class for exporters, which receive the spans of each sampled request.
+
+    `export` is called on the event loop and must not block; exporters doing I/O
+    should be wrapped in a `BatchExporter`.
+    """
+
+    def export(self, spans: List[SpanRecord]) -> None:
+        """
+        Exports the spans of a request.
+
+        :param spans: The span records, as returned by `Trace.export`
+        """
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """Flushes buffered spans and releases resources."""
+
+
+class InMemoryExporter(SpanExporter):
+    """
+    Keeps exported spans in a list, for tests.
+
+    Attributes:
+        spans (List[SpanRecord]): The exported spans.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[SpanRecord] = []
+
+    def export(self, spans: List[SpanRecord]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        """Removes the exported spans."""
+        self.spans.clear()
+
+
+class FileExporter(SpanExporter):
+    """
+    Appends spans to a file as JSON lines, one span per line.
+
+    Attributes:
+        path (str): The file the spans are written to.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[SpanRecord]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+class BatchExporter(SpanExporter):
+    """
+    Collects spans in a bounded queue and passes them to another exporter in batches
+    from a background thread, so exporting does not block the event loop.
+
+    When the queue is full, the spans of further requests are dropped rather than
+    slowing down requests.
+
+    Attributes:
+        exporter (SpanExporter): The exporter receiving the batches.
+        batch_size (int): The maximum number of spans per batch.
+        interval (float): Seconds to wait for a batch to fill before exporting it.
+        dropped (int): The number of spans dropped because the queue was full.
+    """
+
+    _STOP: List[SpanRecord] = []
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue: int = 2048,
+        batch_size: int = 512,
+        interval: float = 5.0,
+    ) -> None:
+        """
+        :param exporter: The exporter receiving the batches
+        :param max_queue: The maximum number of requests whose spans are queued
+        :param batch_size: The maximum number of spans per batch
+        :param interval: Seconds to wait for a batch to fill before exporting it
+        """
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[List[SpanRecord]]" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[SpanRecord]) -> None:
+        if self._thread is None:
+            self._start()
+
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Exports the queued spans and stops the background thread.
+
+        :param timeout: Seconds to wait for the queued spans to be exported
+        """
+        thread = self._thread
+        if thread is not None:
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                Logger.warning("Span queue did not drain, dropping queued spans")
+            thread.join(timeout)
+            self._thread = None
+
+        self.exporter.shutdown()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="birchrest-span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch: List[SpanRecord] = []
+        deadline = monotonic() + self.interval
+
+        while True:
+            try:
+                spans = self._queue.get(timeout=max(deadline - monotonic(), 0))
+            except queue.Empty:
+                spans = []
+
+            if spans is self._STOP:
+                if batch:
+                    self._flush(batch)
+                return
+
+            batch.extend(spans)
+
+            if len(batch) >= self.batch_size or monotonic() >= deadline:
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                deadline = monotonic() + self.interval
+
+    def _flush(self, batch: List[SpanRecord]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            Logger.error(
+                "Span export failed",
+                {"Exception Type": type(e).__name__, "Exception Message": str(e)},
+            )
@@ -0,0 +1,149 @@
+from time import perf_counter_ns, time_ns
+from typing import Any, Dict, List, Optional
+
+from ..http.trace_context import new_span_id
+
+SpanRecord = Dict[str, Any]
+
+
+class Span:
+    """
+    A timed operation within a trace. Timestamps are `perf_counter_ns` values and
+    are converted to wall clock time when the span is exported.
+
+    Attributes:
+        name (str): The name of the operation.
+        span_id (str): The ID of the span, 16 hex characters.
+        parent_id (Optional[str]): The ID of the enclosing span, None for the root
+            span of a trace started by this service.
+        start (int): The `perf_counter_ns` timestamp the span started at.
+        end (Optional[int]): The `perf_counter_ns` timestamp the span ended at.
+        attributes (Dict[str, Any]): Key value pairs describing the operation.
+        error (bool): Whether the operation failed.
+    """
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], start: int) -> None:
+        self.name = name
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error = False
+
+
+class _SpanScope:
+    __slots__ = ("trace", "name", "span")
+
+    def __init__(self, trace: "Trace", name: str) -> None:
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> Span:
+        self.span = self.trace.start_span(self.name)
+        return self.span
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            self.span.error = True
+        self.trace.end_span()
+
+
+class Trace:
+    """
+    The spans recorded for one sampled request. The root span covers the whole
+    request and the stages recorded by the framework are nested in it.
+
+    Spans are kept on a stack, so spans started with `span` must be properly nested
+    and must not be started from tasks running concurrently within the request.
+
+    Attributes:
+        trace_id (str): The ID of the trace, 32 hex characters.
+        root (Span): The span covering the request.
+        spans (List[Span]): All spans of the request, starting with the root.
+    """
+
+    __slots__ = ("trace_id", "root", "spans", "_stack", "_clock_offset")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        start: Optional[int] = None,
+    ) -> None:
+        """
+        :param name: The name of the root span
+        :param trace_id: The ID of the trace
+        :param parent_id: The span ID of the caller, if the trace was propagated
+        :param start: The `perf_counter_ns` timestamp the request started at
+        """
+        self._clock_offset = time_ns() - perf_counter_ns()
+        self.trace_id = trace_id
+        self.root = Span(name, parent_id, perf_counter_ns() if start is None else start)
+        self.spans: List[Span] = [self.root]
+        self._stack: List[Span] = [self.root]
+
+    def start_span(self, name: str, start: Optional[int] = None) -> Span:
+        """Starts a span nested in the current span."""
+        span = Span(
+            name,
+            self._stack[-1].span_id,
+            perf_counter_ns() if start is None else start,
+        )
+        self.spans.append(span)
+        self._stack.append(span)
+        return span
+
+    def end_span(self, end: Optional[int] = None) -> None:
+        """Ends the current span."""
+        if len(self._stack) > 1:
+            self._stack.pop().end = perf_counter_ns() if end is None else end
+
+    def span(self, name: str) -> _SpanScope:
+        """
+        Returns a context manager recording a span, for timing work such as
+        database queries inside a handler. The span is marked as failed when the
+        block raises.
+
+        :param name: The name of the span
+        """
+        return _SpanScope(self, name)
+
+    def traceparent(self) -> str:
+        """Formats the current span as a `traceparent` header value."""
+        return f"00-{self.trace_id}-{self._stack[-1].span_id}-01"
+
+    def finish(self, end: Optional[int] = None) -> None:
+        """Ends the root span and any span left open."""
+        end = perf_counter_ns() if end is None else end
+        for span in self._stack:
+            if span.end is None:
+                span.end = end
+        del self._stack[1:]
+
+    def export(self, service: str) -> List[SpanRecord]:
+        """
+        Converts the spans to records with wall clock timestamps in nanoseconds
+        since the epoch, as passed to span exporters.
+        """
+        offset = self._clock_offset
+        return [
+            {
+                "trace_id": self.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "service": service,
+                "start_time_unix_nano": span.start + offset,
+                "end_time_unix_nano": (
+                    span.end if span.end is not None else span.start
+                )
+                + offset,
+                "attributes": span.attributes,
+                "status": "error" if span.error else "ok",
+            }
+            for span in self.spans
+        ]
@@ -0,0 +1,108 @@
+import random
+from typing import Optional
+
+from ..http import Request, Response
+from ..http.trace_context import TraceContext, new_span_id, new_trace_id
+from .exporters import SpanExporter
+from .span import Trace
+
+
+class Tracer:
+    """
+    Decides which requests are traced and passes their spans to an exporter.
+
+    A request is sampled when its caller sampled it, as signalled by the
+    `traceparent` header, and otherwise with probability `sample_rate`. Requests
+    that are not sampled only get a trace context for propagation, so tracing
+    costs next to nothing for them.
+
+    Attributes:
+        exporter (SpanExporter): The exporter receiving the spans of sampled requests.
+        sample_rate (float): The fraction of requests without a sampled caller to trace.
+        service (str): The service name added to exported spans.
+        respect_parent (bool): Whether to follow the sampling decision of the caller.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        sample_rate: float = 0.01,
+        service: str = "birchrest",
+        respect_parent: bool = True,
+    ) -> None:
+        """
+        :param exporter: The exporter receiving the spans of sampled requests
+        :param sample_rate: The fraction of requests without a sampled caller to trace
+        :param service: The service name added to exported spans
+        :param respect_parent: Whether to follow the sampling decision of the caller
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.service = service
+        self.respect_parent = respect_parent
+
+    def start(self, request: Request) -> Optional[Trace]:
+        """
+        Starts a trace for a request if it is sampled. Requests without a trace
+        context get a new one, whose trace ID also becomes their correlation ID.
+
+        :param request: The incoming request
+        :return: The trace, or None if the request is not sampled
+        """
+        context = request.trace_context
+
+        if context is not None and self.respect_parent:
+            sampled = context.sampled
+        else:
+            sampled = random.random() < self.sample_rate
+
+        if not sampled:
+            if context is None:
+                request.trace_context = TraceContext(new_trace_id(), new_span_id(), False)
+                request.correlation_id = request.trace_context.trace_id
+            return None
+
+        timings = request.timings
+        start = timings.started if timings is not None else None
+
+        if context is None:
+            trace = Trace(request.method, new_trace_id(), start=start)
+            request.correlation_id = trace.trace_id
+        else:
+            trace = Trace(request.method, context.trace_id, context.parent_id, start)
+
+        if timings is not None and "parse" in timings.stages:
+            trace.start_span("parse", timings.started)
+            trace.end_span(timings.started + timings.stages["parse"])
+
+        request.trace = trace
+        return trace
+
+    def finish(self, trace: Trace, request: Request, response: Response) -> None:
+        """
+        Ends the trace of a handled request and exports its spans.
+
+        :param trace: The trace returned by `start`
+        :param request: The handled request
+        :param response: The response to the request
+        """
+        trace.finish()
+
+        root = trace.root
+        status = response._status_code
+        if request.route is not None:
+            root.name = f"{request.method} {request.route}"
+            root.attributes["http.route"] = request.route
+        root.attributes["http.method"] = request.method
+        root.attributes["http.target"] = request.path
+        root.attributes["http.status_code"] = status
+        root.error = status >= 500
+
+        self.exporter.export(trace.export(self.service))
+
+    def shutdown(self) -> None:
+        """Flushes the exporter."""
+        self.exporter.shutdown()
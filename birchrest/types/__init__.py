@@ -8,6 +8,8 @@ Types:
 - **AuthHandlerFunction**: Type for authentication handler functions.
 - **FuncType**: Generic type for callable functions.
 - **ErrorHandler**: Defines a type for error handling functions.
+- **LifecycleHook**: Type for functions run when the application starts up or shuts down.
+- **TimingHook**: Type for functions receiving the stage timings of a handled request.
 
 Exported types:
 - `NextFunction`
@@ -16,6 +18,8 @@ Exported types:
 - `AuthHandlerFunction`
 - `FuncType`
 - `ErrorHandler`
+- `LifecycleHook`
+- `TimingHook`
 """
 
 
@@ -26,6 +30,8 @@ from .types import (
     AuthHandlerFunction,
     FuncType,
     ErrorHandler,
+    LifecycleHook,
+    TimingHook,
 )
 
 __all__ = [
@@ -35,4 +41,6 @@ __all__ = [
     "AuthHandlerFunction",
     "FuncType",
     "ErrorHandler",
+    "LifecycleHook",
+    "TimingHook",
 ]
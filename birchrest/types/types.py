@@ -1,5 +1,6 @@
 from typing import Callable, TypeVar, Any, Awaitable
 from ..http import Request, Response
+from ..http.timing import Timings
 
 NextFunction = Callable[[], Awaitable[None]]
 
@@ -12,3 +13,7 @@ RouteHandler = Callable[[Request, Response], Awaitable[None]]
 FuncType = TypeVar("FuncType", bound=Callable[..., Awaitable[Any]])
 
 ErrorHandler = Callable[[Request, Response, Exception], Awaitable[None]]
+
+LifecycleHook = Callable[[], Awaitable[None]]
+
+TimingHook = Callable[[Request, Response, Timings], None]
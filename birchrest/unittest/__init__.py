@@ -2,13 +2,17 @@
 This module provides the `TestAdapter`, a wrapper around the BirchRest app to simplify unit testing.
 
 - **TestAdapter**: Facilitates testing by providing an easy way to simulate requests and inspect responses.
+- **BenchResult**: The throughput and latency percentiles measured by `TestAdapter.bench`.
 
 Exported components:
 - `TestAdapter`
+- `BirchRestTestCase`
+- `BenchResult`
 """
 
 
 from .test_adapter import TestAdapter
 from .birchrest_test_case import BirchRestTestCase
+from .bench import BenchResult
 
-__all__ = ["TestAdapter", "BirchRestTestCase"]
+__all__ = ["TestAdapter", "BirchRestTestCase", "BenchResult"]
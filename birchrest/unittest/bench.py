@@ -0,0 +1,78 @@
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from ..benchmarks.histogram import LatencyHistogram
+from ..http.timing import Timings
+
+
+class BenchResult:
+    """
+    The outcome of `TestAdapter.bench`.
+
+    Attributes:
+        requests (int): The number of requests handled.
+        concurrency (int): The number of requests in flight at a time.
+        duration (float): The seconds taken to handle every request.
+        background_duration (float): The seconds the background tasks of the
+            responses took to finish after the last request was handled. Not included
+            in `duration`.
+        statuses (Counter): The number of responses per status code.
+        latency (LatencyHistogram): The time each request took in `handle_request`.
+        stages (Dict[str, LatencyHistogram]): The time spent per stage, such as
+            `routing` or `handler`, when timing was enabled. A stage is recorded only
+            for the requests that went through it.
+    """
+
+    def __init__(self, requests: int, concurrency: int) -> None:
+        self.requests = requests
+        self.concurrency = concurrency
+        self.duration = 0.0
+        self.background_duration = 0.0
+        self.statuses: "Counter[int]" = Counter()
+        self.latency = LatencyHistogram()
+        self.stages: Dict[str, LatencyHistogram] = {}
+
+    def record(self, latency: float, status: int, timings: Optional[Timings]) -> None:
+        """Records a handled request and the stage timings recorded for it."""
+        self.latency.record(latency)
+        self.statuses[status] += 1
+
+        if timings is None:
+            return
+
+        for stage, duration in timings.stages.items():
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(duration / 1e9)
+
+    @property
+    def throughput(self) -> float:
+        """Requests handled per second."""
+        return self.requests / self.duration if self.duration else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """Returns a latency percentile in seconds, such as `percentile(99)`."""
+        return self.latency.percentile(percentile)
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the results as a dictionary with latencies in milliseconds."""
+        return {
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "duration_s": round(self.duration, 6),
+            "background_s": round(self.background_duration, 6),
+            "throughput_rps": round(self.throughput, 2),
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency": self.latency.summary(),
+            "stages": {
+                stage: histogram.summary() for stage, histogram in self.stages.items()
+            },
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"<BenchResult {self.requests} requests, {self.throughput:,.0f} req/s, "
+            f"p50 {self.percentile(50) * 1000:.3f} ms, "
+            f"p99 {self.percentile(99) * 1000:.3f} ms>"
+        )
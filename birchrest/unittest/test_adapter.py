@@ -1,8 +1,12 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+import asyncio
 import json
+from time import perf_counter
 from birchrest.http.request import Request
 from birchrest.http.response import Response
+from birchrest.http.timing import Timings
 from ..app.birchrest_app import BirchRest
+from .bench import BenchResult
 
 
 class TestAdapter:
@@ -29,6 +33,7 @@ class TestAdapter:
         delete(path, headers, body): Simulates a DELETE request to the application.
         head(path, headers): Simulates a HEAD request to the application.
         options(path, headers): Simulates an OPTIONS request to the application.
+        bench(method, path, n, concurrency): Measures the throughput and latency of a route.
         _generate_request(method, path, headers, body): Helper method to create a `Request` object.
     """
 
@@ -41,45 +46,125 @@ class TestAdapter:
     ) -> Response:
         """Simulate a GET request."""
         request = self._generate_request("GET", path, headers, body)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
 
     async def post(
         self, path: str, headers: Dict[str, str] = {}, body: Optional[Any] = None
     ) -> Response:
         """Simulate a POST request."""
         request = self._generate_request("POST", path, headers, body)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
 
     async def put(
         self, path: str, headers: Dict[str, str] = {}, body: Optional[Any] = None
     ) -> Response:
         """Simulate a PUT request."""
         request = self._generate_request("PUT", path, headers, body)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
 
     async def patch(
         self, path: str, headers: Dict[str, str] = {}, body: Optional[Any] = None
     ) -> Response:
         """Simulate a PATCH request."""
         request = self._generate_request("PATCH", path, headers, body)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
 
     async def delete(
         self, path: str, headers: Dict[str, str] = {}, body: Optional[Any] = None
     ) -> Response:
         """Simulate a DELETE request."""
         request = self._generate_request("DELETE", path, headers, body)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
 
     async def head(self, path: str, headers: Dict[str, str] = {}) -> Response:
         """Simulate a HEAD request."""
         request = self._generate_request("HEAD", path, headers)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
 
     async def options(self, path: str, headers: Dict[str, str] = {}) -> Response:
         """Simulate an OPTIONS request."""
         request = self._generate_request("OPTIONS", path, headers)
-        return await self.app.handle_request(request)
+        return await self._handle(request)
+
+    async def bench(
+        self,
+        method: str,
+        path: str,
+        n: int = 1000,
+        concurrency: int = 10,
+        headers: Dict[str, str] = {},
+        body: Optional[Any] = None,
+        timing: bool = False,
+        warmup: int = 0,
+    ) -> BenchResult:
+        """
+        Benchmarks a route by handling `n` simulated requests, at most `concurrency` at
+        a time on the running event loop, and measuring the time each spends in
+        `handle_request`. No sockets are involved and the body is serialized once, so
+        the results reflect the application rather than the transport.
+
+        :param method: The HTTP method
+        :param path: The path including any query string
+        :param n: The number of requests to measure
+        :param concurrency: The number of requests in flight at a time
+        :param headers: The request headers
+        :param body: The request body, serialized as JSON
+        :param timing: Whether to record the time spent per stage of each request
+        :param warmup: The number of requests to handle before measuring
+        :return: The throughput, latency percentiles, statuses and stage timings
+        """
+        if n < 1 or concurrency < 1:
+            raise ValueError("n and concurrency must be at least 1")
+
+        encoded = json.dumps(body)
+
+        def generate() -> Request:
+            request = Request(
+                method, path, "HTTP/1.1", dict(headers), encoded, "testadapter-agent"
+            )
+            if timing:
+                request.timings = Timings()
+            return request
+
+        for _ in range(warmup):
+            await self._handle(generate())
+
+        result = BenchResult(n, concurrency)
+        remaining = n
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                request = generate()
+
+                started = perf_counter()
+                response = await self.app.handle_request(request)
+                result.record(
+                    perf_counter() - started, response._status_code, request.timings
+                )
+                task = self.app.background.run(response)
+                if task is not None:
+                    background.append(task)
+
+        background: List["asyncio.Task[None]"] = []
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, n))))
+        result.duration = perf_counter() - started
+
+        await asyncio.gather(*background)
+        result.background_duration = perf_counter() - started - result.duration
+
+        return result
+
+    async def _handle(self, request: Request) -> Response:
+        """
+        Handles a request and runs the background tasks of its response before
+        returning it, so a test can check their effects.
+        """
+        response = await self.app.handle_request(request)
+        await self.app.run_background(response)
+        return response
 
     def _generate_request(
         self,
@@ -1,5 +1,13 @@
 from .artwork import get_artwork
 from .logger import Logger
 from .dict_to_dataclass import dict_to_dataclass
+from .executor import is_async_callable, to_async, to_async_middleware
 
-__all__ = ["get_artwork", "Logger", "dict_to_dataclass"]
+__all__ = [
+    "get_artwork",
+    "Logger",
+    "dict_to_dataclass",
+    "is_async_callable",
+    "to_async",
+    "to_async_middleware",
+]
@@ -0,0 +1,193 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+ExecutorFactory = Callable[[], Optional[Executor]]
+
+
+def is_async_callable(func: Any) -> bool:
+    """
+    Determines whether calling `func` produces an awaitable. Looks through
+    functools.partial objects, decorator wrappers that set `__wrapped__`
+    (like the route decorators) and callable objects with an async `__call__`.
+
+    Parameters:
+        func (Any): The callable to inspect.
+
+    Returns:
+        bool: True if the callable is a coroutine function.
+    """
+    while isinstance(func, functools.partial):
+        func = func.func
+
+    if asyncio.iscoroutinefunction(func):
+        return True
+
+    try:
+        unwrapped = inspect.unwrap(func)
+    except ValueError:
+        unwrapped = func
+
+    if asyncio.iscoroutinefunction(unwrapped):
+        return True
+
+    if inspect.isfunction(unwrapped) or inspect.ismethod(unwrapped):
+        return False
+
+    return asyncio.iscoroutinefunction(getattr(unwrapped, "__call__", None))
+
+
+def to_async(
+    func: Callable[..., Any], executor: ExecutorFactory
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Returns an awaitable version of `func`. Coroutine functions are returned unchanged,
+    synchronous callables are executed in the executor returned by `executor` so they
+    do not block the event loop. Context variables are propagated to the worker thread.
+
+    Parameters:
+        func (Callable): The handler to convert.
+        executor (ExecutorFactory): Returns the executor to run synchronous calls in.
+
+    Returns:
+        Callable[..., Awaitable[Any]]: A coroutine function with the same signature.
+    """
+    if is_async_callable(func):
+        return func
+
+    async def run_in_executor(*args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        result = await loop.run_in_executor(executor(), call)
+
+        if inspect.isawaitable(result):
+            return await result
+
+        return result
+
+    return run_in_executor
+
+
+class MiddlewareExecutor:
+    """
+    The bounded thread pool synchronous middlewares run in, separate from the pool
+    of synchronous handlers.
+
+    A synchronous middleware holds its thread while the rest of the chain runs, so a
+    request going through `k` of them needs `k` threads at once. Before entering its
+    chain, a request reserves all of them with `reserve`, and requests that do not
+    fit wait on the event loop. Every request in a chain therefore has the threads
+    it needs, and neither this pool nor the handler pool can deadlock.
+
+    Attributes:
+        max_workers (int): The number of threads.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """
+        :param max_workers: The number of threads, defaults to the ThreadPoolExecutor
+            default.
+        :raises ValueError: If `max_workers` is not positive.
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._available = self.max_workers
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def in_use(self) -> int:
+        """The number of threads reserved by requests."""
+        return self.max_workers - self._available
+
+    @asynccontextmanager
+    async def reserve(self, threads: int) -> AsyncIterator[None]:
+        """
+        Reserves `threads` threads for the duration of the `async with` block, waiting
+        until enough are free.
+
+        :raises ValueError: If more threads are requested than the pool has.
+        """
+        if threads > self.max_workers:
+            raise ValueError(
+                f"{threads} synchronous middlewares need more than the "
+                f"{self.max_workers} middleware threads"
+            )
+
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+
+        async with condition:
+            await condition.wait_for(lambda: self._available >= threads)
+            self._available -= threads
+        try:
+            yield
+        finally:
+            async with condition:
+                self._available += threads
+                condition.notify_all()
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Returns the thread pool, creating it the first time it is needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="birchrest-middleware"
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stops the threads without waiting for running middlewares."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def to_async_middleware(
+    middleware: Callable[..., Any], executor: MiddlewareExecutor
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Returns an awaitable version of a middleware. A synchronous middleware runs in the
+    middleware pool and receives a blocking `next` that runs the rest of the chain on
+    the event loop and returns once it has completed. The caller must have reserved a
+    thread for it with `MiddlewareExecutor.reserve`.
+
+    The middleware does not run in the handler thread pool: its thread is blocked
+    while the rest of the chain runs, and the chain may need a thread of the pool for
+    a synchronous handler, so taking one would deadlock once every thread of the pool
+    is held by a middleware waiting on its `next`.
+
+    Parameters:
+        middleware (Callable): The middleware to convert.
+        executor (MiddlewareExecutor): The pool to run synchronous middlewares in.
+
+    Returns:
+        Callable[..., Awaitable[Any]]: A middleware coroutine function.
+    """
+    if is_async_callable(middleware):
+        return middleware
+
+    async def run_in_executor(req: Any, res: Any, next_: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+
+        def blocking_next() -> None:
+            asyncio.run_coroutine_threadsafe(next_(), loop).result()
+
+        call = functools.partial(context.run, middleware, req, res, blocking_next)
+        result = await loop.run_in_executor(executor.executor(), call)
+
+        if inspect.isawaitable(result):
+            return await result
+
+        return result
+
+    return run_in_executor
@@ -1,10 +1,23 @@
 import json
 import os
 from datetime import datetime
-from typing import Any, Optional
-from colorama import Fore, Style, init
+from typing import Any, Optional, Tuple
 
-init(autoreset=True)
+_colors: Optional[Tuple[Any, Any]] = None
+
+
+def _colorama() -> Tuple[Any, Any]:
+    """
+    Imports and initializes colorama on the first log message rather than on import,
+    as initializing it wraps the standard streams.
+    """
+    global _colors
+    if _colors is None:
+        from colorama import Fore, Style, init
+
+        init(autoreset=True)
+        _colors = (Fore, Style)
+    return _colors
 
 
 class Logger:
@@ -16,11 +29,14 @@ class Logger:
         Args:
             level (str): The level of the log (DEBUG, INFO, WARNING, ERROR).
             message (str): The log message.
-            color (str): The color for the log level.
+            color (str): The colorama name of the color for the log level.
             obj (Optional[Any]): An optional object to be logged in JSON format.
         """
+        fore, style = _colorama()
         time_stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"{color}{time_stamp} - {level}: {message}{Style.RESET_ALL}"
+        log_message = (
+            f"{getattr(fore, color)}{time_stamp} - {level}: {message}{style.RESET_ALL}"
+        )
 
         if obj is not None:
             try:
@@ -52,7 +68,7 @@ class Logger:
         if not Logger._should_log("debug"):
             return
 
-        Logger._log("DEBUG", message, Fore.BLUE, obj)
+        Logger._log("DEBUG", message, "BLUE", obj)
 
     @staticmethod
     def info(message: str, obj: Optional[Any] = None) -> None:
@@ -60,7 +76,7 @@ class Logger:
         if not Logger._should_log("info"):
             return
 
-        Logger._log("INFO", message, Fore.GREEN, obj)
+        Logger._log("INFO", message, "GREEN", obj)
 
     @staticmethod
     def warning(message: str, obj: Optional[Any] = None) -> None:
@@ -68,7 +84,7 @@ class Logger:
         if not Logger._should_log("warning"):
             return
 
-        Logger._log("WARNING", message, Fore.YELLOW, obj)
+        Logger._log("WARNING", message, "YELLOW", obj)
 
     @staticmethod
     def error(message: str, obj: Optional[Any] = None) -> None:
@@ -76,4 +92,4 @@ class Logger:
         if not Logger._should_log("error"):
             return
 
-        Logger._log("ERROR", message, Fore.RED, obj)
+        Logger._log("ERROR", message, "RED", obj)
@@ -9,4 +9,11 @@ class HealthController(Controller):
     
     @get()
     async def health(self, req: Request, res: Response) -> Response:
-        return res.send({"message": "Service is healthy!"})
\ No newline at end of file
+        return res.send({"message": "Service is healthy!"})
+
+    @get("ready")
+    async def ready(self, req: Request, res: Response) -> Response:
+        if req.app is not None and not req.app.ready:
+            return res.status(503).send({"message": "Service is draining"})
+
+        return res.send({"message": "Service is ready"})
@@ -103,6 +103,22 @@ class TestBirchRest(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(response.body["error"]["status"], 500)
             self.assertEqual(response.body["error"]["code"], "Internal Server Error")
 
+    @patch('birchrest.http.Request')
+    async def test_handle_request_sync_error_handler(self, MockRequest):
+        """Test that a synchronous error handler runs off the event loop and handles errors."""
+        mock_request = MockRequest()
+        mock_request.correlation_id = 'test-correlation-id'
+
+        def error_handler(req, res, e):
+            res.status(418).send({"handled": str(e)})
+
+        self.birch_rest.error(error_handler)
+
+        with patch.object(self.birch_rest, '_handle_request', side_effect=Exception("boom")):
+            response = await self.birch_rest.handle_request(mock_request)
+            self.assertEqual(response._status_code, 418)
+            self.assertEqual(response.body, {"handled": "boom"})
+
     def test_build_api(self):
         """Test that _build_api properly resolves routes."""
         mock_controller = MockController()
@@ -116,6 +132,17 @@ class TestBirchRest(unittest.IsolatedAsyncioTestCase):
         mock_controller.resolve_paths.assert_called_once_with(prefix="", middlewares=self.birch_rest.global_middlewares)
         mock_controller.collect_routes.assert_called_once()
 
+    def test_build_api_once(self):
+        """Test that building the API again does not collect the routes twice."""
+        mock_controller = MockController()
+        self.birch_rest.controllers = [mock_controller]
+        mock_controller.collect_routes = Mock(return_value=[])
+
+        self.birch_rest._build_api()
+        self.birch_rest._build_api()
+
+        mock_controller.collect_routes.assert_called_once()
+
     def test_build_api_with_auth_handler(self):
         """Test that routes receive an auth handler if it's registered."""
         mock_controller = MockController()
@@ -133,9 +160,11 @@ class TestBirchRest(unittest.IsolatedAsyncioTestCase):
 
         mock_route.register_auth_handler.assert_called_with(mock_auth_handler)
 
+    @patch('birchrest.app.discovery.read_manifest', return_value=None)
+    @patch('birchrest.app.discovery.write_manifest')
     @patch('os.walk', return_value=[('/some/path', ['subdir'], ['__birch__.py'])])
     @patch('birchrest.BirchRest._import_birch_file')
-    def test_discover_controllers(self, mock_import_birch_file, mock_os_walk):
+    def test_discover_controllers(self, mock_import_birch_file, mock_os_walk, mock_write_manifest, mock_read_manifest):
         """Test _discover_controllers to ensure it discovers the __birch__.py file and imports it."""
         self.birch_rest._discover_controllers()
 
@@ -0,0 +1,181 @@
+# type: ignore
+
+import json
+import unittest
+from unittest.mock import Mock
+from birchrest import BirchRest
+from birchrest.http import Request, Response
+
+
+class TestAsgiAdapter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.app = BirchRest()
+        self.app._build_api = Mock()
+        self.requests = []
+
+        async def handle_request(request: Request) -> Response:
+            self.requests.append(request)
+            return Response().status(201).send({"path": request.clean_path})
+
+        self.app.handle_request = handle_request
+        self.asgi = self.app.asgi()
+
+    def _receive(self, messages):
+        messages = list(messages)
+
+        async def receive():
+            return messages.pop(0)
+
+        return receive
+
+    def _send(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        return sent, send
+
+    async def test_http_request(self):
+        """Test that an HTTP scope is translated to a Request and the response is sent."""
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "POST",
+            "path": "/users",
+            "query_string": b"page=2",
+            "headers": [(b"Content-Type", b"application/json")],
+            "client": ("127.0.0.1", 5000),
+        }
+        receive = self._receive(
+            [
+                {"type": "http.request", "body": b'{"na', "more_body": True},
+                {"type": "http.request", "body": b'me": "birch"}'},
+            ]
+        )
+        sent, send = self._send()
+
+        await self.asgi(scope, receive, send)
+
+        request = self.requests[0]
+        self.assertEqual(request.method, "POST")
+        self.assertEqual(request.clean_path, "/users")
+        self.assertEqual(request.queries, {"page": "2"})
+        self.assertEqual(request.body, {"name": "birch"})
+        self.assertEqual(request.get_header("content-type"), "application/json")
+        self.assertEqual(request.client_address, "127.0.0.1")
+
+        self.assertEqual(sent[0]["type"], "http.response.start")
+        self.assertEqual(sent[0]["status"], 201)
+        self.assertIn((b"content-type", b"application/json"), sent[0]["headers"])
+        self.assertEqual(json.loads(sent[1]["body"]), {"path": "/users"})
+        self.app._build_api.assert_called_once()
+
+    async def test_invalid_json_returns_bad_request(self):
+        """Test that a body that is not valid JSON is answered with 400."""
+        scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+        sent, send = self._send()
+
+        await self.asgi(scope, self._receive([{"type": "http.request", "body": b"{"}]), send)
+
+        self.assertEqual(sent[0]["status"], 400)
+        self.assertEqual(self.requests, [])
+
+    async def test_undecodable_body_returns_bad_request(self):
+        """Test that a body that is not valid UTF-8 is answered with 400."""
+        scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+        sent, send = self._send()
+
+        await self.asgi(
+            scope, self._receive([{"type": "http.request", "body": b"\xff\xfe"}]), send
+        )
+
+        self.assertEqual(sent[0]["status"], 400)
+        self.assertEqual(json.loads(sent[1]["body"]), {"error": "Malformed request"})
+        self.assertEqual(self.requests, [])
+
+    async def test_lifespan_runs_hooks(self):
+        """Test that lifespan events build the API and run the startup and shutdown hooks."""
+        calls = []
+
+        async def startup():
+            calls.append("startup")
+
+        def shutdown():
+            calls.append("shutdown")
+
+        self.app.on_startup(startup)
+        self.app.on_shutdown(shutdown)
+
+        receive = self._receive(
+            [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        )
+        sent, send = self._send()
+
+        await self.asgi({"type": "lifespan"}, receive, send)
+
+        self.assertEqual(calls, ["startup", "shutdown"])
+        self.assertEqual(
+            [message["type"] for message in sent],
+            ["lifespan.startup.complete", "lifespan.shutdown.complete"],
+        )
+        self.app._build_api.assert_called_once()
+        self.assertFalse(self.app.ready)
+
+    async def test_lifespan_startup_failure(self):
+        """Test that a failing startup hook is reported to the server."""
+
+        async def startup():
+            raise RuntimeError("database unavailable")
+
+        self.app.on_startup(startup)
+        sent, send = self._send()
+
+        await self.asgi({"type": "lifespan"}, self._receive([{"type": "lifespan.startup"}]), send)
+
+        self.assertEqual(sent[0]["type"], "lifespan.startup.failed")
+        self.assertEqual(sent[0]["message"], "database unavailable")
+
+    async def test_lifespan_shutdown_failure(self):
+        """Test that a failing shutdown is reported to the server."""
+
+        async def shutdown():
+            raise RuntimeError("container teardown failed")
+
+        self.app.shutdown = shutdown
+        receive = self._receive(
+            [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        )
+        sent, send = self._send()
+
+        await self.asgi({"type": "lifespan"}, receive, send)
+
+        self.assertEqual(
+            [message["type"] for message in sent],
+            ["lifespan.startup.complete", "lifespan.shutdown.failed"],
+        )
+        self.assertEqual(sent[1]["message"], "container teardown failed")
+
+    async def test_websocket_is_closed(self):
+        """Test that WebSocket connections are closed instead of being left open."""
+        sent, send = self._send()
+
+        await self.asgi(
+            {"type": "websocket", "path": "/ws"},
+            self._receive([{"type": "websocket.connect"}]),
+            send,
+        )
+
+        self.assertEqual(sent, [{"type": "websocket.close", "code": 1000}])
+        self.assertEqual(self.requests, [])
+
+    async def test_ready_after_startup_without_server(self):
+        """Test that the application reports ready once started behind an ASGI server."""
+        self.assertFalse(self.app.ready)
+        await self.app.startup()
+        self.assertTrue(self.app.ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,279 @@
+# type: ignore
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+from birchrest import BirchRest
+from birchrest.app.scheduler import Job, Scheduler
+from birchrest.di import Container
+from birchrest.exceptions import NotFound
+from birchrest.http import Request, Response
+from birchrest.http.background import BackgroundTasks
+from birchrest.http.server import Server
+from birchrest.routes import Route
+from birchrest.unittest import TestAdapter
+
+
+class Session:
+    pass
+
+
+class TestBackgroundTasks(unittest.IsolatedAsyncioTestCase):
+
+    async def test_tasks_run_in_order(self):
+        events = []
+
+        async def send_email(to):
+            events.append(("email", to))
+
+        def warm_cache():
+            events.append(("cache", threading.current_thread() is threading.main_thread()))
+
+        res = Response().send({})
+        res.background(send_email("a@example.com")).background(warm_cache)
+        res.background(send_email, to="b@example.com")
+
+        await BackgroundTasks().run(res)
+
+        self.assertEqual(
+            events, [("email", "a@example.com"), ("cache", False), ("email", "b@example.com")]
+        )
+        self.assertIsNone(res.background_tasks)
+
+    async def test_failing_task_is_logged(self):
+        events = []
+
+        def fail():
+            raise ValueError("boom")
+
+        res = Response().background(fail).background(events.append, "after")
+
+        with patch("birchrest.utils.Logger.error") as error:
+            await BackgroundTasks().run(res)
+
+        error.assert_called_once()
+        self.assertEqual(events, ["after"])
+
+    def test_rejects_invalid_tasks(self):
+        with self.assertRaises(TypeError):
+            Response().background("not a task")
+
+    async def test_drain_cancels_tasks_past_the_deadline(self):
+        tasks = BackgroundTasks()
+        cancelled = asyncio.Event()
+
+        async def forever():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        tasks.run(Response().background(forever))
+        await asyncio.sleep(0)
+        await tasks.drain(0.01)
+
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(len(tasks), 0)
+
+    async def test_server_runs_tasks_after_sending(self):
+        events = []
+
+        async def handler(request):
+            async def task():
+                events.append("task")
+
+            events.append("handler")
+            return Response().send({"ok": True}).background(task)
+
+        server = Server(handler, host="127.0.0.1", port=0)
+        serving = asyncio.ensure_future(server.start())
+        while not server.ready:
+            await asyncio.sleep(0.01)
+        port = server._server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+
+        server.stop()
+        await asyncio.wait_for(serving, 5)
+
+        self.assertIn(b"200 OK", response)
+        self.assertEqual(events, ["handler", "task"])
+
+
+class TestAppBackground(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.app = BirchRest(log_level="test")
+        self.events = []
+
+    def add_route(self, handler):
+        route = Route(handler, "GET", "task", [], False, None, None, None)
+        route.resolve("/bg", [])
+        route.prepare(lambda: None)
+        self.app.routes.append(route)
+
+    async def test_test_adapter_runs_tasks(self):
+        async def handler(req, res):
+            res.send({}).background(self.events.append, "sent")
+
+        self.add_route(handler)
+        response = await TestAdapter(self.app).get("/bg/task")
+
+        self.assertEqual(response._status_code, 200)
+        self.assertEqual(self.events, ["sent"])
+
+    async def test_tasks_are_dropped_when_the_handler_raises(self):
+        async def handler(req, res):
+            res.background(self.events.append, "sent")
+            raise NotFound
+
+        self.add_route(handler)
+        response = await TestAdapter(self.app).get("/bg/task")
+
+        self.assertEqual(response._status_code, 404)
+        self.assertEqual(self.events, [])
+
+    def add_injected_route(self, handler):
+        container = Container()
+
+        def session() -> Session:
+            self.events.append("acquire")
+            yield Session()
+            self.events.append("release")
+
+        container.register(Session, session, scope="request")
+        route = Route(handler, "GET", "task", [], False, None, None, None)
+        route.resolve("/bg", [])
+        route.prepare(lambda: None, None, container)
+        self.app.routes.append(route)
+
+    async def test_request_dependencies_outlive_tasks(self):
+        async def handler(req, res, session: Session):
+            res.send({}).background(self.events.append, "task")
+
+        self.add_injected_route(handler)
+        await TestAdapter(self.app).get("/bg/task")
+
+        self.assertEqual(self.events, ["acquire", "task", "release"])
+
+    async def test_request_dependencies_are_released_when_tasks_are_dropped(self):
+        async def handler(req, res, session: Session):
+            res.send({}).background(self.events.append, "task")
+
+        self.add_injected_route(handler)
+        request = Request("GET", "/bg/task", "HTTP/1.1", {}, None, "127.0.0.1")
+        response = Response()
+        await self.app.routes[0](request, response)
+        self.assertEqual(self.events, ["acquire"])
+
+        self.app.background.drop(response)
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.events, ["acquire", "release"])
+
+
+class TestScheduler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_runs_periodically(self):
+        runs = []
+        scheduler = Scheduler()
+        job = scheduler.add(Job(lambda: runs.append(1), 0.01))
+
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop(1)
+
+        self.assertGreaterEqual(job.runs, 3)
+        self.assertEqual(len(runs), job.runs)
+
+    async def test_skips_overlapping_runs(self):
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        scheduler = Scheduler()
+        job = scheduler.add(Job(slow, 0.01, concurrency=1))
+
+        scheduler.start()
+        await asyncio.sleep(0.08)
+        self.assertEqual(job.stats()["running"], 1)
+        self.assertGreater(job.skipped, 0)
+
+        release.set()
+        await scheduler.stop(1)
+        self.assertEqual(job.runs, 1)
+
+    async def test_limit_bounds_all_jobs(self):
+        running = []
+        peak = []
+
+        async def work():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.03)
+            running.pop()
+
+        scheduler = Scheduler(limit=1)
+        for _ in range(3):
+            scheduler.add(Job(work, 0.01))
+
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop(1)
+
+        self.assertEqual(max(peak), 1)
+
+    async def test_stop_cancels_runs_past_the_grace_period(self):
+        cancelled = asyncio.Event()
+
+        async def stuck():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        scheduler = Scheduler()
+        job = scheduler.add(Job(stuck, 0.01))
+        scheduler.start()
+        await asyncio.sleep(0.03)
+        await scheduler.stop(0.01)
+
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(job.stats()["running"], 0)
+
+    def test_jitter(self):
+        job = Job(lambda: None, 1.0, jitter=0.5)
+        delays = [job.delay() for _ in range(100)]
+
+        self.assertTrue(all(1.0 <= delay <= 1.5 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    async def test_app_every(self):
+        app = BirchRest(log_level="test")
+        runs = []
+
+        @app.every(0.01)
+        async def refresh():
+            runs.append(1)
+
+        await app.startup()
+        await asyncio.sleep(0.05)
+        await app.shutdown()
+        count = len(runs)
+        await asyncio.sleep(0.03)
+
+        self.assertGreater(count, 0)
+        self.assertEqual(len(runs), count)
+        self.assertEqual(app.scheduler.jobs[0].name, refresh.__qualname__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# type: ignore
+
+import unittest
+from birchrest.benchmarks import (
+    BENCHMARKS,
+    Benchmark,
+    compare,
+    measure,
+    run,
+    select,
+    to_json,
+)
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_measure_computes_statistics_per_operation(self):
+        calls = []
+        result = measure(
+            Benchmark("append", lambda: lambda: calls.append(1), "test"),
+            min_time=0.001,
+            repeat=5,
+        )
+
+        self.assertEqual(result.name, "append")
+        self.assertEqual(result.repeats, 5)
+        self.assertGreaterEqual(result.loops, 1)
+        self.assertGreater(result.median_ns, 0)
+        self.assertLessEqual(result.min_ns, result.median_ns)
+        self.assertGreaterEqual(result.iqr_ns, 0)
+        self.assertGreater(len(calls), result.loops * 5)
+
+    def test_measure_awaits_async_operations(self):
+        awaited = []
+
+        async def operation():
+            awaited.append(1)
+
+        result = measure(Benchmark("async", lambda: operation, "test"), 0.001, 3)
+
+        self.assertGreaterEqual(len(awaited), result.loops * 3)
+
+    def test_compare_flags_regressions(self):
+        results = run(
+            [Benchmark("noop", lambda: lambda: None, "test")], min_time=0.001, repeat=3
+        )
+        median = results[0].median_ns
+
+        baseline = {
+            "results": [
+                {"name": "noop", "median_ns": median / 2},
+                {"name": "removed", "median_ns": 10},
+            ]
+        }
+        comparisons = compare(results, baseline, tolerance=0.1)
+
+        self.assertEqual(len(comparisons), 1)
+        self.assertTrue(comparisons[0].regression)
+        self.assertAlmostEqual(comparisons[0].change, 1.0)
+
+        comparisons = compare(results, to_json(results), tolerance=0.1)
+        self.assertFalse(comparisons[0].regression)
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_select_matches_names_and_groups(self):
+        self.assertEqual(
+            [b.name for b in select("router.match.*")],
+            ["router.match.10", "router.match.100", "router.match.1000"],
+        )
+        self.assertEqual(len(select("router")), 8)
+        self.assertEqual(len(select()), len(BENCHMARKS))
+
+    def test_every_benchmark_runs(self):
+        results = run(BENCHMARKS, min_time=0.0001, repeat=1)
+        document = to_json(results)
+
+        self.assertEqual(len(document["results"]), len(BENCHMARKS))
+        for entry in document["results"]:
+            self.assertGreater(entry["median_ns"], 0, entry["name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
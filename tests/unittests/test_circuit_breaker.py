@@ -0,0 +1,153 @@
+# type: ignore
+
+import asyncio
+import unittest
+from unittest.mock import patch
+from birchrest.exceptions import BadRequest, ServiceUnavailable
+from birchrest.middlewares import Bulkhead, CircuitBreaker
+from birchrest.http import Request, Response
+
+
+def make_request():
+    return Request("GET", "/orders", "HTTP/1.1", {}, None, "127.0.0.1")
+
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            failure_threshold=0.5, window_size=4, min_calls=4, reset_timeout=10
+        )
+
+    async def _call(self, status=200, error=None):
+        res = Response()
+
+        async def next_():
+            if error:
+                raise error
+            res.status(status).send({})
+
+        await self.breaker(make_request(), res, next_)
+        return res
+
+    async def _fail(self, times):
+        for _ in range(times):
+            with self.assertRaises(RuntimeError):
+                await self._call(error=RuntimeError("downstream"))
+
+    async def test_opens_at_failure_rate(self):
+        """Test that the circuit opens once the failure rate reaches the threshold."""
+        await self._call()
+        await self._call()
+        await self._fail(1)
+        self.assertEqual(self.breaker.state, "closed")
+
+        await self._call(status=502)
+        self.assertEqual(self.breaker.state, "open")
+
+        res = Response()
+        with self.assertRaises(ServiceUnavailable):
+            await self.breaker(make_request(), res, None)
+        self.assertEqual(res._headers["Retry-After"], "10")
+
+    async def test_client_errors_are_not_failures(self):
+        """Test that ApiErrors below 500 do not count as failures."""
+        for _ in range(4):
+            with self.assertRaises(BadRequest):
+                await self._call(error=BadRequest())
+
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.failure_rate, 0)
+
+    async def test_ring_buffer_forgets_old_outcomes(self):
+        """Test that only the last window_size outcomes count."""
+        await self._fail(1)
+        for _ in range(4):
+            await self._call()
+
+        self.assertEqual(self.breaker.failure_rate, 0)
+
+    async def test_half_open_probe(self):
+        """Test that a successful probe closes the circuit and a failed one reopens it."""
+        await self._fail(4)
+        opened = self.breaker._opened_at
+
+        with patch("birchrest.middlewares.circuit_breaker.time.monotonic", return_value=opened + 11):
+            await self._fail(1)
+            self.assertEqual(self.breaker.state, "open")
+
+        with patch("birchrest.middlewares.circuit_breaker.time.monotonic", return_value=opened + 30):
+            await self._call()
+            self.assertEqual(self.breaker.state, "closed")
+            self.assertEqual(self.breaker.failure_rate, 0)
+
+    async def test_half_open_limits_probes(self):
+        """Test that only half_open_calls probes run concurrently."""
+        await self._fail(4)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        with patch("birchrest.middlewares.circuit_breaker.time.monotonic", return_value=1e9):
+            probe = asyncio.ensure_future(self.breaker(make_request(), Response(), slow))
+            await asyncio.sleep(0)
+
+            with self.assertRaises(ServiceUnavailable):
+                await self._call()
+
+            release.set()
+            await probe
+
+        self.assertEqual(self.breaker.state, "closed")
+
+
+class TestBulkhead(unittest.IsolatedAsyncioTestCase):
+
+    async def test_rejects_beyond_limit(self):
+        """Test that requests beyond the concurrency and waiting limits fail fast."""
+        bulkhead = Bulkhead(max_concurrent=2, max_waiting=1)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        tasks = [
+            asyncio.ensure_future(bulkhead(make_request(), Response(), slow))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+
+        self.assertEqual(bulkhead.active, 2)
+        self.assertEqual(bulkhead.waiting, 1)
+
+        with self.assertRaises(ServiceUnavailable):
+            await bulkhead(make_request(), Response(), slow)
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(bulkhead.active, 0)
+        self.assertEqual(bulkhead.rejected, 1)
+
+    async def test_waiting_times_out(self):
+        """Test that a request waiting longer than the timeout is rejected."""
+        bulkhead = Bulkhead(max_concurrent=1, max_waiting=1, timeout=0.01)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        task = asyncio.ensure_future(bulkhead(make_request(), Response(), slow))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(ServiceUnavailable):
+            await bulkhead(make_request(), Response(), slow)
+
+        release.set()
+        await task
+        self.assertEqual(bulkhead.waiting, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
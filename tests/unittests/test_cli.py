@@ -9,7 +9,7 @@ import subprocess
 import json
 class TestBirchRestCLI(unittest.TestCase):
 
-    @patch('birchrest.cli.BirchRest')
+    @patch('birchrest.app.BirchRest')
     def test_serve_project(self, mock_birchrest):
         """Test that the serve_project function starts the BirchRest server with the correct parameters."""
         mock_app_instance = MagicMock()
@@ -17,8 +17,24 @@ class TestBirchRestCLI(unittest.TestCase):
 
         serve_project(port=5000, host="0.0.0.0", log_level="debug")
 
-        mock_birchrest.assert_called_once_with(log_level="debug", base_path="")
-        mock_app_instance.serve.assert_called_once_with(host="0.0.0.0", port=5000)
+        mock_birchrest.assert_called_once_with(log_level="debug", base_path="", birch_file=None)
+        mock_app_instance.serve.assert_called_once_with(
+            host="0.0.0.0", port=5000, loop="auto", backlog=100, server="streams", reload=False
+        )
+
+    @patch('birchrest.app.BirchRest')
+    def test_serve_project_with_loop(self, mock_birchrest):
+        """Test that the event loop and backlog options are passed on to serve."""
+        mock_app_instance = MagicMock()
+        mock_birchrest.return_value = mock_app_instance
+
+        serve_project(
+            port=5000, host="0.0.0.0", log_level="debug", loop="uvloop", backlog=2048, server="protocol"
+        )
+
+        mock_app_instance.serve.assert_called_once_with(
+            host="0.0.0.0", port=5000, loop="uvloop", backlog=2048, server="protocol", reload=False
+        )
 
     @patch('argparse.ArgumentParser.parse_args')
     @patch('birchrest.cli.serve_project')
@@ -93,7 +109,7 @@ class TestBirchRestCLI(unittest.TestCase):
             stderr=sys.stderr,
         )
 
-    @patch('birchrest.cli.BirchRest')
+    @patch('birchrest.app.BirchRest')
     @patch('builtins.open', new_callable=mock_open)
     def test_generate_openapi(self, mock_open_file, mock_birchrest):
         """Test OpenAPI documentation generation."""
@@ -0,0 +1,215 @@
+# type: ignore
+
+import unittest
+from typing import AsyncIterator
+from unittest.mock import Mock
+from birchrest.di import Container, Inject
+from birchrest.di.container import RequestScope, _after_fork
+from birchrest.exceptions import DependencyError
+from birchrest.http import Request, Response
+from birchrest.routes import Controller
+from birchrest.routes.route import Route
+
+
+class Settings:
+    def __init__(self):
+        self.url = "postgres://localhost"
+
+
+class Pool:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.closed = False
+
+
+class Session:
+    def __init__(self, pool: Pool, request: Request):
+        self.pool = pool
+        self.request = request
+
+
+def make_request():
+    request = Mock(spec=Request)
+    request.body = {}
+    request.queries = {}
+    request.params = {}
+    return request
+
+
+class TestContainer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.container = Container()
+        self.container.register(Settings)
+
+    async def test_autowires_constructor(self):
+        self.container.register(Pool, scope="worker")
+        await self.container.startup()
+
+        pool = self.container.get(Pool)
+        self.assertIs(pool.settings, self.container.get(Settings))
+        self.assertIs(self.container.get(Pool), pool)
+
+    async def test_async_generator_lifecycle(self):
+        events = []
+
+        @self.container.provide(scope="worker")
+        async def pool(settings: Settings) -> AsyncIterator[Pool]:
+            events.append("open")
+            yield Pool(settings)
+            events.append("close")
+
+        await self.container.startup()
+        self.assertEqual(events, ["open"])
+        self.assertIsInstance(self.container.get(Pool), Pool)
+
+        await self.container.shutdown()
+        self.assertEqual(events, ["open", "close"])
+        with self.assertRaises(DependencyError):
+            self.container.get(Pool)
+
+    async def test_request_scope(self):
+        events = []
+        self.container.register(Pool, scope="worker")
+
+        def session(pool: Pool, request: Request):
+            yield Session(pool, request)
+            events.append("released")
+
+        self.container.register(Session, session, scope="request")
+        self.container.validate()
+
+        async def handler(req, res, session: Session, other=Inject(Session)):
+            self.assertIs(session, other)
+            self.assertIs(session.request, req)
+
+        plan = self.container.plan(handler)
+        self.assertEqual([name for name, _ in plan], ["session", "other"])
+
+        request = make_request()
+        scope = RequestScope()
+        kwargs = await self.container.resolve(plan, request, scope)
+        self.assertIs(kwargs["session"], kwargs["other"])
+        await handler(request, None, **kwargs)
+        self.assertEqual(events, [])
+
+        await self.container.release(scope)
+        self.assertEqual(events, ["released"])
+
+        kwargs = await self.container.resolve(plan, make_request(), RequestScope())
+        self.assertIsNot(kwargs["session"].request, request)
+
+    def test_missing_dependency(self):
+        async def handler(req, res, pool: Pool):
+            pass
+
+        with self.assertRaises(DependencyError):
+            self.container.plan(handler)
+
+    def test_defaults_are_not_injected(self):
+        async def handler(req, res, limit: int = 10):
+            pass
+
+        self.assertEqual(self.container.plan(handler), ())
+
+    def test_singleton_can_not_depend_on_request_scope(self):
+        def pool(session: Session) -> Pool:
+            return Pool(None)
+
+        self.container.register(Session, lambda: None, scope="request")
+        self.container.register(Pool, pool)
+        with self.assertRaises(DependencyError):
+            self.container.validate()
+
+    def test_factory_depending_on_itself(self):
+        def first(settings: Settings, pool: Pool) -> Settings:
+            return settings
+
+        def pool(settings: Settings) -> Pool:
+            return Pool(settings)
+
+        self.container.register(Settings, first)
+        self.container.register(Pool, pool)
+        with self.assertRaises(DependencyError):
+            self.container.validate()
+
+    async def test_worker_scope_is_recreated_after_fork(self):
+        self.container.register(Pool, scope="worker")
+        await self.container.startup()
+        settings, pool = self.container.get(Settings), self.container.get(Pool)
+
+        _after_fork()
+
+        self.assertIs(self.container.get(Settings), settings)
+        self.assertIsNot(self.container.get(Pool), pool)
+
+    def test_inject_attribute(self):
+        class Service:
+            settings = Inject(Settings)
+
+        service = Service()
+        with self.assertRaises(DependencyError):
+            service.settings
+
+        service._container = self.container
+        self.assertIsInstance(service.settings, Settings)
+
+    def test_use_container(self):
+        controller = Controller()
+        controller.controllers = [Controller()]
+        controller.use_container(self.container)
+        self.assertIs(controller.controllers[0]._container, self.container)
+
+    async def test_route_injects_dependencies(self):
+        self.container.instance("answer", 42)
+        received = {}
+
+        async def handler(req, res, settings: Settings, answer=Inject("answer")):
+            received.update(settings=settings, answer=answer)
+
+        route = Route(handler, "GET", "answer", [], False, None, None, None)
+        route.resolve("/api", [])
+        route.prepare(lambda: None, None, self.container)
+        await self.container.startup()
+
+        await route(make_request(), Mock(spec=Response))
+        self.assertEqual(received["answer"], 42)
+        self.assertIs(received["settings"], self.container.get(Settings))
+
+    async def test_failed_resolve_releases_created_dependencies(self):
+        events = []
+
+        def session(request: Request) -> Session:
+            events.append("acquire")
+            yield Session(None, request)
+            events.append("release")
+
+        def failing(session: Session) -> Pool:
+            raise RuntimeError("unavailable")
+
+        self.container.register(Session, session, scope="request")
+        self.container.register(Pool, failing, scope="request")
+
+        async def handler(req, res, session: Session, pool: Pool):
+            pass
+
+        route = Route(handler, "GET", "fail", [], False, None, None, None)
+        route.resolve("/api", [])
+        route.prepare(lambda: None, None, self.container)
+
+        with self.assertRaises(RuntimeError):
+            await route(make_request(), Mock(spec=Response))
+        self.assertEqual(events, ["acquire", "release"])
+
+    def test_cpu_bound_route_can_not_inject(self):
+        async def handler(req, res, settings: Settings):
+            pass
+
+        route = Route(handler, "GET", "cpu", [], False, None, None, None, cpu_bound={})
+        route.resolve("/api", [])
+        with self.assertRaises(DependencyError):
+            route.prepare(lambda: None, None, self.container)
+
+
+if __name__ == "__main__":
+    unittest.main()
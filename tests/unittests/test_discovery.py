@@ -0,0 +1,164 @@
+# type: ignore
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from birchrest.app.discovery import (
+    BIRCH_FILE_ENV,
+    discover_birch_files,
+    find_birch_files,
+    manifest_path,
+    read_manifest,
+)
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+def touch(*parts):
+    path = os.path.join(*parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("")
+    return path
+
+
+class TestDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.env = patch.dict(
+            os.environ, {BIRCH_FILE_ENV: "", "XDG_CACHE_HOME": self.cache.name}
+        )
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.cache.cleanup()
+        self.tmp.cleanup()
+
+    def test_walk_skips_ignored_directories_and_virtualenvs(self):
+        """Test that ignored, hidden and virtualenv directories are not searched."""
+        app = touch(self.root, "app", "__birch__.py")
+        touch(self.root, "node_modules", "pkg", "__birch__.py")
+        touch(self.root, ".git", "__birch__.py")
+        touch(self.root, "__pycache__", "__birch__.py")
+        touch(self.root, "myenv", "pyvenv.cfg")
+        touch(self.root, "myenv", "lib", "__birch__.py")
+        touch(self.root, "data", "__birch__.py")
+
+        found = find_birch_files(self.root, ignore=["data", "node_modules", ".*", "__*"])
+
+        self.assertEqual(found, [app])
+
+    def test_walk_respects_max_depth(self):
+        """Test that directories deeper than max_depth are not searched."""
+        shallow = touch(self.root, "a", "__birch__.py")
+        touch(self.root, "a", "b", "c", "__birch__.py")
+
+        self.assertEqual(find_birch_files(self.root, max_depth=2), [shallow])
+
+    def test_explicit_birch_file(self):
+        """Test that a configured file or directory is used without searching."""
+        app = touch(self.root, "app", "__birch__.py")
+
+        with patch("os.walk") as walk:
+            self.assertEqual(discover_birch_files(self.root, "app"), [app])
+            self.assertEqual(discover_birch_files(self.root, app), [app])
+            walk.assert_not_called()
+
+        with self.assertRaises(FileNotFoundError):
+            discover_birch_files(self.root, "missing/__birch__.py")
+
+    def test_environment_variable(self):
+        """Test that the birch file can be configured with an environment variable."""
+        app = touch(self.root, "service", "__birch__.py")
+
+        with patch.dict(os.environ, {BIRCH_FILE_ENV: "service"}):
+            self.assertEqual(discover_birch_files(self.root), [app])
+
+    @unittest.skipIf(tomllib is None, "No TOML parser available")
+    def test_pyproject_configuration(self):
+        """Test that discovery is configured in the [tool.birchrest] table."""
+        app = touch(self.root, "src", "app", "__birch__.py")
+        touch(self.root, "fixtures", "__birch__.py")
+        with open(os.path.join(self.root, "pyproject.toml"), "w", encoding="utf-8") as f:
+            f.write('[tool.birchrest]\nignore = ["fixtures"]\ncache = false\n')
+
+        self.assertEqual(discover_birch_files(self.root), [app])
+        self.assertIsNone(read_manifest(self.root))
+
+        with open(os.path.join(self.root, "pyproject.toml"), "w", encoding="utf-8") as f:
+            f.write('[tool.birchrest]\nbirch_file = "fixtures"\n')
+
+        self.assertEqual(
+            discover_birch_files(self.root),
+            [os.path.join(self.root, "fixtures", "__birch__.py")],
+        )
+
+    def test_scan_is_cached(self):
+        """Test that a scan is cached and reused until the project changes."""
+        app = touch(self.root, "app", "__birch__.py")
+
+        self.assertEqual(discover_birch_files(self.root), [app])
+        self.assertEqual(read_manifest(self.root), [app])
+
+        with patch("os.walk") as walk:
+            self.assertEqual(discover_birch_files(self.root), [app])
+            walk.assert_not_called()
+
+        os.remove(app)
+        other = touch(self.root, "other", "__birch__.py")
+
+        self.assertIsNone(read_manifest(self.root))
+        self.assertEqual(discover_birch_files(self.root), [other])
+
+    def test_new_birch_file_invalidates_cache(self):
+        """Test that a birch file added after a scan is found."""
+        app = touch(self.root, "app", "__birch__.py")
+        os.makedirs(os.path.join(self.root, "api"))
+        self.assertEqual(discover_birch_files(self.root), [app])
+
+        api = touch(self.root, "api", "__birch__.py")
+
+        self.assertIsNone(read_manifest(self.root))
+        self.assertEqual(sorted(discover_birch_files(self.root)), sorted([api, app]))
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "POSIX permissions")
+    def test_cache_writable_by_others_is_ignored(self):
+        """Test that a manifest others could have written is not trusted."""
+        app = touch(self.root, "app", "__birch__.py")
+        discover_birch_files(self.root)
+        path = manifest_path(self.root)
+
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+        os.chmod(path, 0o666)
+        self.assertIsNone(read_manifest(self.root))
+
+        os.chmod(path, 0o600)
+        os.chmod(os.path.dirname(path), 0o777)
+        self.assertIsNone(read_manifest(self.root))
+
+        os.chmod(os.path.dirname(path), 0o700)
+        os.remove(path)
+        os.symlink(os.path.join(self.root, "planted.json"), path)
+        self.assertIsNone(read_manifest(self.root))
+        self.assertEqual(discover_birch_files(self.root), [app])
+
+    def test_no_birch_file(self):
+        with self.assertRaises(FileNotFoundError):
+            discover_birch_files(self.root)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# type: ignore
+
+import asyncio
+import sys
+import unittest
+from unittest.mock import patch
+from birchrest.http import event_loop
+
+
+class TestEventLoop(unittest.TestCase):
+
+    def test_asyncio_loop_uses_default(self):
+        """Test that the asyncio loop selection returns no factory."""
+        self.assertIsNone(event_loop.get_loop_factory("asyncio"))
+
+    def test_unknown_loop_raises(self):
+        """Test that an unknown loop name is rejected."""
+        with self.assertRaises(ValueError):
+            event_loop.get_loop_factory("trio")
+
+    def test_auto_falls_back_without_uvloop(self):
+        """Test that auto falls back to asyncio when uvloop is not installed."""
+        with patch.dict(sys.modules, {"uvloop": None}):
+            self.assertIsNone(event_loop.get_loop_factory("auto"))
+
+    def test_uvloop_required_raises_without_uvloop(self):
+        """Test that explicitly requesting uvloop fails when it is not installed."""
+        with patch.dict(sys.modules, {"uvloop": None}):
+            with self.assertRaises(RuntimeError):
+                event_loop.get_loop_factory("uvloop")
+
+    def test_run_uses_factory(self):
+        """Test that run executes the coroutine on a loop created by the factory."""
+        created = []
+
+        def factory():
+            loop = asyncio.SelectorEventLoop()
+            created.append(loop)
+            return loop
+
+        async def main():
+            return asyncio.get_running_loop()
+
+        with patch.object(event_loop, "get_loop_factory", return_value=factory):
+            loop = event_loop.run(main(), loop="uvloop")
+
+        self.assertEqual(created, [loop])
+        self.assertEqual(asyncio.run(self._loop_name()), "asyncio")
+
+    async def _loop_name(self):
+        return event_loop.loop_name()
+
+
+if __name__ == "__main__":
+    unittest.main()
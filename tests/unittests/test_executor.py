@@ -0,0 +1,170 @@
+# type: ignore
+
+import asyncio
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from birchrest.decorators import get, protected
+from birchrest.http import Request, Response
+from birchrest.middlewares import Middleware
+from birchrest.routes.route import Route
+from birchrest.utils import is_async_callable, to_async, to_async_middleware
+from birchrest.utils.executor import MiddlewareExecutor
+
+
+class AsyncMiddleware(Middleware):
+    async def __call__(self, req, res, next):
+        await next()
+
+
+class TestExecutor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-pool")
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_is_async_callable(self):
+        """Test detection of async callables through decorators and callable objects."""
+
+        @protected()
+        @get("route")
+        async def decorated(req, res):
+            pass
+
+        @get("route")
+        def sync_decorated(req, res):
+            pass
+
+        self.assertTrue(is_async_callable(decorated))
+        self.assertFalse(is_async_callable(sync_decorated))
+        self.assertTrue(is_async_callable(AsyncMiddleware()))
+        self.assertFalse(is_async_callable(lambda req, res: None))
+
+    async def test_to_async_returns_coroutine_functions_unchanged(self):
+        """Test that coroutine functions are not wrapped."""
+
+        async def handler(req, res):
+            pass
+
+        self.assertIs(to_async(handler, lambda: self.executor), handler)
+
+    async def test_to_async_runs_sync_callable_in_executor(self):
+        """Test that synchronous callables run in the executor thread pool."""
+
+        def handler(value):
+            return threading.current_thread().name, value
+
+        thread_name, value = await to_async(handler, lambda: self.executor)(42)
+
+        self.assertTrue(thread_name.startswith("test-pool"))
+        self.assertEqual(value, 42)
+
+    async def test_sync_middleware_receives_blocking_next(self):
+        """Test that a sync middleware can run the rest of the chain from its thread."""
+        calls = []
+
+        def middleware(req, res, next):
+            calls.append("before")
+            next()
+            calls.append("after")
+
+        async def downstream():
+            calls.append("handler")
+
+        pool = MiddlewareExecutor(1)
+        wrapped = to_async_middleware(middleware, pool)
+        try:
+            await wrapped(Mock(), Mock(), downstream)
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(calls, ["before", "handler", "after"])
+
+    async def test_sync_middlewares_run_in_a_bounded_pool(self):
+        """Test that sync middlewares use their own bounded pool and do not deadlock."""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="single")
+        middlewares = MiddlewareExecutor(max_workers=2)
+        threads = {}
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def middleware(req, res, next):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            threads["middleware"] = threading.current_thread().name
+            next()
+            with lock:
+                running.pop()
+
+        def handler(req, res):
+            threads["handler"] = threading.current_thread().name
+            res.send({"ok": True})
+
+        route = Route(handler, "GET", "/sync", [middleware, middleware], False, None, None, None)
+        route.resolve("", [])
+        route.prepare(lambda: executor, None, None, middlewares)
+
+        async def call():
+            response = Response()
+            request = Request("GET", "/sync", "HTTP/1.1", {}, None, "127.0.0.1")
+            await route(request, response)
+            return response
+
+        try:
+            responses = await asyncio.wait_for(asyncio.gather(*[call() for _ in range(8)]), 5)
+        finally:
+            executor.shutdown(wait=True)
+            middlewares.shutdown()
+
+        self.assertTrue(all(response.body == {"ok": True} for response in responses))
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(middlewares.in_use, 0)
+        self.assertTrue(threads["middleware"].startswith("birchrest-middleware"))
+        self.assertTrue(threads["handler"].startswith("single"))
+
+    def test_more_sync_middlewares_than_threads(self):
+        """Test that a chain that could never get its threads fails when prepared."""
+
+        def middleware(req, res, next):
+            next()
+
+        route = Route(lambda req, res: None, "GET", "/", [middleware] * 3, False, None, None, None)
+        route.resolve("", [])
+
+        with self.assertRaises(ValueError):
+            route.prepare(lambda: self.executor, None, None, MiddlewareExecutor(2))
+
+    async def test_prepared_route_runs_sync_handlers_in_executor(self):
+        """Test that a prepared route offloads sync handlers and auth handlers."""
+        threads = {}
+
+        def handler(req, res):
+            threads["handler"] = threading.current_thread().name
+            res.send({"ok": True})
+
+        def auth_handler(req, res):
+            threads["auth"] = threading.current_thread().name
+            return {"id": 1}
+
+        route = Route(handler, "GET", "/sync", [], True, None, None, None)
+        route.resolve("", [])
+        route.register_auth_handler(auth_handler)
+        route.prepare(lambda: self.executor)
+
+        request = Request("GET", "/sync", "HTTP/1.1", {}, None, "127.0.0.1")
+        response = Response()
+        await route(request, response)
+
+        self.assertTrue(threads["handler"].startswith("test-pool"))
+        self.assertTrue(threads["auth"].startswith("test-pool"))
+        self.assertEqual(request.user, {"id": 1})
+        self.assertEqual(response.body, {"ok": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
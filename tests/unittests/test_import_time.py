@@ -0,0 +1,101 @@
+# type: ignore
+
+import json
+import subprocess
+import sys
+import unittest
+from birchrest.profiling.imports import (
+    by_package,
+    parse_importtime,
+    profile_imports,
+    total_us,
+)
+
+# The time birchrest's own modules may take to import `BirchRest`, generous enough
+# for slow CI machines while catching an eagerly imported optional feature.
+IMPORT_BUDGET_MS = 250
+
+LAZY_MODULES = [
+    "birchrest.cli",
+    "birchrest.metrics",
+    "birchrest.middlewares",
+    "birchrest.openapi",
+    "birchrest.profiling",
+    "birchrest.tracing",
+    "birchrest.unittest",
+    "birchrest.app.process_pool",
+    "birchrest.app.asgi",
+    "birchrest.app.scheduler",
+    "birchrest.di",
+    "colorama",
+]
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        80 |        200 | io
+import time:       300 |        300 |     birchrest.utils
+import time:       500 |        800 |   birchrest.http
+import time:       100 |        900 | birchrest
+"""
+
+
+def loaded_modules(statement):
+    code = f"import json, sys\n{statement}\nprint(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return set(json.loads(output.stdout))
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_parse_importtime(self):
+        imports = parse_importtime(SAMPLE)
+
+        self.assertEqual([i.name for i in imports], ["_io", "io", "birchrest.utils", "birchrest.http", "birchrest"])
+        self.assertEqual(imports[2].self_us, 300)
+        self.assertEqual(imports[3].cumulative_us, 800)
+        self.assertEqual([i.depth for i in imports], [1, 0, 2, 1, 0])
+
+        self.assertEqual(total_us(imports), 1100)
+        self.assertEqual(total_us(imports, "birchrest"), 900)
+        self.assertEqual(by_package(imports), {"birchrest": 900, "_io": 120, "io": 80})
+
+    def test_optional_modules_are_not_imported(self):
+        """Test that importing the framework does not import the optional features."""
+        for statement in ("import birchrest", "from birchrest import BirchRest"):
+            loaded = loaded_modules(statement)
+            for module in LAZY_MODULES:
+                self.assertNotIn(module, loaded, f"{statement} imports {module}")
+
+    def test_exports_are_imported_on_access(self):
+        loaded = loaded_modules(
+            "import birchrest\nbirchrest.Controller\nbirchrest.unittest.TestAdapter"
+        )
+        self.assertIn("birchrest.routes", loaded)
+        self.assertIn("birchrest.unittest", loaded)
+
+    def test_import_time_budget(self):
+        imports = profile_imports("from birchrest import BirchRest", repeat=3)
+        own_ms = total_us(imports, "birchrest") / 1000
+
+        self.assertTrue(any(i.name == "birchrest.app" for i in imports))
+        self.assertLess(
+            own_ms,
+            IMPORT_BUDGET_MS,
+            f"Importing BirchRest took {own_ms:.1f} ms in birchrest's modules",
+        )
+
+    def test_failing_statement(self):
+        with self.assertRaises(RuntimeError) as context:
+            profile_imports("import birchrest_does_not_exist")
+
+        self.assertEqual(
+            str(context.exception),
+            "ModuleNotFoundError: No module named 'birchrest_does_not_exist'",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
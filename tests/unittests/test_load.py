@@ -0,0 +1,222 @@
+# type: ignore
+
+import asyncio
+import json
+import random
+import unittest
+from birchrest.benchmarks import LatencyHistogram, LoadGenerator, Scenario
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_are_within_precision(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 * 0.02)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.99 * 0.02)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertEqual(histogram.min, 0.001)
+        self.assertAlmostEqual(histogram.mean, 0.5005, places=4)
+
+    def test_merge(self):
+        fast, slow = LatencyHistogram(), LatencyHistogram()
+        for _ in range(90):
+            fast.record(0.001)
+        for _ in range(10):
+            slow.record(0.1)
+
+        fast.merge(slow)
+
+        self.assertEqual(fast.count, 100)
+        self.assertLess(fast.percentile(90), 0.0011)
+        self.assertAlmostEqual(fast.percentile(95), 0.1, delta=0.002)
+        self.assertEqual(fast.summary()["max_ms"], 100.0)
+
+
+class TestScenario(unittest.TestCase):
+
+    def test_from_dict(self):
+        scenario = Scenario.from_dict(
+            {
+                "requests": [
+                    {"path": "health", "weight": 3},
+                    {
+                        "name": "create",
+                        "method": "post",
+                        "path": "/user",
+                        "body": {"name": "Jane"},
+                        "status": 201,
+                    },
+                ]
+            }
+        )
+
+        health, create = scenario.requests
+        self.assertEqual(health.name, "GET /health")
+        self.assertIsNone(health.body)
+        self.assertTrue(health.expects(204))
+        self.assertFalse(health.expects(404))
+        self.assertEqual(create.method, "POST")
+        self.assertEqual(json.loads(create.body), {"name": "Jane"})
+        self.assertIn(("Content-Type", "application/json"), create.headers)
+        self.assertTrue(create.expects(201))
+        self.assertFalse(create.expects(200))
+
+    def test_choose_follows_weights(self):
+        scenario = Scenario.from_dict(
+            {"requests": [{"path": "/a", "weight": 9}, {"path": "/b", "weight": 1}]}
+        )
+        rng = random.Random(1)
+        chosen = [scenario.choose(rng).path for _ in range(2000)]
+
+        self.assertAlmostEqual(chosen.count("/a") / 2000, 0.9, delta=0.03)
+
+    def test_rejects_empty_scenarios(self):
+        with self.assertRaises(ValueError):
+            Scenario.from_dict({"requests": []})
+
+
+class FakeServer:
+    """Answers requests with 200, optionally stalling on one of them."""
+
+    def __init__(self, keep_alive=True, stall_on=None, stall=0.0, drop_second=False):
+        self.keep_alive = keep_alive
+        self.drop_second = drop_second
+        self.stall_on = stall_on
+        self.stall = stall
+        self.handled = 0
+        self.connections = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/ping"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        received = 0
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                received += 1
+                if self.drop_second and received == 2:
+                    break
+                self.handled += 1
+                if self.handled == self.stall_on:
+                    await asyncio.sleep(self.stall)
+
+                status = 404 if b"/missing" in head.split(b"\r\n")[0] else 200
+                writer.write(
+                    f"HTTP/1.1 {status} OK\r\nContent-Length: 2\r\n\r\nok".encode()
+                )
+                await writer.drain()
+                if not self.keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class TestLoadGenerator(unittest.IsolatedAsyncioTestCase):
+
+    async def test_closed_loop_reuses_connections(self):
+        server = FakeServer()
+        url = await server.start()
+
+        result = await LoadGenerator(
+            url, concurrency=4, duration=None, requests=200
+        ).run_async()
+        await server.stop()
+
+        self.assertEqual(result.requests, 200)
+        self.assertEqual(result.errors, 0)
+        self.assertEqual(result.statuses["200"], 200)
+        self.assertLessEqual(result.connections, 4)
+        self.assertEqual(result.latency.count, 200)
+
+    async def test_reconnects_when_the_server_closes_connections(self):
+        server = FakeServer(keep_alive=False)
+        url = await server.start()
+
+        result = await LoadGenerator(
+            url, concurrency=2, duration=None, requests=20
+        ).run_async()
+        await server.stop()
+
+        self.assertEqual(result.requests, 20)
+        self.assertEqual(result.errors, 0)
+        self.assertEqual(result.connections, 20)
+
+    async def test_only_idempotent_requests_are_retried(self):
+        for method, retried in (("GET", True), ("POST", False)):
+            with self.subTest(method=method):
+                server = FakeServer(drop_second=True)
+                url = await server.start()
+
+                result = await LoadGenerator(
+                    url,
+                    Scenario.single(method, "/ping"),
+                    concurrency=1,
+                    duration=None,
+                    requests=2,
+                ).run_async()
+                await server.stop()
+
+                self.assertEqual(result.errors, 0 if retried else 1)
+                self.assertEqual(server.connections, 2 if retried else 1)
+
+    async def test_unexpected_statuses_are_errors(self):
+        server = FakeServer()
+        url = await server.start()
+        scenario = Scenario.from_dict(
+            {
+                "requests": [
+                    {"name": "ok", "path": "/ping"},
+                    {"name": "missing", "path": "/missing", "status": 404},
+                    {"name": "broken", "path": "/missing"},
+                ]
+            }
+        )
+
+        result = await LoadGenerator(
+            url, scenario, concurrency=2, duration=None, requests=300, seed=3
+        ).run_async()
+        await server.stop()
+
+        self.assertEqual(set(result.by_request), {"ok", "missing", "broken"})
+        self.assertEqual(result.errors, result.by_request["broken"].count)
+        self.assertTrue(result.check(max_error_rate=0.0))
+
+    async def test_open_loop_accounts_for_coordinated_omission(self):
+        server = FakeServer(stall_on=5, stall=0.3)
+        url = await server.start()
+
+        result = await LoadGenerator(
+            url, concurrency=1, rate=100, mode="open", duration=0.6
+        ).run_async()
+        await server.stop()
+
+        # Requests due while the server stalled waited for the only connection.
+        # Their service time is short, but their latency includes the wait.
+        self.assertGreater(result.requests, 40)
+        self.assertLess(result.service.percentile(90), 0.1)
+        self.assertGreater(result.latency.percentile(90), 0.1)
+        self.assertTrue(result.check({90: 100}))
+        self.assertFalse(result.check({50: 1000}, min_throughput=1))
+
+    def test_rejects_invalid_options(self):
+        with self.assertRaises(ValueError):
+            LoadGenerator("https://localhost/")
+        with self.assertRaises(ValueError):
+            LoadGenerator("http://localhost/", mode="open")
+
+
+if __name__ == "__main__":
+    unittest.main()
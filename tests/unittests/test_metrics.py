@@ -0,0 +1,140 @@
+# type: ignore
+
+import unittest
+from birchrest import BirchRest
+from birchrest.http import Request, Response
+from birchrest.metrics import HttpMetrics, MetricsRegistry
+from birchrest.metrics.registry import Metric
+from birchrest.routes import Route
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_with_labels(self):
+        """Test that labelled counters render one sample per label combination."""
+        counter = self.registry.counter("jobs_total", "Jobs run.", ("queue",))
+        counter.labels("email").inc()
+        counter.labels("email").inc(2)
+        counter.labels('sm"s').inc()
+
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP jobs_total Jobs run.\n"
+            "# TYPE jobs_total counter\n"
+            'jobs_total{queue="email"} 3\n'
+            'jobs_total{queue="sm\\"s"} 1\n',
+        )
+
+    def test_gauge_function(self):
+        """Test that a gauge with a function is read when rendered."""
+        gauge = self.registry.gauge("connections", "Open connections.")
+        values = iter([3, 5])
+        gauge.set_function(lambda: next(values))
+
+        self.assertIn("connections 3\n", self.registry.render())
+        self.assertEqual(gauge.value, 5)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets are rendered cumulatively with sum and count."""
+        histogram = self.registry.histogram("latency", "Latency.", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        rendered = self.registry.render()
+        self.assertIn('latency_bucket{le="0.1"} 2\n', rendered)
+        self.assertIn('latency_bucket{le="1"} 3\n', rendered)
+        self.assertIn('latency_bucket{le="+Inf"} 4\n', rendered)
+        self.assertIn("latency_sum 3.65\n", rendered)
+        self.assertIn("latency_count 4\n", rendered)
+
+    def test_duplicate_and_wrong_labels(self):
+        """Test that duplicate names and wrong label counts are rejected."""
+        counter = self.registry.counter("a_total", "A.", ("x",))
+        with self.assertRaises(ValueError):
+            self.registry.counter("a_total", "A.")
+        with self.assertRaises(ValueError):
+            counter.labels("1", "2")
+
+    def test_metric_base_is_abstract(self):
+        """Test that the metric base class can not be instantiated."""
+        with self.assertRaises(TypeError):
+            Metric("base", "Base.")
+
+
+class TestAppMetrics(unittest.IsolatedAsyncioTestCase):
+
+    async def test_requests_are_recorded_and_served(self):
+        """Test that requests are recorded by route template and served at /metrics."""
+        app = BirchRest(metrics=True, base_path="api")
+
+        async def handler(req, res):
+            res.send({"id": req.params.id})
+
+        app._build_api()
+        route = Route(handler, "GET", "items/:id", [], False, None, None, None)
+        route.resolve("/api", [])
+        app.routes.append(route)
+
+        for item in ("1", "2"):
+            await app.handle_request(
+                Request("GET", f"/api/items/{item}", "HTTP/1.1", {}, None, "127.0.0.1")
+            )
+        await app.handle_request(
+            Request("GET", "/missing", "HTTP/1.1", {}, None, "127.0.0.1")
+        )
+
+        response = await app.handle_request(
+            Request("GET", "/metrics", "HTTP/1.1", {}, None, "127.0.0.1")
+        )
+
+        self.assertEqual(response._status_code, 200)
+        self.assertTrue(response._headers["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            'birchrest_requests_total{route="/api/items/:id",method="GET",status="2xx"} 2',
+            response.json,
+        )
+        self.assertIn(
+            'birchrest_requests_total{route="unmatched",method="GET",status="4xx"} 1',
+            response.json,
+        )
+        self.assertIn(
+            'birchrest_request_duration_seconds_count{route="/api/items/:id",method="GET"} 2',
+            response.json,
+        )
+        self.assertIn('birchrest_queue_depth{pool="threads"} 0', response.json)
+
+    def test_invalid_content_length_is_recorded_as_empty(self):
+        """Test that a malformed Content-Length header does not fail the request."""
+        metrics = HttpMetrics(MetricsRegistry())
+        request = Request("GET", "/", "HTTP/1.1", {"content-length": "abc"}, None, "127.0.0.1")
+
+        metrics.observe(request, Response().send({}), 0.01)
+
+        self.assertEqual(metrics.request_size.labels("unmatched").sum, 0)
+
+    def test_unknown_methods_share_a_label(self):
+        """Test that arbitrary request methods do not create new series."""
+        metrics = HttpMetrics(MetricsRegistry())
+
+        for method in ("GET", "FOO", "BAR"):
+            request = Request(method, "/", "HTTP/1.1", {}, None, "127.0.0.1")
+            metrics.observe(request, Response().send({}), 0.01)
+
+        self.assertEqual(metrics.requests.labels("unmatched", "GET", "2xx").value, 1)
+        self.assertEqual(metrics.requests.labels("unmatched", "other", "2xx").value, 2)
+        self.assertNotIn('method="FOO"', metrics.requests.render())
+
+    async def test_disabled_by_default(self):
+        """Test that no metrics are recorded or served unless enabled."""
+        app = BirchRest()
+        app._build_api()
+
+        self.assertIsNone(app.metrics)
+        self.assertFalse(any(route.path == "/metrics" for route in app.routes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# type: ignore
+
+import unittest
+from birchrest.http.parser import HttpParser, HttpParserError
+
+
+class TestHttpParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = HttpParser()
+
+    def test_parses_request_fed_in_pieces(self):
+        """Test that a request split across several reads is parsed once complete."""
+        raw = b'POST /users?id=1 HTTP/1.1\r\nHost: localhost\r\nContent-Length: 13\r\n\r\n{"name": "a"}'
+
+        for byte in raw[:-1]:
+            self.parser.feed(bytes([byte]))
+            self.assertIsNone(self.parser.next_request())
+
+        self.parser.feed(raw[-1:])
+        request = self.parser.next_request()
+
+        self.assertEqual(request.method, "POST")
+        self.assertEqual(request.path, "/users?id=1")
+        self.assertEqual(request.version, "HTTP/1.1")
+        self.assertEqual(request.headers["host"], "localhost")
+        self.assertEqual(request.body, '{"name": "a"}')
+        self.assertTrue(request.keep_alive)
+
+    def test_pipelined_requests(self):
+        """Test that pipelined requests are returned one at a time, in order."""
+        self.parser.feed(b"GET /a HTTP/1.1\r\n\r\nGET /b HTTP/1.1\r\nConnection: close\r\n\r\n")
+
+        first = self.parser.next_request()
+        second = self.parser.next_request()
+
+        self.assertEqual(first.path, "/a")
+        self.assertEqual(second.path, "/b")
+        self.assertFalse(second.keep_alive)
+        self.assertIsNone(self.parser.next_request())
+        self.assertEqual(self.parser.buffered, 0)
+
+    def test_http_1_0_closes_by_default(self):
+        """Test that HTTP/1.0 connections are only kept alive when requested."""
+        self.parser.feed(b"GET / HTTP/1.0\r\n\r\nGET / HTTP/1.0\r\nConnection: keep-alive\r\n\r\n")
+
+        self.assertFalse(self.parser.next_request().keep_alive)
+        self.assertTrue(self.parser.next_request().keep_alive)
+
+    def test_malformed_request_line(self):
+        """Test that a malformed request line raises an error."""
+        self.parser.feed(b"NOT A REQUEST\r\n\r\n")
+
+        with self.assertRaises(HttpParserError):
+            self.parser.next_request()
+
+    def test_invalid_content_length(self):
+        """Test that a non-numeric Content-Length raises an error."""
+        self.parser.feed(b"POST / HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+
+        with self.assertRaises(HttpParserError):
+            self.parser.next_request()
+
+    def test_body_not_utf8(self):
+        """Test that a body that is not valid UTF-8 raises an error."""
+        self.parser.feed(b"POST / HTTP/1.1\r\nContent-Length: 2\r\n\r\n\xff\xfe")
+
+        with self.assertRaises(HttpParserError):
+            self.parser.next_request()
+
+    def test_headers_too_large(self):
+        """Test that an unterminated head larger than the limit raises an error."""
+        parser = HttpParser(max_header_size=16)
+        parser.feed(b"GET / HTTP/1.1\r\nX-Long: " + b"a" * 32)
+
+        with self.assertRaises(HttpParserError):
+            parser.next_request()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+# type: ignore
+
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from birchrest import BirchRest
+from birchrest.app import ProcessPool
+from birchrest.decorators import cpu_bound, get
+from birchrest.exceptions import ApiError, GatewayTimeout, ServiceUnavailable
+from birchrest.http import Request, Response
+from birchrest.routes.route import Route
+
+
+class ReportHandlers:
+    """Plain class so the handlers are not discovered as controller routes."""
+
+    @cpu_bound()
+    @get("report")
+    async def report(self, req, res):
+        total = sum(range(req.body.limit))
+        res.status(201).set_header("X-Worker", str(os.getpid()))
+        res.send({"total": total, "user": req.user["id"]})
+
+    @cpu_bound()
+    @get("missing")
+    def missing(self, req, res):
+        raise ApiError("Report not found", 404)
+
+    @cpu_bound(timeout=0.1)
+    @get("slow")
+    def slow(self, req, res):
+        time.sleep(0.5)
+        res.send({})
+
+
+class TestProcessPool(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPool(max_workers=1, max_queue=1)
+        cls.pool.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def _route(self, func):
+        route = Route(func, "GET", "/", [], False, None, None, None, cpu_bound=func._cpu_bound)
+        route.resolve("", [])
+        route.prepare(lambda: None, self.pool)
+        return route
+
+    def test_cpu_bound_decorator(self):
+        """Test that the decorator marks the handler with its pool options."""
+        self.assertEqual(ReportHandlers.slow._cpu_bound, {"timeout": 0.1})
+        self.assertEqual(ReportHandlers.slow._http_method, "GET")
+
+    async def test_handler_runs_in_worker_process(self):
+        """Test that the handler runs in another process and its response is copied back."""
+        route = self._route(ReportHandlers().report)
+        request = Request("GET", "/report", "HTTP/1.1", {}, '{"limit": 10}', "127.0.0.1")
+        request.user = {"id": 7}
+        response = Response(request.correlation_id)
+
+        await route(request, response)
+
+        self.assertEqual(response._status_code, 201)
+        self.assertEqual(response.body, {"total": 45, "user": 7})
+        self.assertNotEqual(response._headers["X-Worker"], str(os.getpid()))
+
+    async def test_api_error_is_raised_in_parent(self):
+        """Test that an ApiError raised in the worker is re-raised with its status code."""
+        route = self._route(ReportHandlers().missing)
+        request = Request("GET", "/missing", "HTTP/1.1", {}, None, "127.0.0.1")
+
+        with self.assertRaises(ApiError) as context:
+            await route(request, Response())
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(context.exception.user_message, "Report not found")
+
+    async def test_timeout_raises_gateway_timeout(self):
+        """Test that a handler exceeding its timeout is answered with a 504."""
+        route = self._route(ReportHandlers().slow)
+        request = Request("GET", "/slow", "HTTP/1.1", {}, None, "127.0.0.1")
+
+        with self.assertRaises(GatewayTimeout):
+            await route(request, Response())
+
+        # The worker is still running the handler and counts against the capacity
+        self.assertEqual(self.pool.pending, 1)
+
+        deadline = time.monotonic() + 5
+        while self.pool.pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.pool.pending, 0)
+
+    async def test_saturated_pool_fails_fast(self):
+        """Test that requests beyond the pool capacity are rejected with a 503."""
+        route = self._route(ReportHandlers().report)
+        request = Request("GET", "/report", "HTTP/1.1", {}, '{"limit": 10}', "127.0.0.1")
+        self.pool.pending = self.pool.capacity
+
+        try:
+            with self.assertRaises(ServiceUnavailable):
+                await route(request, Response())
+        finally:
+            self.pool.pending = 0
+
+
+class TestProcessPoolStartup(unittest.IsolatedAsyncioTestCase):
+
+    async def test_unstarted_pool_starts_off_the_event_loop(self):
+        """Test that a pool used before it was started is started in a thread."""
+        pool = ProcessPool(max_workers=1)
+        threads = []
+        start = pool.start
+
+        def record_start():
+            threads.append(threading.current_thread())
+            start()
+
+        pool.start = record_start
+        func = ReportHandlers().report
+        route = Route(func, "GET", "/", [], False, None, None, None, cpu_bound=func._cpu_bound)
+        route.resolve("", [])
+        route.prepare(lambda: None, pool)
+        request = Request("GET", "/report", "HTTP/1.1", {}, '{"limit": 3}', "127.0.0.1")
+        request.user = {"id": 1}
+        response = Response()
+
+        try:
+            await route(request, response)
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(response.body, {"total": 3, "user": 1})
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    async def test_app_starts_its_pool_on_startup(self):
+        """Test that the app uses the given pool and starts it in a thread on startup."""
+        threads = []
+        pool = ProcessPool(max_workers=1, max_queue=3, timeout=2)
+        pool.start = Mock(side_effect=lambda: threads.append(threading.current_thread()))
+        app = BirchRest(log_level="test", process_pool=pool)
+
+        app._build_api()
+        pool.start.assert_not_called()
+        await app.startup()
+        await app.shutdown()
+
+        self.assertIs(app.process_pool, pool)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+if __name__ == "__main__":
+    unittest.main()
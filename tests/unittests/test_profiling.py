@@ -0,0 +1,162 @@
+# type: ignore
+
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from birchrest import BirchRest
+from birchrest.http import Request
+from birchrest.profiling import Profiler, StackSampler
+from birchrest.profiling.profiler import control_dir, control_path
+
+
+def burn_slow(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def burn_other(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestStackSampler(unittest.TestCase):
+
+    def _sample(self, mode):
+        sampler = StackSampler(interval=0.001, mode=mode)
+        sampler.start()
+        try:
+            burn_slow(0.2)
+        finally:
+            sampler.stop()
+        return sampler
+
+    def test_thread_mode(self):
+        """Test that the thread sampler records the stacks of the sampled thread."""
+        sampler = self._sample("thread")
+
+        self.assertGreater(sampler.samples, 10)
+        self.assertIn("burn_slow (", sampler.collapsed())
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "requires interval timers")
+    def test_signal_mode(self):
+        """Test that the signal sampler records stacks outermost frame first."""
+        sampler = self._sample("signal")
+
+        stack, count = sampler.collapsed().splitlines()[0].rsplit(" ", 1)
+        self.assertTrue(stack.split(";")[-1].startswith("burn_slow ("))
+        self.assertGreater(int(count), 0)
+        self.assertEqual(signal.getsignal(signal.SIGPROF), signal.SIG_DFL)
+
+
+class TestProfiler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_route_filter(self):
+        """Test that a session limited to a route only keeps samples of its requests."""
+        profiler = Profiler(interval=0.001, mode="thread")
+
+        async def request(route, burn):
+            with profiler.tracking(route):
+                for _ in range(4):
+                    burn(0.03)
+                    await asyncio.sleep(0)
+
+        session = asyncio.ensure_future(profiler.profile(0.4, route="/slow"))
+        await asyncio.sleep(0)
+        await asyncio.gather(request("/slow", burn_slow), request("/other", burn_other))
+        collapsed = await session
+
+        self.assertIn("burn_slow", collapsed)
+        self.assertNotIn("burn_other", collapsed)
+        self.assertFalse(profiler.active)
+
+    async def test_one_session_at_a_time(self):
+        """Test that a second session is rejected while one is running."""
+        profiler = Profiler(mode="thread")
+        session = asyncio.ensure_future(profiler.profile(0.05))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(RuntimeError):
+            await profiler.profile(0.05)
+        with self.assertRaises(ValueError):
+            await Profiler().profile(3600)
+
+        await session
+
+    async def test_signal_request(self):
+        """Test that a profiling request from the CLI is read and answered with a file."""
+        profiler = Profiler(mode="thread")
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "profile.txt")
+            with open(control_path(os.getpid()), "w", encoding="utf-8") as file:
+                json.dump({"duration": 0.05, "output": output}, file)
+
+            profiler._on_signal()
+            while not os.path.exists(output):
+                await asyncio.sleep(0.01)
+
+            self.assertFalse(os.path.exists(control_path(os.getpid())))
+
+    def test_control_dir_must_be_private(self):
+        """Test that profiling requests are only exchanged through a private directory."""
+        with tempfile.TemporaryDirectory() as directory:
+            with patch("tempfile.gettempdir", return_value=directory):
+                path = control_dir()
+                self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+
+                os.chmod(path, 0o777)
+                with self.assertRaises(PermissionError):
+                    control_path(os.getpid())
+
+                os.rmdir(path)
+                os.symlink(directory, path)
+                with self.assertRaises(PermissionError):
+                    control_dir()
+
+
+class TestProfilingRoute(unittest.IsolatedAsyncioTestCase):
+
+    async def _get(self, app, query):
+        return await app.handle_request(
+            Request("GET", f"/debug/profile?{query}", "HTTP/1.1", {}, None, "127.0.0.1")
+        )
+
+    async def test_route_requires_profiling_auth(self):
+        """Test that the profiling route uses its own auth handler."""
+        app = BirchRest(profiling=True, profiling_auth=lambda req, res: req.headers.get("x-admin"))
+        app.profiler.mode = "thread"
+        app._build_api()
+
+        response = await self._get(app, "duration=0.05")
+        self.assertEqual(response._status_code, 401)
+
+        response = await app.handle_request(
+            Request(
+                "GET",
+                "/debug/profile?duration=0.05",
+                "HTTP/1.1",
+                {"x-admin": "1"},
+                None,
+                "127.0.0.1",
+            )
+        )
+        self.assertEqual(response._status_code, 200)
+        self.assertTrue(response._headers["Content-Type"].startswith("text/plain"))
+
+    async def test_invalid_duration(self):
+        """Test that an out of range duration is rejected with 400."""
+        app = BirchRest(profiling=True, profiling_auth=lambda req, res: True)
+        app._build_api()
+
+        response = await self._get(app, "duration=-1")
+        self.assertEqual(response._status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
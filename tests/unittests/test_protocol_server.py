@@ -0,0 +1,148 @@
+# type: ignore
+
+import asyncio
+import json
+import unittest
+from birchrest.http import ProtocolServer, Request, Response
+
+
+class TestProtocolServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.release = asyncio.Event()
+        self.release.set()
+
+        async def handler(request: Request) -> Response:
+            await self.release.wait()
+            return Response().send({"path": request.clean_path, "body": request.body})
+
+        self.server = ProtocolServer(handler, host="127.0.0.1", port=0, drain_timeout=2)
+        self.serve_task = asyncio.ensure_future(self.server.start())
+
+        while not self.server.ready:
+            await asyncio.sleep(0.01)
+
+        self.port = self.server._server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.release.set()
+        self.server.stop()
+        await asyncio.wait_for(self.serve_task, 5)
+
+    async def _read_response(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        headers = dict(
+            line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if line
+        )
+        body = await reader.readexactly(int(headers["Content-Length"]))
+        return head.decode().split("\r\n")[0], headers, json.loads(body)
+
+    async def test_keep_alive_serves_multiple_requests(self):
+        """Test that several requests are answered on the same connection."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+
+        for path in ("/first", "/second"):
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            status, headers, body = await asyncio.wait_for(self._read_response(reader), 2)
+
+            self.assertEqual(status, "HTTP/1.1 200 OK")
+            self.assertNotIn("Connection", headers)
+            self.assertEqual(body["path"], path)
+
+        writer.close()
+
+    async def test_pipelined_requests_with_body(self):
+        """Test that pipelined requests, including bodies, are answered in order."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        payload = json.dumps({"name": "birch"})
+
+        writer.write(
+            (
+                f"POST /a HTTP/1.1\r\nContent-Length: {len(payload)}\r\n\r\n{payload}"
+                "GET /b HTTP/1.1\r\nConnection: close\r\n\r\n"
+            ).encode()
+        )
+
+        _, _, first = await asyncio.wait_for(self._read_response(reader), 2)
+        _, headers, second = await asyncio.wait_for(self._read_response(reader), 2)
+
+        self.assertEqual(first, {"path": "/a", "body": {"name": "birch"}})
+        self.assertEqual(second["path"], "/b")
+        self.assertEqual(headers["Connection"], "close")
+        self.assertEqual(await asyncio.wait_for(reader.read(), 2), b"")
+        writer.close()
+
+    async def test_malformed_request_returns_400(self):
+        """Test that an unparsable request is answered with 400 and closed."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"garbage\r\n\r\n")
+
+        status, _, body = await asyncio.wait_for(self._read_response(reader), 2)
+
+        self.assertEqual(status, "HTTP/1.1 400 Bad Request")
+        self.assertEqual(body, {"error": "Malformed request"})
+        writer.close()
+
+    async def test_body_not_utf8_returns_400(self):
+        """Test that a body that is not valid UTF-8 is answered with 400, also pipelined."""
+        invalid = b"POST /b HTTP/1.1\r\nContent-Length: 2\r\n\r\n\xff\xfe"
+
+        for pipelined in (False, True):
+            with self.subTest(pipelined=pipelined):
+                reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+                if pipelined:
+                    writer.write(b"GET /a HTTP/1.1\r\n\r\n" + invalid)
+                    status, _, _ = await asyncio.wait_for(self._read_response(reader), 2)
+                    self.assertEqual(status, "HTTP/1.1 200 OK")
+                else:
+                    writer.write(invalid)
+
+                status, _, body = await asyncio.wait_for(self._read_response(reader), 2)
+
+                self.assertEqual(status, "HTTP/1.1 400 Bad Request")
+                self.assertEqual(body, {"error": "Malformed request"})
+                self.assertEqual(await asyncio.wait_for(reader.read(), 2), b"")
+                writer.close()
+
+    async def test_idle_keep_alive_connections_are_closed(self):
+        """Test that connections waiting too long for a request are closed."""
+        self.server.keep_alive_timeout = 0.1
+        silent_reader, silent_writer = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+
+        writer.write(b"GET /a HTTP/1.1\r\n\r\n")
+        status, headers, _ = await asyncio.wait_for(self._read_response(reader), 2)
+        self.assertEqual(status, "HTTP/1.1 200 OK")
+        self.assertNotIn("Connection", headers)
+
+        self.assertEqual(await asyncio.wait_for(reader.read(), 2), b"")
+        self.assertEqual(await asyncio.wait_for(silent_reader.read(), 2), b"")
+        self.assertEqual(self.server.connections, 0)
+        writer.close()
+        silent_writer.close()
+
+    async def test_drain_finishes_in_flight_and_closes_idle(self):
+        """Test that stopping lets in-flight requests finish and closes idle connections."""
+        idle_reader, idle_writer = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.release.clear()
+        writer.write(b"GET /slow HTTP/1.1\r\n\r\n")
+
+        while self.server.in_flight == 0:
+            await asyncio.sleep(0.01)
+
+        self.server.stop()
+        self.assertEqual(await asyncio.wait_for(idle_reader.read(), 2), b"")
+
+        self.release.set()
+        _, headers, body = await asyncio.wait_for(self._read_response(reader), 2)
+
+        self.assertEqual(body["path"], "/slow")
+        self.assertEqual(headers["Connection"], "close")
+        await asyncio.wait_for(self.serve_task, 2)
+        writer.close()
+        idle_writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
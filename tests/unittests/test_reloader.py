@@ -0,0 +1,159 @@
+# type: ignore
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from birchrest import BirchRest
+from birchrest.app.reloader import InotifyWatcher, PollingWatcher, Reloader
+from birchrest.unittest import TestAdapter
+
+CONTROLLER = '''
+from birchrest import Controller
+from birchrest.decorators import controller, get
+from {package}.version import VERSION
+
+
+@controller("reload{suffix}")
+class ReloadController(Controller):
+
+    @get("{path}")
+    async def version(self, req, res):
+        return res.send({{"version": VERSION}})
+'''
+
+
+def write(path, content):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+    # Make sure the change is seen even within the timestamp resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+try:
+    InotifyWatcher().close()
+    HAS_INOTIFY = True
+except OSError:
+    HAS_INOTIFY = False
+
+
+class TestWatchers(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "module.py")
+        write(self.path, "A = 1\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher()
+        watcher.watch([self.path])
+        self.assertEqual(watcher.changed(), set())
+
+        write(self.path, "A = 2\n")
+        self.assertEqual(watcher.changed(), {self.path})
+        self.assertEqual(watcher.changed(), set())
+
+        os.remove(self.path)
+        self.assertEqual(watcher.changed(), {self.path})
+
+    @unittest.skipUnless(HAS_INOTIFY, "inotify is not available")
+    async def test_inotify_watcher(self):
+        watcher = InotifyWatcher()
+        try:
+            watcher.watch([self.path])
+            write(os.path.join(self.tmp.name, "other.py"), "")
+            write(self.path, "A = 2\n")
+
+            changed = await asyncio.wait_for(watcher.wait(), 5)
+            self.assertEqual(changed, {self.path})
+        finally:
+            watcher.close()
+
+
+class TestReloader(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.package = f"reload_fixture_{id(self)}"
+        directory = os.path.join(self.tmp.name, self.package)
+        os.mkdir(directory)
+        write(os.path.join(directory, "__init__.py"), "")
+        self.version = os.path.join(directory, "version.py")
+        self.controller = os.path.join(directory, "controller.py")
+        write(self.version, "VERSION = 1\n")
+        write(self.controller, CONTROLLER.format(package=self.package, suffix=id(self), path=""))
+        sys.path.insert(0, self.tmp.name)
+
+        __import__(f"{self.package}.controller")
+        self.app = BirchRest()
+        self.adapter = TestAdapter(self.app)
+        self.reloader = Reloader(self.app, root=self.tmp.name, inotify=False)
+        self.prefix = f"/reload{id(self)}"
+
+    def tearDown(self):
+        for name in list(sys.modules):
+            if name.startswith(self.package):
+                module = sys.modules.pop(name)
+                cls = getattr(module, "ReloadController", None)
+                if cls is not None:
+                    cls._replaced = True
+        sys.path.remove(self.tmp.name)
+        self.tmp.cleanup()
+
+    async def test_watches_project_modules(self):
+        modules = self.reloader.modules()
+
+        self.assertEqual(modules[self.controller], f"{self.package}.controller")
+        self.assertEqual(modules[self.version], f"{self.package}.version")
+        self.assertFalse(any(name.startswith("birchrest") for name in modules.values()))
+
+    async def test_reloads_changed_module_and_dependents(self):
+        response = await self.adapter.get(self.prefix)
+        self.assertEqual(response.body, {"version": 1})
+        routes = len(self.app.routes)
+
+        write(self.version, "VERSION = 2\n")
+        reloaded = self.reloader.reload({self.version})
+
+        self.assertEqual(reloaded[0], f"{self.package}.version")
+        self.assertIn(f"{self.package}.controller", reloaded)
+        self.assertEqual(len(self.app.routes), routes)
+        response = await self.adapter.get(self.prefix)
+        self.assertEqual(response.body, {"version": 2})
+
+    async def test_swaps_in_new_routes(self):
+        old_routes = self.app.routes
+        write(self.controller, CONTROLLER.format(package=self.package, suffix=id(self), path="v2"))
+
+        self.reloader.reload({self.controller})
+
+        self.assertIsNot(self.app.routes, old_routes)
+        self.assertEqual((await self.adapter.get(self.prefix))._status_code, 404)
+        self.assertEqual((await self.adapter.get(f"{self.prefix}/v2"))._status_code, 200)
+
+    async def test_failed_reload_keeps_routes(self):
+        routes = self.app.routes
+        write(self.controller, "this is not python")
+
+        self.assertEqual(self.reloader.reload({self.controller}), [])
+
+        self.assertIs(self.app.routes, routes)
+        self.assertEqual((await self.adapter.get(self.prefix))._status_code, 200)
+
+        # A later reload of an unrelated file rebuilds the routes from the old class
+        other = os.path.join(self.tmp.name, self.package, "other.py")
+        write(other, "A = 1\n")
+        __import__(f"{self.package}.other")
+        write(other, "A = 2\n")
+
+        self.assertEqual(self.reloader.reload({other}), [f"{self.package}.other"])
+        self.assertEqual((await self.adapter.get(self.prefix))._status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+# type: ignore
+
+import asyncio
+import unittest
+from birchrest.di import ResourcePool
+from birchrest.exceptions import PoolTimeout
+from birchrest.metrics import MetricsRegistry
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.closed = False
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.connections = []
+
+    async def connect(self):
+        await asyncio.sleep(0)
+        connection = FakeConnection(len(self.connections))
+        self.connections.append(connection)
+        return connection
+
+    async def close(self, connection):
+        connection.closed = True
+
+    def ping(self, connection):
+        return connection.healthy
+
+
+class TestResourcePool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.db = FakeDatabase()
+
+    def make_pool(self, **options):
+        options.setdefault("health_check_interval", 0)
+        return ResourcePool(self.db.connect, self.db.close, self.db.ping, **options)
+
+    async def test_warms_min_size_on_start(self):
+        async with self.make_pool(min_size=3) as pool:
+            self.assertEqual(len(self.db.connections), 3)
+            self.assertEqual(pool.stats()["idle"], 3)
+
+        self.assertTrue(all(c.closed for c in self.db.connections))
+
+    async def test_reuses_released_resources(self):
+        async with self.make_pool() as pool:
+            async with pool.acquire() as first:
+                self.assertEqual(pool.stats()["in_use"], 1)
+            async with pool.acquire() as second:
+                self.assertIs(first, second)
+
+        self.assertEqual(len(self.db.connections), 1)
+
+    async def test_waiters_are_served_in_order(self):
+        pool = self.make_pool(max_size=1)
+        await pool.start()
+        held = await pool.get()
+        order = []
+
+        async def borrow(name):
+            async with pool.acquire():
+                order.append(name)
+
+        tasks = [asyncio.create_task(borrow(name)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        self.assertEqual(pool.stats()["waiting"], 3)
+
+        await pool.release(held)
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ["a", "b", "c"])
+        self.assertEqual(pool.size, 1)
+        await pool.close()
+
+    async def test_acquire_timeout(self):
+        pool = self.make_pool(max_size=1, acquire_timeout=0.01)
+        held = await pool.get()
+
+        with self.assertRaises(PoolTimeout):
+            await pool.get()
+
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        self.assertEqual(pool.stats()["waiting"], 0)
+        await pool.release(held)
+        self.assertEqual(pool.stats()["idle"], 1)
+        await pool.close()
+
+    async def test_cancelled_waiter_does_not_lose_resource(self):
+        pool = self.make_pool(max_size=1)
+        held = await pool.get()
+        waiter = asyncio.create_task(pool.get())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await pool.release(held)
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+        self.assertEqual(pool.stats()["idle"], 1)
+        self.assertEqual(pool.stats()["in_use"], 0)
+        await pool.close()
+
+    async def test_health_check_replaces_broken_resources(self):
+        pool = self.make_pool(min_size=2)
+        await pool.start()
+        self.db.connections[0].healthy = False
+
+        await pool.check()
+
+        self.assertTrue(self.db.connections[0].closed)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(len(self.db.connections), 3)
+        self.assertEqual(pool.stats()["failed_checks"], 1)
+        await pool.close()
+
+    async def test_reaps_idle_resources_above_min_size(self):
+        pool = self.make_pool(min_size=1, max_idle=0)
+        resources = [await pool.get() for _ in range(3)]
+        for resource in resources:
+            await pool.release(resource)
+
+        await asyncio.sleep(0.001)
+        await pool.check()
+
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(sum(c.closed for c in self.db.connections), 2)
+        await pool.close()
+
+    async def test_background_health_checks(self):
+        pool = self.make_pool(min_size=1, health_check_interval=0.01)
+        await pool.start()
+        self.db.connections[0].healthy = False
+
+        await asyncio.sleep(0.05)
+
+        self.assertTrue(self.db.connections[0].closed)
+        self.assertEqual(pool.size, 1)
+        await pool.close()
+
+    async def test_close_during_slow_check_closes_all_resources(self):
+        checking = asyncio.Event()
+
+        async def slow_ping(connection):
+            checking.set()
+            await asyncio.sleep(10)
+            return True
+
+        pool = ResourcePool(
+            self.db.connect, self.db.close, slow_ping, min_size=3, health_check_interval=0.01
+        )
+        await pool.start()
+        await asyncio.wait_for(checking.wait(), 1)
+
+        await pool.close()
+
+        self.assertTrue(all(c.closed for c in self.db.connections))
+        self.assertEqual(pool.size, 0)
+        self.assertEqual(pool.stats()["in_use"], 0)
+
+    async def test_metrics(self):
+        registry = MetricsRegistry()
+        pool = self.make_pool(name="db")
+        pool.register_metrics(registry)
+
+        async with pool.acquire():
+            rendered = registry.render()
+
+        self.assertIn('birchrest_pool_in_use{pool="db"} 1', rendered)
+        self.assertIn('birchrest_pool_wait_seconds_count{pool="db"} 1', registry.render())
+        await pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
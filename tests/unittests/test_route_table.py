@@ -0,0 +1,124 @@
+# type: ignore
+
+import itertools
+import unittest
+from birchrest import BirchRest
+from birchrest.http import Request
+from birchrest.routes.route import Route
+from birchrest.routes.router import RouteTable, match_route
+
+
+async def handler(req, res):
+    res.send({})
+
+
+def make_routes(*definitions, prefix="/api"):
+    routes = []
+    for method, path in definitions:
+        route = Route(handler, method, path, [], False, None, None, None)
+        route.resolve(prefix, [])
+        routes.append(route)
+    return routes
+
+
+ROUTES = [
+    ("GET", "users"),
+    ("POST", "users"),
+    ("GET", "users/:id"),
+    ("GET", "users/me"),
+    ("DELETE", "users/me"),
+    ("PUT", "users/:id"),
+    ("GET", "users/:id/posts/:post"),
+    ("GET", "users/:id/posts/latest"),
+    ("GET", "openapi.json"),
+    ("GET", "files/:name.txt"),
+    ("GET", "health"),
+    ("GET", "health"),
+]
+
+PATHS = [
+    "/api/users",
+    "/api/users/",
+    "/api/users/42",
+    "/api/users/me",
+    "/api/users/42/posts/7",
+    "/api/users/42/posts/latest",
+    "/api/users/42/posts",
+    "/api/openapi.json",
+    "/api/openapiXjson",
+    "/api/files/a.txt",
+    "/api/files/a/b.txt",
+    "/api/health",
+    "/api",
+    "/",
+    "",
+    "/missing",
+]
+
+
+class TestRouteTable(unittest.TestCase):
+
+    def test_matches_like_linear_search(self):
+        """Test that every lookup returns the same result as trying every route."""
+        routes = make_routes(*ROUTES)
+        table = RouteTable(routes)
+
+        for method, path in itertools.product(["GET", "POST", "PUT", "DELETE"], PATHS):
+            with self.subTest(method=method, path=path):
+                self.assertEqual(table.match(method, path), match_route(routes, method, path))
+
+    def test_first_defined_route_wins(self):
+        """Test that a parameter route defined first wins over a literal one."""
+        param_first = make_routes(("GET", "users/:id"), ("GET", "users/me"))
+        route, params, _ = RouteTable(param_first).match("GET", "/api/users/me")
+        self.assertIs(route, param_first[0])
+        self.assertEqual(params, {"id": "me"})
+
+        literal_first = make_routes(("GET", "users/me"), ("GET", "users/:id"))
+        route, params, _ = RouteTable(literal_first).match("GET", "/api/users/me")
+        self.assertIs(route, literal_first[0])
+        self.assertEqual(params, {})
+
+    def test_method_not_allowed_and_not_found(self):
+        table = RouteTable(make_routes(("GET", "users/:id")))
+
+        self.assertEqual(table.match("POST", "/api/users/1"), (None, {}, True))
+        self.assertEqual(table.match("GET", "/api/users/1/2"), (None, {}, False))
+        self.assertEqual(table.match("GET", "/api/users/"), (None, {}, False))
+
+    def test_describe_and_stats(self):
+        table = RouteTable(make_routes(("GET", "users"), ("GET", "users/:id"), ("GET", "a.json")))
+
+        self.assertEqual([e["kind"] for e in table.describe()], ["static", "dynamic", "pattern"])
+        self.assertEqual(table.describe()[1]["params"], ["id"])
+        self.assertEqual(table.describe()[1]["handler"], "handler")
+
+        stats = table.stats()
+        self.assertEqual((stats["routes"], stats["static"], stats["dynamic"], stats["pattern"]), (3, 1, 1, 1))
+        self.assertEqual(stats["nodes"], 5)
+
+
+class TestAppRouter(unittest.IsolatedAsyncioTestCase):
+
+    async def _get(self, app, path):
+        return await app.handle_request(Request("GET", path, "HTTP/1.1", {}, None, "127.0.0.1"))
+
+    async def test_router_is_compiled_once_and_replaced_on_rebuild(self):
+        app = BirchRest(log_level="test")
+        app._build_api()
+        self.assertIsNone(app.router)
+        app.routes.extend(make_routes(("GET", "users")))
+
+        self.assertEqual((await self._get(app, "/api/users"))._status_code, 200)
+        router = app.router
+        self.assertIsNotNone(router)
+        await self._get(app, "/api/users")
+        self.assertIs(app.router, router)
+
+        app._rebuild_api()
+        self.assertIsNot(app.router, router)
+        self.assertEqual((await self._get(app, "/api/users"))._status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 import unittest
 from unittest.mock import patch, AsyncMock, Mock
 import asyncio
+import socket
 from birchrest.http.server import Server
 from birchrest.http.request import Request
 from birchrest.http.response import Response
@@ -21,7 +22,135 @@ class TestServer(unittest.IsolatedAsyncioTestCase):
 
         await server.start()
 
-        mock_start_server.assert_called_once_with(server._handle_client, "127.0.0.1", 8000)
+        mock_start_server.assert_called_once_with(
+            server._handle_client, "127.0.0.1", 8000, backlog=100
+        )
+
+    @patch('asyncio.start_server', new_callable=AsyncMock)
+    async def test_server_start_with_backlog(self, mock_start_server):
+        """Test that the configured backlog is passed to start_server."""
+
+        async def mock_request_handler(request: Request) -> Response:
+            return Response().status(200).send({"message": "OK"})
+
+        server = Server(request_handler=mock_request_handler, port=8000, backlog=2048)
+
+        await server.start()
+
+        mock_start_server.assert_called_once_with(
+            server._handle_client, "127.0.0.1", 8000, backlog=2048
+        )
+
+
+class TestServerDrain(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+
+        async def slow_handler(request: Request) -> Response:
+            self.started.set()
+            await self.release.wait()
+            return Response().status(200).send({"message": "OK"})
+
+        self.server = Server(slow_handler, host="127.0.0.1", port=0, drain_timeout=2)
+        self.serve_task = asyncio.ensure_future(self.server.start())
+
+        while not self.server.ready:
+            await asyncio.sleep(0.01)
+
+        self.port = self.server._server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.release.set()
+        self.server.stop()
+        await asyncio.wait_for(self.serve_task, 5)
+
+    async def _send_request(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        return reader, writer
+
+    async def test_socket_options_applied(self):
+        """Test that TCP_NODELAY and SO_KEEPALIVE are set on accepted connections."""
+        self.server.keepalive = True
+        reader, writer = await self._send_request()
+        await asyncio.wait_for(self.started.wait(), 2)
+
+        (server_writer,) = list(self.server._connections)
+        sock = server_writer.get_extra_info("socket")
+
+        self.assertTrue(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        self.assertTrue(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+        writer.close()
+
+    async def test_stop_turns_server_unready(self):
+        """Test that requesting a stop immediately reports the server as not ready."""
+        self.assertTrue(self.server.ready)
+        self.server.stop()
+        self.assertFalse(self.server.ready)
+
+    async def test_in_flight_request_finishes_during_drain(self):
+        """Test that an in-flight request is allowed to complete after stop is requested."""
+        reader, writer = await self._send_request()
+        await asyncio.wait_for(self.started.wait(), 2)
+
+        self.assertEqual(self.server.in_flight, 1)
+        self.server.stop()
+        await asyncio.sleep(0.05)
+        self.assertFalse(self.serve_task.done())
+
+        self.release.set()
+        data = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+
+        self.assertTrue(data.startswith(b"HTTP/1.1 200"))
+        await asyncio.wait_for(self.serve_task, 2)
+
+    async def test_responses_announce_connection_close(self):
+        """Test that responses tell the client the connection will not be reused."""
+        self.release.set()
+        reader, writer = await self._send_request()
+        data = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+
+        head = data.split(b"\r\n\r\n", 1)[0].split(b"\r\n")
+        self.assertTrue(head[0].startswith(b"HTTP/1.1 200"))
+        self.assertIn(b"Connection: close", head[1:])
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"GARBAGE\r\n\r\n")
+        data = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+
+        self.assertTrue(data.startswith(b"HTTP/1.1 400"))
+        self.assertIn(b"\r\nConnection: close\r\n", data)
+
+    async def test_idle_connection_is_closed_on_shutdown(self):
+        """Test that connections without a request are closed when draining starts."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        await asyncio.sleep(0.05)
+
+        self.server.stop()
+        data = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+
+        self.assertEqual(data, b"")
+        await asyncio.wait_for(self.serve_task, 2)
+
+    async def test_drain_deadline_cancels_requests(self):
+        """Test that requests still running after the drain deadline are cancelled."""
+        self.server.drain_timeout = 0.1
+        reader, writer = await self._send_request()
+        await asyncio.wait_for(self.started.wait(), 2)
+
+        self.server.stop()
+        await asyncio.wait_for(self.serve_task, 2)
+        writer.close()
+
+        self.assertEqual(self.server.in_flight, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
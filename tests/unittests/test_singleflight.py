@@ -0,0 +1,97 @@
+# type: ignore
+
+import asyncio
+import unittest
+from birchrest.decorators import coalesce
+from birchrest.exceptions import NotFound
+from birchrest.middlewares import Singleflight
+from birchrest.http import Request, Response
+
+
+class TestSingleflight(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.singleflight = Singleflight(headers=["Authorization"])
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    def _request(self, path="/items?page=1", method="GET", token="a"):
+        return Request(method, path, "HTTP/1.1", {"authorization": token}, None, "127.0.0.1")
+
+    async def _run(self, req, error=None):
+        res = Response()
+
+        async def next_():
+            self.calls += 1
+            await self.release.wait()
+            if error:
+                raise error
+            res.status(201).send({"calls": self.calls})
+
+        await self.singleflight(req, res, next_)
+        return res
+
+    async def test_identical_requests_are_merged(self):
+        """Test that identical concurrent requests run the handler once and share the body."""
+        tasks = [asyncio.ensure_future(self._run(self._request())) for _ in range(10)]
+        await asyncio.sleep(0)
+        self.release.set()
+        responses = await asyncio.gather(*tasks)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.singleflight.hits, 1)
+        self.assertEqual(self.singleflight.merges, 9)
+        self.assertTrue(all(res._status_code == 201 for res in responses))
+        self.assertTrue(all(res.json is responses[0].json for res in responses))
+        self.assertEqual(self.singleflight._in_flight, {})
+
+    async def test_different_keys_are_not_merged(self):
+        """Test that the path, query and configured headers are part of the key."""
+        tasks = [
+            asyncio.ensure_future(self._run(self._request("/items?page=1"))),
+            asyncio.ensure_future(self._run(self._request("/items?page=2"))),
+            asyncio.ensure_future(self._run(self._request(token="b"))),
+            asyncio.ensure_future(self._run(self._request(method="POST"))),
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(self.calls, 4)
+        self.assertEqual(self.singleflight.merges, 0)
+
+    async def test_exception_is_shared(self):
+        """Test that an exception from the handler is raised for every merged request."""
+        tasks = [
+            asyncio.ensure_future(self._run(self._request(), error=NotFound()))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(result, NotFound) for result in results))
+
+    async def test_sequential_requests_are_not_merged(self):
+        """Test that a completed request is not cached."""
+        self.release.set()
+        await self._run(self._request())
+        await self._run(self._request())
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.singleflight.hits, 2)
+
+    def test_coalesce_decorator(self):
+        """Test that the decorator registers a Singleflight middleware on the route."""
+
+        @coalesce(headers=["Authorization"])
+        async def handler(req, res):
+            pass
+
+        self.assertIsInstance(handler._middlewares[0], Singleflight)
+        self.assertEqual(handler._middlewares[0].headers, ["authorization"])
+
+
+if __name__ == "__main__":
+    unittest.main()
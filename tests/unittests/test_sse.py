@@ -0,0 +1,192 @@
+# type: ignore
+
+import asyncio
+import unittest
+from birchrest.http import (
+    Broadcaster,
+    ProtocolServer,
+    Request,
+    Response,
+    Server,
+    ServerSentEvent,
+)
+from birchrest.http.sse import EventStream
+
+
+class TestServerSentEvent(unittest.TestCase):
+
+    def test_encode_event_fields(self):
+        """Test that all fields are framed and multiline data is split."""
+        event = ServerSentEvent("first\nsecond", event="update", id="7", retry=1000)
+        self.assertEqual(
+            event.encode(),
+            b"event: update\nid: 7\nretry: 1000\ndata: first\ndata: second\n\n",
+        )
+
+    def test_encode_json_data(self):
+        """Test that data that is not a string is JSON encoded."""
+        self.assertEqual(ServerSentEvent({"a": 1}).encode(), b'data: {"a": 1}\n\n')
+
+    def test_sse_sets_headers(self):
+        """Test that sse marks the response as sent with event-stream headers."""
+
+        async def source():
+            yield "hello"
+
+        res = Response().sse(source())
+
+        self.assertTrue(res._is_sent)
+        self.assertIsNotNone(res.stream)
+        self.assertEqual(res._headers["Content-Type"], "text/event-stream")
+        self.assertNotIn("Content-Length", res._headers)
+
+        with self.assertRaises(RuntimeError):
+            res.send({})
+
+
+class TestEventStream(unittest.IsolatedAsyncioTestCase):
+
+    async def test_heartbeat_and_events(self):
+        """Test that a heartbeat is written while the source is idle."""
+
+        async def source():
+            await asyncio.sleep(0.08)
+            yield "late"
+
+        written = []
+
+        async def write(data):
+            written.append(data)
+
+        await EventStream(source(), heartbeat=0.03).run(write)
+
+        self.assertIn(b": ping\n\n", written)
+        self.assertEqual(written[-1], b"data: late\n\n")
+
+    async def test_stopping_closes_source(self):
+        """Test that setting the stopping event ends the stream and closes the source."""
+        closed = asyncio.Event()
+
+        async def source():
+            try:
+                while True:
+                    await asyncio.sleep(1)
+                    yield "tick"
+            finally:
+                closed.set()
+
+        async def write(data):
+            pass
+
+        stopping = asyncio.Event()
+        task = asyncio.ensure_future(EventStream(source(), heartbeat=5).run(write, stopping))
+        await asyncio.sleep(0.01)
+        stopping.set()
+
+        await asyncio.wait_for(task, 1)
+        self.assertTrue(closed.is_set())
+
+    async def test_failed_write_ends_stream(self):
+        """Test that a write to a disconnected client ends the stream."""
+
+        async def source():
+            while True:
+                yield "tick"
+
+        async def write(data):
+            raise ConnectionResetError()
+
+        await asyncio.wait_for(EventStream(source()).run(write), 1)
+
+
+class TestBroadcaster(unittest.IsolatedAsyncioTestCase):
+
+    async def test_publish_fans_out(self):
+        """Test that a published event is delivered to every subscriber."""
+        hub = Broadcaster()
+        subscriptions = [hub.subscribe() for _ in range(100)]
+
+        self.assertEqual(hub.publish({"n": 1}, event="tick"), 100)
+
+        for subscription in subscriptions:
+            self.assertEqual(
+                await subscription.__anext__(), b'event: tick\ndata: {"n": 1}\n\n'
+            )
+
+    async def test_slow_subscriber_is_evicted(self):
+        """Test that a subscriber with a full queue is evicted and its stream ends."""
+        hub = Broadcaster(max_queue=2)
+        slow = hub.subscribe()
+        fast = hub.subscribe(max_queue=10)
+
+        for n in range(3):
+            hub.publish(n)
+
+        self.assertTrue(slow.evicted)
+        self.assertEqual(hub.subscribers, 1)
+        self.assertEqual([event async for event in slow], [])
+
+        hub.close()
+        self.assertEqual(len([event async for event in fast]), 3)
+
+    async def test_aclose_unsubscribes(self):
+        """Test that closing the response stream removes the subscriber."""
+        hub = Broadcaster()
+        subscription = hub.subscribe()
+
+        await subscription.aclose()
+
+        self.assertEqual(hub.subscribers, 0)
+        self.assertEqual(hub.publish("ignored"), 0)
+
+
+class TestServerStreaming(unittest.IsolatedAsyncioTestCase):
+
+    async def _stream(self, server_class):
+        hub = Broadcaster()
+
+        async def handler(request: Request) -> Response:
+            return Response().sse(hub.subscribe())
+
+        server = server_class(handler, host="127.0.0.1", port=0, drain_timeout=2)
+        serve_task = asyncio.ensure_future(server.start())
+
+        while not server.ready:
+            await asyncio.sleep(0.01)
+
+        port = server._server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 2)
+
+        while hub.subscribers == 0:
+            await asyncio.sleep(0.01)
+
+        hub.publish("one")
+        hub.publish({"two": 2}, event="update")
+
+        first = await asyncio.wait_for(reader.readuntil(b"\n\n"), 2)
+        second = await asyncio.wait_for(reader.readuntil(b"\n\n"), 2)
+
+        server.stop()
+        await asyncio.wait_for(serve_task, 5)
+        writer.close()
+
+        self.assertIn(b"Content-Type: text/event-stream", head)
+        self.assertNotIn(b"Content-Length", head)
+        self.assertEqual(first, b"data: one\n\n")
+        self.assertEqual(second, b'event: update\ndata: {"two": 2}\n\n')
+        self.assertEqual(hub.subscribers, 0)
+
+    async def test_streams_server(self):
+        """Test that the streams server writes events and ends the stream on shutdown."""
+        await self._stream(Server)
+
+    async def test_protocol_server(self):
+        """Test that the protocol server writes events and ends the stream on shutdown."""
+        await self._stream(ProtocolServer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ from birchrest.http.request import Request
 from birchrest.http.response import Response
 from birchrest.app.birchrest_app import BirchRest
 from birchrest.unittest import TestAdapter
+from birchrest.routes import Route
+import asyncio
 from typing import Dict, Optional, Any
 
 
@@ -103,5 +105,82 @@ class TestTestAdapter(unittest.IsolatedAsyncioTestCase):
         self._assert_request("OPTIONS", path, headers, None)
 
 
+
+class TestBench(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.app = BirchRest(base_path="api")
+        self.adapter = TestAdapter(self.app)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        async def handler(req, res):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0)
+            self.in_flight -= 1
+            res.send({"id": req.params.id, "name": getattr(req.body, "name", None)})
+
+        route = Route(handler, "POST", "items/:id", [], False, None, None, None)
+        route.resolve("/api", [])
+        self.app.routes.append(route)
+
+    async def test_bench_reports_throughput_and_latency(self):
+        """Test that every request is handled and measured, with bounded concurrency."""
+        result = await self.adapter.bench(
+            "POST", "/api/items/1", n=200, concurrency=8, body={"name": "x"}
+        )
+
+        self.assertEqual(result.requests, 200)
+        self.assertEqual(result.statuses, {200: 200})
+        self.assertEqual(result.latency.count, 200)
+        self.assertEqual(self.max_in_flight, 8)
+        self.assertGreater(result.throughput, 0)
+        self.assertLessEqual(result.percentile(50), result.percentile(99))
+        self.assertEqual(result.stages, {})
+
+        summary = result.summary()
+        self.assertEqual(summary["requests"], 200)
+        self.assertIn("p99_ms", summary["latency"])
+
+    async def test_bench_records_stage_timings(self):
+        """Test that stage timings are recorded per request when enabled."""
+        result = await self.adapter.bench("POST", "/api/items/1", n=20, timing=True)
+
+        for stage in ("routing", "handler", "serialize"):
+            self.assertEqual(result.stages[stage].count, 20, stage)
+
+    async def test_bench_counts_statuses(self):
+        """Test that responses are counted per status code, including warmup exclusion."""
+        result = await self.adapter.bench("GET", "/api/missing", n=10, warmup=5)
+
+        self.assertEqual(result.statuses, {404: 10})
+
+    async def test_bench_waits_for_background_tasks(self):
+        """Test that background tasks finish before bench returns, timed separately."""
+        finished = []
+
+        async def task():
+            await asyncio.sleep(0.01)
+            finished.append(1)
+
+        async def handler(req, res):
+            res.send({}).background(task)
+
+        route = Route(handler, "GET", "tasks", [], False, None, None, None)
+        route.resolve("/api", [])
+        self.app.routes.append(route)
+
+        result = await self.adapter.bench("GET", "/api/tasks", n=20, concurrency=4)
+
+        self.assertEqual(len(finished), 20)
+        self.assertEqual(len(self.app.background), 0)
+        self.assertGreater(result.background_duration, 0)
+
+    async def test_bench_rejects_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            await self.adapter.bench("GET", "/api/items/1", n=0)
+
+
 if __name__ == "__main__":
     unittest.main()
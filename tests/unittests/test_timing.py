@@ -0,0 +1,96 @@
+# type: ignore
+
+import time
+import unittest
+from birchrest import BirchRest
+from birchrest.http import Request, Timings
+from birchrest.routes import Route
+
+
+class TestTimings(unittest.TestCase):
+
+    def test_nested_stages_are_exclusive(self):
+        """Test that time in a nested stage is not counted for the outer stage."""
+        timings = Timings()
+
+        with timings.stage("middlewares"):
+            time.sleep(0.01)
+            with timings.stage("handler"):
+                time.sleep(0.02)
+
+        self.assertGreaterEqual(timings.stages["handler"], 20_000_000)
+        self.assertGreaterEqual(timings.stages["middlewares"], 10_000_000)
+        self.assertLess(timings.stages["middlewares"], 20_000_000)
+        self.assertLessEqual(sum(timings.stages.values()), timings.total())
+
+    def test_server_timing_header(self):
+        """Test that stages are formatted in milliseconds followed by the total."""
+        timings = Timings()
+        timings.stages = {"handler": 1_500_000, "serialize": 250_000}
+
+        value = timings.server_timing()
+
+        self.assertTrue(value.startswith("handler;dur=1.500, serialize;dur=0.250, total;dur="))
+
+
+class TestAppTiming(unittest.IsolatedAsyncioTestCase):
+
+    async def _handle(self, app):
+        async def handler(req, res):
+            res.send({"id": req.params.id})
+
+        app._build_api()
+        route = Route(handler, "GET", "items/:id", [], False, None, None, None)
+        route.resolve("/api", [])
+        app.routes.append(route)
+
+        return await app.handle_request(
+            Request("GET", "/api/items/1", "HTTP/1.1", {}, None, "127.0.0.1")
+        )
+
+    async def test_timing_is_off_by_default(self):
+        """Test that no timings are recorded unless timing is enabled."""
+        response = await self._handle(BirchRest(base_path="api"))
+
+        self.assertIsNone(response.timings)
+        self.assertNotIn("Server-Timing", response._headers)
+
+    async def test_server_timing(self):
+        """Test that the Server-Timing header lists the recorded stages."""
+        response = await self._handle(BirchRest(base_path="api", server_timing=True))
+
+        header = response._headers["Server-Timing"]
+        for stage in ("routing", "dataclass", "handler", "serialize", "total"):
+            self.assertIn(f"{stage};dur=", header)
+
+    async def test_hooks_receive_timings(self):
+        """Test that timing hooks are called and failing hooks do not break requests."""
+        app = BirchRest(base_path="api")
+        received = []
+
+        def failing(req, res, timings):
+            raise RuntimeError("exporter down")
+
+        app.on_timing(failing)
+        app.on_timing(lambda req, res, timings: received.append(timings))
+        response = await self._handle(app)
+
+        self.assertEqual(response._status_code, 200)
+        self.assertEqual(len(received), 1)
+        self.assertIn("handler", received[0].stages)
+        self.assertNotIn("Server-Timing", response._headers)
+
+    async def test_stage_metrics(self):
+        """Test that stage durations are recorded in the metrics registry."""
+        app = BirchRest(base_path="api", metrics=True)
+        await self._handle(app)
+
+        rendered = app.metrics.render()
+        self.assertIn(
+            'birchrest_request_stage_duration_seconds_count{stage="handler"} 1\n',
+            rendered,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+# type: ignore
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from contextlib import nullcontext
+from birchrest import BirchRest
+from birchrest.http import Request
+from birchrest.http.trace_context import parse_traceparent
+from birchrest.routes import Route
+from birchrest.tracing import (
+    BatchExporter,
+    FileExporter,
+    InMemoryExporter,
+    SpanExporter,
+    Trace,
+    Tracer,
+)
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+class TestTraceContext(unittest.TestCase):
+
+    def test_parse_traceparent(self):
+        """Test that a valid header is parsed and formatted back unchanged."""
+        context = parse_traceparent(TRACEPARENT)
+
+        self.assertEqual(context.trace_id, "4bf92f3577b34da6a3ce929d0e0e4736")
+        self.assertEqual(context.parent_id, "00f067aa0ba902b7")
+        self.assertTrue(context.sampled)
+        self.assertEqual(context.traceparent(), TRACEPARENT)
+
+    def test_invalid_headers_are_ignored(self):
+        """Test that malformed headers and all zero IDs are rejected."""
+        for header in (
+            "garbage",
+            "ff-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+            "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-0000000000000000-01",
+            "00-4BF92F3577B34DA6A3CE929D0E0E4736-00f067aa0ba902b7-01",
+            TRACEPARENT + "-extra",
+        ):
+            self.assertIsNone(parse_traceparent(header), header)
+
+    def test_request_uses_trace_id_as_correlation_id(self):
+        """Test that the trace ID of an incoming header becomes the correlation ID."""
+        request = Request(
+            "GET", "/", "HTTP/1.1", {"traceparent": TRACEPARENT}, None, "127.0.0.1"
+        )
+
+        self.assertEqual(request.correlation_id, "4bf92f3577b34da6a3ce929d0e0e4736")
+        self.assertEqual(request.traceparent(), TRACEPARENT)
+
+
+class TestTrace(unittest.TestCase):
+
+    def test_spans_nest(self):
+        """Test that spans are parented to the span they were started in."""
+        trace = Trace("GET", "a" * 32)
+
+        with trace.span("db") as db:
+            with trace.span("query") as query:
+                self.assertIn(query.span_id, trace.traceparent())
+
+        with self.assertRaises(ValueError):
+            with trace.span("cache"):
+                raise ValueError()
+
+        trace.finish()
+        records = {record["name"]: record for record in trace.export("api")}
+
+        self.assertEqual(records["db"]["parent_id"], trace.root.span_id)
+        self.assertEqual(records["query"]["parent_id"], db.span_id)
+        self.assertEqual(records["cache"]["status"], "error")
+        self.assertLessEqual(
+            records["GET"]["start_time_unix_nano"], records["db"]["start_time_unix_nano"]
+        )
+
+
+class TestExporters(unittest.TestCase):
+
+    def test_batch_exporter_flushes_on_shutdown(self):
+        """Test that queued spans are exported in batches from the background thread."""
+        batches = []
+
+        class Recorder(SpanExporter):
+            def export(self, spans):
+                batches.append(list(spans))
+
+        exporter = BatchExporter(Recorder(), batch_size=3, interval=10)
+        for n in range(5):
+            exporter.export([{"n": n}])
+        exporter.shutdown()
+
+        self.assertEqual(sum(len(batch) for batch in batches), 5)
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+
+    def test_batch_exporter_drops_when_full(self):
+        """Test that spans are dropped instead of blocking when the queue is full."""
+
+        class Slow(SpanExporter):
+            def export(self, spans):
+                time.sleep(0.2)
+
+        exporter = BatchExporter(Slow(), max_queue=1, batch_size=1, interval=10)
+        for n in range(10):
+            exporter.export([{"n": n}])
+
+        self.assertGreater(exporter.dropped, 0)
+        exporter.shutdown()
+
+    def test_file_exporter(self):
+        """Test that spans are appended to the file as JSON lines."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spans.jsonl")
+            exporter = FileExporter(path)
+            exporter.export([{"name": "a"}, {"name": "b"}])
+
+            with open(path, encoding="utf-8") as file:
+                names = [json.loads(line)["name"] for line in file]
+
+        self.assertEqual(names, ["a", "b"])
+
+
+class TestAppTracing(unittest.IsolatedAsyncioTestCase):
+
+    async def _handle(self, tracer, headers=None):
+        app = BirchRest(base_path="api", tracer=tracer)
+
+        async def handler(req, res):
+            with req.trace.span("db") if req.trace else nullcontext():
+                res.send({"id": req.params.id})
+
+        app._build_api()
+        route = Route(handler, "GET", "items/:id", [], False, None, None, None)
+        route.resolve("/api", [])
+        app.routes.append(route)
+
+        request = Request("GET", "/api/items/1", "HTTP/1.1", headers or {}, None, "127.0.0.1")
+        response = await app.handle_request(request)
+        return request, response
+
+    async def test_sampled_request_records_stages(self):
+        """Test that a sampled request exports a root span with nested stage spans."""
+        exporter = InMemoryExporter()
+        request, response = await self._handle(Tracer(exporter, sample_rate=1.0))
+
+        spans = {span["name"]: span for span in exporter.spans}
+        root = spans["GET /api/items/:id"]
+
+        self.assertEqual(root["trace_id"], request.correlation_id)
+        self.assertEqual(response.correlation_id, request.correlation_id)
+        self.assertIsNone(root["parent_id"])
+        self.assertEqual(root["attributes"]["http.status_code"], 200)
+        for stage in ("routing", "dataclass", "handler", "serialize"):
+            self.assertEqual(spans[stage]["trace_id"], root["trace_id"])
+        self.assertEqual(spans["db"]["parent_id"], spans["handler"]["span_id"])
+
+    async def test_incoming_trace_is_continued(self):
+        """Test that a sampled caller's trace is continued even at a zero sample rate."""
+        exporter = InMemoryExporter()
+        await self._handle(Tracer(exporter, sample_rate=0.0), {"traceparent": TRACEPARENT})
+
+        root = exporter.spans[0]
+        self.assertEqual(root["trace_id"], "4bf92f3577b34da6a3ce929d0e0e4736")
+        self.assertEqual(root["parent_id"], "00f067aa0ba902b7")
+
+    async def test_unsampled_request_is_not_recorded(self):
+        """Test that unsampled requests export nothing but can still propagate."""
+        exporter = InMemoryExporter()
+        request, response = await self._handle(Tracer(exporter, sample_rate=0.0))
+
+        self.assertEqual(exporter.spans, [])
+        self.assertIsNone(request.timings)
+        self.assertTrue(request.traceparent().endswith("-00"))
+        self.assertIn(request.correlation_id, request.traceparent())
+
+    async def test_shutdown_does_not_block_the_loop(self):
+        """Test that flushing the exporter on shutdown runs off the event loop."""
+
+        class Slow(SpanExporter):
+            def export(self, spans):
+                pass
+
+            def shutdown(self):
+                time.sleep(0.2)
+
+        app = BirchRest(tracer=Tracer(Slow()))
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        await app.shutdown()
+        ticker.cancel()
+
+        self.assertGreater(len(ticks), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
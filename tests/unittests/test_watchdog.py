@@ -0,0 +1,89 @@
+# type: ignore
+
+import asyncio
+import time
+import unittest
+from birchrest import BirchRest
+from birchrest.http import Request
+from birchrest.profiling import Watchdog
+
+
+def make_request(path="/reports"):
+    return Request("GET", path, "HTTP/1.1", {}, None, "127.0.0.1")
+
+
+async def slow_handler():
+    await asyncio.sleep(0.3)
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+class TestWatchdog(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.watchdog = Watchdog(threshold=0.1, lag_threshold=0.1, interval=0.02)
+        self.watchdog.start()
+
+    async def asyncTearDown(self):
+        self.watchdog.stop()
+
+    async def test_slow_request_stack(self):
+        """Test that a slow request is reported with the stack it is waiting in."""
+        request = make_request()
+        with self.watchdog.watch(request):
+            await slow_handler()
+
+        reports = [r for r in self.watchdog.reports if r["kind"] == "slow_request"]
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0]["request"]["correlation_id"], request.correlation_id)
+        self.assertTrue(any("slow_handler" in frame for frame in reports[0]["stack"]))
+        self.assertGreaterEqual(reports[0]["duration_ms"], 300)
+        self.assertEqual(self.watchdog.in_flight, 0)
+
+    async def test_blocked_loop(self):
+        """Test that a blocking call is reported with the request whose handler ran."""
+        request = make_request("/blocking")
+        with self.watchdog.watch(request):
+            blocking_handler()
+            await asyncio.sleep(0.05)
+
+        reports = [r for r in self.watchdog.reports if r["kind"] == "loop_blocked"]
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0]["request"]["path"], "/blocking")
+        self.assertIn("blocking_handler", reports[0]["stack"][-1])
+        self.assertGreaterEqual(reports[0]["duration_ms"], 250)
+
+    async def test_reports_are_bounded(self):
+        """Test that only the latest reports are kept."""
+        watchdog = Watchdog(max_reports=2)
+        for n in range(3):
+            watchdog.reports.append({"n": n})
+
+        self.assertEqual([r["n"] for r in watchdog.snapshot()["reports"]], [1, 2])
+
+
+class TestWatchdogRoute(unittest.IsolatedAsyncioTestCase):
+
+    async def test_reports_are_served(self):
+        """Test that the watchdog route serves the reports to authorized callers."""
+        app = BirchRest(
+            watchdog=Watchdog(), profiling_auth=lambda req, res: req.headers.get("x-admin")
+        )
+        app._build_api()
+        app.watchdog.reports.append({"kind": "slow_request"})
+
+        response = await app.handle_request(make_request("/debug/slow"))
+        self.assertEqual(response._status_code, 401)
+
+        response = await app.handle_request(
+            Request("GET", "/debug/slow", "HTTP/1.1", {"x-admin": "1"}, None, "127.0.0.1")
+        )
+        self.assertEqual(response._status_code, 200)
+        self.assertEqual(response.body["reports"], [{"kind": "slow_request"}])
+        self.assertEqual(response.body["in_flight"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,292 @@
+# type: ignore
+
+import asyncio
+import os
+import struct
+import unittest
+from birchrest.exceptions import ApiError, Unauthorized, UpgradeRequired
+from birchrest.http import ProtocolServer, Request, Response, Server
+from birchrest.http.websocket import (
+    BINARY,
+    CLOSE,
+    PING,
+    PONG,
+    TEXT,
+    FrameParser,
+    WebSocketError,
+    accept_key,
+    apply_mask,
+    encode_frame,
+)
+from birchrest.routes import Route
+
+
+def client_frame(opcode, payload=b"", fin=True):
+    mask = os.urandom(4)
+    first = (0x80 if fin else 0) | opcode
+    length = len(payload)
+
+    if length < 126:
+        header = struct.pack("!BB", first, 0x80 | length)
+    elif length < 65536:
+        header = struct.pack("!BBH", first, 0x80 | 126, length)
+    else:
+        header = struct.pack("!BBQ", first, 0x80 | 127, length)
+
+    return header + mask + apply_mask(payload, mask)
+
+
+async def read_frame(reader):
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+
+    return first & 0x0F, await reader.readexactly(length)
+
+
+def handshake_request(path="/chat", key="dGhlIHNhbXBsZSBub25jZQ=="):
+    return (
+        f"GET {path} HTTP/1.1\r\n"
+        "Host: localhost\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n"
+    ).encode()
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_accept_key(self):
+        """Test the accept key against the example from RFC 6455."""
+        self.assertEqual(
+            accept_key("dGhlIHNhbXBsZSBub25jZQ=="), "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+        )
+
+    def test_mask_round_trip(self):
+        """Test that masking twice returns the original payload."""
+        payload = os.urandom(1001)
+        mask = os.urandom(4)
+        self.assertEqual(apply_mask(apply_mask(payload, mask), mask), payload)
+
+    def test_encode_frame_lengths(self):
+        """Test the length encodings of server frames."""
+        self.assertEqual(encode_frame(TEXT, b"hi"), b"\x81\x02hi")
+        self.assertEqual(encode_frame(BINARY, b"x" * 200)[:4], b"\x82\x7e\x00\xc8")
+        self.assertEqual(encode_frame(BINARY, b"x" * 70000)[1], 127)
+
+    def test_parser_handles_partial_frames(self):
+        """Test that a frame is only returned once it has fully arrived."""
+        parser = FrameParser(max_size=1024)
+        frame = client_frame(TEXT, b"hello" * 50)
+
+        parser.feed(frame[:3])
+        self.assertIsNone(parser.next_frame())
+
+        parser.feed(frame[3:] + client_frame(PING, b"p"))
+        self.assertEqual(parser.next_frame().payload, b"hello" * 50)
+        self.assertEqual(parser.next_frame().opcode, PING)
+        self.assertIsNone(parser.next_frame())
+
+    def test_parser_rejects_unmasked_and_large_frames(self):
+        """Test that unmasked frames and frames above the size limit are rejected."""
+        parser = FrameParser(max_size=10)
+        parser.feed(encode_frame(TEXT, b"hi"))
+        with self.assertRaises(WebSocketError) as context:
+            parser.next_frame()
+        self.assertEqual(context.exception.code, 1002)
+
+        parser = FrameParser(max_size=10)
+        parser.feed(client_frame(TEXT, b"x" * 11))
+        with self.assertRaises(WebSocketError) as context:
+            parser.next_frame()
+        self.assertEqual(context.exception.code, 1009)
+
+
+class TestHandshake(unittest.IsolatedAsyncioTestCase):
+
+    def _route(self, handler, protected=False):
+        route = Route(
+            handler,
+            "GET",
+            "/chat",
+            [],
+            protected,
+            None,
+            None,
+            None,
+            websocket={"max_message_size": 16, "ping_interval": None, "max_queue": 4},
+        )
+        route.resolve("", [])
+        return route
+
+    def _request(self, data):
+        return Request.parse(data.decode(), "127.0.0.1", 5000)
+
+    async def test_accepts_handshake(self):
+        """Test that a valid handshake is answered with 101 and the accept key."""
+
+        async def handler(req, ws):
+            pass
+
+        res = Response()
+        await self._route(handler)(self._request(handshake_request()), res)
+
+        self.assertEqual(res._status_code, 101)
+        self.assertEqual(res._headers["Sec-WebSocket-Accept"], "s3pPLMBiTxaQ9kYGzzhZRbK+xOo=")
+        self.assertIsNotNone(res.websocket)
+
+    async def test_plain_request_requires_upgrade(self):
+        """Test that a request without upgrade headers is rejected with 426."""
+
+        async def handler(req, ws):
+            pass
+
+        request = self._request(b"GET /chat HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        with self.assertRaises(UpgradeRequired):
+            await self._route(handler)(request, Response())
+
+    async def test_protected_handshake_requires_auth(self):
+        """Test that the auth handler runs before the handshake is accepted."""
+
+        async def handler(req, ws):
+            pass
+
+        async def auth(req, res):
+            return False
+
+        route = self._route(handler, protected=True)
+        route.register_auth_handler(auth)
+        res = Response()
+
+        with self.assertRaises(Unauthorized):
+            await route(self._request(handshake_request()), res)
+
+        self.assertIsNone(res.websocket)
+
+
+class TestServerWebSocket(unittest.IsolatedAsyncioTestCase):
+
+    async def _connect(self, server_class, early=b""):
+        async def echo(req, ws):
+            async for message in ws:
+                await ws.send({"echo": message} if isinstance(message, str) else message)
+
+        route = Route(
+            echo,
+            "GET",
+            "/chat",
+            [],
+            False,
+            None,
+            None,
+            None,
+            websocket={"max_message_size": 1024, "ping_interval": None, "max_queue": 4},
+        )
+        route.resolve("", [])
+
+        async def handler(request: Request) -> Response:
+            res = Response()
+            try:
+                await route(request, res)
+            except ApiError as e:
+                e.convert_to_response(res)
+            return res
+
+        self.server = server_class(handler, host="127.0.0.1", port=0, drain_timeout=2)
+        self.serve_task = asyncio.ensure_future(self.server.start())
+
+        while not self.server.ready:
+            await asyncio.sleep(0.01)
+
+        port = self.server._server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(handshake_request() + early)
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 2)
+
+        return head, reader, writer
+
+    async def asyncTearDown(self):
+        self.server.stop()
+        await asyncio.wait_for(self.serve_task, 5)
+
+    async def _exchange(self, server_class):
+        head, reader, writer = await self._connect(server_class)
+        self.assertTrue(head.startswith(b"HTTP/1.1 101"))
+
+        writer.write(client_frame(TEXT, b"hel", fin=False) + client_frame(0x0, b"lo"))
+        self.assertEqual(await read_frame(reader), (TEXT, b'{"echo": "hello"}'))
+
+        writer.write(client_frame(BINARY, b"\x00\x01"))
+        self.assertEqual(await read_frame(reader), (BINARY, b"\x00\x01"))
+
+        writer.write(client_frame(PING, b"keepalive"))
+        self.assertEqual(await read_frame(reader), (PONG, b"keepalive"))
+
+        writer.write(client_frame(TEXT, b"x" * 2000))
+        opcode, payload = await read_frame(reader)
+        self.assertEqual(opcode, CLOSE)
+        self.assertEqual(struct.unpack("!H", payload[:2])[0], 1009)
+        writer.close()
+
+    async def test_streams_server(self):
+        """Test messages, pings and size limits over the streams server."""
+        await self._exchange(Server)
+
+    async def test_protocol_server(self):
+        """Test messages, pings and size limits over the protocol server."""
+        await self._exchange(ProtocolServer)
+
+    async def test_frames_sent_with_the_handshake(self):
+        """Test that frames in the same packet as the handshake reach the handler."""
+        for server_class in (Server, ProtocolServer):
+            with self.subTest(server=server_class.__name__):
+                head, reader, writer = await self._connect(
+                    server_class, client_frame(TEXT, b"early")
+                )
+                self.assertTrue(head.startswith(b"HTTP/1.1 101"))
+                frame = await asyncio.wait_for(read_frame(reader), 2)
+                self.assertEqual(frame, (TEXT, b'{"echo": "early"}'))
+                writer.close()
+                await self.asyncTearDown()
+
+    async def test_invalid_close_frames(self):
+        """Test that malformed close frames fail the connection."""
+        cases = [
+            (b"\x03", 1002),
+            (struct.pack("!H", 1005), 1002),
+            (struct.pack("!H", 2999), 1002),
+            (struct.pack("!H", 1000) + b"\xff", 1007),
+            (struct.pack("!H", 4000) + b"bye", 4000),
+        ]
+        for payload, expected in cases:
+            with self.subTest(payload=payload):
+                _, reader, writer = await self._connect(ProtocolServer)
+                writer.write(client_frame(CLOSE, payload))
+                opcode, reply = await asyncio.wait_for(read_frame(reader), 2)
+                self.assertEqual(opcode, CLOSE)
+                self.assertEqual(struct.unpack("!H", reply[:2])[0], expected)
+                writer.close()
+                await self.asyncTearDown()
+
+    async def test_shutdown_closes_connection(self):
+        """Test that shutting down closes open WebSockets with 1001."""
+        _, reader, writer = await self._connect(ProtocolServer)
+
+        self.server.stop()
+        opcode, payload = await asyncio.wait_for(read_frame(reader), 2)
+
+        self.assertEqual(opcode, CLOSE)
+        self.assertEqual(struct.unpack("!H", payload[:2])[0], 1001)
+
+        writer.write(client_frame(CLOSE, payload[:2]))
+        await asyncio.wait_for(self.serve_task, 5)
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()